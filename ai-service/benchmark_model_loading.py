@@ -0,0 +1,95 @@
+#!/usr/bin/env python3
+"""
+Compare model loading modes: load time, RSS and tokens/sec on CPU
+
+Each quantization mode runs in a fresh interpreter so RSS is not shared
+between modes. A mode loads the model through ModelManager.load_llama_model,
+then greedily generates a fixed number of tokens per prompt.
+
+    python benchmark_model_loading.py --model microsoft/DialoGPT-medium --modes none int8_dynamic onnx
+"""
+import argparse
+import asyncio
+import json
+import os
+import subprocess
+import sys
+import time
+
+# CPU only, so results are comparable across machines
+os.environ.setdefault("CUDA_VISIBLE_DEVICES", "")
+
+PROMPTS = [
+    "What is the standard deduction for a single filer?",
+    "Can I deduct student loan interest?",
+    "How do I contribute to a traditional IRA?",
+]
+
+
+async def measure_mode(model_name: str, mode: str, new_tokens: int) -> dict:
+    import torch
+    from src.models.llm_models import ModelManager, _get_rss_bytes
+
+    manager = ModelManager()
+    manager.device = "cpu"
+    rss_before = _get_rss_bytes()
+
+    if not await manager.load_llama_model(model_name, quantization=mode):
+        return {"mode": mode, "error": "load failed"}
+
+    stats = manager.model_stats[model_name]
+    model = manager.models[model_name]
+    tokenizer = manager.tokenizers[model_name]
+
+    def generate(prompt: str) -> int:
+        inputs = tokenizer(prompt, return_tensors="pt")
+        with torch.inference_mode():
+            output = model.generate(
+                **inputs,
+                max_new_tokens=new_tokens,
+                min_new_tokens=new_tokens,
+                do_sample=False,
+                pad_token_id=tokenizer.pad_token_id
+            )
+        return output.shape[1] - inputs["input_ids"].shape[1]
+
+    # Warm up before timing
+    generate(PROMPTS[0])
+
+    started = time.perf_counter()
+    tokens = sum(generate(prompt) for prompt in PROMPTS)
+    elapsed = time.perf_counter() - started
+
+    return {
+        "mode": mode,
+        "load_time_seconds": round(stats["load_time_seconds"], 2),
+        "rss_mb": round((_get_rss_bytes() - rss_before) / 1024**2, 1),
+        "tokens_per_second": round(tokens / elapsed, 1)
+    }
+
+
+def main(args):
+    if args.single_mode:
+        print(json.dumps(asyncio.run(measure_mode(args.model, args.single_mode, args.new_tokens))))
+        return
+
+    for mode in args.modes:
+        completed = subprocess.run(
+            [sys.executable, __file__, "--model", args.model, "--new-tokens", str(args.new_tokens),
+             "--single-mode", mode],
+            capture_output=True,
+            text=True
+        )
+        lines = completed.stdout.strip().splitlines()
+        print(lines[-1] if completed.returncode == 0 and lines else
+              json.dumps({"mode": mode, "error": completed.stderr.strip().splitlines()[-1:]}))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--model", default="microsoft/DialoGPT-medium")
+    parser.add_argument("--modes", nargs="+", default=["none", "int8_dynamic", "onnx"])
+    parser.add_argument("--new-tokens", type=int, default=32)
+    parser.add_argument("--single-mode", help=argparse.SUPPRESS)
+
+    main(parser.parse_args())
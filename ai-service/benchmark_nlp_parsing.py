@@ -0,0 +1,122 @@
+#!/usr/bin/env python3
+"""
+Benchmark tax input parsing throughput on a corpus of user utterances
+
+Parses the corpus (one utterance per line from --input, or a generated
+corpus) with the compiled extractor alone, with per-text spaCy calls on the
+full and the trimmed pipeline, and with nlp.pipe batching, as used by
+TaxNLPService.parse_tax_inputs. The LLM enhancement step is not included.
+
+    python benchmark_nlp_parsing.py --utterances 5000
+"""
+import argparse
+import json
+import random
+import time
+from pathlib import Path
+
+import spacy
+
+from src.config import settings
+from src.services.nlp_service import TaxNLPService
+
+TEMPLATES = [
+    "I make ${income:,} a year and I'm {status} with {kids} kids in {state}",
+    "{status}, salary {income}, my wife earns {spouse} per year. We live in {state}.",
+    "I earn {income_k}k annually and contribute ${retirement:,} to my 401k",
+    "Single mother of {kids} children in {state}, income {income}, paid {mortgage} in mortgage interest",
+    "We are married filing jointly, combined income of ${income:,}, donated ${charity:,} to charity",
+    "How much tax do I owe on {income} if I'm {status} and live in {state}?",
+    "My husband makes {spouse} and I make {income}; we have {kids} dependents and medical expenses of {medical}",
+]
+
+STATUSES = ["single", "married", "head of household", "married filing separately"]
+STATES = ["California", "Texas", "New York", "Ohio", "TX", "NY", "Florida", "Washington"]
+
+
+def generate_corpus(count: int, seed: int = 0) -> list:
+    rng = random.Random(seed)
+    corpus = []
+    for _ in range(count):
+        income = rng.randrange(20000, 400000, 500)
+        corpus.append(rng.choice(TEMPLATES).format(
+            income=income,
+            income_k=income // 1000,
+            spouse=rng.randrange(10000, 200000, 500),
+            status=rng.choice(STATUSES),
+            kids=rng.randint(0, 4),
+            state=rng.choice(STATES),
+            retirement=rng.randrange(1000, 23000, 500),
+            mortgage=rng.randrange(2000, 30000, 100),
+            charity=rng.randrange(100, 10000, 50),
+            medical=rng.randrange(500, 20000, 50),
+        ))
+    return corpus
+
+
+def run_mode(name: str, parse, corpus: list) -> dict:
+    started = time.perf_counter()
+    results = parse(corpus)
+    elapsed = time.perf_counter() - started
+
+    return {
+        "mode": name,
+        "utterances_per_second": round(len(corpus) / elapsed, 1),
+        "total_seconds": round(elapsed, 3),
+        "with_income": sum(1 for result in results if result.income is not None)
+    }
+
+
+def main(args):
+    corpus = (
+        [line for line in Path(args.input).read_text().splitlines() if line.strip()]
+        if args.input else generate_corpus(args.utterances)
+    )
+
+    service = TaxNLPService()
+    full_nlp = spacy.load(args.model)
+    trimmed_nlp = spacy.load(args.model)
+    for component in settings.spacy_disabled_components:
+        if component in trimmed_nlp.pipe_names:
+            trimmed_nlp.disable_pipe(component)
+
+    def extractor_only(texts):
+        service.nlp = None
+        return service._parse_batch(texts)
+
+    def per_text(nlp):
+        def parse(texts):
+            service.nlp = nlp
+            results = []
+            for text in texts:
+                cleaned_text = service._clean_text(text)
+                results.append(service._build_result(text, cleaned_text, nlp(cleaned_text)))
+            return results
+        return parse
+
+    def piped(texts):
+        service.nlp = trimmed_nlp
+        return service._parse_batch(texts)
+
+    # Warm up spaCy before timing
+    piped(corpus[:100])
+
+    results = [
+        run_mode("extractor_only", extractor_only, corpus),
+        run_mode("per_text_full_pipeline", per_text(full_nlp), corpus),
+        run_mode("per_text_ner_only", per_text(trimmed_nlp), corpus),
+        run_mode("nlp_pipe_ner_only", piped, corpus),
+    ]
+
+    print(json.dumps({"utterances": len(corpus), "active_components": trimmed_nlp.pipe_names}))
+    for result in results:
+        print(json.dumps(result))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--input", help="Text file with one utterance per line")
+    parser.add_argument("--utterances", type=int, default=5000, help="Generated corpus size")
+    parser.add_argument("--model", default=settings.spacy_model)
+
+    main(parser.parse_args())
@@ -0,0 +1,107 @@
+#!/usr/bin/env python3
+"""
+Benchmark prompt building plus tokenization
+
+Compares the previous per-variable str.replace and regex rendering with the
+compiled templates in PromptEngineeringService, then full-prompt
+tokenization with ModelManager.encode_prompt, which reuses cached token ids
+for each template's shared prefix. Only the tokenizer is loaded.
+
+    python benchmark_prompt_building.py --iterations 5000
+"""
+import argparse
+import json
+import re
+import time
+from datetime import datetime
+
+from transformers import AutoTokenizer
+
+from src.config import settings
+from src.models.llm_models import ModelManager
+from src.services.nlp_service import ParsedTaxInfo, FilingStatus
+from src.services.prompt_service import PromptEngineeringService
+
+CASES = [
+    ("tax_question_answer", {"question": "Can I deduct my home office?"}),
+    ("tax_info_extraction", {"user_input": "I make 75k, married with 2 kids in California"}),
+    ("tax_concept_explanation", {"concept": "the alternative minimum tax"}),
+    ("general_tax_assistance", {"user_request": "I forgot to file last year, what now?"}),
+]
+
+USER_CONTEXT = ParsedTaxInfo(
+    income=85000,
+    filing_status=FilingStatus.MARRIED_FILING_JOINTLY,
+    dependents=2,
+    state="CA",
+    deductions=[{"type": "mortgage_interest", "amount": 12000}]
+)
+
+
+def legacy_build(service: PromptEngineeringService, template_name: str, variables: dict) -> str:
+    """The replace-and-regex rendering used before templates were compiled."""
+    template = service.templates[template_name]
+    all_variables = {
+        **variables,
+        "context_section": service._build_context_section(USER_CONTEXT),
+        "personalization_section": service._build_personalization_section(USER_CONTEXT),
+        "tax_year": datetime.now().year
+    }
+
+    prompt = template.template
+    for var_name, var_value in all_variables.items():
+        if f"{{{var_name}}}" in prompt:
+            prompt = prompt.replace(f"{{{var_name}}}", str(var_value))
+
+    if all_variables.get("context_section", "").strip() == "":
+        prompt = re.sub(r'\{context_section\}\s*\n?', '', prompt)
+    if all_variables.get("personalization_section", "").strip() == "":
+        prompt = re.sub(r'\{personalization_section\}\s*\n?', '', prompt)
+    prompt = re.sub(r'\n{3,}', '\n\n', prompt)
+
+    return prompt.strip()
+
+
+def timed(label: str, iterations: int, fn) -> dict:
+    started = time.perf_counter()
+    for i in range(iterations):
+        fn(i)
+    elapsed = time.perf_counter() - started
+    return {"step": label, "microseconds_per_prompt": round(elapsed / iterations * 1e6, 2)}
+
+
+def main(args):
+    service = PromptEngineeringService()
+    manager = ModelManager()
+    tokenizer = AutoTokenizer.from_pretrained(args.tokenizer, cache_dir=settings.model_cache_dir)
+    manager.tokenizers[args.tokenizer] = tokenizer
+
+    built = [service.build_prompt(name, variables, USER_CONTEXT) for name, variables in CASES]
+
+    results = [
+        timed("build_legacy", args.iterations,
+              lambda i: legacy_build(service, *CASES[i % len(CASES)])),
+        timed("build_compiled", args.iterations,
+              lambda i: service.build_prompt(CASES[i % len(CASES)][0], CASES[i % len(CASES)][1], USER_CONTEXT)),
+        timed("tokenize_full", args.iterations,
+              lambda i: manager.encode_prompt(args.tokenizer, built[i % len(built)]["prompt"])),
+        timed("tokenize_cached_prefix", args.iterations,
+              lambda i: manager.encode_prompt(args.tokenizer, built[i % len(built)]["prompt"],
+                                              built[i % len(built)]["prefix"])),
+    ]
+
+    for result in results:
+        print(json.dumps(result))
+    print(json.dumps({
+        "prefix_tokens": {prompt["template_name"]: len(tokenizer(prompt["prefix"])["input_ids"]) for prompt in built},
+        "prompt_tokens": {prompt["template_name"]: len(tokenizer(prompt["prompt"])["input_ids"]) for prompt in built},
+        "prefix_cache": manager.prefix_stats
+    }))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--tokenizer", default="microsoft/DialoGPT-medium")
+    parser.add_argument("--iterations", type=int, default=5000)
+
+    main(parser.parse_args())
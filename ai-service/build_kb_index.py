@@ -0,0 +1,81 @@
+#!/usr/bin/env python3
+"""
+Build a versioned knowledge-base index for TaxQAService
+
+Reads curated Q&As (a JSON list or JSON Lines of objects with question,
+answer, category, confidence, sources and tax_code), adds the built-in
+knowledge base, writes <output>/<version>/ and points <output>/CURRENT at it.
+Lookup latency is measured against the new index afterwards.
+
+    python build_kb_index.py --input curated_qa.jsonl --output ./kb_index
+"""
+import argparse
+import json
+import statistics
+import time
+from pathlib import Path
+
+from src.config import settings
+from src.services.kb_index import build_kb_index, KnowledgeBaseIndex
+from src.services.qa_service import qa_service
+
+
+def read_entries(path: str) -> list:
+    text = Path(path).read_text()
+    if text.lstrip().startswith("["):
+        return json.loads(text)
+    return [json.loads(line) for line in text.splitlines() if line.strip()]
+
+
+def measure_lookups(index: KnowledgeBaseIndex, questions: list) -> dict:
+    latencies = []
+    hits = 0
+    for question in questions:
+        start = time.perf_counter()
+        if index.lookup(question):
+            hits += 1
+        latencies.append((time.perf_counter() - start) * 1000)
+
+    latencies.sort()
+    return {
+        "lookups": len(latencies),
+        "hit_rate": round(hits / len(latencies), 3),
+        "p50_ms": round(statistics.median(latencies), 4),
+        "p99_ms": round(latencies[max(int(len(latencies) * 0.99) - 1, 0)], 4)
+    }
+
+
+def main(args):
+    entries = read_entries(args.input) if args.input else []
+    if not args.no_builtin:
+        entries.extend(qa_service.export_knowledge_base())
+
+    if not entries:
+        raise SystemExit("No knowledge base entries to index")
+
+    version_dir = build_kb_index(
+        entries,
+        args.output,
+        version=args.version,
+        embedder_name=args.embedder,
+        dimension=args.dimension,
+        nlist=args.nlist
+    )
+
+    index = KnowledgeBaseIndex.load(args.output)
+    print(json.dumps({"index": str(version_dir), **index.manifest}))
+    print(json.dumps(measure_lookups(index, [entry["question"] for entry in entries[:1000]])))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--input", help="Curated Q&A file (JSON list or JSON Lines)")
+    parser.add_argument("--output", default=settings.kb_index_path)
+    parser.add_argument("--version", help="Version directory name (defaults to a UTC timestamp)")
+    parser.add_argument("--embedder", default="hashing",
+                        help="'hashing' or a sentence-transformers model name")
+    parser.add_argument("--dimension", type=int, default=512, help="Hashing embedder dimension")
+    parser.add_argument("--nlist", type=int, help="IVF lists (0 for exact search; default scales with KB size)")
+    parser.add_argument("--no-builtin", action="store_true", help="Do not include the built-in knowledge base")
+
+    main(parser.parse_args())
@@ -3,7 +3,8 @@ import uvicorn
 from fastapi import FastAPI, HTTPException, Request
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.middleware.trustedhost import TrustedHostMiddleware
-from fastapi.responses import JSONResponse
+from fastapi.responses import JSONResponse, Response
+from prometheus_client import generate_latest, CONTENT_TYPE_LATEST
 from contextlib import asynccontextmanager
 import time
 
@@ -24,9 +25,9 @@ async def lifespan(app: FastAPI):
         # Initialize services
         api_logger.info("Initializing AI services...")
 
-        # Initialize model manager and load models
+        # Preload models in the background; /health reports not ready until they are loaded
         model_manager = get_model_manager()
-        await model_manager.load_llama_model()
+        model_manager.start_preload()
 
         # Initialize NLP service
         await nlp_service.initialize()
@@ -48,6 +49,9 @@ async def lifespan(app: FastAPI):
     try:
         # Cleanup model manager
         model_manager = get_model_manager()
+        if model_manager.preload_task and not model_manager.preload_task.done():
+            model_manager.preload_task.cancel()
+        await model_manager.scheduler.shutdown()
         for model_name in list(model_manager.models.keys()):
             model_manager.unload_model(model_name)
 
@@ -167,6 +171,12 @@ async def ping():
     return {"status": "ok", "timestamp": time.time()}
 
 
+@app.get("/metrics")
+async def metrics():
+    """Prometheus metrics endpoint."""
+    return Response(generate_latest(), media_type=CONTENT_TYPE_LATEST)
+
+
 # Mount API router
 app.include_router(api_router, prefix=settings.api_prefix)
 
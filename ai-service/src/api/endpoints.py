@@ -1,14 +1,18 @@
 import asyncio
+import json
 import time
 from typing import Optional, List, Dict, Any
-from fastapi import APIRouter, HTTPException, UploadFile, File, Depends, BackgroundTasks
-from fastapi.responses import JSONResponse
+from fastapi import APIRouter, HTTPException, UploadFile, File, Depends, BackgroundTasks, WebSocket, WebSocketDisconnect
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse, StreamingResponse
 import uuid
 
+import numpy as np
+
 from src.api.schemas import (
     ParseTextRequest, ParsedTaxInfoResponse,
     VoiceToTextRequest, VoiceTranscriptionResponse,
-    OptimizationRequest, OptimizationResponse,
+    OptimizationRequest, OptimizationResponse, OptimizationSuggestionResponse, OptimizationInsightsResponse,
     TaxQuestionRequest, QAResponse,
     ServiceHealthResponse, ErrorResponse, SuccessResponse,
     ModelInfoResponse, SupportedFormatsResponse, QuestionSuggestionsResponse
@@ -17,6 +21,7 @@ from src.services import (
     nlp_service, voice_service, optimization_service, qa_service, ParsedTaxInfo
 )
 from src.models import get_model_manager
+from src.middleware import quality_controller
 from src.core import api_logger
 from src.config import settings
 
@@ -56,6 +61,119 @@ def convert_parsed_info_to_optimization_request(parsed_info: ParsedTaxInfo) -> O
     )
 
 
+def convert_request_to_parsed_info(request: OptimizationRequest, confidence_score: float = 0.95) -> ParsedTaxInfo:
+    """Convert an OptimizationRequest (direct user input) to ParsedTaxInfo."""
+    return ParsedTaxInfo(
+        income=request.income,
+        filing_status=request.filing_status,
+        dependents=request.dependents,
+        state=request.state,
+        country=request.country,
+        age=request.age,
+        spouse_income=request.spouse_income,
+        deductions=request.deductions,
+        retirement_contributions=request.retirement_contributions,
+        student_loan_interest=request.student_loan_interest,
+        mortgage_interest=request.mortgage_interest,
+        charitable_donations=request.charitable_donations,
+        medical_expenses=request.medical_expenses,
+        business_income=request.business_income,
+        confidence_score=confidence_score
+    )
+
+
+def build_optimization_response(
+    request: OptimizationRequest,
+    suggestions: List[Any],
+    processing_time: float,
+    result: Optional[Any] = None
+) -> OptimizationResponse:
+    """Build the optimization response with profile and analysis summaries."""
+    # Calculate total potential savings
+    total_savings = sum(s.potential_savings for s in suggestions)
+
+    # Create user profile summary
+    profile_parts = []
+    if request.income:
+        profile_parts.append(f"Income: ${request.income:,.0f}")
+    if request.filing_status:
+        profile_parts.append(f"Filing Status: {request.filing_status}")
+    if request.dependents > 0:
+        profile_parts.append(f"Dependents: {request.dependents}")
+    if request.state:
+        profile_parts.append(f"State: {request.state}")
+
+    user_profile_summary = ", ".join(profile_parts) if profile_parts else "Basic profile"
+
+    # Create analysis summary
+    analysis_summary = f"Generated {len(suggestions)} optimization suggestions with potential savings of ${total_savings:,.0f}."
+    if suggestions:
+        top_category = max(set(s.category for s in suggestions), key=lambda cat: len([s for s in suggestions if s.category == cat]))
+        analysis_summary += f" Primary focus area: {top_category.value.replace('_', ' ').title()}."
+
+    return OptimizationResponse(
+        suggestions=[convert_suggestion_to_response(s) for s in suggestions],
+        total_potential_savings=total_savings,
+        analysis_summary=analysis_summary,
+        user_profile_summary=user_profile_summary,
+        processing_time=processing_time,
+        insights_id=result.insights_id if result else None,
+        insights_status=result.insights_status if result else "disabled",
+        degraded=result.degraded if result else False
+    )
+
+
+def convert_suggestion_to_response(s: Any) -> OptimizationSuggestionResponse:
+    """Convert an OptimizationSuggestion to its response model."""
+    return OptimizationSuggestionResponse(
+        id=s.id,
+        category=s.category.value,
+        title=s.title,
+        description=s.description,
+        potential_savings=s.potential_savings,
+        confidence=s.confidence,
+        priority=s.priority,
+        required_actions=s.required_actions,
+        deadlines=s.deadlines,
+        applicable_tax_years=s.applicable_tax_years,
+        legal_references=s.legal_references,
+        estimated_effort=s.estimated_effort,
+        eligibility_requirements=s.eligibility_requirements,
+        risks=s.risks,
+        additional_info=s.additional_info
+    )
+
+
+def build_qa_response(qa_response: Any, personalized: bool, processing_time: float) -> QAResponse:
+    """Convert a service QAResponse to the API response model."""
+    return QAResponse(
+        answer=qa_response.answer,
+        confidence=qa_response.confidence,
+        category=qa_response.category.value,
+        sources=qa_response.sources,
+        related_questions=qa_response.related_questions,
+        tax_code_references=qa_response.tax_code_references,
+        disclaimer=qa_response.disclaimer,
+        follow_up_suggestions=qa_response.follow_up_suggestions,
+        personalized=personalized,
+        processing_time=processing_time
+    )
+
+
+def format_sse_event(event: str, data: Dict[str, Any]) -> str:
+    """Format one server-sent event."""
+    return f"event: {event}\ndata: {json.dumps(data, default=str)}\n\n"
+
+
+def create_event_stream_response(events) -> StreamingResponse:
+    """Wrap an async iterator of SSE strings in an unbuffered streaming response."""
+    return StreamingResponse(
+        events,
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+
 # Parse Text Endpoint
 @router.post("/parse-text", response_model=ParsedTaxInfoResponse)
 async def parse_text(request: ParseTextRequest):
@@ -160,6 +278,51 @@ async def voice_to_text(
         raise HTTPException(status_code=500, detail=f"Failed to transcribe audio: {str(e)}")
 
 
+# Streaming Voice Transcription Endpoint
+@router.websocket("/voice/stream")
+async def stream_voice_to_text(websocket: WebSocket, sample_rate: int = 16000, language: str = "en"):
+    """Transcribe 16-bit mono PCM sent as binary messages; a text message ends the stream."""
+    await websocket.accept()
+    api_logger.info("Voice stream opened", sample_rate=sample_rate, language=language)
+    session = voice_service.create_transcription_session(sample_rate, language)
+
+    try:
+        while True:
+            message = await websocket.receive()
+            if message["type"] == "websocket.disconnect":
+                return
+
+            if message.get("bytes") is None:
+                break
+
+            chunk = np.frombuffer(message["bytes"], dtype=np.int16).astype(np.float32) / 32768.0
+            for event in await session.feed(chunk):
+                await websocket.send_json(event)
+
+        for event in await session.finish():
+            await websocket.send_json(event)
+
+        result = session.result()
+        await websocket.send_json({
+            "type": "final",
+            "text": result["text"],
+            "cleaned_text": result.get("cleaned_text", result["text"]),
+            "confidence_score": result["confidence_score"],
+            "language": result["language"],
+            "duration": result["duration"],
+            "no_speech_detected": result.get("no_speech_detected", False)
+        })
+        api_logger.info("Voice stream completed", duration=result["duration"], text_length=len(result["text"]))
+        await websocket.close()
+
+    except WebSocketDisconnect:
+        api_logger.info("Voice stream disconnected", duration=session.duration)
+    except Exception as e:
+        api_logger.error("Voice stream failed", error=str(e))
+        await websocket.send_json({"type": "error", "error": f"Failed to transcribe audio: {str(e)}"})
+        await websocket.close(code=1011)
+
+
 # Tax Optimization Endpoint
 @router.post("/optimize", response_model=OptimizationResponse)
 async def get_optimization_suggestions(request: OptimizationRequest):
@@ -169,84 +332,25 @@ async def get_optimization_suggestions(request: OptimizationRequest):
         api_logger.info("Optimization request received", income=request.income, filing_status=request.filing_status)
 
         # Convert request to ParsedTaxInfo
-        parsed_info = ParsedTaxInfo(
-            income=request.income,
-            filing_status=request.filing_status,
-            dependents=request.dependents,
-            state=request.state,
-            country=request.country,
-            age=request.age,
-            spouse_income=request.spouse_income,
-            deductions=request.deductions,
-            retirement_contributions=request.retirement_contributions,
-            student_loan_interest=request.student_loan_interest,
-            mortgage_interest=request.mortgage_interest,
-            charitable_donations=request.charitable_donations,
-            medical_expenses=request.medical_expenses,
-            business_income=request.business_income,
-            confidence_score=0.95  # High confidence for direct input
-        )
+        parsed_info = convert_request_to_parsed_info(request)
 
-        # Generate optimization suggestions
-        suggestions = await optimization_service.generate_optimization_suggestions(
+        # Generate optimization suggestions within the request deadline; AI insights continue in the background
+        result = await optimization_service.run_optimization(
             parsed_info,
-            user_preferences=request.preferences
+            user_preferences=request.preferences,
+            deadline_ms=request.deadline_ms,
+            insights=request.include_insights
         )
 
-        # Calculate total potential savings
-        total_savings = sum(s.potential_savings for s in suggestions)
-
-        # Create user profile summary
-        profile_parts = []
-        if request.income:
-            profile_parts.append(f"Income: ${request.income:,.0f}")
-        if request.filing_status:
-            profile_parts.append(f"Filing Status: {request.filing_status}")
-        if request.dependents > 0:
-            profile_parts.append(f"Dependents: {request.dependents}")
-        if request.state:
-            profile_parts.append(f"State: {request.state}")
-
-        user_profile_summary = ", ".join(profile_parts) if profile_parts else "Basic profile"
-
-        # Create analysis summary
-        analysis_summary = f"Generated {len(suggestions)} optimization suggestions with potential savings of ${total_savings:,.0f}."
-        if suggestions:
-            top_category = max(set(s.category for s in suggestions), key=lambda cat: len([s for s in suggestions if s.category == cat]))
-            analysis_summary += f" Primary focus area: {top_category.value.replace('_', ' ').title()}."
-
         processing_time = time.time() - start_time
-
-        response = OptimizationResponse(
-            suggestions=[
-                OptimizationSuggestionResponse(
-                    id=s.id,
-                    category=s.category.value,
-                    title=s.title,
-                    description=s.description,
-                    potential_savings=s.potential_savings,
-                    confidence=s.confidence,
-                    priority=s.priority,
-                    required_actions=s.required_actions,
-                    deadlines=s.deadlines,
-                    applicable_tax_years=s.applicable_tax_years,
-                    legal_references=s.legal_references,
-                    estimated_effort=s.estimated_effort,
-                    eligibility_requirements=s.eligibility_requirements,
-                    risks=s.risks,
-                    additional_info=s.additional_info
-                ) for s in suggestions
-            ],
-            total_potential_savings=total_savings,
-            analysis_summary=analysis_summary,
-            user_profile_summary=user_profile_summary,
-            processing_time=processing_time
-        )
+        response = build_optimization_response(request, result.suggestions, processing_time, result)
 
         api_logger.info("Optimization completed",
                        processing_time=processing_time,
-                       suggestions_count=len(suggestions),
-                       total_savings=total_savings)
+                       suggestions_count=len(result.suggestions),
+                       total_savings=response.total_potential_savings,
+                       degraded=result.degraded,
+                       insights_status=result.insights_status)
 
         return response
 
@@ -255,6 +359,16 @@ async def get_optimization_suggestions(request: OptimizationRequest):
         raise HTTPException(status_code=500, detail=f"Failed to generate optimization suggestions: {str(e)}")
 
 
+@router.get("/optimize/insights/{insights_id}", response_model=OptimizationInsightsResponse)
+async def get_optimization_insights(insights_id: str):
+    """Fetch the background AI review started by /optimize."""
+    insights = optimization_service.get_insights(insights_id)
+    if insights is None:
+        raise HTTPException(status_code=404, detail="Insights not found or expired")
+
+    return OptimizationInsightsResponse(**insights)
+
+
 # Tax Q&A Endpoint
 @router.post("/ask", response_model=QAResponse)
 async def ask_tax_question(request: TaxQuestionRequest):
@@ -264,25 +378,7 @@ async def ask_tax_question(request: TaxQuestionRequest):
         api_logger.info("Tax question received", question_length=len(request.question))
 
         # Convert user context if provided
-        user_context = None
-        if request.user_context:
-            user_context = ParsedTaxInfo(
-                income=request.user_context.income,
-                filing_status=request.user_context.filing_status,
-                dependents=request.user_context.dependents,
-                state=request.user_context.state,
-                country=request.user_context.country,
-                age=request.user_context.age,
-                spouse_income=request.user_context.spouse_income,
-                deductions=request.user_context.deductions,
-                retirement_contributions=request.user_context.retirement_contributions,
-                student_loan_interest=request.user_context.student_loan_interest,
-                mortgage_interest=request.user_context.mortgage_interest,
-                charitable_donations=request.user_context.charitable_donations,
-                medical_expenses=request.user_context.medical_expenses,
-                business_income=request.user_context.business_income,
-                confidence_score=0.95
-            )
+        user_context = convert_request_to_parsed_info(request.user_context) if request.user_context else None
 
         # Get answer from Q&A service
         qa_response = await qa_service.answer_tax_question(
@@ -293,18 +389,7 @@ async def ask_tax_question(request: TaxQuestionRequest):
 
         processing_time = time.time() - start_time
 
-        response = QAResponse(
-            answer=qa_response.answer,
-            confidence=qa_response.confidence,
-            category=qa_response.category.value,
-            sources=qa_response.sources,
-            related_questions=qa_response.related_questions,
-            tax_code_references=qa_response.tax_code_references,
-            disclaimer=qa_response.disclaimer,
-            follow_up_suggestions=qa_response.follow_up_suggestions,
-            personalized=user_context is not None,
-            processing_time=processing_time
-        )
+        response = build_qa_response(qa_response, user_context is not None, processing_time)
 
         api_logger.info("Tax question answered",
                        processing_time=processing_time,
@@ -318,6 +403,82 @@ async def ask_tax_question(request: TaxQuestionRequest):
         raise HTTPException(status_code=500, detail=f"Failed to answer question: {str(e)}")
 
 
+# Streaming Tax Q&A Endpoint
+@router.post("/ask/stream")
+async def stream_tax_question(request: TaxQuestionRequest):
+    """Answer a tax question as server-sent events, streaming answer tokens as they are generated."""
+    start_time = time.time()
+    api_logger.info("Streaming tax question received", question_length=len(request.question))
+
+    user_context = convert_request_to_parsed_info(request.user_context) if request.user_context else None
+
+    async def events():
+        try:
+            async for event, data in qa_service.stream_tax_question(
+                request.question,
+                user_context=user_context,
+                conversation_history=request.conversation_history
+            ):
+                if event == "final":
+                    processing_time = time.time() - start_time
+                    data = {
+                        "response": build_qa_response(data["response"], user_context is not None, processing_time).dict(),
+                        "quality": data["quality"].to_dict(),
+                        "fallback_used": data["fallback_used"],
+                        "time_to_first_token": data["time_to_first_token"]
+                    }
+                    api_logger.info("Streaming tax question completed",
+                                   processing_time=processing_time,
+                                   time_to_first_token=data["time_to_first_token"])
+
+                yield format_sse_event(event, data)
+
+        except Exception as e:
+            api_logger.error("Streaming tax Q&A failed", error=str(e))
+            yield format_sse_event("error", {"error": f"Failed to answer question: {str(e)}"})
+
+    return create_event_stream_response(events())
+
+
+# Streaming Tax Optimization Endpoint
+@router.post("/optimize/stream")
+async def stream_optimization_suggestions(request: OptimizationRequest):
+    """Stream optimization suggestions and AI insights as server-sent events."""
+    start_time = time.time()
+    api_logger.info("Streaming optimization request received", income=request.income, filing_status=request.filing_status)
+
+    parsed_info = convert_request_to_parsed_info(request)
+
+    async def events():
+        try:
+            async for event, data in optimization_service.stream_optimization_suggestions(
+                parsed_info,
+                user_preferences=request.preferences
+            ):
+                if event == "suggestions":
+                    data = {"suggestions": [convert_suggestion_to_response(s).dict() for s in data["suggestions"]]}
+
+                elif event == "final":
+                    processing_time = time.time() - start_time
+                    data = {
+                        "response": build_optimization_response(request, data["suggestions"], processing_time).dict(),
+                        "insights": data["insights"],
+                        "quality": data["quality"].to_dict() if data["quality"] else None,
+                        "time_to_first_token": data["time_to_first_token"]
+                    }
+                    api_logger.info("Streaming optimization completed",
+                                   processing_time=processing_time,
+                                   time_to_first_token=data["time_to_first_token"])
+
+                yield format_sse_event(event, data)
+
+        except Exception as e:
+            api_logger.error("Streaming optimization failed", error=str(e))
+            yield format_sse_event("error", {"error": f"Failed to generate optimization suggestions: {str(e)}"})
+
+    return create_event_stream_response(events())
+
+
 # Health Check Endpoint
 @router.get("/health", response_model=ServiceHealthResponse)
 async def health_check():
@@ -348,14 +509,21 @@ async def health_check():
         services_status["optimization"] = {"status": "healthy", "ready": True}
 
         # Check Q&A service
-        services_status["qa"] = {"status": "healthy", "ready": True}
+        services_status["qa"] = {
+            "status": "healthy",
+            "ready": True,
+            "response_cache": quality_controller.get_cache_statistics()
+        }
 
         # Determine overall status
         all_healthy = all(
             service.get("status") == "healthy"
             for service in services_status.values()
         )
-        overall_status = "healthy" if all_healthy else "degraded"
+        preload_failed = "failed" in model_manager.preload_status.values()
+        overall_status = "healthy" if all_healthy and not preload_failed else "degraded"
+        if not model_manager.is_ready:
+            overall_status = "starting"
 
         uptime = time.time() - start_time  # Simplified uptime
 
@@ -367,6 +535,10 @@ async def health_check():
             version=settings.app_version
         )
 
+        # Not ready until preloaded models are in memory, so load balancers hold traffic back
+        if not model_manager.is_ready:
+            return JSONResponse(status_code=503, content=jsonable_encoder(response))
+
         return response
 
     except Exception as e:
@@ -75,6 +75,8 @@ class OptimizationRequest(BaseModel):
     medical_expenses: Optional[float] = Field(None, description="Medical expenses", ge=0)
     business_income: Optional[float] = Field(None, description="Business income", ge=0)
     preferences: Dict[str, Any] = Field(default_factory=dict, description="User preferences for optimization")
+    deadline_ms: Optional[int] = Field(None, description="Latency budget in milliseconds (capped by the server)", ge=50)
+    include_insights: bool = Field(True, description="Start a background AI review of the suggestions")
 
 
 class TaxQuestionRequest(BaseModel):
@@ -154,6 +156,18 @@ class OptimizationResponse(BaseModel):
     user_profile_summary: str = Field(..., description="Summary of user profile")
     generated_at: datetime = Field(default_factory=datetime.now, description="Generation timestamp")
     processing_time: float = Field(..., description="Processing time in seconds")
+    insights_id: Optional[str] = Field(None, description="ID to fetch the background AI review with")
+    insights_status: str = Field("disabled", description="AI review status: pending, skipped or disabled")
+    degraded: bool = Field(False, description="Whether some suggestion categories missed the deadline")
+
+
+class OptimizationInsightsResponse(BaseModel):
+    insights_id: str = Field(..., description="AI review ID")
+    status: str = Field(..., description="Review status: pending, completed or failed")
+    insights: Optional[str] = Field(None, description="AI review of the suggestions")
+    quality: Optional[Dict[str, Any]] = Field(None, description="Quality verdict for the review")
+    processing_time: Optional[float] = Field(None, description="Generation time in seconds")
+    error: Optional[str] = Field(None, description="Error message if the review failed")
 
 
 class QAResponse(BaseModel):
@@ -41,6 +41,14 @@ class Settings(BaseSettings):
     redis_db: int = 0
     cache_ttl: int = 3600  # 1 hour
 
+    # Response cache settings
+    response_cache_backend: str = "memory"  # "memory" or "redis" (shared across workers)
+    response_cache_max_entries: int = 1000
+    response_cache_max_bytes: int = 16 * 1024 * 1024  # 16 MB per process
+    response_cache_ttl: int = 86400  # 24 hours
+    response_cache_near_duplicates: bool = True
+    response_cache_similarity_threshold: float = 0.92
+
     # AI Model settings
     huggingface_token: Optional[str] = None
     openai_api_key: Optional[str] = None
@@ -52,21 +60,62 @@ class Settings(BaseSettings):
     llama_temperature: float = 0.7
     llama_top_p: float = 0.9
 
+    # Model loading settings
+    model_quantization: str = "auto"  # "auto" (4-bit bitsandbytes on GPU), "none", "int8_dynamic" (CPU) or "onnx"
+    model_preload: List[str] = ["microsoft/DialoGPT-medium"]  # loaded in the background at startup
+    model_memory_budget_mb: int = 0  # unload least recently used models above this; 0 disables eviction
+    onnx_export_dir: str = "./models/onnx"
+
+    # Generation batching settings
+    generation_batching_enabled: bool = True
+    generation_max_batch_size: int = 8
+    generation_max_wait_ms: float = 20.0  # milliseconds to collect a batch
+    prompt_prefix_cache_size: int = 256  # shared prompt prefixes kept tokenized
+
     # OpenAI settings (fallback)
     openai_model: str = "gpt-3.5-turbo"
     openai_max_tokens: int = 500
     openai_temperature: float = 0.7
 
+    # NLP parsing settings
+    spacy_model: str = "en_core_web_sm"
+    spacy_disabled_components: List[str] = ["tagger", "parser", "attribute_ruler", "lemmatizer"]  # NER only
+    nlp_pipe_batch_size: int = 64  # texts per nlp.pipe batch for bulk parsing
+
     # Voice processing settings
     whisper_model: str = "base"
     max_audio_duration: int = 300  # 5 minutes
     supported_audio_formats: List[str] = ["wav", "mp3", "m4a", "flac"]
 
+    # Streaming transcription settings
+    voice_stream_vad_frame_ms: int = 30  # webrtcvad accepts 10, 20 or 30 ms frames
+    voice_stream_padding_ms: int = 300  # VAD smoothing window that opens and closes segments
+    voice_stream_max_segment_seconds: float = 15.0  # longer speech is cut and stitched
+    voice_stream_overlap_seconds: float = 1.0  # audio re-read across a cut
+    voice_stream_partial_interval_seconds: float = 1.0  # new audio between partial hypotheses
+    voice_stream_buffer_seconds: float = 30.0  # ring buffer size; must exceed the max segment plus overlap
+
+    # Knowledge base index settings
+    kb_index_path: str = "./kb_index"  # directory with a CURRENT pointer or a single index version
+    kb_similarity_threshold: float = 0.8  # minimum cosine similarity for a vector match
+    kb_token_similarity_threshold: float = 0.7  # minimum Jaccard overlap for a token match
+    kb_ivf_min_entries: int = 5000  # build an IVF index at or above this many entries
+    kb_ivf_nprobe: int = 8  # IVF lists searched per query
+
     # Response settings
     max_response_time: float = 3.0  # seconds
     confidence_threshold: float = 0.7
     max_suggestions: int = 5
 
+    # Optimization settings
+    tax_year: int = 2024  # year of the federal tables used for suggestions
+    optimization_deadline_ms: int = 2000  # per-request budget for /optimize; requests may ask for less
+    optimization_insights_min_budget_ms: int = 500  # skip AI insights when less budget than this remains
+    optimization_insights_timeout: float = 30.0  # seconds a background AI review may run
+    optimization_max_pending_insights: int = 8  # background AI reviews running at once; more are skipped
+    optimization_insights_max_entries: int = 1000
+    optimization_insights_ttl: int = 600  # seconds a finished AI review can be fetched
+
     # Rate limiting
     rate_limit_requests: int = 100
     rate_limit_period: int = 3600  # 1 hour
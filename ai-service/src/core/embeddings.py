@@ -0,0 +1,45 @@
+import re
+import zlib
+from typing import List
+
+import numpy as np
+
+
+STOPWORDS = {
+    "a", "an", "and", "are", "can", "do", "does", "for", "how", "i", "if", "in", "is",
+    "it", "me", "my", "of", "on", "or", "the", "to", "what", "when", "with"
+}
+
+
+def tokenize_question(text: str) -> List[str]:
+    """Lowercase word tokens without stopwords, as used by the embedder and token index."""
+    return [token for token in re.findall(r"[a-z0-9]+", text.lower()) if token not in STOPWORDS]
+
+
+class HashingEmbedder:
+    """Signed feature-hashing embedder over word unigrams and bigrams (no model, sub-millisecond)."""
+
+    name = "hashing"
+
+    def __init__(self, dimension: int = 512):
+        self.dimension = dimension
+
+    def embed(self, texts: List[str]) -> np.ndarray:
+        vectors = np.zeros((len(texts), self.dimension), dtype=np.float32)
+
+        for row, text in enumerate(texts):
+            tokens = tokenize_question(text)
+            features = tokens + [f"{a} {b}" for a, b in zip(tokens, tokens[1:])]
+            for feature in features:
+                # crc32 is stable across processes, unlike hash()
+                digest = zlib.crc32(feature.encode("utf-8"))
+                vectors[row, digest % self.dimension] += -1.0 if digest & 0x80000000 else 1.0
+
+        return normalize_rows(vectors)
+
+
+def normalize_rows(vectors: np.ndarray) -> np.ndarray:
+    """L2-normalise each row; all-zero rows are left as zeros."""
+    norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+    norms[norms == 0] = 1.0
+    return vectors / norms
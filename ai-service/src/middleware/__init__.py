@@ -1,3 +1,8 @@
-from .quality_control import quality_controller, ResponseQualityController, ResponseQuality, QualityMetrics
+from .quality_control import (
+    quality_controller, ResponseQualityController, ResponseQuality, QualityMetrics, StreamingQualityMonitor
+)
 
-__all__ = ["quality_controller", "ResponseQualityController", "ResponseQuality", "QualityMetrics"]
\ No newline at end of file
+__all__ = [
+    "quality_controller", "ResponseQualityController", "ResponseQuality", "QualityMetrics",
+    "StreamingQualityMonitor"
+]
\ No newline at end of file
@@ -9,6 +9,7 @@ import hashlib
 
 from src.core import ai_logger
 from src.config import settings
+from src.middleware.response_cache import ResponseCache
 
 
 class ResponseQuality(Enum):
@@ -43,6 +44,86 @@ class QualityMetrics:
     warnings: List[str]
     suggestions: List[str]
 
+    def to_dict(self) -> Dict[str, Any]:
+        """JSON-serialisable form of the metrics."""
+        return {
+            "confidence": self.confidence,
+            "accuracy_score": self.accuracy_score,
+            "completeness_score": self.completeness_score,
+            "relevance_score": self.relevance_score,
+            "response_time": self.response_time,
+            "text_quality_score": self.text_quality_score,
+            "overall_quality": self.overall_quality.value,
+            "validation_results": {rule.value: passed for rule, passed in self.validation_results.items()},
+            "warnings": self.warnings,
+            "suggestions": self.suggestions
+        }
+
+
+class StreamingQualityMonitor:
+    """
+    Runs the cheap quality checks on a response while it is being streamed.
+
+    Chunks are fed before anything is sent; ``release`` then hands out only
+    text that has been checked and cannot be part of a later harmful match
+    (everything but the last SCAN_OVERLAP characters). Once harmful content
+    is flagged nothing more is released.
+    """
+
+    # Longest harmful pattern match we need to catch across chunk boundaries
+    SCAN_OVERLAP = 64
+
+    def __init__(self, controller: "ResponseQualityController", response_type: str,
+                 context: Optional[Dict[str, Any]] = None):
+        self.controller = controller
+        self.response_type = response_type
+        self.context = context
+        self.text = ""
+        self.scanned_length = 0
+        self.warnings: List[str] = []
+        self.should_stop = False
+        self.flagged = False
+        self.released_length = 0
+
+    def feed(self, chunk: str) -> List[str]:
+        """Add a streamed chunk and return any warnings it raised."""
+        self.text += chunk
+        new_warnings = []
+
+        # Only the new text (plus an overlap for matches spanning chunks) is rescanned
+        window = self.text[max(0, self.scanned_length - self.SCAN_OVERLAP):]
+        self.scanned_length = len(self.text)
+
+        if self.controller._contains_harmful_content(window):
+            new_warnings.append("Response may contain inappropriate tax advice")
+            self.should_stop = True
+            self.flagged = True
+
+        max_length = self.controller.validation_rules[ValidationRule.MAX_LENGTH]["threshold"]
+        if len(self.text) > max_length:
+            new_warnings.append("Response is too long")
+            self.should_stop = True
+
+        new_warnings = [warning for warning in new_warnings if warning not in self.warnings]
+        self.warnings.extend(new_warnings)
+        return new_warnings
+
+    def release(self, final: bool = False) -> str:
+        """Checked text that has not been sent yet; the held-back tail is included once final."""
+        if self.flagged:
+            return ""
+
+        end = len(self.text) if final else max(self.released_length, len(self.text) - self.SCAN_OVERLAP)
+        released = self.text[self.released_length:end]
+        self.released_length = end
+        return released
+
+    async def finalize(self, response: str, confidence: float, processing_time: float) -> QualityMetrics:
+        """Run the full validation on the completed response for the final verdict."""
+        return await self.controller.validate_response(
+            response, self.response_type, confidence, processing_time, self.context
+        )
+
 
 class ResponseQualityController:
     """Controls and validates the quality of AI responses."""
@@ -50,7 +131,15 @@ class ResponseQualityController:
     def __init__(self):
         self.validation_rules = self._initialize_validation_rules()
         self.quality_history = []
-        self.response_cache = {}
+        self.response_cache = ResponseCache(
+            max_entries=settings.response_cache_max_entries,
+            max_bytes=settings.response_cache_max_bytes,
+            ttl=settings.response_cache_ttl,
+            similarity_threshold=settings.response_cache_similarity_threshold,
+            near_duplicates=settings.response_cache_near_duplicates,
+            redis_url=settings.redis_url if settings.response_cache_backend == "redis" else None,
+            redis_db=settings.redis_db
+        )
 
         # Harmful content patterns (basic)
         self.harmful_patterns = [
@@ -218,6 +307,14 @@ class ResponseQualityController:
                 suggestions=["Manual review recommended"]
             )
 
+    def create_stream_monitor(
+        self,
+        response_type: str,
+        context: Optional[Dict[str, Any]] = None
+    ) -> StreamingQualityMonitor:
+        """Create a monitor that checks a streamed response incrementally."""
+        return StreamingQualityMonitor(self, response_type, context)
+
     def _contains_harmful_content(self, response: str) -> bool:
         """Check if response contains potentially harmful tax advice."""
         response_lower = response.lower()
@@ -494,36 +591,23 @@ class ResponseQualityController:
             "common_warnings": dict(sorted(warning_counts.items(), key=lambda x: x[1], reverse=True)[:5])
         }
 
-    async def cache_response(self, query_hash: str, response: str, quality_metrics: QualityMetrics) -> None:
+    async def cache_response(self, query: str, response: str, quality_metrics: QualityMetrics) -> None:
         """Cache high-quality responses for future use."""
         if quality_metrics.overall_quality in [ResponseQuality.EXCELLENT, ResponseQuality.GOOD]:
-            self.response_cache[query_hash] = {
+            await self.response_cache.set(query, {
                 "response": response,
                 "quality": quality_metrics.overall_quality.value,
                 "timestamp": time.time(),
                 "confidence": quality_metrics.confidence
-            }
+            })
+
+    async def get_cached_response(self, query: str) -> Optional[Dict[str, Any]]:
+        """Get a cached response for the query, or for a near-duplicate of it, if not expired."""
+        return await self.response_cache.get(query)
 
-            # Limit cache size
-            if len(self.response_cache) > 1000:
-                # Remove oldest entries
-                oldest_keys = sorted(self.response_cache.keys(),
-                                   key=lambda k: self.response_cache[k]["timestamp"])[:100]
-                for key in oldest_keys:
-                    del self.response_cache[key]
-
-    def get_cached_response(self, query_hash: str) -> Optional[Dict[str, Any]]:
-        """Get cached response if available and not expired."""
-        if query_hash in self.response_cache:
-            cached = self.response_cache[query_hash]
-            # Check if cache is not too old (24 hours)
-            if time.time() - cached["timestamp"] < 86400:
-                return cached
-            else:
-                # Remove expired cache
-                del self.response_cache[query_hash]
-
-        return None
+    def get_cache_statistics(self) -> Dict[str, Any]:
+        """Get response cache size and hit rate."""
+        return self.response_cache.get_stats()
 
 
 # Global quality controller instance
@@ -0,0 +1,229 @@
+import hashlib
+import json
+import re
+import time
+from collections import OrderedDict
+from typing import Dict, Any, List, Optional, Callable, Tuple
+
+import numpy as np
+from prometheus_client import Counter, Gauge
+from redis import asyncio as redis_asyncio
+
+from src.core import ai_logger
+from src.core.embeddings import HashingEmbedder
+
+
+RESPONSE_CACHE_LOOKUPS = Counter(
+    'ai_response_cache_lookups_total', 'Response cache lookups', ['result']
+)
+RESPONSE_CACHE_HIT_RATIO = Gauge(
+    'ai_response_cache_hit_ratio', 'Fraction of response cache lookups served from cache'
+)
+RESPONSE_CACHE_BYTES = Gauge(
+    'ai_response_cache_bytes', 'Bytes held by the in-process response cache'
+)
+
+
+class LRUTTLCache:
+    """Ordered-dict LRU with per-entry TTL and entry/byte budgets; every operation is O(1)."""
+
+    def __init__(
+        self,
+        max_entries: int,
+        max_bytes: int,
+        ttl: float,
+        on_evict: Optional[Callable[[str], None]] = None
+    ):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self.on_evict = on_evict
+        self.entries: "OrderedDict[str, Tuple[float, int, Dict[str, Any]]]" = OrderedDict()
+        self.total_bytes = 0
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        entry = self.entries.get(key)
+        if entry is None:
+            return None
+
+        expires_at, _, value = entry
+        if time.time() >= expires_at:
+            self._remove(key)
+            return None
+
+        self.entries.move_to_end(key)
+        return value
+
+    def put(self, key: str, value: Dict[str, Any], size: int) -> bool:
+        """Insert or refresh an entry, evicting least recently used ones to fit."""
+        if key in self.entries:
+            self._remove(key)
+        if size > self.max_bytes:
+            return False
+
+        self.entries[key] = (time.time() + self.ttl, size, value)
+        self.total_bytes += size
+
+        while len(self.entries) > self.max_entries or self.total_bytes > self.max_bytes:
+            self._remove(next(iter(self.entries)))
+
+        return True
+
+    def _remove(self, key: str) -> None:
+        _, size, _ = self.entries.pop(key)
+        self.total_bytes -= size
+        if self.on_evict:
+            self.on_evict(key)
+
+    def __contains__(self, key: str) -> bool:
+        return key in self.entries
+
+    def __len__(self) -> int:
+        return len(self.entries)
+
+
+class ResponseCache:
+    """
+    Response cache keyed by normalized question, with near-duplicate lookup.
+
+    An in-process LRU/TTL cache answers first; with a Redis URL configured,
+    entries are also written to Redis so workers share exact-key hits (Redis
+    should run with an LRU maxmemory policy). Near-duplicate matching compares
+    the question's hashed embedding against the entries this process holds.
+    """
+
+    KEY_PREFIX = "ai:response_cache:"
+
+    def __init__(
+        self,
+        max_entries: int,
+        max_bytes: int,
+        ttl: float,
+        similarity_threshold: float,
+        near_duplicates: bool = True,
+        redis_url: Optional[str] = None,
+        redis_db: int = 0
+    ):
+        self.ttl = ttl
+        self.similarity_threshold = similarity_threshold
+        self.local = LRUTTLCache(max_entries, max_bytes, ttl, on_evict=self._release_slot)
+        self.redis = redis_asyncio.from_url(redis_url, db=redis_db) if redis_url else None
+
+        # One embedding slot per local entry; freed slots are zeroed so they never match
+        self.embedder = HashingEmbedder() if near_duplicates else None
+        if self.embedder:
+            self.vectors = np.zeros((max_entries, self.embedder.dimension), dtype=np.float32)
+            self.slot_keys: List[Optional[str]] = [None] * max_entries
+            self.key_slots: Dict[str, int] = {}
+            self.free_slots = list(range(max_entries))
+
+        self.lookups = {"hit": 0, "near_hit": 0, "miss": 0}
+
+    @staticmethod
+    def normalize(query: str) -> str:
+        """Lowercase, drop punctuation and collapse whitespace."""
+        return re.sub(r"\s+", " ", re.sub(r"[^\w\s]", " ", query.lower())).strip()
+
+    @staticmethod
+    def key_for(normalized_query: str) -> str:
+        return hashlib.sha256(normalized_query.encode("utf-8")).hexdigest()[:32]
+
+    async def get(self, query: str) -> Optional[Dict[str, Any]]:
+        """Cached value for the question or a near-duplicate of it."""
+        normalized = self.normalize(query)
+        value = await self._get_by_key(self.key_for(normalized))
+        result = "hit"
+
+        if value is None and self.embedder:
+            near_key = self._nearest_key(normalized)
+            if near_key:
+                value = await self._get_by_key(near_key)
+                result = "near_hit"
+
+        self._record_lookup(result if value is not None else "miss")
+        return value
+
+    async def set(self, query: str, value: Dict[str, Any]) -> None:
+        """Cache a value locally and, when configured, in Redis."""
+        normalized = self.normalize(query)
+        key = self.key_for(normalized)
+        payload = json.dumps(value)
+
+        self._put_local(key, normalized, value, len(payload.encode("utf-8")))
+
+        if self.redis is not None:
+            try:
+                await self.redis.set(self.KEY_PREFIX + key, json.dumps({"query": normalized, "value": value}),
+                                     ex=int(self.ttl))
+            except Exception as e:
+                ai_logger.warning("Response cache write to Redis failed", error=str(e))
+
+    async def _get_by_key(self, key: str) -> Optional[Dict[str, Any]]:
+        value = self.local.get(key)
+        if value is not None or self.redis is None:
+            return value
+
+        try:
+            raw = await self.redis.get(self.KEY_PREFIX + key)
+        except Exception as e:
+            ai_logger.warning("Response cache read from Redis failed", error=str(e))
+            return None
+
+        if raw is None:
+            return None
+
+        # Promote shared entries into this worker's LRU and near-duplicate index
+        record = json.loads(raw)
+        self._put_local(key, record["query"], record["value"], len(raw))
+        return record["value"]
+
+    def _put_local(self, key: str, normalized: str, value: Dict[str, Any], size: int) -> None:
+        stored = self.local.put(key, value, size)
+        RESPONSE_CACHE_BYTES.set(self.local.total_bytes)
+        if not stored or not self.embedder:
+            return
+
+        slot = self.free_slots.pop()
+        self.vectors[slot] = self.embedder.embed([normalized])[0]
+        self.slot_keys[slot] = key
+        self.key_slots[key] = slot
+
+    def _release_slot(self, key: str) -> None:
+        if not self.embedder or key not in self.key_slots:
+            return
+
+        slot = self.key_slots.pop(key)
+        self.vectors[slot] = 0.0
+        self.slot_keys[slot] = None
+        self.free_slots.append(slot)
+
+    def _nearest_key(self, normalized: str) -> Optional[str]:
+        if not self.key_slots:
+            return None
+
+        scores = self.vectors @ self.embedder.embed([normalized])[0]
+        best = int(np.argmax(scores))
+        if scores[best] >= self.similarity_threshold:
+            return self.slot_keys[best]
+        return None
+
+    def _record_lookup(self, result: str) -> None:
+        self.lookups[result] += 1
+        RESPONSE_CACHE_LOOKUPS.labels(result=result).inc()
+        RESPONSE_CACHE_HIT_RATIO.set(self.hit_rate)
+
+    @property
+    def hit_rate(self) -> float:
+        total = sum(self.lookups.values())
+        return (self.lookups["hit"] + self.lookups["near_hit"]) / total if total else 0.0
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            "entries": len(self.local),
+            "bytes": self.local.total_bytes,
+            "max_entries": self.local.max_entries,
+            "max_bytes": self.local.max_bytes,
+            "lookups": dict(self.lookups),
+            "hit_rate": self.hit_rate,
+            "shared_backend": "redis" if self.redis is not None else None
+        }
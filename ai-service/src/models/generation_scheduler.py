@@ -0,0 +1,288 @@
+import asyncio
+import time
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from typing import Optional, Dict, Any, List, Tuple, TYPE_CHECKING
+
+import torch
+from prometheus_client import Gauge, Histogram
+from transformers import StoppingCriteria, StoppingCriteriaList
+from transformers.generation.streamers import BaseStreamer
+
+from src.config import settings
+from src.core import ai_logger
+
+if TYPE_CHECKING:
+    from src.models.llm_models import ModelManager
+
+
+GENERATION_QUEUE_DEPTH = Gauge(
+    'ai_generation_queue_depth', 'Prompts waiting for a generation batch', ['model_name']
+)
+GENERATION_BATCH_SIZE = Histogram(
+    'ai_generation_batch_size', 'Prompts per generation batch', ['model_name'],
+    buckets=(1, 2, 4, 8, 16, 32, 64)
+)
+GENERATION_TIME_TO_FIRST_TOKEN = Histogram(
+    'ai_generation_time_to_first_token_seconds', 'Time from enqueue to first generated token', ['model_name']
+)
+
+
+@dataclass
+class PendingGeneration:
+    """A prompt waiting in the scheduler queue."""
+    prompt: str
+    max_new_tokens: int
+    temperature: float
+    top_p: float
+    future: asyncio.Future
+    token_queue: Optional[asyncio.Queue] = None  # receives token ids, then None, when streaming
+    prefix: Optional[str] = None  # shared template prefix whose tokens are cached
+    enqueued_at: float = field(default_factory=time.monotonic)
+
+
+class BatchTokenStreamer(BaseStreamer):
+    """Streamer that records the first-token time and fans tokens out to streaming callers."""
+
+    def __init__(self, loop: asyncio.AbstractEventLoop, batch: List[PendingGeneration]):
+        self.loop = loop
+        self.batch = batch
+        self.prompt_seen = False
+        self.steps = 0
+        self.first_token_at: Optional[float] = None
+
+    def put(self, value):
+        # generate() pushes the prompt ids first, then one token per row per step
+        if not self.prompt_seen:
+            self.prompt_seen = True
+            return
+
+        if self.first_token_at is None:
+            self.first_token_at = time.monotonic()
+        self.steps += 1
+
+        token_ids = value.view(-1).tolist()
+        for row, request in enumerate(self.batch):
+            if request.token_queue is not None and self.steps <= request.max_new_tokens:
+                self.loop.call_soon_threadsafe(request.token_queue.put_nowait, token_ids[row])
+
+    def end(self):
+        close_token_queues(self.loop, self.batch)
+
+
+class AbandonedBatchCriteria(StoppingCriteria):
+    """Stops generate() once every caller in the batch has been resolved or has gone away."""
+
+    def __init__(self, batch: List[PendingGeneration]):
+        self.batch = batch
+
+    def __call__(self, input_ids, scores, **kwargs) -> bool:
+        return all(request.future.done() for request in self.batch)
+
+
+def close_token_queues(loop: asyncio.AbstractEventLoop, batch: List[PendingGeneration]) -> None:
+    """Signal end-of-stream to every streaming caller in a batch."""
+    for request in batch:
+        if request.token_queue is not None:
+            loop.call_soon_threadsafe(request.token_queue.put_nowait, None)
+
+
+class GenerationScheduler:
+    """Collects concurrent prompts per model and runs them as padded batches."""
+
+    def __init__(
+        self,
+        model_manager: "ModelManager",
+        max_batch_size: Optional[int] = None,
+        max_wait_ms: Optional[float] = None
+    ):
+        self.model_manager = model_manager
+        self.max_batch_size = max_batch_size or settings.generation_max_batch_size
+        self.max_wait = (max_wait_ms if max_wait_ms is not None else settings.generation_max_wait_ms) / 1000
+        # One batch at a time on the model; batching replaces per-prompt threads
+        self.executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="llm-generate")
+        self.queues: Dict[str, asyncio.Queue] = {}
+        self.workers: Dict[str, asyncio.Task] = {}
+        self.stats: Dict[str, Dict[str, float]] = defaultdict(
+            lambda: {"requests": 0, "batches": 0, "time_to_first_token_total": 0.0, "time_to_first_token_count": 0}
+        )
+
+    async def submit(
+        self,
+        model_name: str,
+        prompt: str,
+        max_new_tokens: int,
+        temperature: float,
+        top_p: float,
+        token_queue: Optional[asyncio.Queue] = None,
+        prefix: Optional[str] = None
+    ) -> Optional[str]:
+        """Queue a prompt and wait for its batch to finish, optionally streaming its token ids."""
+        loop = asyncio.get_running_loop()
+        queue = self._queue_for(model_name, loop)
+
+        request = PendingGeneration(
+            prompt=prompt,
+            max_new_tokens=max_new_tokens,
+            temperature=temperature,
+            top_p=top_p,
+            future=loop.create_future(),
+            token_queue=token_queue,
+            prefix=prefix
+        )
+        await queue.put(request)
+        GENERATION_QUEUE_DEPTH.labels(model_name=model_name).set(queue.qsize())
+
+        return await request.future
+
+    def _queue_for(self, model_name: str, loop: asyncio.AbstractEventLoop) -> asyncio.Queue:
+        """Get the model's queue, starting its batching worker on the running loop."""
+        worker = self.workers.get(model_name)
+        if worker is None or worker.done() or worker.get_loop() is not loop:
+            self.queues[model_name] = asyncio.Queue()
+            self.workers[model_name] = loop.create_task(self._worker(model_name, self.queues[model_name]))
+        return self.queues[model_name]
+
+    async def _worker(self, model_name: str, queue: asyncio.Queue) -> None:
+        """Drain the queue in batches of up to max_batch_size, waiting at most max_wait."""
+        loop = asyncio.get_running_loop()
+        batch: List[PendingGeneration] = []
+
+        try:
+            while True:
+                batch = [await queue.get()]
+                deadline = loop.time() + self.max_wait
+
+                while len(batch) < self.max_batch_size:
+                    remaining = deadline - loop.time()
+                    if remaining <= 0:
+                        break
+                    try:
+                        batch.append(await asyncio.wait_for(queue.get(), remaining))
+                    except asyncio.TimeoutError:
+                        break
+
+                GENERATION_QUEUE_DEPTH.labels(model_name=model_name).set(queue.qsize())
+
+                # Sampling parameters are per batch, so prompts are grouped by them
+                groups: Dict[Tuple[float, float], List[PendingGeneration]] = defaultdict(list)
+                for request in batch:
+                    if not request.future.done():
+                        groups[(request.temperature, request.top_p)].append(request)
+
+                for group in groups.values():
+                    await self._run_batch(model_name, group)
+
+        except asyncio.CancelledError:
+            for request in batch:
+                if not request.future.done():
+                    request.future.cancel()
+            close_token_queues(loop, batch)
+            raise
+
+    async def _run_batch(self, model_name: str, batch: List[PendingGeneration]) -> None:
+        """Generate one padded batch off the event loop and resolve each caller."""
+        loop = asyncio.get_running_loop()
+        GENERATION_BATCH_SIZE.labels(model_name=model_name).observe(len(batch))
+
+        try:
+            texts, first_token_at = await loop.run_in_executor(
+                self.executor, self._generate_batch, model_name, batch, loop
+            )
+        except Exception as e:
+            ai_logger.error("Batched generation failed", model=model_name, batch_size=len(batch), error=str(e))
+            for request in batch:
+                if not request.future.done():
+                    request.future.set_exception(e)
+            close_token_queues(loop, batch)
+            return
+
+        stats = self.stats[model_name]
+        stats["requests"] += len(batch)
+        stats["batches"] += 1
+
+        for request, text in zip(batch, texts):
+            if first_token_at is not None:
+                ttft = first_token_at - request.enqueued_at
+                GENERATION_TIME_TO_FIRST_TOKEN.labels(model_name=model_name).observe(ttft)
+                stats["time_to_first_token_total"] += ttft
+                stats["time_to_first_token_count"] += 1
+            if not request.future.done():
+                request.future.set_result(text)
+
+        ai_logger.debug("Generation batch completed", model=model_name, batch_size=len(batch))
+
+    def _generate_batch(
+        self,
+        model_name: str,
+        batch: List[PendingGeneration],
+        loop: asyncio.AbstractEventLoop
+    ) -> Tuple[List[str], Optional[float]]:
+        """Run model.generate on a left-padded batch; returns texts and first-token time."""
+        model = self.model_manager.models[model_name]
+        tokenizer = self.model_manager.tokenizers[model_name]
+
+        # Shared prompt prefixes are tokenized once and reused from the model manager's cache
+        encoded = [self.model_manager.encode_prompt(model_name, request.prompt, request.prefix) for request in batch]
+        inputs = tokenizer.pad({"input_ids": encoded}, padding=True, return_tensors="pt").to(model.device)
+
+        streamer = BatchTokenStreamer(loop, batch)
+        with torch.inference_mode():
+            output = model.generate(
+                **inputs,
+                max_new_tokens=max(request.max_new_tokens for request in batch),
+                temperature=batch[0].temperature,
+                top_p=batch[0].top_p,
+                do_sample=True,
+                pad_token_id=tokenizer.pad_token_id,
+                streamer=streamer,
+                stopping_criteria=StoppingCriteriaList([AbandonedBatchCriteria(batch)])
+            )
+
+        # Each row continues after the shared padded prompt width
+        prompt_length = inputs["input_ids"].shape[1]
+        texts = [
+            tokenizer.decode(
+                output[row, prompt_length:prompt_length + request.max_new_tokens],
+                skip_special_tokens=True,
+                clean_up_tokenization_spaces=True
+            ).strip()
+            for row, request in enumerate(batch)
+        ]
+        return texts, streamer.first_token_at
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Per-model queue depth, batch size and time-to-first-token summary."""
+        return {
+            "max_batch_size": self.max_batch_size,
+            "max_wait_ms": self.max_wait * 1000,
+            "models": {
+                model_name: {
+                    "queue_depth": self.queues[model_name].qsize() if model_name in self.queues else 0,
+                    "requests": int(stats["requests"]),
+                    "batches": int(stats["batches"]),
+                    "average_batch_size": stats["requests"] / stats["batches"] if stats["batches"] else 0.0,
+                    "average_time_to_first_token_ms": (
+                        stats["time_to_first_token_total"] / stats["time_to_first_token_count"] * 1000
+                        if stats["time_to_first_token_count"] else 0.0
+                    )
+                }
+                for model_name, stats in self.stats.items()
+            }
+        }
+
+    async def shutdown(self) -> None:
+        """Stop batching workers and fail anything still queued."""
+        for model_name, worker in self.workers.items():
+            worker.cancel()
+            queue = self.queues[model_name]
+            while not queue.empty():
+                request = queue.get_nowait()
+                if not request.future.done():
+                    request.future.cancel()
+
+        await asyncio.gather(*self.workers.values(), return_exceptions=True)
+        self.workers.clear()
+        self.queues.clear()
+        self.executor.shutdown(wait=False)
@@ -1,19 +1,74 @@
 import os
+import resource
+import time
 import torch
-from typing import Optional, Dict, Any, List
+from collections import OrderedDict, defaultdict
+from pathlib import Path
+from typing import Optional, Dict, Any, List, AsyncIterator, Tuple
 from transformers import (
     AutoTokenizer,
     AutoModelForCausalLM,
     pipeline,
     BitsAndBytesConfig
 )
+from transformers.pytorch_utils import Conv1D
 from src.config import settings
 from src.core import ai_logger
+from src.models.generation_scheduler import GenerationScheduler
 import asyncio
 from functools import lru_cache
 import threading
 
 
+def _get_rss_bytes() -> int:
+    """Resident set size of this process."""
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, IndexError):
+        # Peak RSS (kilobytes on Linux) where /proc is unavailable
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+
+
+def _model_memory_bytes(model: Any, onnx_dir: Optional[Path] = None) -> int:
+    """
+    Bytes held by a model's weights: parameter and buffer tensors (including
+    dynamically quantized packed weights) for torch models, the exported
+    graph and weight files for ONNX Runtime models.
+    """
+    if not isinstance(model, torch.nn.Module):
+        if onnx_dir is None or not onnx_dir.exists():
+            return 0
+        return sum(path.stat().st_size for path in onnx_dir.iterdir() if path.suffix in (".onnx", ".onnx_data"))
+
+    tensors = {}
+
+    def collect(value):
+        if isinstance(value, torch.Tensor):
+            # Tied weights share storage and are counted once
+            tensors[(value.device, value.data_ptr())] = value
+        elif isinstance(value, (tuple, list)):
+            for item in value:
+                collect(item)
+
+    for value in model.state_dict().values():
+        collect(value)
+    return sum(tensor.numel() * tensor.element_size() for tensor in tensors.values())
+
+
+def _conv1d_to_linear(module: torch.nn.Module) -> torch.nn.Module:
+    """Replace transformers Conv1D layers with equivalent nn.Linear layers, in place."""
+    for name, child in module.named_children():
+        if isinstance(child, Conv1D):
+            linear = torch.nn.Linear(child.weight.shape[0], child.weight.shape[1])
+            linear.weight.data = child.weight.data.t().contiguous()
+            linear.bias.data = child.bias.data
+            setattr(module, name, linear)
+        else:
+            _conv1d_to_linear(child)
+    return module
+
+
 class ModelManager:
     """Manages AI models with caching and optimization."""
 
@@ -23,6 +78,20 @@ class ModelManager:
         self.pipelines: Dict[str, Any] = {}
         self.device = self._get_optimal_device()
         self.model_lock = threading.Lock()
+        self.batching_enabled = settings.generation_batching_enabled
+        self.scheduler = GenerationScheduler(self)
+
+        # Load bookkeeping: in-flight loads, per-model stats, LRU order and preload readiness
+        self.loading: Dict[str, asyncio.Future] = {}
+        self.model_stats: Dict[str, Dict[str, Any]] = {}
+        self.last_used: "OrderedDict[str, float]" = OrderedDict()
+        self.active_requests: Dict[str, int] = defaultdict(int)
+        self.preload_status: Dict[str, str] = {}
+        self.preload_task: Optional[asyncio.Task] = None
+
+        # Token ids of shared prompt prefixes, keyed by (model, prefix)
+        self.prefix_tokens: "OrderedDict[Tuple[str, str], List[int]]" = OrderedDict()
+        self.prefix_stats = {"hits": 0, "misses": 0}
 
     def _get_optimal_device(self) -> str:
         """Determine the best available device for inference."""
@@ -48,121 +117,355 @@ class ModelManager:
             )
         return None
 
-    async def load_llama_model(self, model_name: str = "microsoft/DialoGPT-medium") -> bool:
-        """Load Llama model with optimization."""
+    async def load_llama_model(self, model_name: str = "microsoft/DialoGPT-medium", quantization: Optional[str] = None) -> bool:
+        """Load Llama model with optimization, off the event loop; concurrent calls share one load."""
+        if model_name in self.models:
+            self._touch(model_name)
+            return True
+
+        load = self.loading.get(model_name)
+        if load is None:
+            loop = asyncio.get_running_loop()
+            load = loop.run_in_executor(
+                None, self._load_model_sync, model_name, quantization or settings.model_quantization
+            )
+            self.loading[model_name] = load
+
         try:
-            ai_logger.info("Loading LLM model", model=model_name, device=self.device)
+            loaded = await asyncio.shield(load)
+        finally:
+            if load.done():
+                self.loading.pop(model_name, None)
+
+        # Bookkeeping and eviction stay on the event loop, where request counts change
+        if loaded:
+            self._touch(model_name)
+            self._evict_to_budget(keep=model_name)
+        return loaded
+
+    def _load_model_sync(self, model_name: str, quantization: str) -> bool:
+        """Load tokenizer, model and pipeline in the requested quantization mode."""
+        try:
+            ai_logger.info("Loading LLM model", model=model_name, device=self.device, quantization=quantization)
 
             # For now, using DialoGPT as a placeholder for Llama 3.2-1B
             # In production, you would use: "meta-llama/Llama-3.2-1B"
 
-            with self.model_lock:
-                if model_name in self.models:
-                    ai_logger.info("Model already loaded", model=model_name)
-                    return True
+            start_time = time.perf_counter()
 
-                # Load tokenizer
-                tokenizer = AutoTokenizer.from_pretrained(
-                    model_name,
-                    cache_dir=settings.model_cache_dir,
-                    trust_remote_code=True,
-                    use_auth_token=settings.huggingface_token
-                )
-
-                # Add padding token if missing
-                if tokenizer.pad_token is None:
-                    tokenizer.pad_token = tokenizer.eos_token
-
-                # Load model with optimization
-                model_kwargs = {
-                    "cache_dir": settings.model_cache_dir,
-                    "trust_remote_code": True,
-                    "torch_dtype": torch.float16 if self.device != "cpu" else torch.float32,
-                }
+            # Load tokenizer
+            tokenizer = AutoTokenizer.from_pretrained(
+                model_name,
+                cache_dir=settings.model_cache_dir,
+                trust_remote_code=True,
+                use_auth_token=settings.huggingface_token
+            )
 
-                if settings.huggingface_token:
-                    model_kwargs["use_auth_token"] = settings.huggingface_token
+            # Add padding token if missing
+            if tokenizer.pad_token is None:
+                tokenizer.pad_token = tokenizer.eos_token
 
-                # Add quantization for GPU
-                quantization_config = self._get_quantization_config()
-                if quantization_config:
-                    model_kwargs["quantization_config"] = quantization_config
+            # Decoder-only models continue from the right, so batches pad on the left
+            tokenizer.padding_side = "left"
 
-                model = AutoModelForCausalLM.from_pretrained(model_name, **model_kwargs)
+            # int8 dynamic quantization and ONNX Runtime run on CPU
+            on_cpu = self.device == "cpu" or quantization in ("int8_dynamic", "onnx")
 
-                if not quantization_config:  # Only move to device if not quantized
-                    model = model.to(self.device)
+            if quantization == "onnx":
+                model = self._load_onnx_model(model_name)
+            else:
+                model = self._load_torch_model(model_name, quantization, on_cpu)
 
-                # Set to evaluation mode
-                model.eval()
+            # Create text generation pipeline
+            pipeline_kwargs = {
+                "device": 0 if self.device == "cuda" and not on_cpu else -1,
+                "max_length": settings.llama_max_length,
+                "temperature": settings.llama_temperature,
+                "top_p": settings.llama_top_p,
+                "do_sample": True,
+                "pad_token_id": tokenizer.eos_token_id
+            }
+            if quantization != "onnx":
+                pipeline_kwargs["torch_dtype"] = torch.float32 if on_cpu else torch.float16
+
+            text_pipeline = pipeline("text-generation", model=model, tokenizer=tokenizer, **pipeline_kwargs)
+
+            stats = {
+                "quantization": quantization,
+                "device": "cpu" if on_cpu else self.device,
+                "load_time_seconds": time.perf_counter() - start_time,
+                # Counted from the weights: process-wide RSS deltas are skewed by concurrent loads
+                # and by pages the allocator keeps after an unload
+                "memory_bytes": _model_memory_bytes(model, self._onnx_export_dir(model_name)),
+                "preloaded": model_name in self.preload_status
+            }
 
-                # Store model and tokenizer
+            # Store model and tokenizer
+            with self.model_lock:
                 self.models[model_name] = model
                 self.tokenizers[model_name] = tokenizer
+                self.pipelines[model_name] = text_pipeline
+                self.model_stats[model_name] = stats
 
-                # Create text generation pipeline
-                self.pipelines[model_name] = pipeline(
-                    "text-generation",
-                    model=model,
-                    tokenizer=tokenizer,
-                    device=0 if self.device == "cuda" else -1,
-                    torch_dtype=torch.float16 if self.device != "cpu" else torch.float32,
-                    max_length=settings.llama_max_length,
-                    temperature=settings.llama_temperature,
-                    top_p=settings.llama_top_p,
-                    do_sample=True,
-                    pad_token_id=tokenizer.eos_token_id
-                )
-
-                ai_logger.info("Model loaded successfully", model=model_name)
-                return True
+            ai_logger.info("Model loaded successfully",
+                           model=model_name,
+                           quantization=quantization,
+                           load_time=stats["load_time_seconds"],
+                           memory_mb=stats["memory_bytes"] / 1024**2)
+            return True
 
         except Exception as e:
-            ai_logger.error("Failed to load model", model=model_name, error=str(e))
+            ai_logger.error("Failed to load model", model=model_name, quantization=quantization, error=str(e))
             return False
 
+    def _load_torch_model(self, model_name: str, quantization: str, on_cpu: bool):
+        """Load a transformers model, quantized for the device where requested."""
+        # Load model with optimization
+        model_kwargs = {
+            "cache_dir": settings.model_cache_dir,
+            "trust_remote_code": True,
+            "torch_dtype": torch.float32 if on_cpu else torch.float16,
+        }
+
+        if settings.huggingface_token:
+            model_kwargs["use_auth_token"] = settings.huggingface_token
+
+        # Add quantization for GPU
+        quantization_config = self._get_quantization_config() if quantization == "auto" else None
+        if quantization_config:
+            model_kwargs["quantization_config"] = quantization_config
+
+        model = AutoModelForCausalLM.from_pretrained(model_name, **model_kwargs)
+
+        if quantization == "int8_dynamic":
+            # GPT-2 style models use Conv1D; convert so dynamic quantization covers the attention and MLP layers
+            model = _conv1d_to_linear(model)
+            model = torch.quantization.quantize_dynamic(model, {torch.nn.Linear}, dtype=torch.qint8)
+        elif not quantization_config:  # Only move to device if not quantized
+            model = model.to("cpu" if on_cpu else self.device)
+
+        # Set to evaluation mode
+        model.eval()
+        return model
+
+    def _load_onnx_model(self, model_name: str):
+        """Load an ONNX Runtime model, exporting it with optimum on first use."""
+        from optimum.onnxruntime import ORTModelForCausalLM
+
+        export_dir = self._onnx_export_dir(model_name)
+        if (export_dir / "config.json").exists():
+            return ORTModelForCausalLM.from_pretrained(export_dir)
+
+        model = ORTModelForCausalLM.from_pretrained(
+            model_name,
+            export=True,
+            cache_dir=settings.model_cache_dir,
+            use_auth_token=settings.huggingface_token
+        )
+        model.save_pretrained(export_dir)
+        ai_logger.info("Exported model to ONNX", model=model_name, path=str(export_dir))
+        return model
+
+    @staticmethod
+    def _onnx_export_dir(model_name: str) -> Path:
+        return Path(settings.onnx_export_dir) / model_name.replace("/", "--")
+
+    def start_preload(self, model_names: Optional[List[str]] = None) -> asyncio.Task:
+        """Load models in the background; the service reports not ready until they finish."""
+        model_names = settings.model_preload if model_names is None else model_names
+        for model_name in model_names:
+            self.preload_status.setdefault(model_name, "pending")
+
+        self.preload_task = asyncio.create_task(self.preload_models(model_names))
+        return self.preload_task
+
+    async def preload_models(self, model_names: List[str]) -> Dict[str, str]:
+        """Load models one after another, recording each model's preload status."""
+        for model_name in model_names:
+            self.preload_status[model_name] = "loading"
+            loaded = await self.load_llama_model(model_name)
+            self.preload_status[model_name] = "ready" if loaded else "failed"
+
+        ai_logger.info("Model preload finished", status=self.preload_status)
+        return dict(self.preload_status)
+
+    @property
+    def is_ready(self) -> bool:
+        """True once every preloaded model has finished loading (or failed to)."""
+        return all(status in ("ready", "failed") for status in self.preload_status.values())
+
+    def _touch(self, model_name: str) -> None:
+        self.last_used[model_name] = time.time()
+        self.last_used.move_to_end(model_name)
+
+    def _evict_to_budget(self, keep: Optional[str] = None) -> None:
+        """Unload least recently used idle models until loaded models fit the memory budget."""
+        budget = settings.model_memory_budget_mb * 1024**2
+        if budget <= 0:
+            return
+
+        for model_name in list(self.last_used):
+            used = sum(stats["memory_bytes"] for stats in self.model_stats.values())
+            if used <= budget:
+                return
+            if model_name == keep or self.active_requests[model_name] > 0:
+                continue
+
+            ai_logger.info("Evicting model over memory budget",
+                           model=model_name,
+                           used_mb=used / 1024**2,
+                           budget_mb=settings.model_memory_budget_mb)
+            self.unload_model(model_name)
+
+    def encode_prompt(self, model_name: str, prompt: str, prefix: Optional[str] = None) -> List[int]:
+        """Token ids for a prompt, reusing cached ids for its shared prefix."""
+        tokenizer = self.tokenizers[model_name]
+        if not prefix or not prompt.startswith(prefix):
+            return tokenizer(prompt, truncation=True, max_length=settings.llama_max_length)["input_ids"]
+
+        key = (model_name, prefix)
+        prefix_ids = self.prefix_tokens.get(key)
+        if prefix_ids is None:
+            self.prefix_stats["misses"] += 1
+            prefix_ids = tokenizer(prefix)["input_ids"]
+            self.prefix_tokens[key] = prefix_ids
+            if len(self.prefix_tokens) > settings.prompt_prefix_cache_size:
+                self.prefix_tokens.popitem(last=False)
+        else:
+            self.prefix_stats["hits"] += 1
+            self.prefix_tokens.move_to_end(key)
+
+        suffix_ids = tokenizer(prompt[len(prefix):], add_special_tokens=False)["input_ids"]
+        return (prefix_ids + suffix_ids)[:settings.llama_max_length]
+
     async def generate_text(
         self,
         prompt: str,
         model_name: str = "microsoft/DialoGPT-medium",
         max_new_tokens: int = 150,
         temperature: float = None,
-        top_p: float = None
+        top_p: float = None,
+        prefix: Optional[str] = None
     ) -> Optional[str]:
-        """Generate text using the loaded model."""
+        """Generate text using the loaded model; prefix marks a shared prompt prefix to cache."""
         try:
             if model_name not in self.pipelines:
                 success = await self.load_llama_model(model_name)
                 if not success:
                     return None
 
-            # Use custom parameters if provided
-            generation_kwargs = {
-                "max_new_tokens": max_new_tokens,
-                "temperature": temperature or settings.llama_temperature,
-                "top_p": top_p or settings.llama_top_p,
-                "do_sample": True,
-                "return_full_text": False,
-                "clean_up_tokenization_spaces": True
-            }
+            self._touch(model_name)
+            self.active_requests[model_name] += 1
+            try:
+                return await self._generate_text(model_name, prompt, max_new_tokens, temperature, top_p, prefix)
+            finally:
+                self.active_requests[model_name] -= 1
 
-            # Generate in a thread to avoid blocking
-            loop = asyncio.get_event_loop()
-            result = await loop.run_in_executor(
-                None,
-                lambda: self.pipelines[model_name](prompt, **generation_kwargs)
-            )
+        except Exception as e:
+            ai_logger.error("Text generation failed", error=str(e), model=model_name)
+            return None
 
-            if result and len(result) > 0:
-                generated_text = result[0]["generated_text"].strip()
+    async def _generate_text(
+        self,
+        model_name: str,
+        prompt: str,
+        max_new_tokens: int,
+        temperature: Optional[float],
+        top_p: Optional[float],
+        prefix: Optional[str] = None
+    ) -> Optional[str]:
+        """Generate with the scheduler or the per-prompt pipeline; the model must be loaded."""
+        temperature = temperature or settings.llama_temperature
+        top_p = top_p or settings.llama_top_p
+
+        # Concurrent prompts are queued and generated together as one padded batch
+        if self.batching_enabled:
+            generated_text = await self.scheduler.submit(
+                model_name, prompt, max_new_tokens, temperature, top_p, prefix=prefix
+            )
+            if generated_text:
                 ai_logger.debug("Text generated", prompt_length=len(prompt), response_length=len(generated_text))
                 return generated_text
-
             return None
 
-        except Exception as e:
-            ai_logger.error("Text generation failed", error=str(e), model=model_name)
-            return None
+        # Use custom parameters if provided
+        generation_kwargs = {
+            "max_new_tokens": max_new_tokens,
+            "temperature": temperature,
+            "top_p": top_p,
+            "do_sample": True,
+            "return_full_text": False,
+            "clean_up_tokenization_spaces": True
+        }
+
+        # Generate in a thread to avoid blocking
+        loop = asyncio.get_event_loop()
+        result = await loop.run_in_executor(
+            None,
+            lambda: self.pipelines[model_name](prompt, **generation_kwargs)
+        )
+
+        if result and len(result) > 0:
+            generated_text = result[0]["generated_text"].strip()
+            ai_logger.debug("Text generated", prompt_length=len(prompt), response_length=len(generated_text))
+            return generated_text
+
+        return None
+
+    async def stream_text(
+        self,
+        prompt: str,
+        model_name: str = "microsoft/DialoGPT-medium",
+        max_new_tokens: int = 150,
+        temperature: float = None,
+        top_p: float = None,
+        prefix: Optional[str] = None
+    ) -> AsyncIterator[str]:
+        """Generate text through the batching scheduler, yielding text deltas as tokens arrive."""
+        if model_name not in self.pipelines:
+            success = await self.load_llama_model(model_name)
+            if not success:
+                return
+
+        self._touch(model_name)
+        tokenizer = self.tokenizers[model_name]
+        token_queue: asyncio.Queue = asyncio.Queue()
+        generation = asyncio.ensure_future(self.scheduler.submit(
+            model_name,
+            prompt,
+            max_new_tokens,
+            temperature or settings.llama_temperature,
+            top_p or settings.llama_top_p,
+            token_queue=token_queue,
+            prefix=prefix
+        ))
+
+        token_ids: List[int] = []
+        emitted = ""
+        self.active_requests[model_name] += 1
+        try:
+            while True:
+                token_id = await token_queue.get()
+                if token_id is None:
+                    break
+
+                token_ids.append(token_id)
+                text = tokenizer.decode(token_ids, skip_special_tokens=True, clean_up_tokenization_spaces=True)
+
+                # Hold back partial multi-byte characters until the next token completes them
+                if text.endswith("\ufffd") or len(text) <= len(emitted):
+                    continue
+
+                yield text[len(emitted):]
+                emitted = text
+
+            # Surface generation errors to the consumer
+            await generation
+
+        finally:
+            self.active_requests[model_name] -= 1
+            if not generation.done():
+                generation.cancel()
 
     def unload_model(self, model_name: str) -> bool:
         """Unload a model to free memory."""
@@ -172,6 +475,10 @@ class ModelManager:
                     del self.models[model_name]
                     del self.tokenizers[model_name]
                     del self.pipelines[model_name]
+                    self.model_stats.pop(model_name, None)
+                    self.last_used.pop(model_name, None)
+                    for key in [key for key in self.prefix_tokens if key[0] == model_name]:
+                        del self.prefix_tokens[key]
 
                     # Clear GPU cache if using CUDA
                     if self.device == "cuda":
@@ -191,7 +498,25 @@ class ModelManager:
             "loaded_models": list(self.models.keys()),
             "memory_usage": self._get_memory_usage(),
             "cuda_available": torch.cuda.is_available(),
-            "model_count": len(self.models)
+            "model_count": len(self.models),
+            "ready": self.is_ready,
+            "preload": dict(self.preload_status),
+            "quantization": settings.model_quantization,
+            "memory_budget_mb": settings.model_memory_budget_mb,
+            "models": {
+                model_name: {
+                    "quantization": stats["quantization"],
+                    "device": stats["device"],
+                    "load_time_seconds": round(stats["load_time_seconds"], 3),
+                    "memory_mb": round(stats["memory_bytes"] / 1024**2, 1),
+                    "preloaded": stats["preloaded"],
+                    "last_used": self.last_used.get(model_name),
+                    "active_requests": self.active_requests[model_name]
+                }
+                for model_name, stats in self.model_stats.items()
+            },
+            "prefix_cache": {"entries": len(self.prefix_tokens), **self.prefix_stats},
+            "generation_scheduler": self.scheduler.get_stats()
         }
 
     def _get_memory_usage(self) -> Dict[str, Any]:
@@ -202,7 +527,7 @@ class ModelManager:
                 "gpu_memory_cached": torch.cuda.memory_reserved() / 1024**3,  # GB
                 "gpu_memory_free": (torch.cuda.get_device_properties(0).total_memory - torch.cuda.memory_allocated()) / 1024**3
             }
-        return {"cpu_memory": "N/A"}
+        return {"rss_mb": _get_rss_bytes() / 1024**2}
 
 
 # Global model manager instance
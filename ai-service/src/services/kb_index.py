@@ -0,0 +1,225 @@
+import json
+import time
+from collections import Counter
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, Any, List, Optional, Tuple
+
+import numpy as np
+
+from src.config import settings
+from src.core import ai_logger
+from src.core.embeddings import HashingEmbedder, tokenize_question, normalize_rows
+
+
+INDEX_FORMAT_VERSION = 1
+
+
+class SentenceTransformerEmbedder:
+    """Dense embeddings from a sentence-transformers model."""
+
+    def __init__(self, model_name: str):
+        from sentence_transformers import SentenceTransformer
+
+        self.name = model_name
+        self.model = SentenceTransformer(model_name, cache_folder=settings.model_cache_dir)
+        self.dimension = self.model.get_sentence_embedding_dimension()
+
+    def embed(self, texts: List[str]) -> np.ndarray:
+        return self.model.encode(texts, normalize_embeddings=True, convert_to_numpy=True).astype(np.float32)
+
+
+def create_embedder(name: str, dimension: int = 512):
+    """Create the embedder recorded in an index manifest."""
+    if name == HashingEmbedder.name:
+        return HashingEmbedder(dimension)
+    return SentenceTransformerEmbedder(name)
+
+
+def _top_k(scores: np.ndarray, k: int) -> np.ndarray:
+    """Indices of the k highest scores, best first."""
+    k = min(k, len(scores))
+    if k <= 0:
+        return np.empty(0, dtype=np.int64)
+    candidates = np.argpartition(-scores, k - 1)[:k]
+    return candidates[np.argsort(-scores[candidates])]
+
+
+def _train_ivf(embeddings: np.ndarray, nlist: int, iterations: int = 10, seed: int = 0) -> Tuple[np.ndarray, np.ndarray]:
+    """Spherical k-means; returns (centroids, list assignment per row)."""
+    rng = np.random.default_rng(seed)
+    centroids = embeddings[rng.choice(len(embeddings), nlist, replace=False)].copy()
+
+    for _ in range(iterations):
+        assignment = np.argmax(embeddings @ centroids.T, axis=1)
+        sums = np.zeros_like(centroids)
+        np.add.at(sums, assignment, embeddings)
+        # Empty lists keep their previous centroid
+        filled = np.bincount(assignment, minlength=nlist) > 0
+        centroids[filled] = normalize_rows(sums[filled])
+
+    return centroids, np.argmax(embeddings @ centroids.T, axis=1)
+
+
+def resolve_index_dir(path: str) -> Path:
+    """Follow a CURRENT pointer file to the active index version directory."""
+    index_dir = Path(path)
+    pointer = index_dir / "CURRENT"
+    if pointer.exists():
+        return index_dir / pointer.read_text().strip()
+    return index_dir
+
+
+def build_kb_index(
+    entries: List[Dict[str, Any]],
+    output_dir: str,
+    version: Optional[str] = None,
+    embedder_name: str = HashingEmbedder.name,
+    dimension: int = 512,
+    nlist: Optional[int] = None
+) -> Path:
+    """
+    Build a versioned knowledge-base index directory.
+
+    Writes ``<output_dir>/<version>/`` with the manifest, the embedding matrix
+    (rows grouped by IVF list when IVF is used), the entries in row order and
+    the inverted token index, then points ``<output_dir>/CURRENT`` at it.
+    """
+    version = version or datetime.utcnow().strftime("%Y%m%d%H%M%S")
+    embedder = create_embedder(embedder_name, dimension)
+    embeddings = embedder.embed([entry["question"] for entry in entries])
+
+    # Exact search is fast enough for small KBs; IVF kicks in as the KB grows
+    if nlist is None:
+        nlist = int(np.sqrt(len(entries))) if len(entries) >= settings.kb_ivf_min_entries else 0
+
+    version_dir = Path(output_dir) / version
+    version_dir.mkdir(parents=True, exist_ok=True)
+
+    if nlist:
+        centroids, assignment = _train_ivf(embeddings, nlist)
+        order = np.argsort(assignment, kind="stable")
+        embeddings = embeddings[order]
+        entries = [entries[i] for i in order]
+        offsets = np.concatenate([[0], np.cumsum(np.bincount(assignment, minlength=nlist))])
+        np.save(version_dir / "centroids.npy", centroids.astype(np.float32))
+        np.save(version_dir / "list_offsets.npy", offsets.astype(np.int64))
+
+    np.save(version_dir / "embeddings.npy", np.ascontiguousarray(embeddings, dtype=np.float32))
+
+    postings: Dict[str, List[int]] = {}
+    for row, entry in enumerate(entries):
+        for token in set(tokenize_question(entry["question"])):
+            postings.setdefault(token, []).append(row)
+
+    with open(version_dir / "entries.json", "w") as f:
+        json.dump(entries, f)
+    with open(version_dir / "tokens.json", "w") as f:
+        json.dump(postings, f)
+
+    manifest = {
+        "format_version": INDEX_FORMAT_VERSION,
+        "version": version,
+        "created_at": datetime.utcnow().isoformat(),
+        "embedder": embedder.name,
+        "dimension": int(embeddings.shape[1]),
+        "entries": len(entries),
+        "nlist": int(nlist)
+    }
+    with open(version_dir / "manifest.json", "w") as f:
+        json.dump(manifest, f, indent=2)
+
+    (Path(output_dir) / "CURRENT").write_text(version)
+
+    ai_logger.info("Knowledge base index built", version=version, entries=len(entries), nlist=nlist)
+    return version_dir
+
+
+class KnowledgeBaseIndex:
+    """Read-only knowledge-base index: memory-mapped vectors plus an inverted token index."""
+
+    def __init__(self, index_dir: Path):
+        with open(index_dir / "manifest.json") as f:
+            self.manifest = json.load(f)
+
+        if self.manifest["format_version"] != INDEX_FORMAT_VERSION:
+            raise ValueError(f"Unsupported KB index format {self.manifest['format_version']}")
+
+        self.version = self.manifest["version"]
+        self.embedder = create_embedder(self.manifest["embedder"], self.manifest["dimension"])
+        self.embeddings = np.load(index_dir / "embeddings.npy", mmap_mode="r")
+
+        self.nlist = self.manifest["nlist"]
+        if self.nlist:
+            self.centroids = np.load(index_dir / "centroids.npy")
+            self.list_offsets = np.load(index_dir / "list_offsets.npy")
+
+        with open(index_dir / "entries.json") as f:
+            self.entries: List[Dict[str, Any]] = json.load(f)
+        with open(index_dir / "tokens.json") as f:
+            self.postings: Dict[str, List[int]] = json.load(f)
+
+        self.entry_token_counts = [len(set(tokenize_question(entry["question"]))) for entry in self.entries]
+
+    @classmethod
+    def load(cls, path: str) -> Optional["KnowledgeBaseIndex"]:
+        """Load the current index version, or None when no index has been built."""
+        index_dir = resolve_index_dir(path)
+        if not (index_dir / "manifest.json").exists():
+            ai_logger.info("No knowledge base index found", path=str(index_dir))
+            return None
+
+        start_time = time.time()
+        index = cls(index_dir)
+        ai_logger.info("Knowledge base index loaded",
+                       version=index.version,
+                       entries=len(index.entries),
+                       nlist=index.nlist,
+                       load_time=time.time() - start_time)
+        return index
+
+    def search(self, question: str, top_k: int = 5) -> List[Tuple[Dict[str, Any], float]]:
+        """Top-k entries by cosine similarity (IVF probes the nearest lists when built)."""
+        query = self.embedder.embed([question])[0]
+
+        if not self.nlist:
+            scores = np.asarray(self.embeddings @ query)
+            rows = _top_k(scores, top_k)
+            return [(self.entries[row], float(scores[row])) for row in rows]
+
+        probed = _top_k(self.centroids @ query, settings.kb_ivf_nprobe)
+        candidate_rows = np.concatenate([
+            np.arange(self.list_offsets[c], self.list_offsets[c + 1]) for c in probed
+        ])
+        scores = np.asarray(self.embeddings[candidate_rows] @ query)
+        best = _top_k(scores, top_k)
+        return [(self.entries[candidate_rows[i]], float(scores[i])) for i in best]
+
+    def token_lookup(self, question: str, threshold: float) -> Optional[Tuple[Dict[str, Any], float]]:
+        """Best Jaccard match among entries sharing at least one token."""
+        tokens = set(tokenize_question(question))
+        shared = Counter(row for token in tokens for row in self.postings.get(token, ()))
+
+        best_row, best_score = None, 0.0
+        for row, overlap in shared.items():
+            score = overlap / (len(tokens) + self.entry_token_counts[row] - overlap)
+            if score > best_score:
+                best_row, best_score = row, score
+
+        if best_row is not None and best_score > threshold:
+            return self.entries[best_row], best_score
+        return None
+
+    def lookup(self, question: str) -> Optional[Dict[str, Any]]:
+        """Best matching entry: vector search first, then the inverted token index."""
+        hits = self.search(question, top_k=1)
+        if hits and hits[0][1] >= settings.kb_similarity_threshold:
+            entry, score = hits[0]
+            return {**entry, "match_score": score, "match_method": "vector"}
+
+        token_hit = self.token_lookup(question, settings.kb_token_similarity_threshold)
+        if token_hit:
+            entry, score = token_hit
+            return {**entry, "match_score": score, "match_method": "token"}
+
+        return None
@@ -1,14 +1,16 @@
 import re
 import asyncio
-from typing import Dict, Any, Optional, List, Tuple
+from typing import Dict, Any, Optional, List
 from dataclasses import dataclass
 from enum import Enum
 import spacy
 from textblob import TextBlob
 import json
 
+from src.config import settings
 from src.core import nlp_logger
 from src.models import get_model_manager
+from src.services.tax_extractor import CompiledTaxExtractor
 
 
 class FilingStatus(Enum):
@@ -52,55 +54,19 @@ class TaxNLPService:
     def __init__(self):
         self.nlp = None
         self.model_manager = get_model_manager()
-        self._income_patterns = [
-            r'(?:make|earn|income|salary|wage).*?[\$]?(\d{1,3}(?:,\d{3})*(?:\.\d{2})?)[k\s]?(?:thousand|per year|annually|yearly)?',
-            r'[\$](\d{1,3}(?:,\d{3})*(?:\.\d{2})?)[k\s]?(?:income|salary|per year|annually)',
-            r'(\d{1,3}(?:,\d{3})*)[k\s](?:income|salary|per year|annually)',
-            r'(\d{1,3}(?:,\d{3})*(?:\.\d{2})?)\s*(?:dollars?|usd)?\s*(?:income|salary|per year|annually)'
-        ]
-
-        self._filing_status_patterns = {
-            FilingStatus.SINGLE: [
-                r'\b(?:single|unmarried|not married|filing single)\b',
-                r'\b(?:i am|i\'m)\s+(?:single|unmarried)\b'
-            ],
-            FilingStatus.MARRIED_FILING_JOINTLY: [
-                r'\b(?:married|spouse|husband|wife|filing jointly|married filing jointly)\b',
-                r'\b(?:my spouse|my husband|my wife)\b',
-                r'\b(?:we are married|married couple)\b'
-            ],
-            FilingStatus.MARRIED_FILING_SEPARATELY: [
-                r'\b(?:married filing separately|filing separately)\b',
-                r'\b(?:married but filing separately)\b'
-            ],
-            FilingStatus.HEAD_OF_HOUSEHOLD: [
-                r'\b(?:head of household|hoh)\b',
-                r'\b(?:single parent|single mother|single father)\b'
-            ]
-        }
-
-        self._dependent_patterns = [
-            r'(\d+)\s*(?:kids?|children?|dependents?)',
-            r'(?:have|with)\s*(\d+)\s*(?:kids?|children?|dependents?)',
-            r'(\d+)\s*(?:year|years)\s*old\s*(?:child|kid|son|daughter)',
-            r'(?:children?|kids?|dependents?).*?(\d+)'
-        ]
-
-        self._state_patterns = [
-            r'\b(?:in|from|live in|residing in|state of)\s+([A-Z]{2}|[A-Za-z\s]+(?:state|State))\b',
-            r'\b([A-Z]{2})\s+(?:state|resident)\b',
-            r'\b(?:california|texas|florida|new york|pennsylvania|illinois|ohio|georgia|north carolina|michigan)\b'
-        ]
+        self.extractor = CompiledTaxExtractor()
 
     async def initialize(self):
         """Initialize spaCy model and other NLP components."""
         try:
-            # Load spaCy model
-            self.nlp = spacy.load("en_core_web_sm")
-            nlp_logger.info("SpaCy model loaded successfully")
-
-            # Initialize the LLM model
-            await self.model_manager.load_llama_model()
+            # Load spaCy model; only the NER components are needed for entities
+            self.nlp = spacy.load(settings.spacy_model)
+            for name in settings.spacy_disabled_components:
+                if name in self.nlp.pipe_names:
+                    self.nlp.disable_pipe(name)
+            nlp_logger.info("SpaCy model loaded successfully", active_components=self.nlp.pipe_names)
+
+            # LLM models are preloaded by the model manager and loaded on demand otherwise
             nlp_logger.info("NLP service initialized successfully")
 
         except Exception as e:
@@ -112,36 +78,12 @@ class TaxNLPService:
         try:
             nlp_logger.info("Parsing tax input", text_length=len(text))
 
-            # Initialize result
-            result = ParsedTaxInfo(raw_text=text)
-
             # Clean and normalize text
             cleaned_text = self._clean_text(text)
+            doc = self.nlp(cleaned_text) if self.nlp else None
 
-            # Extract basic entities using spaCy
-            if self.nlp:
-                doc = self.nlp(cleaned_text)
-                result.extracted_entities = self._extract_spacy_entities(doc)
-
-            # Extract income information
-            result.income = await self._extract_income(cleaned_text)
-
-            # Extract filing status
-            result.filing_status = self._extract_filing_status(cleaned_text)
-
-            # Extract dependents
-            result.dependents = self._extract_dependents(cleaned_text)
-
-            # Extract location
-            result.state, result.country = self._extract_location(cleaned_text)
-
-            # Extract other financial information
-            result.spouse_income = await self._extract_spouse_income(cleaned_text)
-            result.deductions = self._extract_deductions(cleaned_text)
-            result.retirement_contributions = self._extract_retirement_contributions(cleaned_text)
-
-            # Calculate confidence score
-            result.confidence_score = self._calculate_confidence(result)
+            # Extract all fields in one pass over the text
+            result = self._build_result(text, cleaned_text, doc)
 
             # Enhanced parsing with LLM if available
             if result.confidence_score < 0.7:
@@ -160,6 +102,59 @@ class TaxNLPService:
             nlp_logger.error("Failed to parse tax input", error=str(e))
             return ParsedTaxInfo(raw_text=text, confidence_score=0.0)
 
+    async def parse_tax_inputs(self, texts: List[str], enhance: bool = True) -> List[ParsedTaxInfo]:
+        """Parse many inputs at once, running spaCy over them with nlp.pipe."""
+        try:
+            nlp_logger.info("Parsing tax inputs", count=len(texts))
+
+            loop = asyncio.get_running_loop()
+            results = await loop.run_in_executor(None, self._parse_batch, texts)
+
+            # Low-confidence results are enhanced concurrently so the LLM can batch them
+            if enhance:
+                low_confidence = [i for i, result in enumerate(results) if result.confidence_score < 0.7]
+                enhanced = await asyncio.gather(
+                    *[self._enhance_with_llm(texts[i], results[i]) for i in low_confidence]
+                )
+                for i, enhanced_result in zip(low_confidence, enhanced):
+                    if enhanced_result:
+                        results[i] = enhanced_result
+
+            return results
+
+        except Exception as e:
+            nlp_logger.error("Failed to parse tax inputs", error=str(e))
+            return [ParsedTaxInfo(raw_text=text, confidence_score=0.0) for text in texts]
+
+    def _parse_batch(self, texts: List[str]) -> List[ParsedTaxInfo]:
+        """Clean, run spaCy as one nlp.pipe stream and extract each input."""
+        cleaned_texts = [self._clean_text(text) for text in texts]
+        if self.nlp:
+            docs = self.nlp.pipe(cleaned_texts, batch_size=settings.nlp_pipe_batch_size)
+        else:
+            docs = [None] * len(cleaned_texts)
+
+        return [
+            self._build_result(text, cleaned_text, doc)
+            for text, cleaned_text, doc in zip(texts, cleaned_texts, docs)
+        ]
+
+    def _build_result(self, text: str, cleaned_text: str, doc) -> ParsedTaxInfo:
+        """Build a ParsedTaxInfo from the compiled extractor and the spaCy doc."""
+        fields = self.extractor.extract(doc.text if doc is not None else cleaned_text)
+        filing_status = fields.pop("filing_status")
+
+        result = ParsedTaxInfo(
+            raw_text=text,
+            filing_status=FilingStatus(filing_status) if filing_status else None,
+            **fields
+        )
+        if doc is not None:
+            result.extracted_entities = self._extract_spacy_entities(doc)
+
+        result.confidence_score = self._calculate_confidence(result)
+        return result
+
     def _clean_text(self, text: str) -> str:
         """Clean and normalize input text."""
         # Remove extra whitespace
@@ -168,8 +163,13 @@ class TaxNLPService:
         # Normalize currency symbols
         text = re.sub(r'[$]', '$', text)
 
-        # Normalize numbers with k suffix
-        text = re.sub(r'(\d+)k\b', r'\1000', text, flags=re.IGNORECASE)
+        # Normalize numbers with k suffix (75k, 62.5k), leaving 401k alone
+        text = re.sub(
+            r'\b(?!401k\b)(\d+(?:\.\d+)?)k\b',
+            lambda match: str(int(round(float(match.group(1)) * 1000))),
+            text,
+            flags=re.IGNORECASE
+        )
 
         return text
 
@@ -186,182 +186,6 @@ class TaxNLPService:
             })
         return entities
 
-    async def _extract_income(self, text: str) -> Optional[float]:
-        """Extract income information from text."""
-        text_lower = text.lower()
-
-        for pattern in self._income_patterns:
-            matches = re.findall(pattern, text_lower, re.IGNORECASE)
-            for match in matches:
-                try:
-                    # Clean the match
-                    income_str = re.sub(r'[,$]', '', match)
-                    income = float(income_str)
-
-                    # Handle 'k' suffix
-                    if 'k' in text_lower[text_lower.find(match):text_lower.find(match) + 20]:
-                        income *= 1000
-
-                    # Validate reasonable income range
-                    if 1000 <= income <= 10000000:
-                        return income
-
-                except (ValueError, AttributeError):
-                    continue
-
-        return None
-
-    def _extract_filing_status(self, text: str) -> Optional[FilingStatus]:
-        """Extract filing status from text."""
-        text_lower = text.lower()
-
-        for status, patterns in self._filing_status_patterns.items():
-            for pattern in patterns:
-                if re.search(pattern, text_lower, re.IGNORECASE):
-                    return status
-
-        return None
-
-    def _extract_dependents(self, text: str) -> int:
-        """Extract number of dependents from text."""
-        text_lower = text.lower()
-
-        for pattern in self._dependent_patterns:
-            matches = re.findall(pattern, text_lower, re.IGNORECASE)
-            for match in matches:
-                try:
-                    dependents = int(match)
-                    if 0 <= dependents <= 20:  # Reasonable range
-                        return dependents
-                except ValueError:
-                    continue
-
-        return 0
-
-    def _extract_location(self, text: str) -> Tuple[Optional[str], Optional[str]]:
-        """Extract state and country information."""
-        text_lower = text.lower()
-        state = None
-        country = "US"  # Default assumption
-
-        # State mapping for common abbreviations and full names
-        state_mapping = {
-            'california': 'CA', 'texas': 'TX', 'florida': 'FL', 'new york': 'NY',
-            'pennsylvania': 'PA', 'illinois': 'IL', 'ohio': 'OH', 'georgia': 'GA',
-            'north carolina': 'NC', 'michigan': 'MI', 'new jersey': 'NJ',
-            'virginia': 'VA', 'washington': 'WA', 'arizona': 'AZ', 'massachusetts': 'MA',
-            'tennessee': 'TN', 'indiana': 'IN', 'missouri': 'MO', 'maryland': 'MD',
-            'wisconsin': 'WI', 'colorado': 'CO', 'minnesota': 'MN', 'south carolina': 'SC',
-            'alabama': 'AL', 'louisiana': 'LA', 'kentucky': 'KY', 'oregon': 'OR',
-            'oklahoma': 'OK', 'connecticut': 'CT', 'utah': 'UT', 'iowa': 'IA',
-            'nevada': 'NV', 'arkansas': 'AR', 'mississippi': 'MS', 'kansas': 'KS',
-            'new mexico': 'NM', 'nebraska': 'NE', 'west virginia': 'WV',
-            'idaho': 'ID', 'hawaii': 'HI', 'new hampshire': 'NH', 'maine': 'ME',
-            'montana': 'MT', 'rhode island': 'RI', 'delaware': 'DE',
-            'south dakota': 'SD', 'north dakota': 'ND', 'alaska': 'AK',
-            'vermont': 'VT', 'wyoming': 'WY'
-        }
-
-        for pattern in self._state_patterns:
-            matches = re.findall(pattern, text_lower, re.IGNORECASE)
-            for match in matches:
-                match = match.strip().lower()
-                if match in state_mapping:
-                    state = state_mapping[match]
-                    break
-                elif len(match) == 2 and match.upper() in state_mapping.values():
-                    state = match.upper()
-                    break
-
-        # Check for other countries
-        if any(country_name in text_lower for country_name in ['canada', 'canadian', 'uk', 'britain', 'australia']):
-            if 'canada' in text_lower or 'canadian' in text_lower:
-                country = 'CA'
-            elif 'uk' in text_lower or 'britain' in text_lower:
-                country = 'GB'
-            elif 'australia' in text_lower:
-                country = 'AU'
-
-        return state, country
-
-    async def _extract_spouse_income(self, text: str) -> Optional[float]:
-        """Extract spouse income information."""
-        text_lower = text.lower()
-        spouse_patterns = [
-            r'(?:spouse|husband|wife|partner).*?(?:makes?|earns?|income).*?[\$]?(\d{1,3}(?:,\d{3})*(?:\.\d{2})?)',
-            r'(?:spouse|husband|wife|partner).*?[\$](\d{1,3}(?:,\d{3})*(?:\.\d{2})?)',
-            r'[\$](\d{1,3}(?:,\d{3})*(?:\.\d{2})?).*?(?:spouse|husband|wife|partner)'
-        ]
-
-        for pattern in spouse_patterns:
-            matches = re.findall(pattern, text_lower, re.IGNORECASE)
-            for match in matches:
-                try:
-                    income_str = re.sub(r'[,$]', '', match)
-                    income = float(income_str)
-
-                    if 'k' in text_lower:
-                        income *= 1000
-
-                    if 1000 <= income <= 10000000:
-                        return income
-                except ValueError:
-                    continue
-
-        return None
-
-    def _extract_deductions(self, text: str) -> List[Dict[str, Any]]:
-        """Extract deduction information."""
-        deductions = []
-        text_lower = text.lower()
-
-        deduction_patterns = {
-            'mortgage_interest': r'(?:mortgage|home loan).*?interest.*?[\$]?(\d{1,3}(?:,\d{3})*(?:\.\d{2})?)',
-            'charitable_donations': r'(?:charity|donation|charitable).*?[\$]?(\d{1,3}(?:,\d{3})*(?:\.\d{2})?)',
-            'medical_expenses': r'(?:medical|health).*?(?:expenses?|costs?).*?[\$]?(\d{1,3}(?:,\d{3})*(?:\.\d{2})?)',
-            'student_loan_interest': r'(?:student loan).*?interest.*?[\$]?(\d{1,3}(?:,\d{3})*(?:\.\d{2})?)',
-            'state_taxes': r'(?:state tax|property tax).*?[\$]?(\d{1,3}(?:,\d{3})*(?:\.\d{2})?)'
-        }
-
-        for deduction_type, pattern in deduction_patterns.items():
-            matches = re.findall(pattern, text_lower, re.IGNORECASE)
-            for match in matches:
-                try:
-                    amount_str = re.sub(r'[,$]', '', match)
-                    amount = float(amount_str)
-                    if 0 < amount <= 1000000:  # Reasonable range
-                        deductions.append({
-                            'type': deduction_type,
-                            'amount': amount,
-                            'description': f'{deduction_type.replace("_", " ").title()}'
-                        })
-                except ValueError:
-                    continue
-
-        return deductions
-
-    def _extract_retirement_contributions(self, text: str) -> Optional[float]:
-        """Extract retirement contribution information."""
-        text_lower = text.lower()
-        retirement_patterns = [
-            r'(?:401k|401\(k\)|ira|retirement).*?(?:contribution|contribute).*?[\$]?(\d{1,3}(?:,\d{3})*(?:\.\d{2})?)',
-            r'(?:contribute|contributing).*?[\$]?(\d{1,3}(?:,\d{3})*(?:\.\d{2})?).*?(?:401k|401\(k\)|ira|retirement)',
-            r'[\$](\d{1,3}(?:,\d{3})*(?:\.\d{2})?).*?(?:401k|401\(k\)|ira|retirement)'
-        ]
-
-        for pattern in retirement_patterns:
-            matches = re.findall(pattern, text_lower, re.IGNORECASE)
-            for match in matches:
-                try:
-                    amount_str = re.sub(r'[,$]', '', match)
-                    amount = float(amount_str)
-                    if 0 < amount <= 100000:  # Reasonable range
-                        return amount
-                except ValueError:
-                    continue
-
-        return None
-
     def _calculate_confidence(self, result: ParsedTaxInfo) -> float:
         """Calculate confidence score based on extracted information."""
         score = 0.0
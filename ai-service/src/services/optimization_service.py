@@ -1,13 +1,21 @@
 import asyncio
-from typing import Dict, Any, List, Optional, Tuple
-from dataclasses import dataclass
+import time
+from typing import Dict, Any, List, Optional, Tuple, AsyncIterator
+from dataclasses import dataclass, field
 from enum import Enum
 import json
+import uuid
 from datetime import datetime, date
 
+import numpy as np
+
 from src.core import optimization_logger
+from src.config import settings
 from src.models import get_model_manager
+from src.middleware import quality_controller
+from src.middleware.response_cache import LRUTTLCache
 from src.services.nlp_service import ParsedTaxInfo, FilingStatus
+from src.services.tax_tables import get_tax_tables
 
 
 class OptimizationCategory(Enum):
@@ -41,39 +49,33 @@ class OptimizationSuggestion:
     additional_info: Dict[str, Any]
 
 
+@dataclass
+class OptimizationResult:
+    """Suggestions for one request, with the state of its background AI insights."""
+    suggestions: List[OptimizationSuggestion]
+    insights_status: str  # "pending", "skipped" or "disabled"
+    insights_id: Optional[str] = None
+    degraded: bool = False  # some generators missed the deadline
+    timed_out_categories: List[str] = field(default_factory=list)
+
+
 class TaxOptimizationService:
     """Service for generating intelligent tax optimization suggestions."""
 
     def __init__(self):
         self.model_manager = get_model_manager()
 
-        # Current tax year limits and thresholds (2024)
-        self.tax_limits = {
-            "401k_contribution_limit": 23000,
-            "401k_catchup_limit": 7500,  # Additional for 50+
-            "ira_contribution_limit": 7000,
-            "ira_catchup_limit": 1000,  # Additional for 50+
-            "hsa_individual_limit": 4150,
-            "hsa_family_limit": 8300,
-            "hsa_catchup_limit": 1000,  # Additional for 55+
-            "dependent_care_fsa_limit": 5000,
-            "charitable_deduction_limit_agi_percentage": 60,
-            "student_loan_interest_deduction_max": 2500,
-            "state_local_tax_deduction_cap": 10000,
-            "mortgage_interest_debt_limit": 750000
-        }
+        # Background AI insights, fetched by id after the response has been sent
+        self.insights = LRUTTLCache(
+            max_entries=settings.optimization_insights_max_entries,
+            max_bytes=settings.optimization_insights_max_entries * 4096,  # 200-token reviews stay well under 4 KB
+            ttl=settings.optimization_insights_ttl
+        )
+        self.insight_tasks = set()
 
-        # Income thresholds for various benefits
-        self.income_thresholds = {
-            "roth_ira_phaseout_single": (138000, 153000),
-            "roth_ira_phaseout_married": (218000, 228000),
-            "eitc_max_income_no_children": 17640,
-            "eitc_max_income_1_child": 46560,
-            "eitc_max_income_2_children": 52918,
-            "eitc_max_income_3_plus_children": 56838,
-            "child_tax_credit_phaseout_single": 200000,
-            "child_tax_credit_phaseout_married": 400000
-        }
+        # Year-versioned federal figures; limits keep the keys the rules below use
+        self.tables = get_tax_tables(settings.tax_year)
+        self.tax_limits = self.tables.limits
 
     async def generate_optimization_suggestions(
         self,
@@ -82,39 +84,197 @@ class TaxOptimizationService:
         user_preferences: Optional[Dict[str, Any]] = None
     ) -> List[OptimizationSuggestion]:
         """Generate personalized tax optimization suggestions."""
+        result = await self.run_optimization(tax_info, user_preferences=user_preferences, insights=False)
+        return result.suggestions
+
+    async def run_optimization(
+        self,
+        tax_info: ParsedTaxInfo,
+        user_preferences: Optional[Dict[str, Any]] = None,
+        deadline_ms: Optional[int] = None,
+        insights: bool = True
+    ) -> OptimizationResult:
+        """
+        Generate suggestions within a per-request deadline.
+
+        The rule-based generators run concurrently and whatever has finished
+        when the deadline passes is returned (marked ``degraded``). AI insights
+        are not awaited: they start as a background task whose result is
+        fetched with ``get_insights``, and are skipped when the remaining
+        budget is too short or too many are already running.
+        """
+        start_time = time.time()
+        budget = min(deadline_ms or settings.optimization_deadline_ms, settings.optimization_deadline_ms) / 1000
+
         try:
             optimization_logger.info("Generating optimization suggestions",
                                    income=tax_info.income,
-                                   filing_status=tax_info.filing_status)
+                                   filing_status=tax_info.filing_status,
+                                   deadline=budget)
 
-            suggestions = []
+            suggestions, timed_out = await self._run_rule_generators(tax_info, budget)
 
-            # Generate different types of suggestions
-            suggestions.extend(await self._generate_retirement_suggestions(tax_info))
-            suggestions.extend(await self._generate_deduction_suggestions(tax_info))
-            suggestions.extend(await self._generate_credit_suggestions(tax_info))
-            suggestions.extend(await self._generate_income_timing_suggestions(tax_info))
-            suggestions.extend(await self._generate_education_suggestions(tax_info))
-            suggestions.extend(await self._generate_healthcare_suggestions(tax_info))
-            suggestions.extend(await self._generate_charitable_suggestions(tax_info))
+            # Sort by priority and potential savings
+            final_suggestions = self._prioritize_suggestions(suggestions)[:10]  # Return top 10 suggestions
 
-            # Use AI to enhance suggestions if available
-            enhanced_suggestions = await self._enhance_suggestions_with_ai(tax_info, suggestions)
+        except Exception as e:
+            optimization_logger.error("Failed to generate optimization suggestions", error=str(e))
+            return OptimizationResult(suggestions=[], insights_status="disabled", degraded=True)
 
-            # Sort by priority and potential savings
-            final_suggestions = self._prioritize_suggestions(enhanced_suggestions or suggestions)
+        remaining = budget - (time.time() - start_time)
+        if not insights:
+            insights_id, insights_status = None, "disabled"
+        elif not final_suggestions or remaining * 1000 < settings.optimization_insights_min_budget_ms:
+            insights_id, insights_status = None, "skipped"
+        else:
+            insights_id = self._start_insights(tax_info)
+            insights_status = "pending" if insights_id else "skipped"
+
+        optimization_logger.info("Optimization suggestions generated",
+                               total_suggestions=len(final_suggestions),
+                               total_potential_savings=sum(s.potential_savings for s in final_suggestions),
+                               timed_out_categories=timed_out,
+                               insights_status=insights_status)
+
+        return OptimizationResult(
+            suggestions=final_suggestions,
+            insights_id=insights_id,
+            insights_status=insights_status,
+            degraded=bool(timed_out),
+            timed_out_categories=timed_out
+        )
 
-            optimization_logger.info("Optimization suggestions generated",
-                                   total_suggestions=len(final_suggestions),
-                                   total_potential_savings=sum(s.potential_savings for s in final_suggestions))
+    def get_insights(self, insights_id: str) -> Optional[Dict[str, Any]]:
+        """State of a background AI insights task, or None once unknown or expired."""
+        return self.insights.get(insights_id)
 
-            return final_suggestions[:10]  # Return top 10 suggestions
+    async def stream_optimization_suggestions(
+        self,
+        tax_info: ParsedTaxInfo,
+        user_preferences: Optional[Dict[str, Any]] = None
+    ) -> AsyncIterator[Tuple[str, Dict[str, Any]]]:
+        """
+        Generate optimization suggestions as a stream of (event, data) pairs.
+
+        The rule-based ``suggestions`` are emitted as soon as they are computed,
+        the AI review follows as ``token`` events (with ``quality`` warnings from
+        incremental checks), and a ``final`` event carries the suggestions, the
+        full AI insights and their quality verdict.
+        """
+        start_time = time.time()
+        time_to_first_token = None
+
+        suggestions = self._prioritize_suggestions(await self._generate_rule_based_suggestions(tax_info))[:10]
+        yield "suggestions", {"suggestions": suggestions}
+
+        metrics = None
+        monitor = quality_controller.create_stream_monitor("optimization")
+
+        if suggestions:
+            stream = self.model_manager.stream_text(
+                self._build_enhancement_prompt(tax_info),
+                max_new_tokens=200,
+                temperature=0.3
+            )
+            try:
+                async for chunk in stream:
+                    if not monitor.text:
+                        chunk = chunk.lstrip()
+
+                    # Checked before sending, so flagged text never reaches the client
+                    warnings = monitor.feed(chunk)
+                    if warnings:
+                        yield "quality", {"warnings": warnings}
+
+                    text = monitor.release()
+                    if text:
+                        if time_to_first_token is None:
+                            time_to_first_token = time.time() - start_time
+                        yield "token", {"text": text}
+
+                    if monitor.should_stop:
+                        break
+
+            except Exception as e:
+                optimization_logger.warning("Streaming AI enhancement failed", error=str(e))
+            finally:
+                # Abandons this request's generation; a shared batch stops once all its callers are gone
+                await stream.aclose()
+
+            text = monitor.release(final=True)
+            if text:
+                if time_to_first_token is None:
+                    time_to_first_token = time.time() - start_time
+                yield "token", {"text": text}
+
+            if monitor.text.strip():
+                # Free-form insights have no scored confidence, so they are judged at the service threshold
+                metrics = await monitor.finalize(
+                    monitor.text.strip(), settings.confidence_threshold, time.time() - start_time
+                )
+
+        optimization_logger.info("Optimization suggestions streamed",
+                                 total_suggestions=len(suggestions),
+                                 time_to_first_token=time_to_first_token)
+
+        yield "final", {
+            "suggestions": suggestions,
+            "insights": monitor.text.strip(),
+            "quality": metrics,
+            "time_to_first_token": time_to_first_token
+        }
 
-        except Exception as e:
-            optimization_logger.error("Failed to generate optimization suggestions", error=str(e))
-            return []
+    async def _generate_rule_based_suggestions(self, tax_info: ParsedTaxInfo) -> List[OptimizationSuggestion]:
+        """Run every rule-based suggestion generator."""
+        suggestions, _ = await self._run_rule_generators(tax_info)
+        return suggestions
+
+    async def _run_rule_generators(
+        self,
+        tax_info: ParsedTaxInfo,
+        timeout: Optional[float] = None
+    ) -> Tuple[List[OptimizationSuggestion], List[str]]:
+        """
+        Run the generators concurrently; returns suggestions and the categories that missed the deadline.
+
+        The generators are CPU-bound, so each runs in the default executor and
+        the event loop stays free to give up on them when the timeout passes.
+        A generator that misses it keeps running in its thread, but its result
+        is discarded.
+        """
+        generators = {
+            OptimizationCategory.RETIREMENT: self._generate_retirement_suggestions,
+            OptimizationCategory.DEDUCTIONS: self._generate_deduction_suggestions,
+            OptimizationCategory.TAX_CREDITS: self._generate_credit_suggestions,
+            OptimizationCategory.INCOME_TIMING: self._generate_income_timing_suggestions,
+            OptimizationCategory.EDUCATION: self._generate_education_suggestions,
+            OptimizationCategory.HEALTHCARE: self._generate_healthcare_suggestions,
+            OptimizationCategory.CHARITABLE_GIVING: self._generate_charitable_suggestions,
+        }
+        loop = asyncio.get_running_loop()
+        tasks = {
+            loop.run_in_executor(None, generate, tax_info): category.value
+            for category, generate in generators.items()
+        }
 
-    async def _generate_retirement_suggestions(self, tax_info: ParsedTaxInfo) -> List[OptimizationSuggestion]:
+        done, pending = await asyncio.wait(tasks, timeout=timeout)
+        for task in pending:
+            task.cancel()
+
+        suggestions = []
+        for task, category in tasks.items():
+            if task not in done:
+                continue
+            # One failing generator only drops its own category
+            if task.exception() is not None:
+                optimization_logger.warning("Suggestion generator failed",
+                                            category=category, error=str(task.exception()))
+                continue
+            suggestions.extend(task.result())
+
+        return suggestions, sorted(tasks[task] for task in pending)
+
+    def _generate_retirement_suggestions(self, tax_info: ParsedTaxInfo) -> List[OptimizationSuggestion]:
         """Generate retirement-related optimization suggestions."""
         suggestions = []
 
@@ -145,7 +305,7 @@ class TaxOptimizationService:
                     "Ensure contributions don't exceed annual limit"
                 ],
                 deadlines=["December 31st for current tax year"],
-                applicable_tax_years=[2024],
+                applicable_tax_years=[self.tables.year],
                 legal_references=["IRC Section 402(g)"],
                 estimated_effort="low",
                 eligibility_requirements=["Must have access to employer 401(k) plan"],
@@ -176,7 +336,7 @@ class TaxOptimizationService:
                     "Keep records for tax filing"
                 ],
                 deadlines=["April 15th of following year"],
-                applicable_tax_years=[2024],
+                applicable_tax_years=[self.tables.year],
                 legal_references=["IRC Section 219"],
                 estimated_effort="low",
                 eligibility_requirements=[
@@ -206,7 +366,7 @@ class TaxOptimizationService:
                     "Consider conversion strategies"
                 ],
                 deadlines=["April 15th of following year"],
-                applicable_tax_years=[2024],
+                applicable_tax_years=[self.tables.year],
                 legal_references=["IRC Section 408A"],
                 estimated_effort="low",
                 eligibility_requirements=["Income limits apply"],
@@ -220,7 +380,7 @@ class TaxOptimizationService:
 
         return suggestions
 
-    async def _generate_deduction_suggestions(self, tax_info: ParsedTaxInfo) -> List[OptimizationSuggestion]:
+    def _generate_deduction_suggestions(self, tax_info: ParsedTaxInfo) -> List[OptimizationSuggestion]:
         """Generate deduction optimization suggestions."""
         suggestions = []
 
@@ -249,7 +409,7 @@ class TaxOptimizationService:
                     "Consider timing deductions"
                 ],
                 deadlines=["December 31st"],
-                applicable_tax_years=[2024],
+                applicable_tax_years=[self.tables.year],
                 legal_references=["IRC Section 63"],
                 estimated_effort="medium",
                 eligibility_requirements=["Must exceed standard deduction"],
@@ -278,7 +438,7 @@ class TaxOptimizationService:
                     "Track total SALT deductions"
                 ],
                 deadlines=["December 31st"],
-                applicable_tax_years=[2024],
+                applicable_tax_years=[self.tables.year],
                 legal_references=["IRC Section 164"],
                 estimated_effort="medium",
                 eligibility_requirements=["Must itemize deductions"],
@@ -291,7 +451,7 @@ class TaxOptimizationService:
 
         return suggestions
 
-    async def _generate_credit_suggestions(self, tax_info: ParsedTaxInfo) -> List[OptimizationSuggestion]:
+    def _generate_credit_suggestions(self, tax_info: ParsedTaxInfo) -> List[OptimizationSuggestion]:
         """Generate tax credit optimization suggestions."""
         suggestions = []
 
@@ -318,7 +478,7 @@ class TaxOptimizationService:
                         "Check income limits"
                     ],
                     deadlines=["Tax filing deadline"],
-                    applicable_tax_years=[2024],
+                    applicable_tax_years=[self.tables.year],
                     legal_references=["IRC Section 24"],
                     estimated_effort="low",
                     eligibility_requirements=[
@@ -352,7 +512,7 @@ class TaxOptimizationService:
                     "File tax return to claim"
                 ],
                 deadlines=["Tax filing deadline"],
-                applicable_tax_years=[2024],
+                applicable_tax_years=[self.tables.year],
                 legal_references=["IRC Section 32"],
                 estimated_effort="low",
                 eligibility_requirements=[
@@ -370,7 +530,7 @@ class TaxOptimizationService:
 
         return suggestions
 
-    async def _generate_income_timing_suggestions(self, tax_info: ParsedTaxInfo) -> List[OptimizationSuggestion]:
+    def _generate_income_timing_suggestions(self, tax_info: ParsedTaxInfo) -> List[OptimizationSuggestion]:
         """Generate income timing optimization suggestions."""
         suggestions = []
 
@@ -395,7 +555,7 @@ class TaxOptimizationService:
                     "Consider deferred compensation plans"
                 ],
                 deadlines=["Before bonus payment"],
-                applicable_tax_years=[2024, 2025],
+                applicable_tax_years=[self.tables.year, self.tables.year + 1],
                 legal_references=["IRC Section 451"],
                 estimated_effort="medium",
                 eligibility_requirements=["Must have control over income timing"],
@@ -408,7 +568,7 @@ class TaxOptimizationService:
 
         return suggestions
 
-    async def _generate_education_suggestions(self, tax_info: ParsedTaxInfo) -> List[OptimizationSuggestion]:
+    def _generate_education_suggestions(self, tax_info: ParsedTaxInfo) -> List[OptimizationSuggestion]:
         """Generate education-related optimization suggestions."""
         suggestions = []
 
@@ -431,7 +591,7 @@ class TaxOptimizationService:
                     "Include in tax return"
                 ],
                 deadlines=["Tax filing deadline"],
-                applicable_tax_years=[2024],
+                applicable_tax_years=[self.tables.year],
                 legal_references=["IRC Section 221"],
                 estimated_effort="low",
                 eligibility_requirements=[
@@ -448,7 +608,7 @@ class TaxOptimizationService:
 
         return suggestions
 
-    async def _generate_healthcare_suggestions(self, tax_info: ParsedTaxInfo) -> List[OptimizationSuggestion]:
+    def _generate_healthcare_suggestions(self, tax_info: ParsedTaxInfo) -> List[OptimizationSuggestion]:
         """Generate healthcare-related optimization suggestions."""
         suggestions = []
 
@@ -471,7 +631,7 @@ class TaxOptimizationService:
                     f"Contribute ${hsa_limit:,.0f} annually"
                 ],
                 deadlines=["December 31st for contributions"],
-                applicable_tax_years=[2024],
+                applicable_tax_years=[self.tables.year],
                 legal_references=["IRC Section 223"],
                 estimated_effort="medium",
                 eligibility_requirements=[
@@ -489,7 +649,7 @@ class TaxOptimizationService:
 
         return suggestions
 
-    async def _generate_charitable_suggestions(self, tax_info: ParsedTaxInfo) -> List[OptimizationSuggestion]:
+    def _generate_charitable_suggestions(self, tax_info: ParsedTaxInfo) -> List[OptimizationSuggestion]:
         """Generate charitable giving optimization suggestions."""
         suggestions = []
 
@@ -517,7 +677,7 @@ class TaxOptimizationService:
                         "Use donor-advised funds for timing flexibility"
                     ],
                     deadlines=["December 31st"],
-                    applicable_tax_years=[2024],
+                    applicable_tax_years=[self.tables.year],
                     legal_references=["IRC Section 170"],
                     estimated_effort="medium",
                     eligibility_requirements=[
@@ -534,29 +694,65 @@ class TaxOptimizationService:
 
         return suggestions
 
-    async def _enhance_suggestions_with_ai(
-        self,
-        tax_info: ParsedTaxInfo,
-        suggestions: List[OptimizationSuggestion]
-    ) -> Optional[List[OptimizationSuggestion]]:
-        """Use AI to enhance and personalize suggestions."""
+    def _start_insights(self, tax_info: ParsedTaxInfo) -> Optional[str]:
+        """Start a background AI review; returns its id, or None when too many are running."""
+        if len(self.insight_tasks) >= settings.optimization_max_pending_insights:
+            return None
+
+        insights_id = uuid.uuid4().hex
+        self.insights.put(insights_id, {"insights_id": insights_id, "status": "pending"}, 0)
+
+        task = asyncio.create_task(self._generate_insights(insights_id, tax_info))
+        # Keep a reference so the task is not garbage collected before it finishes
+        self.insight_tasks.add(task)
+        task.add_done_callback(self.insight_tasks.discard)
+        return insights_id
+
+    async def _generate_insights(self, insights_id: str, tax_info: ParsedTaxInfo) -> None:
+        """Ask the model to review the suggestions and store its answer for get_insights."""
+        start_time = time.time()
         try:
-            if not suggestions:
-                return suggestions
-
-            # Create context for AI
-            context = {
-                "income": tax_info.income,
-                "filing_status": tax_info.filing_status.value if tax_info.filing_status else "unknown",
-                "dependents": tax_info.dependents,
-                "state": tax_info.state,
-                "current_suggestions": len(suggestions)
+            response = await asyncio.wait_for(
+                self.model_manager.generate_text(
+                    self._build_enhancement_prompt(tax_info),
+                    max_new_tokens=200,
+                    temperature=0.3
+                ),
+                timeout=settings.optimization_insights_timeout
+            )
+            processing_time = time.time() - start_time
+            text = (response or "").strip()
+
+            # Free-form insights have no scored confidence, so they are judged at the service threshold
+            quality = await quality_controller.validate_response(
+                text, "optimization", settings.confidence_threshold, processing_time
+            ) if text else None
+
+            record = {
+                "insights_id": insights_id,
+                "status": "completed",
+                "insights": text,
+                "quality": quality.to_dict() if quality else None,
+                "processing_time": processing_time
             }
+            optimization_logger.info("AI insights completed",
+                                     response_length=len(text), processing_time=processing_time)
 
-            prompt = f"""
+        except Exception as e:
+            error = "timed out" if isinstance(e, asyncio.TimeoutError) else str(e)
+            optimization_logger.warning("AI insights failed", error=error)
+            record = {"insights_id": insights_id, "status": "failed", "error": error}
+
+        self.insights.put(insights_id, record, len(json.dumps(record)))
+
+    def _build_enhancement_prompt(self, tax_info: ParsedTaxInfo) -> str:
+        """Build the prompt asking the model to review the suggestions."""
+        filing_status = tax_info.filing_status.value if tax_info.filing_status else "unknown"
+
+        return f"""
 Based on this taxpayer profile:
-- Income: ${tax_info.income:,.0f} if tax_info.income else 'Unknown'
-- Filing Status: {context['filing_status']}
+- Income: {f"${tax_info.income:,.0f}" if tax_info.income else 'Unknown'}
+- Filing Status: {filing_status}
 - Dependents: {tax_info.dependents}
 - State: {tax_info.state or 'Unknown'}
 
@@ -571,24 +767,6 @@ Focus on the top 3 most impactful suggestions for this taxpayer's situation.
 Keep response concise and practical.
 """
 
-            response = await self.model_manager.generate_text(
-                prompt,
-                max_new_tokens=200,
-                temperature=0.3
-            )
-
-            if response:
-                # Use AI insights to adjust suggestion priorities and confidence
-                optimization_logger.info("AI enhancement completed", response_length=len(response))
-                # Note: In production, you would parse the AI response and update suggestions
-                # For now, return original suggestions
-
-            return suggestions
-
-        except Exception as e:
-            optimization_logger.warning("AI enhancement failed", error=str(e))
-            return suggestions
-
     def _prioritize_suggestions(self, suggestions: List[OptimizationSuggestion]) -> List[OptimizationSuggestion]:
         """Sort suggestions by priority and potential savings."""
         return sorted(
@@ -596,50 +774,50 @@ Keep response concise and practical.
             key=lambda x: (x.priority, -x.potential_savings, -x.confidence)
         )
 
-    def _estimate_marginal_tax_rate(self, income: float, filing_status: Optional[FilingStatus]) -> float:
-        """Estimate marginal tax rate based on income and filing status."""
-        # Simplified federal tax brackets for 2024
-        if filing_status == FilingStatus.MARRIED_FILING_JOINTLY:
-            if income <= 22000:
-                return 0.10
-            elif income <= 89450:
-                return 0.12
-            elif income <= 190750:
-                return 0.22
-            elif income <= 364200:
-                return 0.24
-            elif income <= 462500:
-                return 0.32
-            elif income <= 693750:
-                return 0.35
-            else:
-                return 0.37
-        else:  # Single, MFS, HOH (simplified)
-            if income <= 11000:
-                return 0.10
-            elif income <= 44725:
-                return 0.12
-            elif income <= 95375:
-                return 0.22
-            elif income <= 182050:
-                return 0.24
-            elif income <= 231250:
-                return 0.32
-            elif income <= 578125:
-                return 0.35
-            else:
-                return 0.37
+    def estimate_profiles(self, profiles: List[ParsedTaxInfo]) -> List[Dict[str, float]]:
+        """Headline table figures and savings for a batch of profiles, computed in one vectorized pass."""
+        if not profiles:
+            return []
+
+        income = np.array([p.income or 0.0 for p in profiles])
+        dependents = np.array([p.dependents or 0 for p in profiles])
+        retirement = np.array([p.retirement_contributions or 0.0 for p in profiles])
+        student_loan_interest = np.array([p.student_loan_interest or 0.0 for p in profiles])
+
+        figures = self.tables.evaluate(income, [p.filing_status for p in profiles], dependents)
+        rate = figures["marginal_rate"]
+        has_income = income > 0
+
+        columns = {
+            "marginal_rate": rate,
+            "standard_deduction": figures["standard_deduction"],
+            "401k_savings": np.where(
+                has_income, np.maximum(self.tax_limits["401k_contribution_limit"] - retirement, 0.0) * rate, 0.0
+            ),
+            "ira_savings": np.where(has_income, self.tax_limits["ira_contribution_limit"] * rate, 0.0),
+            "hsa_savings": np.where(
+                has_income & (income < 200000), self.tax_limits["hsa_individual_limit"] * rate, 0.0
+            ),
+            "student_loan_savings": np.minimum(
+                student_loan_interest, self.tax_limits["student_loan_interest_deduction_max"]
+            ) * rate,
+            "child_tax_credit": np.where(has_income, figures["child_tax_credit"], 0.0),
+            "earned_income_credit": np.where(figures["eitc_eligible"], figures["max_eitc"], 0.0),
+            "roth_ira_eligible": figures["roth_ira_eligible"].astype(np.float64)
+        }
+
+        return [
+            {name: float(values[i]) for name, values in columns.items()}
+            for i in range(len(profiles))
+        ]
+
+    def _estimate_marginal_tax_rate(self, income: Optional[float], filing_status: Optional[FilingStatus]) -> float:
+        """Marginal federal rate for the income and filing status."""
+        return float(self.tables.marginal_rate(income or 0.0, filing_status))
 
     def _get_standard_deduction(self, filing_status: Optional[FilingStatus]) -> float:
-        """Get standard deduction amount for 2024."""
-        if filing_status == FilingStatus.MARRIED_FILING_JOINTLY:
-            return 29200
-        elif filing_status == FilingStatus.MARRIED_FILING_SEPARATELY:
-            return 14600
-        elif filing_status == FilingStatus.HEAD_OF_HOUSEHOLD:
-            return 21900
-        else:  # Single
-            return 14600
+        """Standard deduction for the filing status."""
+        return float(self.tables.standard_deduction(filing_status))
 
     def _is_eligible_for_ira_deduction(self, income: float, filing_status: Optional[FilingStatus]) -> bool:
         """Check if eligible for traditional IRA deduction."""
@@ -648,49 +826,19 @@ Keep response concise and practical.
 
     def _is_eligible_for_roth_ira(self, income: float, filing_status: Optional[FilingStatus]) -> bool:
         """Check if eligible for Roth IRA contribution."""
-        if filing_status == FilingStatus.MARRIED_FILING_JOINTLY:
-            return income < self.income_thresholds["roth_ira_phaseout_married"][1]
-        else:
-            return income < self.income_thresholds["roth_ira_phaseout_single"][1]
+        return bool(self.tables.roth_ira_eligible(income, filing_status))
 
     def _is_eligible_for_eitc(self, income: float, filing_status: Optional[FilingStatus], dependents: int) -> bool:
         """Check if eligible for Earned Income Tax Credit."""
-        if dependents == 0:
-            return income <= self.income_thresholds["eitc_max_income_no_children"]
-        elif dependents == 1:
-            return income <= self.income_thresholds["eitc_max_income_1_child"]
-        elif dependents == 2:
-            return income <= self.income_thresholds["eitc_max_income_2_children"]
-        else:
-            return income <= self.income_thresholds["eitc_max_income_3_plus_children"]
+        return bool(self.tables.eitc_eligible(income, filing_status, dependents))
 
     def _calculate_child_tax_credit(self, income: float, filing_status: Optional[FilingStatus], dependents: int) -> float:
         """Calculate Child Tax Credit amount."""
-        base_credit = dependents * 2000
-
-        # Apply income limits
-        if filing_status == FilingStatus.MARRIED_FILING_JOINTLY:
-            phaseout_start = self.income_thresholds["child_tax_credit_phaseout_married"]
-        else:
-            phaseout_start = self.income_thresholds["child_tax_credit_phaseout_single"]
-
-        if income > phaseout_start:
-            reduction = ((income - phaseout_start) // 1000) * 50
-            return max(0, base_credit - reduction)
-
-        return base_credit
+        return float(self.tables.child_tax_credit(income, filing_status, dependents))
 
     def _calculate_max_eitc(self, dependents: int) -> float:
         """Calculate maximum EITC for number of dependents."""
-        # 2024 maximum EITC amounts
-        if dependents == 0:
-            return 632
-        elif dependents == 1:
-            return 4213
-        elif dependents == 2:
-            return 6960
-        else:  # 3 or more
-            return 7830
+        return float(self.tables.max_eitc(dependents))
 
 
 # Global service instance
@@ -1,6 +1,7 @@
 import json
 import re
-from typing import Dict, Any, List, Optional, Union
+from string import Formatter
+from typing import Dict, Any, List, Optional, Union, Tuple
 from dataclasses import dataclass, asdict
 from enum import Enum
 from datetime import datetime
@@ -32,11 +33,89 @@ class PromptTemplate:
     examples: List[Dict[str, str]]
 
 
+# Sections dropped together with the whitespace after them when empty
+OPTIONAL_SECTIONS = {"context_section", "personalization_section"}
+
+
+@dataclass
+class CompiledTemplate:
+    """Template pre-split into literal segments around its slots; rendering is one join."""
+    segments: List[str]  # one more literal than there are slots
+    slots: List[Tuple[str, str]]  # (variable name, format spec)
+    collapsed_segments: List[str]  # segments with leading whitespace removed, used after an empty section
+
+    @property
+    def prefix(self) -> str:
+        """
+        Literal text every rendering starts with, shared across requests.
+
+        Cut before the last whitespace of the leading literal: a word and the
+        space in front of it form one token, so the rest of the prompt must
+        start with that space for prefix and rest tokenized apart to match
+        the tokens of the whole prompt.
+        """
+        boundary = re.search(r'\s+\S*$', self.segments[0])
+        return self.segments[0][:boundary.start()] if boundary else ""
+
+    def render(self, variables: Dict[str, Any]) -> str:
+        parts = [self.segments[0]]
+
+        for i, (name, format_spec) in enumerate(self.slots):
+            if name not in variables:
+                # Unknown variables stay as written, as before compilation
+                parts.append("{" + name + (":" + format_spec if format_spec else "") + "}")
+                parts.append(self.segments[i + 1])
+                continue
+
+            value = variables[name]
+            if name in OPTIONAL_SECTIONS:
+                value = str(value or "").rstrip("\n")
+                if not value.strip():
+                    parts.append(self.collapsed_segments[i + 1])
+                    continue
+
+            parts.append(_format_value(value, format_spec))
+            parts.append(self.segments[i + 1])
+
+        return "".join(parts).strip()
+
+
+def _format_value(value: Any, format_spec: str) -> str:
+    if not format_spec:
+        return str(value)
+    try:
+        return format(value, format_spec)
+    except (TypeError, ValueError):
+        return str(value)
+
+
+def compile_template(template: str) -> CompiledTemplate:
+    """Split a str.format-style template into literal segments and slots."""
+    segments: List[str] = []
+    slots: List[Tuple[str, str]] = []
+    literal = ""
+
+    for literal_text, field_name, format_spec, _ in Formatter().parse(template.strip()):
+        literal += literal_text
+        if field_name is not None:
+            segments.append(literal)
+            slots.append((field_name, format_spec or ""))
+            literal = ""
+    segments.append(literal)
+
+    return CompiledTemplate(
+        segments=segments,
+        slots=slots,
+        collapsed_segments=[segment.lstrip() for segment in segments]
+    )
+
+
 class PromptEngineeringService:
     """Service for managing and optimizing AI prompts."""
 
     def __init__(self):
         self.templates = self._initialize_templates()
+        self.compiled_templates = {name: compile_template(t.template) for name, t in self.templates.items()}
         self.prompt_history = []
         self.performance_metrics = {}
 
@@ -49,7 +128,7 @@ class PromptEngineeringService:
             name="tax_info_extraction",
             type=PromptType.NLP_PARSING,
             template="""
-Extract tax information from this user input: "{user_input}"
+Extract tax information from the user input given at the end.
 
 Extract the following information and return as JSON:
 {{
@@ -80,7 +159,7 @@ JSON:""",
             max_tokens=200,
             temperature=0.1,
             description="Extract structured tax information from natural language",
-            version="1.0",
+            version="1.1",
             examples=[
                 {
                     "input": "I make 75k, married with 2 kids in California",
@@ -269,20 +348,16 @@ Response:""",
                 "tax_year": datetime.now().year
             }
 
-            # Replace variables in template
-            prompt = template.template
-            for var_name, var_value in all_variables.items():
-                if f"{{{var_name}}}" in prompt:
-                    prompt = prompt.replace(f"{{{var_name}}}", str(var_value))
-
-            # Handle conditional sections
-            prompt = self._process_conditional_sections(prompt, all_variables)
+            # Render the precompiled template in one pass
+            compiled = self.compiled_templates[template_name]
+            prompt = compiled.render(all_variables)
 
             # Log prompt usage
             self._log_prompt_usage(template_name, all_variables)
 
             return {
-                "prompt": prompt.strip(),
+                "prompt": prompt,
+                "prefix": compiled.prefix,
                 "max_tokens": template.max_tokens,
                 "temperature": template.temperature,
                 "template_name": template_name,
@@ -349,20 +424,6 @@ Response:""",
 
         return ""
 
-    def _process_conditional_sections(self, prompt: str, variables: Dict[str, Any]) -> str:
-        """Process conditional sections in prompts."""
-        # Remove empty context sections
-        if variables.get("context_section", "").strip() == "":
-            prompt = re.sub(r'\{context_section\}\s*\n?', '', prompt)
-
-        if variables.get("personalization_section", "").strip() == "":
-            prompt = re.sub(r'\{personalization_section\}\s*\n?', '', prompt)
-
-        # Clean up extra newlines
-        prompt = re.sub(r'\n{3,}', '\n\n', prompt)
-
-        return prompt
-
     def _log_prompt_usage(self, template_name: str, variables: Dict[str, Any]) -> None:
         """Log prompt usage for analytics and optimization."""
         usage_record = {
@@ -421,6 +482,8 @@ Response:""",
             if not prompt.startswith("###"):
                 prompt = f"### Instruction:\n{prompt}\n\n### Response:"
                 optimized["prompt"] = prompt
+                if "prefix" in optimized:
+                    optimized["prefix"] = f"### Instruction:\n{optimized['prefix']}"
 
         elif model_type.lower() == "openai":
             # OpenAI-specific optimizations
@@ -480,6 +543,7 @@ Response:""",
             )
 
             self.templates[name] = custom_template
+            self.compiled_templates[name] = compile_template(template)
             ai_logger.info("Custom template created", name=name, type=prompt_type.value)
             return True
 
@@ -496,7 +560,8 @@ Response:""",
                 "variables": template.variables,
                 "max_tokens": template.max_tokens,
                 "temperature": template.temperature,
-                "version": template.version
+                "version": template.version,
+                "shared_prefix_length": len(self.compiled_templates[name].prefix)
             }
             for name, template in self.templates.items()
         }
@@ -1,14 +1,18 @@
 import asyncio
 import json
 import re
-from typing import Dict, Any, List, Optional, Tuple
+import time
+from typing import Dict, Any, List, Optional, Tuple, AsyncIterator
 from dataclasses import dataclass
 from enum import Enum
 from datetime import datetime
 
 from src.core import ai_logger
+from src.config import settings
 from src.models import get_model_manager
+from src.middleware import quality_controller
 from src.services.nlp_service import ParsedTaxInfo
+from src.services.kb_index import KnowledgeBaseIndex
 
 
 class QuestionCategory(Enum):
@@ -111,6 +115,15 @@ class TaxQAService:
             ]
         }
 
+        # Each category's patterns compiled into one alternation, checked in the same order
+        self.compiled_classifiers = [
+            (category, re.compile("|".join(f"(?:{pattern})" for pattern in patterns), re.IGNORECASE))
+            for category, patterns in self.classification_patterns.items()
+        ]
+
+        # Prebuilt semantic index for large curated KBs (see build_kb_index.py)
+        self.kb_index = self.load_knowledge_index()
+
         # Related questions database
         self.related_questions = {
             QuestionCategory.DEDUCTIONS: [
@@ -156,24 +169,29 @@ class TaxQAService:
                 # Use knowledge base response
                 response = self._create_response_from_kb(kb_response, category)
             else:
-                # Use AI to generate response
-                response = await self._generate_ai_response(
-                    question,
-                    category,
-                    user_context,
-                    conversation_history
-                )
-
-            # Add personalization based on user context
-            if user_context:
-                response = self._personalize_response(response, user_context)
-
-            # Add related questions and follow-ups
-            response.related_questions = self._get_related_questions(category)
-            response.follow_up_suggestions = self._get_follow_up_suggestions(response, user_context)
-
-            # Add disclaimer
-            response.disclaimer = self._get_disclaimer()
+                cacheable = self._is_cacheable(user_context, conversation_history)
+                cached = await quality_controller.get_cached_response(question) if cacheable else None
+
+                if cached:
+                    response = self._build_ai_response(cached["response"], question, category)
+                else:
+                    # Use AI to generate response
+                    start_time = time.time()
+                    response = await self._generate_ai_response(
+                        question,
+                        category,
+                        user_context,
+                        conversation_history
+                    )
+
+                    if cacheable and response.sources == ["AI Assistant"]:
+                        metrics = await quality_controller.validate_response(
+                            response.answer, "qa", response.confidence, time.time() - start_time,
+                            {"question": question}
+                        )
+                        await quality_controller.cache_response(question, response.answer, metrics)
+
+            response = self._complete_response(response, category, user_context)
 
             ai_logger.info("Tax question answered",
                          category=category.value,
@@ -186,6 +204,135 @@ class TaxQAService:
             ai_logger.error("Failed to answer tax question", error=str(e))
             return self._create_fallback_response(question)
 
+    async def stream_tax_question(
+        self,
+        question: str,
+        user_context: Optional[ParsedTaxInfo] = None,
+        conversation_history: Optional[List[Dict[str, str]]] = None
+    ) -> AsyncIterator[Tuple[str, Dict[str, Any]]]:
+        """
+        Answer a tax question as a stream of (event, data) pairs.
+
+        Emits ``metadata`` first, ``token`` as answer text passes the
+        incremental quality checks (generated text is held back by the
+        monitor's scan overlap), ``quality`` when a check raises a warning, and
+        a ``final`` event carrying the completed QAResponse and the quality
+        verdict. Text flagged as harmful is never sent as a token.
+        """
+        start_time = time.time()
+        time_to_first_token = None
+
+        normalized_question = self._normalize_question(question)
+        category = self._classify_question(normalized_question)
+        yield "metadata", {"category": category.value}
+
+        monitor = quality_controller.create_stream_monitor("qa", context={"question": question})
+        kb_response = self._check_knowledge_base(normalized_question)
+
+        kb_hit = kb_response is not None and kb_response["confidence"] > 0.8
+        cacheable = self._is_cacheable(user_context, conversation_history)
+        cached = await quality_controller.get_cached_response(question) if cacheable and not kb_hit else None
+        generated = False
+
+        if kb_hit:
+            response = self._create_response_from_kb(kb_response, category)
+            time_to_first_token = time.time() - start_time
+            monitor.feed(response.answer)
+            yield "token", {"text": response.answer}
+        elif cached:
+            response = self._build_ai_response(cached["response"], question, category)
+            time_to_first_token = time.time() - start_time
+            monitor.feed(response.answer)
+            yield "token", {"text": response.answer}
+        else:
+            prompt = self._build_qa_prompt(question, user_context, conversation_history)
+            stream = self.model_manager.stream_text(prompt, max_new_tokens=300, temperature=0.3)
+            try:
+                async for chunk in stream:
+                    if not monitor.text:
+                        chunk = chunk.lstrip()
+
+                    # Checked before sending, so flagged text never reaches the client
+                    warnings = monitor.feed(chunk)
+                    if warnings:
+                        yield "quality", {"warnings": warnings}
+
+                    text = monitor.release()
+                    if text:
+                        if time_to_first_token is None:
+                            time_to_first_token = time.time() - start_time
+                        yield "token", {"text": text}
+
+                    if monitor.should_stop:
+                        break
+
+            except Exception as e:
+                ai_logger.error("Streaming AI response failed", error=str(e))
+            finally:
+                # Abandons this request's generation; a shared batch stops once all its callers are gone
+                await stream.aclose()
+
+            text = monitor.release(final=True)
+            if text:
+                if time_to_first_token is None:
+                    time_to_first_token = time.time() - start_time
+                yield "token", {"text": text}
+
+            if monitor.text.strip():
+                response = self._build_ai_response(monitor.text, question, category)
+                generated = not monitor.should_stop
+            else:
+                response = self._create_fallback_response(question)
+
+        response = self._complete_response(response, category, user_context)
+
+        # The final verdict is the same full validation the buffered path would get
+        metrics = await monitor.finalize(response.answer, response.confidence, time.time() - start_time)
+        if cacheable and generated:
+            await quality_controller.cache_response(question, response.answer, metrics)
+        response.answer, usable = await quality_controller.filter_response(response.answer, metrics)
+
+        ai_logger.info("Tax question streamed",
+                       category=category.value,
+                       confidence=response.confidence,
+                       time_to_first_token=time_to_first_token,
+                       quality=metrics.overall_quality.value)
+
+        yield "final", {
+            "response": response,
+            "quality": metrics,
+            "fallback_used": not usable,
+            "time_to_first_token": time_to_first_token
+        }
+
+    def _is_cacheable(
+        self,
+        user_context: Optional[ParsedTaxInfo],
+        conversation_history: Optional[List[Dict[str, str]]]
+    ) -> bool:
+        """Only answers that do not depend on the user's context are shared through the cache."""
+        return user_context is None and not conversation_history
+
+    def _complete_response(
+        self,
+        response: QAResponse,
+        category: QuestionCategory,
+        user_context: Optional[ParsedTaxInfo]
+    ) -> QAResponse:
+        """Add personalization, related questions, follow-ups and the disclaimer."""
+        # Add personalization based on user context
+        if user_context:
+            response = self._personalize_response(response, user_context)
+
+        # Add related questions and follow-ups
+        response.related_questions = self._get_related_questions(category)
+        response.follow_up_suggestions = self._get_follow_up_suggestions(response, user_context)
+
+        # Add disclaimer
+        response.disclaimer = self._get_disclaimer()
+
+        return response
+
     def _normalize_question(self, question: str) -> str:
         """Normalize and clean the question."""
         # Convert to lowercase
@@ -201,15 +348,39 @@ class TaxQAService:
 
     def _classify_question(self, question: str) -> QuestionCategory:
         """Classify the question into a category."""
-        for category, patterns in self.classification_patterns.items():
-            for pattern in patterns:
-                if re.search(pattern, question, re.IGNORECASE):
-                    return category
+        for category, classifier in self.compiled_classifiers:
+            if classifier.search(question):
+                return category
 
         return QuestionCategory.GENERAL
 
+    def load_knowledge_index(self) -> Optional[KnowledgeBaseIndex]:
+        """Load the current knowledge-base index version, if one has been built."""
+        try:
+            return KnowledgeBaseIndex.load(settings.kb_index_path)
+        except Exception as e:
+            ai_logger.error("Failed to load knowledge base index", path=settings.kb_index_path, error=str(e))
+            return None
+
+    def export_knowledge_base(self) -> List[Dict[str, Any]]:
+        """Built-in knowledge base as index entries."""
+        return [
+            {
+                "question": question,
+                "answer": data["answer"],
+                "category": data["category"].value,
+                "confidence": data["confidence"],
+                "sources": data.get("sources", []),
+                "tax_code": data.get("tax_code", [])
+            }
+            for question, data in self.knowledge_base.items()
+        ]
+
     def _check_knowledge_base(self, question: str) -> Optional[Dict[str, Any]]:
         """Check if question matches knowledge base."""
+        if self.kb_index is not None:
+            return self.kb_index.lookup(question)
+
         for kb_question, kb_data in self.knowledge_base.items():
             # Simple keyword matching - in production, use semantic similarity
             if self._calculate_similarity(question, kb_question) > 0.7:
@@ -252,10 +423,35 @@ class TaxQAService:
     ) -> QAResponse:
         """Generate AI response for tax question."""
         try:
-            # Build context
-            context_info = ""
-            if user_context:
-                context_info = f"""
+            prompt = self._build_qa_prompt(question, user_context, conversation_history)
+
+            # Generate response
+            ai_response = await self.model_manager.generate_text(
+                prompt,
+                max_new_tokens=300,
+                temperature=0.3
+            )
+
+            if not ai_response:
+                raise Exception("AI model returned empty response")
+
+            return self._build_ai_response(ai_response, question, category)
+
+        except Exception as e:
+            ai_logger.error("AI response generation failed", error=str(e))
+            return self._create_fallback_response(question)
+
+    def _build_qa_prompt(
+        self,
+        question: str,
+        user_context: Optional[ParsedTaxInfo],
+        conversation_history: Optional[List[Dict[str, str]]]
+    ) -> str:
+        """Build the tax Q&A prompt."""
+        # Build context
+        context_info = ""
+        if user_context:
+            context_info = f"""
 User context:
 - Income: ${user_context.income:,.0f} if user_context.income else 'Not provided'
 - Filing Status: {user_context.filing_status.value if user_context.filing_status else 'Not provided'}
@@ -263,16 +459,16 @@ User context:
 - State: {user_context.state or 'Not provided'}
 """
 
-            # Build conversation context
-            conversation_context = ""
-            if conversation_history and len(conversation_history) > 0:
-                recent_history = conversation_history[-3:]  # Last 3 exchanges
-                conversation_context = "\nRecent conversation:\n"
-                for exchange in recent_history:
-                    conversation_context += f"Q: {exchange.get('question', '')}\nA: {exchange.get('answer', '')}\n"
+        # Build conversation context
+        conversation_context = ""
+        if conversation_history and len(conversation_history) > 0:
+            recent_history = conversation_history[-3:]  # Last 3 exchanges
+            conversation_context = "\nRecent conversation:\n"
+            for exchange in recent_history:
+                conversation_context += f"Q: {exchange.get('question', '')}\nA: {exchange.get('answer', '')}\n"
 
-            # Create prompt
-            prompt = f"""
+        # Create prompt
+        return f"""
 You are a tax expert assistant. Answer this tax question accurately and helpfully:
 
 Question: {question}
@@ -289,37 +485,25 @@ Provide a clear, accurate answer that:
 
 Answer:"""
 
-            # Generate response
-            ai_response = await self.model_manager.generate_text(
-                prompt,
-                max_new_tokens=300,
-                temperature=0.3
-            )
-
-            if not ai_response:
-                raise Exception("AI model returned empty response")
+    def _build_ai_response(self, ai_response: str, question: str, category: QuestionCategory) -> QAResponse:
+        """Turn raw generated text into a QAResponse."""
+        # Parse and validate response
+        answer = self._clean_ai_response(ai_response)
+        confidence = self._calculate_ai_confidence(answer, question)
 
-            # Parse and validate response
-            answer = self._clean_ai_response(ai_response)
-            confidence = self._calculate_ai_confidence(answer, question)
-
-            # Extract tax code references
-            tax_codes = self._extract_tax_code_references(answer)
-
-            return QAResponse(
-                answer=answer,
-                confidence=confidence,
-                category=category,
-                sources=["AI Assistant"],
-                related_questions=[],
-                tax_code_references=tax_codes,
-                disclaimer="",
-                follow_up_suggestions=[]
-            )
+        # Extract tax code references
+        tax_codes = self._extract_tax_code_references(answer)
 
-        except Exception as e:
-            ai_logger.error("AI response generation failed", error=str(e))
-            return self._create_fallback_response(question)
+        return QAResponse(
+            answer=answer,
+            confidence=confidence,
+            category=category,
+            sources=["AI Assistant"],
+            related_questions=[],
+            tax_code_references=tax_codes,
+            disclaimer="",
+            follow_up_suggestions=[]
+        )
 
     def _clean_ai_response(self, response: str) -> str:
         """Clean and improve AI response."""
@@ -0,0 +1,238 @@
+import re
+from typing import Dict, Any, Optional, Tuple
+
+
+STATE_CODES = {
+    'california': 'CA', 'texas': 'TX', 'florida': 'FL', 'new york': 'NY',
+    'pennsylvania': 'PA', 'illinois': 'IL', 'ohio': 'OH', 'georgia': 'GA',
+    'north carolina': 'NC', 'michigan': 'MI', 'new jersey': 'NJ',
+    'virginia': 'VA', 'washington': 'WA', 'arizona': 'AZ', 'massachusetts': 'MA',
+    'tennessee': 'TN', 'indiana': 'IN', 'missouri': 'MO', 'maryland': 'MD',
+    'wisconsin': 'WI', 'colorado': 'CO', 'minnesota': 'MN', 'south carolina': 'SC',
+    'alabama': 'AL', 'louisiana': 'LA', 'kentucky': 'KY', 'oregon': 'OR',
+    'oklahoma': 'OK', 'connecticut': 'CT', 'utah': 'UT', 'iowa': 'IA',
+    'nevada': 'NV', 'arkansas': 'AR', 'mississippi': 'MS', 'kansas': 'KS',
+    'new mexico': 'NM', 'nebraska': 'NE', 'west virginia': 'WV',
+    'idaho': 'ID', 'hawaii': 'HI', 'new hampshire': 'NH', 'maine': 'ME',
+    'montana': 'MT', 'rhode island': 'RI', 'delaware': 'DE',
+    'south dakota': 'SD', 'north dakota': 'ND', 'alaska': 'AK',
+    'vermont': 'VT', 'wyoming': 'WY'
+}
+
+COUNTRY_CODES = {
+    'canada': 'CA', 'canadian': 'CA', 'uk': 'GB', 'britain': 'GB',
+    'united kingdom': 'GB', 'australia': 'AU'
+}
+
+NUMBER_WORDS = {
+    'one': 1, 'two': 2, 'three': 3, 'four': 4, 'five': 5,
+    'six': 6, 'seven': 7, 'eight': 8, 'nine': 9, 'ten': 10
+}
+
+# Filing status phrases, most specific first so "married filing separately"
+# is not read as "married" and "single mother" is not read as "single"
+FILING_STATUS_PHRASES = [
+    ('married_filing_separately', r'married filing separately|married but filing separately|filing separately'),
+    ('head_of_household', r'head of household|hoh|single parent|single mother|single father'),
+    ('married_filing_jointly', r'married filing jointly|filing jointly|we are married|married couple|married'),
+    ('single', r'not married|unmarried|filing single|single'),
+]
+
+FILING_STATUS_VALUES = {
+    'single': 'single',
+    'married_filing_jointly': 'marriedFilingJointly',
+    'married_filing_separately': 'marriedFilingSeparately',
+    'head_of_household': 'headOfHousehold'
+}
+
+# Cues that say what the next amount in the clause is; nouns also label the
+# amount right before them ("80,000 salary", "$3,000 to charity")
+AMOUNT_CUES = [
+    ('retirement', r'\b401\s?\(?k\)?|\b403\s?\(?b\)?|\b(?:roth ira|ira|retirement|pension)\b'),
+    ('mortgage_interest', r'\b(?:mortgage|home loan)(?: interest)?\b'),
+    ('student_loan_interest', r'\bstudent loans?(?: interest)?\b'),
+    ('medical_expenses', r'\b(?:medical|health ?care|health)(?: expenses?| costs?| bills?)?\b'),
+    ('charitable_donations', r'\b(?:charit(?:y|able)(?: donations?| contributions?)?|donat(?:e|ed|ing|ions?))\b'),
+    ('state_taxes', r'\b(?:state (?:income )?tax(?:es)?|property tax(?:es)?)\b'),
+    ('income', r'\b(?:income|salary|salaries|wages?|per year|a year|annually|yearly|per annum)\b'),
+    ('income_verb', r'\b(?:make|makes|making|made|earn|earns|earning|earned|brings? in|take home)\b'),
+]
+
+CUE_CATEGORIES = {
+    'income_verb': 'income'
+}
+
+DEDUCTION_TYPES = {
+    'mortgage_interest', 'charitable_donations', 'medical_expenses',
+    'student_loan_interest', 'state_taxes'
+}
+
+TRAILING_CUES = {name for name, _ in AMOUNT_CUES} - {'income_verb'}
+
+AMOUNT_LIMITS = {
+    'income': (1000, 10000000),
+    'spouse_income': (1000, 10000000),
+    'retirement': (0, 100000),
+    'deduction': (0, 1000000)
+}
+
+
+def _alternation(words) -> str:
+    """Word alternation with longer phrases first so they win at the same position."""
+    return '|'.join(re.escape(word) for word in sorted(words, key=len, reverse=True))
+
+
+# Count in a dependents mention, whether it comes before or after the noun
+DEPENDENTS_COUNT = re.compile(rf'\d+|\b(?:{_alternation(NUMBER_WORDS)})\b', re.IGNORECASE)
+
+
+def _build_pattern() -> re.Pattern:
+    count_words = _alternation(NUMBER_WORDS)
+    # Two-letter codes only count when they are real codes written in capitals ("in TX", "NY resident"),
+    # so words like "in" or "or" are never taken for one
+    state_codes = rf'(?-i:{_alternation(STATE_CODES.values())})'
+    dependents_nouns = r'kids?|children|child|dependents?|sons?|daughters?'
+
+    # One named group per alternative; at any position the first listed alternative wins
+    alternatives = [
+        ('boundary', r'[.;!?](?=\s|$)'),
+        ('dependents', rf'\b(?:\d{{1,2}}|{count_words})\s+(?:{dependents_nouns})\b'),
+        ('dependents_after', rf'\b(?:kids|children|dependents)\s*:\s*(?:\d{{1,2}}|{count_words})\b'),
+        *[(name, rf'\b(?:{phrases})\b') for name, phrases in FILING_STATUS_PHRASES],
+        *AMOUNT_CUES,
+        ('spouse', r'\b(?:spouse|husband|wife|partner)\b'),
+        ('self', r"\b(?:i|i'm|im|we|we're)\b"),
+        ('country', rf'\b(?:{_alternation(COUNTRY_CODES)})\b'),
+        ('state', rf'\b(?:{_alternation(STATE_CODES)})\b'),
+        ('state_code', rf'(?:(?<=\bin )|(?<=\bfrom )|(?<=\bof ))(?:{state_codes})\b'),
+        ('state_code_resident', rf'\b(?:{state_codes})(?=\s+(?:state|resident)\b)'),
+        ('amount', r'\$?\b(?:\d{1,3}(?:,\d{3})+|\d+)(?:\.\d+)?(?:\s*(?:thousand|million)\b)?'),
+    ]
+
+    return re.compile('|'.join(f'(?P<{name}>{pattern})' for name, pattern in alternatives), re.IGNORECASE)
+
+
+class CompiledTaxExtractor:
+    """
+    Single-pass extractor for tax facts in a user utterance.
+
+    One precompiled alternation with a named group per fact or cue is scanned
+    left to right; amounts are then labelled by the cue before them in the
+    same clause (or a noun cue right after them), and income is attributed to
+    the spouse when the spouse is the clause's current subject.
+    """
+
+    def __init__(self):
+        self.pattern = _build_pattern()
+
+    def extract(self, text: str) -> Dict[str, Any]:
+        """Extract ParsedTaxInfo fields; filing_status is returned as its string value."""
+        fields: Dict[str, Any] = {
+            "income": None,
+            "filing_status": None,
+            "dependents": 0,
+            "state": None,
+            "country": "US",
+            "spouse_income": None,
+            "deductions": [],
+            "retirement_contributions": None
+        }
+
+        matches = list(self.pattern.finditer(text))
+        mentions_spouse = False
+        pending: Optional[str] = None
+        subject = "self"
+        consumed = set()
+
+        for i, match in enumerate(matches):
+            kind = match.lastgroup
+            value = match.group(kind)
+
+            if kind == "boundary":
+                pending, subject = None, "self"
+
+            elif kind in ("self", "spouse"):
+                subject = kind
+                mentions_spouse = mentions_spouse or kind == "spouse"
+
+            elif kind == "amount":
+                category, pending = pending, None
+                trailing = matches[i + 1].lastgroup if i + 1 < len(matches) else None
+                # A trailing noun labels this amount ("80,000 salary") or just repeats its label ("earn 80,000 a year")
+                if trailing in TRAILING_CUES and category in (None, trailing):
+                    category = trailing
+                    consumed.add(i + 1)
+                if category:
+                    self._assign_amount(fields, category, self._parse_amount(value), subject)
+
+            elif kind in CUE_CATEGORIES or kind in TRAILING_CUES:
+                if i not in consumed:
+                    pending = CUE_CATEGORIES.get(kind, kind)
+
+            elif kind in FILING_STATUS_VALUES:
+                if fields["filing_status"] is None:
+                    fields["filing_status"] = FILING_STATUS_VALUES[kind]
+
+            elif kind in ("dependents", "dependents_after"):
+                if not fields["dependents"]:
+                    fields["dependents"] = self._parse_dependents(value)
+
+            elif kind == "state":
+                fields["state"] = fields["state"] or STATE_CODES[value.lower()]
+
+            elif kind in ("state_code", "state_code_resident"):
+                fields["state"] = fields["state"] or value
+
+            elif kind == "country":
+                if fields["country"] == "US":
+                    fields["country"] = COUNTRY_CODES[value.lower()]
+
+        # A spouse mentioned without an explicit status implies a joint return
+        if fields["filing_status"] is None and mentions_spouse:
+            fields["filing_status"] = FILING_STATUS_VALUES["married_filing_jointly"]
+
+        return fields
+
+    @staticmethod
+    def _parse_amount(text: str) -> Optional[float]:
+        match = re.match(r'\$?([\d,]+(?:\.\d+)?)\s*(thousand|million)?', text, re.IGNORECASE)
+        try:
+            amount = float(match.group(1).replace(',', ''))
+        except (AttributeError, ValueError):
+            return None
+
+        scale = (match.group(2) or '').lower()
+        if scale == 'thousand':
+            amount *= 1000
+        elif scale == 'million':
+            amount *= 1000000
+        return amount
+
+    @staticmethod
+    def _parse_dependents(text: str) -> int:
+        number = DEPENDENTS_COUNT.search(text).group().lower()
+        count = int(number) if number.isdigit() else NUMBER_WORDS[number]
+        return count if 0 <= count <= 20 else 0
+
+    @staticmethod
+    def _in_range(amount: Optional[float], limits: Tuple[float, float]) -> bool:
+        low, high = limits
+        return amount is not None and amount > 0 and low <= amount <= high
+
+    def _assign_amount(self, fields: Dict[str, Any], category: str, amount: Optional[float], subject: str) -> None:
+        """Store an amount under its category; the first plausible amount wins for scalar fields."""
+        if category == "income":
+            field = "spouse_income" if subject == "spouse" else "income"
+            if fields[field] is None and self._in_range(amount, AMOUNT_LIMITS[field]):
+                fields[field] = amount
+
+        elif category == "retirement":
+            if fields["retirement_contributions"] is None and self._in_range(amount, AMOUNT_LIMITS["retirement"]):
+                fields["retirement_contributions"] = amount
+
+        elif category in DEDUCTION_TYPES and self._in_range(amount, AMOUNT_LIMITS["deduction"]):
+            fields["deductions"].append({
+                "type": category,
+                "amount": amount,
+                "description": category.replace("_", " ").title()
+            })
@@ -0,0 +1,198 @@
+from functools import lru_cache
+from typing import Dict, Any, Optional
+
+import numpy as np
+
+
+# Filing status values in table order; unknown statuses use the single schedule
+FILING_STATUSES = ("single", "marriedFilingJointly", "marriedFilingSeparately", "headOfHousehold")
+STATUS_INDEX = {status: index for index, status in enumerate(FILING_STATUSES)}
+
+# US federal figures by tax year (2024: IRS Rev. Proc. 2023-34). Brackets
+# match ml-platform/models/data/tax_rules/<year>/usa.json and are listed as
+# (upper bound, rate) with None for the top bracket.
+US_TAX_RULES: Dict[int, Dict[str, Any]] = {
+    2024: {
+        "brackets": {
+            "single": [
+                (11600, 0.10), (47150, 0.12), (100525, 0.22), (191950, 0.24),
+                (243725, 0.32), (609350, 0.35), (None, 0.37)
+            ],
+            "marriedFilingJointly": [
+                (23200, 0.10), (94300, 0.12), (201050, 0.22), (383900, 0.24),
+                (487450, 0.32), (731200, 0.35), (None, 0.37)
+            ],
+            "marriedFilingSeparately": [
+                (11600, 0.10), (47150, 0.12), (100525, 0.22), (191950, 0.24),
+                (243725, 0.32), (365600, 0.35), (None, 0.37)
+            ],
+            "headOfHousehold": [
+                (16550, 0.10), (63100, 0.12), (100500, 0.22), (191950, 0.24),
+                (243700, 0.32), (609350, 0.35), (None, 0.37)
+            ]
+        },
+        "standard_deduction": {
+            "single": 14600,
+            "marriedFilingJointly": 29200,
+            "marriedFilingSeparately": 14600,
+            "headOfHousehold": 21900
+        },
+        "child_tax_credit": {
+            "per_child": 2000,
+            "phaseout_step": 1000,  # credit drops by the reduction for each step (or part of one) over the start
+            "phaseout_reduction": 50,
+            "phaseout_start": {
+                "single": 200000,
+                "marriedFilingJointly": 400000,
+                "marriedFilingSeparately": 200000,
+                "headOfHousehold": 200000
+            }
+        },
+        "eitc": {
+            # Indexed by qualifying children: 0, 1, 2, 3 or more
+            "max_credit": [632, 4213, 6960, 7830],
+            "max_income": {
+                "single": [18591, 49084, 55768, 59899],
+                "marriedFilingJointly": [25511, 56004, 62688, 66819],
+                "marriedFilingSeparately": [18591, 49084, 55768, 59899],  # separated spouses may claim it
+                "headOfHousehold": [18591, 49084, 55768, 59899]
+            }
+        },
+        "roth_ira_phaseout": {
+            "single": (146000, 161000),
+            "marriedFilingJointly": (230000, 240000),
+            "marriedFilingSeparately": (0, 10000),
+            "headOfHousehold": (146000, 161000)
+        },
+        "limits": {
+            "401k_contribution_limit": 23000,
+            "401k_catchup_limit": 7500,  # Additional for 50+
+            "ira_contribution_limit": 7000,
+            "ira_catchup_limit": 1000,  # Additional for 50+
+            "hsa_individual_limit": 4150,
+            "hsa_family_limit": 8300,
+            "hsa_catchup_limit": 1000,  # Additional for 55+
+            "dependent_care_fsa_limit": 5000,
+            "charitable_deduction_limit_agi_percentage": 60,
+            "student_loan_interest_deduction_max": 2500,
+            "state_local_tax_deduction_cap": 10000,
+            "mortgage_interest_debt_limit": 750000
+        }
+    }
+}
+
+
+def status_index(filing_status: Any) -> np.ndarray:
+    """Table row for a filing status (enum, value or None) or a sequence of them."""
+    if isinstance(filing_status, np.ndarray) and filing_status.dtype.kind in "iu":
+        return filing_status
+
+    if filing_status is None or isinstance(filing_status, str) or not hasattr(filing_status, "__iter__"):
+        return np.asarray(STATUS_INDEX.get(getattr(filing_status, "value", filing_status), 0))
+
+    return np.fromiter(
+        (STATUS_INDEX.get(getattr(status, "value", status), 0) for status in filing_status),
+        dtype=np.intp
+    )
+
+
+class TaxTables:
+    """
+    One year's federal figures as arrays indexed by filing status.
+
+    Every lookup takes scalars or equal-length arrays of income, filing
+    status (see ``status_index``) and dependents, so a batch of profiles is
+    evaluated in one NumPy pass.
+    """
+
+    def __init__(self, year: int, rules: Dict[str, Any]):
+        self.year = year
+        self.limits = dict(rules["limits"])
+
+        brackets = [rules["brackets"][status] for status in FILING_STATUSES]
+        self.bracket_bounds = np.array([[bound for bound, _ in rows[:-1]] for rows in brackets], dtype=np.float64)
+        self.bracket_rates = np.array([[rate for _, rate in rows] for rows in brackets], dtype=np.float64)
+
+        # Tax owed at the lower bound of each bracket
+        lower = np.concatenate([np.zeros((len(FILING_STATUSES), 1)), self.bracket_bounds], axis=1)
+        self.bracket_lower = lower
+        self.bracket_base_tax = np.concatenate([
+            np.zeros((len(FILING_STATUSES), 1)),
+            np.cumsum(np.diff(lower, axis=1) * self.bracket_rates[:, :-1], axis=1)
+        ], axis=1)
+
+        self.standard_deductions = self._by_status(rules["standard_deduction"])
+
+        ctc = rules["child_tax_credit"]
+        self.ctc_per_child = ctc["per_child"]
+        self.ctc_phaseout_step = ctc["phaseout_step"]
+        self.ctc_phaseout_reduction = ctc["phaseout_reduction"]
+        self.ctc_phaseout_start = self._by_status(ctc["phaseout_start"])
+
+        self.eitc_max_credit = np.array(rules["eitc"]["max_credit"], dtype=np.float64)
+        self.eitc_max_income = self._by_status(rules["eitc"]["max_income"])
+        self.roth_phaseout = self._by_status(rules["roth_ira_phaseout"])
+
+    @staticmethod
+    def _by_status(values: Dict[str, Any]) -> np.ndarray:
+        return np.array([values[status] for status in FILING_STATUSES], dtype=np.float64)
+
+    def bracket_index(self, income, filing_status) -> np.ndarray:
+        """Bracket each income falls in; an income equal to a bound stays in the lower bracket."""
+        income = np.asarray(income, dtype=np.float64)
+        bounds = self.bracket_bounds[status_index(filing_status)]
+        return np.sum(income[..., None] > bounds, axis=-1)
+
+    def marginal_rate(self, income, filing_status) -> np.ndarray:
+        rows = status_index(filing_status)
+        return self.bracket_rates[rows, self.bracket_index(income, rows)]
+
+    def income_tax(self, taxable_income, filing_status) -> np.ndarray:
+        """Federal income tax from the cumulative bracket table."""
+        taxable_income = np.maximum(np.asarray(taxable_income, dtype=np.float64), 0.0)
+        rows = status_index(filing_status)
+        brackets = self.bracket_index(taxable_income, rows)
+        return (self.bracket_base_tax[rows, brackets]
+                + (taxable_income - self.bracket_lower[rows, brackets]) * self.bracket_rates[rows, brackets])
+
+    def standard_deduction(self, filing_status) -> np.ndarray:
+        return self.standard_deductions[status_index(filing_status)]
+
+    def child_tax_credit(self, income, filing_status, dependents) -> np.ndarray:
+        income = np.asarray(income, dtype=np.float64)
+        excess = np.maximum(income - self.ctc_phaseout_start[status_index(filing_status)], 0.0)
+        reduction = np.ceil(excess / self.ctc_phaseout_step) * self.ctc_phaseout_reduction
+        return np.maximum(np.asarray(dependents) * self.ctc_per_child - reduction, 0.0)
+
+    def max_eitc(self, dependents) -> np.ndarray:
+        return self.eitc_max_credit[np.clip(dependents, 0, len(self.eitc_max_credit) - 1)]
+
+    def eitc_eligible(self, income, filing_status, dependents) -> np.ndarray:
+        children = np.clip(dependents, 0, self.eitc_max_income.shape[1] - 1)
+        income = np.asarray(income, dtype=np.float64)
+        return (income > 0) & (income <= self.eitc_max_income[status_index(filing_status), children])
+
+    def roth_ira_eligible(self, income, filing_status) -> np.ndarray:
+        """Whether any Roth contribution is allowed (income below the end of the phase-out)."""
+        return np.asarray(income, dtype=np.float64) < self.roth_phaseout[status_index(filing_status), 1]
+
+    def evaluate(self, income, filing_status, dependents) -> Dict[str, np.ndarray]:
+        """Every per-profile figure the optimization rules use, for a batch of profiles."""
+        rows = status_index(filing_status)
+        return {
+            "marginal_rate": self.marginal_rate(income, rows),
+            "standard_deduction": self.standard_deduction(rows),
+            "child_tax_credit": self.child_tax_credit(income, rows, dependents),
+            "eitc_eligible": self.eitc_eligible(income, rows, dependents),
+            "max_eitc": self.max_eitc(dependents),
+            "roth_ira_eligible": self.roth_ira_eligible(income, rows)
+        }
+
+
+@lru_cache(maxsize=None)
+def get_tax_tables(year: Optional[int] = None) -> TaxTables:
+    """Tables for a tax year (the latest available by default)."""
+    year = year or max(US_TAX_RULES)
+    if year not in US_TAX_RULES:
+        raise ValueError(f"No tax tables for {year}; available years: {sorted(US_TAX_RULES)}")
+    return TaxTables(year, US_TAX_RULES[year])
@@ -1,7 +1,7 @@
 import asyncio
 import tempfile
 import os
-from typing import Optional, Dict, Any, BinaryIO
+from typing import Optional, Dict, Any, BinaryIO, Iterator, Tuple
 from pathlib import Path
 import speech_recognition as sr
 import whisper
@@ -14,6 +14,7 @@ import numpy as np
 
 from src.config import settings
 from src.core import voice_logger
+from src.services.voice_streaming import StreamingTranscriptionSession
 
 
 class VoiceProcessingService:
@@ -69,26 +70,17 @@ class VoiceProcessingService:
                 temp_path = temp_file.name
 
             try:
-                # Load and preprocess audio
-                audio_data = await self._preprocess_audio(temp_path)
-
-                # Check duration
-                duration = len(audio_data) / 16000  # Assuming 16kHz sample rate
-                if duration > settings.max_audio_duration:
-                    raise ValueError(f"Audio too long: {duration:.1f}s (max: {settings.max_audio_duration}s)")
-
-                # Transcribe with Whisper
-                result = await self._transcribe_with_whisper(audio_data, language)
-
-                # Add confidence scoring
-                result["confidence_score"] = self._calculate_transcription_confidence(result)
-
-                # Validate and clean text
-                result["cleaned_text"] = self._clean_transcription(result["text"])
+                # Stream the file through a transcription session block by block
+                sample_rate, blocks = self._open_audio_blocks(temp_path)
+                session = self.create_transcription_session(sample_rate, language, high_pass=True, partials=False)
+                for block in blocks:
+                    await session.feed(block)
+                await session.finish()
+                result = session.result()
 
                 voice_logger.info("Audio transcription completed",
                                 filename=filename,
-                                duration=duration,
+                                duration=result["duration"],
                                 confidence=result["confidence_score"],
                                 text_length=len(result["text"]))
 
@@ -120,28 +112,19 @@ class VoiceProcessingService:
         try:
             voice_logger.info("Starting real-time transcription", chunks=len(audio_chunks))
 
-            # Combine audio chunks
-            combined_audio = np.concatenate(audio_chunks)
-
-            # Apply voice activity detection
-            if self._has_speech(combined_audio, sample_rate):
-                # Transcribe with Whisper
-                result = await self._transcribe_with_whisper(combined_audio, language)
-                result["confidence_score"] = self._calculate_transcription_confidence(result)
-                result["cleaned_text"] = self._clean_transcription(result["text"])
+            session = self.create_transcription_session(sample_rate, language, partials=False)
+            for chunk in audio_chunks:
+                await session.feed(chunk)
+            await session.finish()
+            result = session.result()
 
+            if result.get("no_speech_detected"):
+                voice_logger.info("No speech detected in audio")
+            else:
                 voice_logger.info("Real-time transcription completed",
                                 confidence=result["confidence_score"],
                                 text_length=len(result["text"]))
-                return result
-            else:
-                voice_logger.info("No speech detected in audio")
-                return {
-                    "text": "",
-                    "confidence_score": 0.0,
-                    "language": language,
-                    "no_speech_detected": True
-                }
+            return result
 
         except Exception as e:
             voice_logger.error("Real-time transcription failed", error=str(e))
@@ -152,45 +135,41 @@ class VoiceProcessingService:
                 "language": language
             }
 
-    async def _preprocess_audio(self, audio_path: str) -> np.ndarray:
-        """Preprocess audio file for better transcription."""
-        try:
-            # Load audio with librosa
-            audio, sr = librosa.load(audio_path, sr=16000, mono=True)
-
-            # Apply noise reduction and normalization
-            audio = self._reduce_noise(audio)
-            audio = self._normalize_audio(audio)
-
-            # Apply voice activity detection and trim silence
-            audio = self._trim_silence(audio, sr)
-
-            return audio
-
-        except Exception as e:
-            voice_logger.error("Audio preprocessing failed", error=str(e))
-            raise
-
-    def _reduce_noise(self, audio: np.ndarray) -> np.ndarray:
-        """Apply basic noise reduction."""
+    def create_transcription_session(
+        self,
+        sample_rate: int = 16000,
+        language: str = "en",
+        high_pass: bool = False,
+        partials: bool = True
+    ) -> StreamingTranscriptionSession:
+        """
+        Start an incremental transcription session for a stream of audio chunks.
+
+        Partial hypotheses re-transcribe the open segment as it grows; they only
+        help live listeners, so complete inputs should pass partials=False.
+        """
+        return StreamingTranscriptionSession(
+            self, sample_rate=sample_rate, language=language, high_pass=high_pass, partials=partials
+        )
+
+    def _open_audio_blocks(self, audio_path: str, block_seconds: float = 1.0) -> Tuple[int, Iterator[np.ndarray]]:
+        """Sample rate and mono float32 blocks of an audio file, read without decoding it all up front."""
         try:
-            # Simple spectral subtraction for noise reduction
-            # This is a basic implementation - in production, you might want more sophisticated methods
-
-            # Calculate noise profile from first 0.5 seconds
-            noise_sample_length = min(len(audio), 8000)  # 0.5 seconds at 16kHz
-            noise_profile = np.mean(np.abs(np.fft.fft(audio[:noise_sample_length])))
-
-            # Apply high-pass filter to reduce low-frequency noise
-            from scipy.signal import butter, filtfilt
-            b, a = butter(4, 300, btype='high', fs=16000)
-            audio = filtfilt(b, a, audio)
-
-            return audio
-
-        except Exception:
-            # If noise reduction fails, return original audio
-            return audio
+            sound_file = sf.SoundFile(audio_path)
+        except RuntimeError:
+            # Formats libsndfile cannot read (e.g. m4a) are decoded whole by librosa
+            audio, sample_rate = librosa.load(audio_path, sr=None, mono=True)
+            block_size = int(sample_rate * block_seconds)
+            return sample_rate, (audio[i:i + block_size] for i in range(0, len(audio), block_size))
+
+        def blocks():
+            with sound_file:
+                for block in sound_file.blocks(
+                    blocksize=int(sound_file.samplerate * block_seconds), dtype='float32', always_2d=True
+                ):
+                    yield block.mean(axis=1)
+
+        return sound_file.samplerate, blocks()
 
     def _normalize_audio(self, audio: np.ndarray) -> np.ndarray:
         """Normalize audio levels."""
@@ -201,64 +180,12 @@ class VoiceProcessingService:
 
         return audio
 
-    def _trim_silence(self, audio: np.ndarray, sample_rate: int) -> np.ndarray:
-        """Trim silence from beginning and end of audio."""
-        try:
-            # Use librosa to trim silence
-            audio_trimmed, _ = librosa.effects.trim(
-                audio,
-                top_db=20,  # Consider anything below -20dB as silence
-                frame_length=2048,
-                hop_length=512
-            )
-
-            # Ensure we don't trim too much
-            if len(audio_trimmed) < len(audio) * 0.1:  # If trimmed to less than 10%, use original
-                return audio
-
-            return audio_trimmed
-
-        except Exception:
-            return audio
-
-    def _has_speech(self, audio: np.ndarray, sample_rate: int) -> bool:
-        """Detect if audio contains speech using VAD."""
-        try:
-            # Convert to 16-bit PCM
-            audio_int16 = (audio * 32767).astype(np.int16)
-
-            # VAD requires specific sample rates (8000, 16000, 32000, 48000)
-            if sample_rate not in [8000, 16000, 32000, 48000]:
-                # Resample to 16000 Hz
-                audio_resampled = librosa.resample(audio, orig_sr=sample_rate, target_sr=16000)
-                audio_int16 = (audio_resampled * 32767).astype(np.int16)
-                sample_rate = 16000
-
-            # Split audio into frames (10ms each)
-            frame_duration = 0.01  # 10ms
-            frame_size = int(sample_rate * frame_duration)
-
-            speech_frames = 0
-            total_frames = 0
-
-            for i in range(0, len(audio_int16) - frame_size, frame_size):
-                frame = audio_int16[i:i + frame_size]
-                total_frames += 1
-
-                # VAD requires frames to be bytes
-                frame_bytes = frame.tobytes()
-                if self.vad.is_speech(frame_bytes, sample_rate):
-                    speech_frames += 1
-
-            # Consider speech if more than 30% of frames contain speech
-            speech_ratio = speech_frames / total_frames if total_frames > 0 else 0
-            return speech_ratio > 0.3
-
-        except Exception as e:
-            voice_logger.warning("VAD failed, assuming speech present", error=str(e))
-            return True  # Conservative fallback
-
-    async def _transcribe_with_whisper(self, audio: np.ndarray, language: str) -> Dict[str, Any]:
+    async def _transcribe_with_whisper(
+        self,
+        audio: np.ndarray,
+        language: str,
+        initial_prompt: Optional[str] = None
+    ) -> Dict[str, Any]:
         """Transcribe audio using Whisper model."""
         try:
             # Run Whisper transcription in thread pool to avoid blocking
@@ -269,6 +196,7 @@ class VoiceProcessingService:
                     audio,
                     language=language if language != "auto" else None,
                     task="transcribe",
+                    initial_prompt=initial_prompt,
                     fp16=False,  # Use fp32 for better compatibility
                     verbose=False
                 )
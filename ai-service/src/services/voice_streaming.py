@@ -0,0 +1,381 @@
+import re
+from collections import deque
+from typing import Dict, Any, List, Optional, Tuple, TYPE_CHECKING
+
+import numpy as np
+import webrtcvad
+from scipy.signal import butter, firwin, sosfilt, sosfilt_zi
+
+from src.config import settings
+from src.core import voice_logger
+
+if TYPE_CHECKING:
+    from src.services.voice_service import VoiceProcessingService
+
+
+WHISPER_SAMPLE_RATE = 16000
+
+
+class AudioRingBuffer:
+    """Fixed-size float32 ring addressed by absolute sample index."""
+
+    def __init__(self, capacity: int):
+        self.capacity = capacity
+        self.buffer = np.zeros(capacity, dtype=np.float32)
+        self.end = 0  # absolute index one past the newest sample
+
+    @property
+    def start(self) -> int:
+        """Absolute index of the oldest sample still held."""
+        return max(0, self.end - self.capacity)
+
+    def write(self, samples: np.ndarray) -> None:
+        count = len(samples)
+        kept = samples[-self.capacity:]
+        position = (self.end + count - len(kept)) % self.capacity
+
+        first = min(len(kept), self.capacity - position)
+        self.buffer[position:position + first] = kept[:first]
+        self.buffer[:len(kept) - first] = kept[first:]
+        self.end += count
+
+    def read(self, start: int, end: int) -> np.ndarray:
+        """Copy of samples [start, end), clipped to what the ring still holds."""
+        start, end = max(start, self.start), min(end, self.end)
+        if end <= start:
+            return np.zeros(0, dtype=np.float32)
+
+        begin = start % self.capacity
+        length = end - start
+        if begin + length <= self.capacity:
+            return self.buffer[begin:begin + length].copy()
+        return np.concatenate([self.buffer[begin:], self.buffer[:begin + length - self.capacity]])
+
+
+class StreamingResampler:
+    """
+    Polyphase resampler that carries its input history across chunks.
+
+    Uses the same anti-aliasing filter and alignment as scipy's
+    resample_poly, so feeding a stream chunk by chunk (then flushing) yields
+    the same samples as resampling it in one piece, with no edge artifacts
+    at chunk boundaries.
+    """
+
+    def __init__(self, input_rate: int, output_rate: int):
+        divisor = np.gcd(input_rate, output_rate)
+        self.up, self.down = output_rate // divisor, input_rate // divisor
+
+        factor = max(self.up, self.down)
+        self.half_len = 10 * factor
+        taps = firwin(2 * self.half_len + 1, 1 / factor, window=('kaiser', 5.0)) * self.up
+
+        # phases[p, k] weighs input sample (m // up) - k for upsampled position m with m % up == p
+        self.width = -(-len(taps) // self.up)
+        self.phases = np.zeros((self.up, self.width))
+        for k in range(self.width):
+            tap = taps[k * self.up:(k + 1) * self.up]
+            self.phases[:len(tap), k] = tap
+
+        self.history = np.zeros(0)
+        self.history_start = 0  # absolute index of history[0]
+        self.received = 0
+        self.produced = 0
+
+    def process(self, samples: np.ndarray) -> np.ndarray:
+        """Resample a chunk; returns every output sample its inputs are complete for."""
+        self.history = np.concatenate([self.history, np.asarray(samples, dtype=float)])
+        self.received += len(samples)
+
+        # Output n needs inputs up to (n * down + half_len) // up
+        available = ((self.received - 1) * self.up - self.half_len) // self.down + 1
+        return self._produce(max(available, self.produced))
+
+    def flush(self) -> np.ndarray:
+        """Remaining output at the end of the stream, reading zeros past the last input."""
+        total = -(-self.received * self.up // self.down)
+        return self._produce(total)
+
+    def _produce(self, stop: int) -> np.ndarray:
+        if stop <= self.produced or not len(self.history):
+            self.produced = max(stop, self.produced)
+            return np.zeros(0, dtype=np.float32)
+
+        positions = np.arange(self.produced, stop) * self.down + self.half_len
+        indices = (positions // self.up)[:, None] - np.arange(self.width)[None, :] - self.history_start
+
+        # Inputs before the stream start or past its end read as zeros
+        inside = (indices >= 0) & (indices < len(self.history))
+        window = np.where(inside, self.history[np.clip(indices, 0, len(self.history) - 1)], 0.0)
+        result = np.einsum('nk,nk->n', self.phases[positions % self.up], window).astype(np.float32)
+        self.produced = stop
+
+        # Keep only the inputs that later outputs still read
+        first_needed = (self.produced * self.down + self.half_len) // self.up - (self.width - 1)
+        drop = min(max(first_needed - self.history_start, 0), len(self.history))
+        self.history = self.history[drop:]
+        self.history_start += drop
+        return result
+
+
+class VADSegmenter:
+    """
+    Incremental speech segmentation with webrtcvad.
+
+    Each call classifies only the new 30 ms frames. A segment opens when most
+    frames in the padding window are voiced and closes when most are silent;
+    segments longer than the maximum are cut and continue as a new segment.
+    """
+
+    def __init__(
+        self,
+        sample_rate: int,
+        frame_ms: int,
+        padding_ms: int,
+        max_segment_seconds: float,
+        aggressiveness: int = 2,
+        trigger_ratio: float = 0.9
+    ):
+        self.vad = webrtcvad.Vad(aggressiveness)
+        self.sample_rate = sample_rate
+        self.frame_size = sample_rate * frame_ms // 1000
+        self.window = deque(maxlen=max(padding_ms // frame_ms, 1))
+        self.trigger_count = trigger_ratio * self.window.maxlen
+        self.max_segment = int(max_segment_seconds * sample_rate)
+
+        self.remainder = np.zeros(0, dtype=np.int16)
+        self.position = 0  # absolute index of remainder[0]
+        self.segment_start: Optional[int] = None
+
+    def process(self, samples: np.ndarray) -> List[Tuple[int, int, bool]]:
+        """Classify new audio; returns completed (start, end, was_cut) segments."""
+        pcm = np.concatenate([self.remainder, (np.clip(samples, -1.0, 1.0) * 32767).astype(np.int16)])
+        frames = len(pcm) // self.frame_size
+        completed = []
+
+        for i in range(frames):
+            frame = pcm[i * self.frame_size:(i + 1) * self.frame_size]
+            frame_end = self.position + (i + 1) * self.frame_size
+            self.window.append(self.vad.is_speech(frame.tobytes(), self.sample_rate))
+            voiced = sum(self.window)
+
+            if self.segment_start is None:
+                if len(self.window) == self.window.maxlen and voiced >= self.trigger_count:
+                    # Start at the beginning of the padding window so word onsets are kept
+                    self.segment_start = max(0, frame_end - self.window.maxlen * self.frame_size)
+
+            elif self.window.maxlen - voiced >= self.trigger_count:
+                completed.append((self.segment_start, frame_end, False))
+                self.segment_start = None
+                self.window.clear()
+
+            elif frame_end - self.segment_start >= self.max_segment:
+                completed.append((self.segment_start, frame_end, True))
+                self.segment_start = frame_end
+
+        consumed = frames * self.frame_size
+        self.remainder = pcm[consumed:]
+        self.position += consumed
+        return completed
+
+    def flush(self) -> Optional[Tuple[int, int, bool]]:
+        """Close the open segment at the end of the stream."""
+        if self.segment_start is None:
+            return None
+
+        segment = (self.segment_start, self.position + len(self.remainder), False)
+        self.segment_start = None
+        return segment
+
+
+def _words(text: str) -> List[str]:
+    return [re.sub(r"[^\w']", "", word.lower()) for word in text.split()]
+
+
+def stitch_transcripts(previous: str, text: str, max_overlap_words: int = 8) -> str:
+    """Drop the leading words of text that repeat the end of previous (the overlapped audio)."""
+    previous_words, words = _words(previous), _words(text)
+
+    for size in range(min(max_overlap_words, len(previous_words), len(words)), 0, -1):
+        if previous_words[-size:] == words[:size]:
+            return " ".join(text.split()[size:])
+    return text
+
+
+class StreamingTranscriptionSession:
+    """
+    Incremental transcription of one audio stream.
+
+    Audio goes into a ring buffer and through the VAD segmenter; only newly
+    completed segments are sent to Whisper, so the cost of an update follows
+    the new audio rather than the whole conversation. Segments cut mid-speech
+    are re-read with a short overlap and stitched, and the open segment is
+    re-transcribed as a partial hypothesis as new audio arrives (live
+    streams only; with partials=False, as for files, only completed
+    segments are transcribed).
+    """
+
+    def __init__(
+        self,
+        service: "VoiceProcessingService",
+        sample_rate: int = WHISPER_SAMPLE_RATE,
+        language: str = "en",
+        high_pass: bool = False,
+        partials: bool = True
+    ):
+        self.service = service
+        self.input_sample_rate = sample_rate
+        self.language = language
+
+        self.ring = AudioRingBuffer(int(settings.voice_stream_buffer_seconds * WHISPER_SAMPLE_RATE))
+        self.segmenter = VADSegmenter(
+            WHISPER_SAMPLE_RATE,
+            frame_ms=settings.voice_stream_vad_frame_ms,
+            padding_ms=settings.voice_stream_padding_ms,
+            max_segment_seconds=settings.voice_stream_max_segment_seconds
+        )
+        self.overlap = int(settings.voice_stream_overlap_seconds * WHISPER_SAMPLE_RATE)
+        self.partials = partials
+        self.partial_interval = int(settings.voice_stream_partial_interval_seconds * WHISPER_SAMPLE_RATE)
+        self.max_samples = settings.max_audio_duration * WHISPER_SAMPLE_RATE
+
+        # Streaming resampler and high-pass filter state, carried across chunks
+        self.resampler = (
+            StreamingResampler(sample_rate, WHISPER_SAMPLE_RATE) if sample_rate != WHISPER_SAMPLE_RATE else None
+        )
+        self.high_pass = butter(4, 300, btype='high', fs=WHISPER_SAMPLE_RATE, output='sos') if high_pass else None
+        self.filter_state = None
+
+        self.texts: List[str] = []
+        self.segments: List[Dict[str, Any]] = []
+        self.previous_cut = False
+        self.partial_mark = 0
+        self.language_detected: Optional[str] = None
+
+    @property
+    def transcript(self) -> str:
+        return " ".join(text for text in self.texts if text)
+
+    @property
+    def duration(self) -> float:
+        return self.ring.end / WHISPER_SAMPLE_RATE
+
+    async def feed(self, chunk: np.ndarray) -> List[Dict[str, Any]]:
+        """Add audio; returns segment and partial events produced by it."""
+        events = await self._ingest(self._prepare(chunk))
+
+        open_start = self.segmenter.segment_start
+        if (self.partials and open_start is not None
+                and self.ring.end - max(self.partial_mark, open_start) >= self.partial_interval):
+            events.append(await self._transcribe_partial(open_start))
+
+        return events
+
+    async def finish(self) -> List[Dict[str, Any]]:
+        """Transcribe whatever speech is still open at the end of the stream."""
+        events = []
+        if self.resampler is not None:
+            events = await self._ingest(self._filter(self.resampler.flush()))
+
+        segment = self.segmenter.flush()
+        if segment is not None:
+            events.append(await self._transcribe_segment(*segment))
+        return events
+
+    async def _ingest(self, samples: np.ndarray) -> List[Dict[str, Any]]:
+        """Buffer prepared audio and transcribe the segments it completes."""
+        if self.ring.end + len(samples) > self.max_samples:
+            raise ValueError(f"Audio too long: exceeds {settings.max_audio_duration}s")
+
+        self.ring.write(samples)
+        events = []
+        for start, end, was_cut in self.segmenter.process(samples):
+            events.append(await self._transcribe_segment(start, end, was_cut))
+        return events
+
+    def _prepare(self, chunk: np.ndarray) -> np.ndarray:
+        samples = np.asarray(chunk, dtype=np.float32)
+        if samples.ndim > 1:
+            samples = samples.mean(axis=1)
+
+        if self.resampler is not None:
+            samples = self.resampler.process(samples)
+
+        return self._filter(samples)
+
+    def _filter(self, samples: np.ndarray) -> np.ndarray:
+        if self.high_pass is not None and len(samples):
+            if self.filter_state is None:
+                self.filter_state = sosfilt_zi(self.high_pass) * samples[0]
+            samples, self.filter_state = sosfilt(self.high_pass, samples, zi=self.filter_state)
+            samples = samples.astype(np.float32)
+
+        return samples
+
+    async def _transcribe_segment(self, start: int, end: int, was_cut: bool) -> Dict[str, Any]:
+        # A segment that continues a cut one re-reads the end of it so split words survive
+        audio_start = start - self.overlap if self.previous_cut else start
+        audio = self.service._normalize_audio(self.ring.read(audio_start, end))
+
+        result = await self.service._transcribe_with_whisper(
+            audio, self.language, initial_prompt=self.transcript[-200:] or None
+        )
+        text = stitch_transcripts(self.transcript, result["text"]) if self.previous_cut else result["text"]
+
+        offset = max(audio_start, self.ring.start) / WHISPER_SAMPLE_RATE
+        for segment in result["segments"]:
+            self.segments.append({**segment, "start": segment["start"] + offset, "end": segment["end"] + offset})
+
+        self.texts.append(text)
+        self.previous_cut = was_cut
+        self.partial_mark = end
+        self.language_detected = self.language_detected or result.get("language")
+
+        voice_logger.debug("Transcribed speech segment",
+                           start=start / WHISPER_SAMPLE_RATE,
+                           end=end / WHISPER_SAMPLE_RATE,
+                           text_length=len(text))
+
+        return {
+            "type": "segment",
+            "text": text,
+            "start": start / WHISPER_SAMPLE_RATE,
+            "end": end / WHISPER_SAMPLE_RATE,
+            "transcript": self.transcript
+        }
+
+    async def _transcribe_partial(self, start: int) -> Dict[str, Any]:
+        # Bounded by the maximum segment length, however long the stream has run
+        audio = self.service._normalize_audio(self.ring.read(start, self.ring.end))
+        result = await self.service._transcribe_with_whisper(
+            audio, self.language, initial_prompt=self.transcript[-200:] or None
+        )
+        self.partial_mark = self.ring.end
+
+        return {
+            "type": "partial",
+            "text": result["text"],
+            "transcript": " ".join(text for text in (self.transcript, result["text"]) if text)
+        }
+
+    def result(self) -> Dict[str, Any]:
+        """Final transcription in the shape returned by transcribe_audio_file."""
+        text = self.transcript
+        if not self.texts:
+            return {
+                "text": "",
+                "confidence_score": 0.0,
+                "language": self.language,
+                "duration": self.duration,
+                "no_speech_detected": True
+            }
+
+        result = {
+            "text": text,
+            "language": self.language_detected or self.language,
+            "segments": self.segments,
+            "duration": self.duration
+        }
+        result["confidence_score"] = self.service._calculate_transcription_confidence(result)
+        result["cleaned_text"] = self.service._clean_transcription(text)
+        return result
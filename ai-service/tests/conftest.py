@@ -0,0 +1,33 @@
+"""
+Test configuration and fixtures
+"""
+
+import pytest
+from unittest.mock import Mock, patch
+
+from src.services.nlp_service import ParsedTaxInfo, FilingStatus
+from src.services.optimization_service import TaxOptimizationService
+
+
+@pytest.fixture
+def sample_tax_info() -> ParsedTaxInfo:
+    """Parsed tax info that every rule-based generator has something to say about"""
+    return ParsedTaxInfo(
+        income=95000,
+        filing_status=FilingStatus.SINGLE,
+        dependents=1,
+        age=35,
+        retirement_contributions=5000,
+        student_loan_interest=1200,
+        mortgage_interest=9000,
+        charitable_donations=2000,
+        medical_expenses=4000,
+        confidence_score=0.9
+    )
+
+
+@pytest.fixture
+def optimization_service() -> TaxOptimizationService:
+    """Optimization service without a loaded model"""
+    with patch("src.services.optimization_service.get_model_manager", return_value=Mock()):
+        return TaxOptimizationService()
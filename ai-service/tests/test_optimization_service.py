@@ -0,0 +1,53 @@
+"""
+Test tax optimization service
+"""
+
+import time
+
+import pytest
+
+from src.services.optimization_service import OptimizationCategory
+
+
+class TestRuleGeneratorDeadline:
+    """Test the per-request deadline on the rule-based generators"""
+
+    @pytest.mark.asyncio
+    async def test_all_generators_finish_within_deadline(self, optimization_service, sample_tax_info):
+        """Test that nothing is dropped when the generators are fast"""
+        suggestions, timed_out = await optimization_service._run_rule_generators(sample_tax_info, timeout=5)
+
+        assert suggestions
+        assert timed_out == []
+
+    @pytest.mark.asyncio
+    async def test_slow_generator_is_dropped(self, optimization_service, sample_tax_info, monkeypatch):
+        """Test that a generator missing the deadline only loses its own category"""
+        def slow_education_suggestions(tax_info):
+            time.sleep(1)
+            return []
+
+        monkeypatch.setattr(optimization_service, "_generate_education_suggestions", slow_education_suggestions)
+
+        start = time.monotonic()
+        suggestions, timed_out = await optimization_service._run_rule_generators(sample_tax_info, timeout=0.2)
+        elapsed = time.monotonic() - start
+
+        assert elapsed < 0.8
+        assert timed_out == [OptimizationCategory.EDUCATION.value]
+        assert any(s.category == OptimizationCategory.RETIREMENT for s in suggestions)
+
+    @pytest.mark.asyncio
+    async def test_run_optimization_marks_degraded(self, optimization_service, sample_tax_info, monkeypatch):
+        """Test that a dropped category is reported on the result"""
+        def slow_charitable_suggestions(tax_info):
+            time.sleep(1)
+            return []
+
+        monkeypatch.setattr(optimization_service, "_generate_charitable_suggestions", slow_charitable_suggestions)
+
+        result = await optimization_service.run_optimization(sample_tax_info, deadline_ms=200, insights=False)
+
+        assert result.degraded
+        assert result.timed_out_categories == [OptimizationCategory.CHARITABLE_GIVING.value]
+        assert result.suggestions
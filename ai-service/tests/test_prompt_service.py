@@ -0,0 +1,57 @@
+"""
+Test compiled prompt templates and their cached prefixes
+"""
+
+import pytest
+from tokenizers import ByteLevelBPETokenizer
+from transformers import PreTrainedTokenizerFast
+
+from src.config import settings
+from src.models.llm_models import ModelManager
+from src.services.prompt_service import PromptEngineeringService, compile_template
+
+
+@pytest.fixture(scope="module")
+def prompt_service():
+    return PromptEngineeringService()
+
+
+@pytest.fixture(scope="module")
+def tokenizer(prompt_service):
+    """GPT-2 style byte-level BPE trained on the templates, so no download is needed"""
+    bpe = ByteLevelBPETokenizer()
+    bpe.train_from_iterator(
+        [template.template for template in prompt_service.templates.values()],
+        vocab_size=2000,
+        show_progress=False
+    )
+    return PreTrainedTokenizerFast(tokenizer_object=bpe._tokenizer)
+
+
+@pytest.fixture
+def model_manager(tokenizer):
+    manager = ModelManager()
+    manager.tokenizers["test-model"] = tokenizer
+    return manager
+
+
+class TestCompiledPrefix:
+    """Test that the cached prefix ends where the prompt can be tokenized apart"""
+
+    @pytest.mark.parametrize("template, expected", [
+        ("Explain this tax concept in simple terms: {concept}", "Explain this tax concept in simple terms:"),
+        ("Question:\n\n{question}", "Question:"),
+        ("Review ({item}) now", "Review"),
+        ("{question} first", ""),
+    ])
+    def test_prefix_stops_before_trailing_whitespace(self, template, expected):
+        assert compile_template(template).prefix == expected
+
+    def test_prefix_and_suffix_tokens_equal_full_prompt(self, prompt_service, model_manager, tokenizer):
+        for name, compiled in prompt_service.compiled_templates.items():
+            variables = {slot: "Sample value 42" for slot, _ in compiled.slots}
+            prompt = compiled.render(variables)
+            assert prompt.startswith(compiled.prefix)
+
+            encoded = model_manager.encode_prompt("test-model", prompt, compiled.prefix)
+            assert encoded == tokenizer(prompt, truncation=True, max_length=settings.llama_max_length)["input_ids"], name
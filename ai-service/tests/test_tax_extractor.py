@@ -0,0 +1,52 @@
+"""
+Test the compiled tax fact extractor
+"""
+
+import pytest
+
+from src.services.tax_extractor import CompiledTaxExtractor
+
+
+@pytest.fixture(scope="module")
+def extractor():
+    return CompiledTaxExtractor()
+
+
+class TestDependents:
+    """Test dependents counts before and after the noun"""
+
+    @pytest.mark.parametrize("text, expected", [
+        ("Income: 85000, dependents: 2", 2),
+        ("children: three", 3),
+        ("I have two kids", 2),
+        ("We have 3 children", 3),
+        ("no dependents mentioned", 0),
+    ])
+    def test_dependents_count(self, extractor, text, expected):
+        assert extractor.extract(text)["dependents"] == expected
+
+    def test_income_next_to_dependents(self, extractor):
+        fields = extractor.extract("Income: 85000, dependents: 2")
+        assert fields["income"] == 85000
+
+
+class TestStateCodes:
+    """Test that two-letter state codes do not swallow ordinary words"""
+
+    def test_state_taxes_deduction_kept(self, extractor):
+        fields = extractor.extract("I earn 90,000 a year and paid 2000 in state taxes")
+
+        assert fields["state"] is None
+        assert fields["income"] == 90000
+        assert {"type": "state_taxes", "amount": 2000.0, "description": "State Taxes"} in fields["deductions"]
+
+    @pytest.mark.parametrize("text, expected", [
+        ("I live in TX and make 80,000", "TX"),
+        ("NY resident earning 120,000", "NY"),
+        ("moved here from CA last year", "CA"),
+        ("I live in california", "CA"),
+        ("we live in ca", None),
+        ("I am an OK resident", "OK"),
+    ])
+    def test_state(self, extractor, text, expected):
+        assert extractor.extract(text)["state"] == expected
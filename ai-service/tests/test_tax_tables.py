@@ -0,0 +1,70 @@
+"""
+Test the year-versioned federal tax tables
+"""
+
+import json
+from pathlib import Path
+
+import pytest
+
+from src.services.tax_tables import FILING_STATUSES, get_tax_tables
+
+
+# 2024 bracket upper bounds from IRS Rev. Proc. 2023-34
+BRACKET_BOUNDS_2024 = {
+    "single": [11600, 47150, 100525, 191950, 243725, 609350],
+    "marriedFilingJointly": [23200, 94300, 201050, 383900, 487450, 731200],
+    "marriedFilingSeparately": [11600, 47150, 100525, 191950, 243725, 365600],
+    "headOfHousehold": [16550, 63100, 100500, 191950, 243700, 609350],
+}
+RATES = [0.10, 0.12, 0.22, 0.24, 0.32, 0.35, 0.37]
+
+# Tax at a bracket bound, as in the IRS tax computation worksheets
+TAX_AT_BOUND_2024 = [
+    ("single", 11600, 1160.00),
+    ("single", 47150, 5426.00),
+    ("single", 100525, 17168.50),
+    ("single", 191950, 39110.50),
+    ("single", 243725, 55678.50),
+    ("single", 609350, 183647.25),
+    ("marriedFilingJointly", 94300, 10852.00),
+    ("marriedFilingJointly", 201050, 34337.00),
+    ("marriedFilingSeparately", 365600, 98334.75),
+    ("headOfHousehold", 63100, 7241.00),
+    ("headOfHousehold", 100500, 15469.00),
+]
+
+ML_PLATFORM_RULES = Path(__file__).resolve().parents[2] / "ml-platform" / "models" / "data" / "tax_rules"
+RULES_FILE_KEYS = {
+    "single": "single",
+    "marriedFilingJointly": "married_filing_jointly",
+    "marriedFilingSeparately": "married_filing_separately",
+    "headOfHousehold": "head_of_household",
+}
+
+
+@pytest.fixture(scope="module")
+def tables_2024():
+    return get_tax_tables(2024)
+
+
+class TestBracketBoundaries2024:
+    """Test each 2024 bracket boundary for every filing status"""
+
+    @pytest.mark.parametrize("filing_status", FILING_STATUSES)
+    def test_rate_changes_just_above_each_bound(self, tables_2024, filing_status):
+        for bound, rate, next_rate in zip(BRACKET_BOUNDS_2024[filing_status], RATES, RATES[1:]):
+            assert tables_2024.marginal_rate(bound, filing_status) == pytest.approx(rate)
+            assert tables_2024.marginal_rate(bound + 1, filing_status) == pytest.approx(next_rate)
+
+    @pytest.mark.parametrize("filing_status, income, expected", TAX_AT_BOUND_2024)
+    def test_tax_at_bound(self, tables_2024, filing_status, income, expected):
+        assert tables_2024.income_tax(income, filing_status) == pytest.approx(expected)
+
+    @pytest.mark.skipif(not (ML_PLATFORM_RULES / "2024" / "usa.json").exists(),
+                        reason="ml-platform rules not checked out")
+    def test_matches_ml_platform_rules(self, tables_2024):
+        rules = json.loads((ML_PLATFORM_RULES / "2024" / "usa.json").read_text())
+        for status, key in RULES_FILE_KEYS.items():
+            bounds = [bracket["max"] for bracket in rules["federal"]["tax_brackets"][key][:-1]]
+            assert tables_2024.bracket_bounds[FILING_STATUSES.index(status)].tolist() == bounds
@@ -0,0 +1,40 @@
+"""
+Test streaming audio preparation
+"""
+
+import numpy as np
+import pytest
+from scipy.signal import resample_poly
+
+from src.services.voice_streaming import StreamingResampler, WHISPER_SAMPLE_RATE
+
+
+class TestStreamingResampler:
+    """Test that chunked resampling matches resampling the whole stream"""
+
+    @pytest.mark.parametrize("input_rate", [8000, 22050, 44100, 48000])
+    def test_chunks_match_one_shot_resampling(self, input_rate):
+        rng = np.random.default_rng(input_rate)
+        audio = rng.standard_normal(input_rate * 2).astype(np.float32)
+
+        resampler = StreamingResampler(input_rate, WHISPER_SAMPLE_RATE)
+        chunks, position = [], 0
+        while position < len(audio):
+            size = int(rng.integers(1, 4000))
+            chunks.append(resampler.process(audio[position:position + size]))
+            position += size
+        chunks.append(resampler.flush())
+
+        divisor = np.gcd(input_rate, WHISPER_SAMPLE_RATE)
+        expected = resample_poly(audio, WHISPER_SAMPLE_RATE // divisor, input_rate // divisor)
+
+        streamed = np.concatenate(chunks)
+        assert len(streamed) == len(expected)
+        np.testing.assert_allclose(streamed, expected, atol=1e-5)
+
+    def test_history_stays_bounded(self):
+        resampler = StreamingResampler(44100, WHISPER_SAMPLE_RATE)
+        for _ in range(50):
+            resampler.process(np.zeros(4410, dtype=np.float32))
+
+        assert len(resampler.history) <= resampler.width + 1
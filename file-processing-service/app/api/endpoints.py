@@ -95,6 +95,11 @@ class ProcessingResultResponse(BaseModel):
     recommendations: List[str]
 
 
+class BatchProcessingRequest(BaseModel):
+    file_ids: List[int] = Field(..., min_items=1)
+    priority: int = Field(default=5, ge=1, le=10)
+
+
 class ErrorResponse(BaseModel):
     error: str
     details: Optional[str] = None
@@ -510,6 +515,92 @@ async def reprocess_file(
         )
 
 
+@app.post("/files/batch/process")
+async def process_file_batch(
+    batch_request: BatchProcessingRequest,
+    user_id: Optional[str] = Depends(get_current_user),
+    db: Session = Depends(get_db)
+):
+    """
+    Process a set of uploaded files as one batch job
+
+    - **file_ids**: IDs of the files to process together
+    - Returns batch task information; poll /files/batch/{task_id}/status for partial results
+    """
+    try:
+        file_records = db.query(FileUpload).filter(
+            FileUpload.id.in_(batch_request.file_ids)
+        ).all()
+
+        # Check file ownership
+        if user_id and any(record.user_id != user_id for record in file_records):
+            raise HTTPException(
+                status_code=status.HTTP_403_FORBIDDEN,
+                detail="Access denied"
+            )
+
+        job_info = await task_manager.submit_batch_processing_job(
+            batch_request.file_ids,
+            user_id,
+            batch_request.priority
+        )
+
+        return {
+            "message": "Batch processing started",
+            **job_info
+        }
+
+    except HTTPException:
+        raise
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e)
+        )
+    except Exception as e:
+        logger.error(f"Error starting batch processing: {str(e)}")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="Error starting batch processing"
+        )
+
+
+@app.get("/files/batch/{task_id}/status")
+async def get_batch_processing_status(
+    task_id: str,
+    user_id: Optional[str] = Depends(get_current_user),
+    db: Session = Depends(get_db)
+):
+    """
+    Get batch processing status with partial per-document results
+
+    - **task_id**: Celery task ID returned when the batch was submitted
+    """
+    # Per-file batch jobs are keyed "<task_id>:<file_id>"
+    file_record = db.query(FileUpload).join(
+        ProcessingJob, ProcessingJob.file_upload_id == FileUpload.id
+    ).filter(ProcessingJob.job_id.like(f"{task_id}:%")).first()
+    if not file_record:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Batch not found"
+        )
+
+    if user_id and file_record.user_id != user_id:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Access denied"
+        )
+
+    batch_status = await task_manager.get_batch_status(task_id)
+    if batch_status.get("status") == "error":
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="Error retrieving batch status"
+        )
+    return batch_status
+
+
 # GDPR Compliance Endpoints
 
 @app.get("/gdpr/export")
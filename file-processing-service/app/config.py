@@ -68,6 +68,12 @@ class Settings(BaseSettings):
     job_timeout_minutes: int = Field(default=30, env="JOB_TIMEOUT_MINUTES")
     retry_attempts: int = Field(default=3, env="RETRY_ATTEMPTS")
     cleanup_interval_hours: int = Field(default=1, env="CLEANUP_INTERVAL_HOURS")
+    cleanup_batch_size: int = Field(default=500, env="CLEANUP_BATCH_SIZE")
+    cleanup_io_workers: int = Field(default=8, env="CLEANUP_IO_WORKERS")
+    cleanup_batch_pause_seconds: float = Field(default=0.2, env="CLEANUP_BATCH_PAUSE_SECONDS")
+    cleanup_max_batches_per_run: int = Field(default=100, env="CLEANUP_MAX_BATCHES_PER_RUN")
+    batch_max_documents: int = Field(default=50, env="BATCH_MAX_DOCUMENTS")
+    ocr_batch_workers: int = Field(default=4, env="OCR_BATCH_WORKERS")
 
     # Form Recognition Configuration
     form_confidence_threshold: float = Field(default=0.8, env="FORM_CONFIDENCE_THRESHOLD")
@@ -146,6 +152,17 @@ class Settings(BaseSettings):
         env="USER_SERVICE_URL"
     )
 
+    # Tax Calculator Client
+    calculator_http2: bool = Field(default=True, env="CALCULATOR_HTTP2")
+    calculator_max_connections: int = Field(default=20, env="CALCULATOR_MAX_CONNECTIONS")
+    calculator_max_keepalive: int = Field(default=10, env="CALCULATOR_MAX_KEEPALIVE")
+    calculator_max_retries: int = Field(default=3, env="CALCULATOR_MAX_RETRIES")
+    calculator_retry_backoff: float = Field(default=0.2, env="CALCULATOR_RETRY_BACKOFF")
+    calculator_batch_window_ms: int = Field(default=25, env="CALCULATOR_BATCH_WINDOW_MS")
+    calculator_batch_max_size: int = Field(default=50, env="CALCULATOR_BATCH_MAX_SIZE")
+    circuit_breaker_failure_threshold: int = Field(default=5, env="CIRCUIT_BREAKER_FAILURE_THRESHOLD")
+    circuit_breaker_reset_seconds: float = Field(default=30.0, env="CIRCUIT_BREAKER_RESET_SECONDS")
+
     @validator("allowed_extensions", pre=True)
     def parse_extensions(cls, v):
         if isinstance(v, str):
@@ -154,6 +154,8 @@ class ProcessingJob(Base):
     __table_args__ = (
         Index('idx_processing_jobs_status', 'status'),
         Index('idx_processing_jobs_created_at', 'created_at'),
+        # Covers the hourly duration rollup (status filter, created_at range, duration inputs)
+        Index('idx_processing_jobs_status_created_completed', 'status', 'created_at', 'completed_at'),
     )
 
 
@@ -283,6 +285,29 @@ class AuditLog(Base):
         Index('idx_audit_logs_created_at', 'created_at'),
         Index('idx_audit_logs_user_id', 'user_id'),
         Index('idx_audit_logs_sensitive', 'sensitive_data_accessed'),
+        # Covers distinct-user counts over a created_at range
+        Index('idx_audit_logs_created_user', 'created_at', 'user_id'),
+    )
+
+
+class AuditLogRollup(Base):
+    """Hourly audit event counts per action, appended once each hour closes"""
+    __tablename__ = "audit_log_rollups"
+
+    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
+
+    # Time period (start of the hour)
+    period_start = Column(DateTime(timezone=True), nullable=False)
+    action = Column(String(50), nullable=False)
+    event_count = Column(Integer, nullable=False, default=0)
+
+    # Timestamps
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+
+    # Indexes
+    __table_args__ = (
+        Index('idx_audit_log_rollups_period', 'period_start'),
+        UniqueConstraint('period_start', 'action', name='uq_audit_log_rollups_period_action'),
     )
 
 
@@ -302,7 +327,11 @@ class ProcessingStatistics(Base):
     total_files_failed = Column(Integer, default=0)
     total_file_size = Column(Integer, default=0)  # bytes
 
+    total_files_pending = Column(Integer, default=0)
+
     # Processing performance
+    total_processing_time = Column(Float, default=0)  # seconds, summed so periods can be combined
+    processing_time_samples = Column(Integer, default=0)  # completed jobs behind the timings
     average_processing_time = Column(Float, nullable=True)  # seconds
     median_processing_time = Column(Float, nullable=True)  # seconds
     max_processing_time = Column(Float, nullable=True)  # seconds
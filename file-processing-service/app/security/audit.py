@@ -2,17 +2,22 @@
 Enhanced audit logging system
 """
 import json
-from datetime import datetime
+from datetime import datetime, timedelta, timezone
 from typing import Dict, Any, Optional
+from sqlalchemy import distinct, func
 from sqlalchemy.orm import Session
 from fastapi import Request
 
 from app.database import SessionLocal
-from app.models.database import AuditLog
+from app.models.database import AuditLog, AuditLogRollup
 from app.utils.logging import get_logger
 
 logger = get_logger(__name__)
 
+# Hours are rolled up only once they have been closed this long: created_at is
+# set at transaction start, so rows for an hour can still commit after it ends
+AUDIT_ROLLUP_SETTLE = timedelta(hours=1)
+
 
 class AuditLogger:
     """Enhanced audit logging system for compliance"""
@@ -294,12 +299,13 @@ class AuditLogger:
 
                 # Create audit log entry
                 audit_entry = AuditLog(
-                    action=action,
+                    event_type=action,
+                    event_description=action.replace("_", " "),
                     user_id=user_id,
-                    file_id=file_id,
+                    file_upload_id=file_id,
                     ip_address=ip_address,
                     user_agent=user_agent,
-                    details=details or {},
+                    event_details=details or {},
                     created_at=datetime.utcnow()
                 )
 
@@ -333,7 +339,7 @@ class AuditLogger:
                     query = query.filter(AuditLog.user_id == user_id)
 
                 if action:
-                    query = query.filter(AuditLog.action == action)
+                    query = query.filter(AuditLog.event_type == action)
 
                 if start_date:
                     query = query.filter(AuditLog.created_at >= start_date)
@@ -348,12 +354,12 @@ class AuditLogger:
                 return [
                     {
                         "id": log.id,
-                        "action": log.action,
+                        "action": log.event_type,
                         "user_id": log.user_id,
-                        "file_id": log.file_id,
+                        "file_id": log.file_upload_id,
                         "ip_address": log.ip_address,
                         "user_agent": log.user_agent,
-                        "details": log.details,
+                        "details": log.event_details,
                         "created_at": log.created_at.isoformat()
                     }
                     for log in results
@@ -366,46 +372,48 @@ class AuditLogger:
             logger.error(f"Error searching audit logs: {str(e)}")
             return []
 
+    async def rollup_audit_logs(self) -> Dict[str, Any]:
+        """
+        Fold closed hours of audit events into per-event-type hourly counts
+
+        Rollups are append-only: each run aggregates, in one grouped query,
+        only the hours that settled (closed AUDIT_ROLLUP_SETTLE ago) since
+        the last rolled-up period.
+        """
+        try:
+            db = SessionLocal()
+            try:
+                result = _rollup_audit_logs(db, datetime.utcnow())
+                logger.info(f"Audit log rollup completed: {result}")
+                return result
+
+            finally:
+                db.close()
+
+        except Exception as e:
+            logger.error(f"Error rolling up audit logs: {str(e)}")
+            return {
+                "error": str(e),
+                "periods_rolled_up": 0,
+                "rows_written": 0
+            }
+
     async def get_audit_summary(
         self,
         start_date: Optional[datetime] = None,
         end_date: Optional[datetime] = None
     ) -> Dict[str, Any]:
-        """Get audit log summary statistics"""
+        """
+        Get audit log summary statistics
+
+        Whole hours already rolled up are read from AuditLogRollup; only the
+        partial hours at the edges of the range and the not-yet-rolled tail are
+        aggregated from raw rows, all as grouped SQL.
+        """
         try:
             db = SessionLocal()
             try:
-                query = db.query(AuditLog)
-
-                if start_date:
-                    query = query.filter(AuditLog.created_at >= start_date)
-
-                if end_date:
-                    query = query.filter(AuditLog.created_at <= end_date)
-
-                # Get action counts
-                action_counts = {}
-                logs = query.all()
-
-                for log in logs:
-                    action_counts[log.action] = action_counts.get(log.action, 0) + 1
-
-                # Get unique users
-                unique_users = len(set(log.user_id for log in logs if log.user_id))
-
-                # Get unique files
-                unique_files = len(set(log.file_id for log in logs if log.file_id))
-
-                return {
-                    "total_events": len(logs),
-                    "unique_users": unique_users,
-                    "unique_files": unique_files,
-                    "action_counts": action_counts,
-                    "period": {
-                        "start": start_date.isoformat() if start_date else None,
-                        "end": end_date.isoformat() if end_date else None
-                    }
-                }
+                return _summarize_audit_logs(db, start_date, end_date)
 
             finally:
                 db.close()
@@ -421,5 +429,129 @@ class AuditLogger:
             }
 
 
+def _rollup_audit_logs(db: Session, now: datetime) -> Dict[str, Any]:
+    """Append AuditLogRollup rows for every settled hour not yet rolled up"""
+    rollup_end = _floor_hour(now) - AUDIT_ROLLUP_SETTLE
+
+    last_period = _naive_utc(db.query(func.max(AuditLogRollup.period_start)).scalar())
+    if last_period:
+        since = last_period + timedelta(hours=1)
+    else:
+        earliest = db.query(func.min(AuditLog.created_at)).scalar()
+        if earliest is None:
+            return {"periods_rolled_up": 0, "rows_written": 0}
+        since = _floor_hour(_naive_utc(earliest))
+
+    bucket = func.date_trunc('hour', AuditLog.created_at).label("bucket")
+    rows = db.query(
+        bucket,
+        AuditLog.event_type,
+        func.count(AuditLog.id)
+    ).filter(
+        AuditLog.created_at >= since,
+        AuditLog.created_at < rollup_end
+    ).group_by(bucket, AuditLog.event_type).all()
+
+    db.add_all([
+        AuditLogRollup(period_start=period_start, action=event_type, event_count=count)
+        for period_start, event_type, count in rows
+    ])
+    db.commit()
+
+    return {
+        "periods_rolled_up": len({period_start for period_start, _, _ in rows}),
+        "rows_written": len(rows),
+        "rolled_up_to": rollup_end.isoformat()
+    }
+
+
+def _summarize_audit_logs(
+    db: Session,
+    start_date: Optional[datetime] = None,
+    end_date: Optional[datetime] = None
+) -> Dict[str, Any]:
+    """Event counts per event type plus distinct users and files between start_date and end_date"""
+    action_counts: Dict[str, int] = {}
+
+    def add_counts(rows):
+        for event_type, count in rows:
+            action_counts[event_type] = action_counts.get(event_type, 0) + int(count)
+
+    def count_raw(range_start: Optional[datetime], range_end: Optional[datetime], end_inclusive: bool):
+        query = db.query(AuditLog.event_type, func.count(AuditLog.id))
+        if range_start:
+            query = query.filter(AuditLog.created_at >= range_start)
+        if range_end:
+            query = query.filter(
+                AuditLog.created_at <= range_end if end_inclusive else AuditLog.created_at < range_end
+            )
+        add_counts(query.group_by(AuditLog.event_type).all())
+
+    last_period = _naive_utc(db.query(func.max(AuditLogRollup.period_start)).scalar())
+    rolled_until = last_period + timedelta(hours=1) if last_period else None
+
+    # Whole hours inside the range that the rollup already covers
+    rollup_start = _ceil_hour(start_date) if start_date else None
+    rollup_end = min(_floor_hour(end_date), rolled_until) if end_date and rolled_until else rolled_until
+
+    if rollup_end and (rollup_start is None or rollup_start < rollup_end):
+        rollup_query = db.query(
+            AuditLogRollup.action,
+            func.sum(AuditLogRollup.event_count)
+        ).filter(AuditLogRollup.period_start < rollup_end)
+        if rollup_start:
+            rollup_query = rollup_query.filter(AuditLogRollup.period_start >= rollup_start)
+        add_counts(rollup_query.group_by(AuditLogRollup.action).all())
+
+        # Partial hour at the start and everything after the rollup
+        if start_date and start_date < rollup_start:
+            count_raw(start_date, rollup_start, end_inclusive=False)
+        if end_date is None or end_date >= rollup_end:
+            count_raw(rollup_end, end_date, end_inclusive=True)
+    else:
+        count_raw(start_date, end_date, end_inclusive=True)
+
+    # Distinct counts are not additive across periods; they run as one
+    # aggregate over the (created_at, user_id) index
+    distinct_query = db.query(
+        func.count(distinct(AuditLog.user_id)),
+        func.count(distinct(AuditLog.file_upload_id))
+    )
+    if start_date:
+        distinct_query = distinct_query.filter(AuditLog.created_at >= start_date)
+    if end_date:
+        distinct_query = distinct_query.filter(AuditLog.created_at <= end_date)
+    unique_users, unique_files = distinct_query.one()
+
+    return {
+        "total_events": sum(action_counts.values()),
+        "unique_users": unique_users,
+        "unique_files": unique_files,
+        "action_counts": action_counts,
+        "period": {
+            "start": start_date.isoformat() if start_date else None,
+            "end": end_date.isoformat() if end_date else None
+        }
+    }
+
+
+def _naive_utc(value: Optional[datetime]) -> Optional[datetime]:
+    """Normalize timestamps read back from timezone-aware columns to naive UTC"""
+    if value is not None and value.tzinfo is not None:
+        return value.astimezone(timezone.utc).replace(tzinfo=None)
+    return value
+
+
+def _floor_hour(value: datetime) -> datetime:
+    """Start of the hour containing value"""
+    return value.replace(minute=0, second=0, microsecond=0)
+
+
+def _ceil_hour(value: datetime) -> datetime:
+    """First hour boundary at or after value"""
+    floored = _floor_hour(value)
+    return floored if floored == value else floored + timedelta(hours=1)
+
+
 # Global audit logger instance
 audit_logger = AuditLogger()
\ No newline at end of file
@@ -2,13 +2,14 @@
 GDPR and compliance utilities
 """
 from datetime import datetime, timedelta
-from typing import Dict, Any, List, Optional
+from typing import Dict, Any, List, Optional, Tuple
 from sqlalchemy.orm import Session
 from pathlib import Path
 
 from app.database import SessionLocal
 from app.models.database import FileUpload, AuditLog, ProcessingJob, ExtractedData
 from app.security.encryption import FileEncryption
+from app.services.retention_cleanup import ExpiredFileCleaner, purge_in_batches
 from app.utils.logging import get_logger
 
 logger = get_logger(__name__)
@@ -266,6 +267,19 @@ class ComplianceManager:
                 "success": False
             }
 
+    def _secure_delete_upload_files(
+        self,
+        file_path: Optional[str],
+        encrypted_path: Optional[str]
+    ) -> Tuple[bool, str]:
+        """Overwrite and remove an upload's plain and encrypted files"""
+        for path in (file_path, encrypted_path):
+            if path:
+                success, message = self.encryption.secure_delete_file(Path(path))
+                if not success:
+                    return False, message
+        return True, "deleted"
+
     async def cleanup_expired_data(self) -> Dict[str, Any]:
         """
         Clean up expired data per retention policies
@@ -288,64 +302,35 @@ class ComplianceManager:
 
                 now = datetime.utcnow()
 
-                # 1. Clean up expired files
-                expired_files = db.query(FileUpload).filter(
-                    FileUpload.expires_at < now,
-                    FileUpload.deleted_at.is_(None)
-                ).all()
-
-                for file_record in expired_files:
-                    try:
-                        # Securely delete physical file
-                        file_path = Path(file_record.file_path)
-                        if file_path.exists():
-                            success, message = self.encryption.secure_delete_file(file_path)
-                            if not success:
-                                cleanup_summary["errors"].append(
-                                    f"Failed to securely delete expired file {file_record.id}: {message}"
-                                )
-
-                        # Mark as deleted
-                        file_record.deleted_at = now
-                        cleanup_summary["files_cleaned"] += 1
-
-                    except Exception as e:
-                        cleanup_summary["errors"].append(
-                            f"Error cleaning expired file {file_record.id}: {str(e)}"
-                        )
+                # 1. Securely delete expired files, batch by batch
+                file_result = ExpiredFileCleaner(
+                    delete_files=self._secure_delete_upload_files,
+                    audit_event_type="retention_expired_cleanup"
+                ).run(db, now=now)
+                cleanup_summary["files_cleaned"] = file_result["cleaned_up"]
+                cleanup_summary["errors"].extend(file_result["error_details"])
 
                 # 2. Clean up old audit logs (keep 2 years)
                 audit_retention_date = now - timedelta(days=730)  # 2 years
-                old_audit_logs = db.query(AuditLog).filter(
-                    AuditLog.created_at < audit_retention_date
-                ).all()
-
-                for log in old_audit_logs:
-                    try:
-                        db.delete(log)
-                        cleanup_summary["audit_logs_cleaned"] += 1
-                    except Exception as e:
-                        cleanup_summary["errors"].append(
-                            f"Error cleaning audit log {log.id}: {str(e)}"
-                        )
+                audit_result = purge_in_batches(
+                    db, AuditLog, AuditLog.created_at < audit_retention_date
+                )
+                cleanup_summary["audit_logs_cleaned"] = audit_result["deleted"]
 
                 # 3. Clean up old completed jobs (keep 30 days)
                 job_retention_date = now - timedelta(days=30)
-                old_jobs = db.query(ProcessingJob).filter(
+                job_result = purge_in_batches(
+                    db,
+                    ProcessingJob,
                     ProcessingJob.created_at < job_retention_date,
                     ProcessingJob.status == "completed"
-                ).all()
-
-                for job in old_jobs:
-                    try:
-                        db.delete(job)
-                        cleanup_summary["jobs_cleaned"] += 1
-                    except Exception as e:
-                        cleanup_summary["errors"].append(
-                            f"Error cleaning job {job.id}: {str(e)}"
-                        )
+                )
+                cleanup_summary["jobs_cleaned"] = job_result["deleted"]
 
-                db.commit()
+                # Anything left over is picked up by the next scheduled run
+                cleanup_summary["complete"] = (
+                    file_result["complete"] and audit_result["complete"] and job_result["complete"]
+                )
 
                 logger.info(f"Expired data cleanup completed: {cleanup_summary}")
                 return cleanup_summary
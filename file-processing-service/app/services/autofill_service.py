@@ -7,6 +7,7 @@ from decimal import Decimal
 import httpx
 
 from app.config import settings
+from app.services.calculator_client import CalculatorClient, CircuitOpenError, get_calculator_client
 from app.utils.logging import get_logger
 
 logger = get_logger(__name__)
@@ -15,9 +16,11 @@ logger = get_logger(__name__)
 class AutoFillService:
     """Service for integrating extracted data with tax calculators"""
 
-    def __init__(self):
+    def __init__(self, calculator_client: Optional[CalculatorClient] = None):
         self.tax_calculator_api_url = settings.tax_calculator_api_url
         self.field_mapping = self._load_field_mappings()
+        # Pooled client shared by every document processed in this process
+        self.calculator_client = calculator_client or get_calculator_client()
 
     def _load_field_mappings(self) -> Dict[str, Dict[str, str]]:
         """Load field mappings between extracted data and calculator fields"""
@@ -207,7 +210,8 @@ class AutoFillService:
         self,
         autofill_data: Dict[str, Any],
         user_id: str,
-        calculator_type: str
+        calculator_type: str,
+        batched: bool = False
     ) -> Dict[str, Any]:
         """
         Send auto-fill data to the tax calculator service
@@ -216,6 +220,7 @@ class AutoFillService:
             autofill_data: Prepared auto-fill data
             user_id: ID of the user
             calculator_type: Type of calculator to use
+            batched: Coalesce with other payloads sent within the batch window
 
         Returns:
             Response from the calculator service
@@ -223,39 +228,39 @@ class AutoFillService:
         try:
             logger.info(f"Sending auto-fill data to {calculator_type} calculator")
 
-            async with httpx.AsyncClient() as client:
-                response = await client.post(
-                    f"{self.tax_calculator_api_url}/autofill/{calculator_type}",
-                    json={
-                        "user_id": user_id,
-                        "autofill_data": autofill_data["autofill_data"],
-                        "metadata": autofill_data["metadata"],
-                        "confidence_scores": autofill_data["confidence_scores"]
-                    },
-                    headers={
-                        "Content-Type": "application/json",
-                        "User-Agent": "FileProcessingService/1.0"
-                    },
-                    timeout=30.0
-                )
+            status_code, result = await self.calculator_client.send_autofill(
+                calculator_type,
+                {
+                    "user_id": user_id,
+                    "autofill_data": autofill_data["autofill_data"],
+                    "metadata": autofill_data["metadata"],
+                    "confidence_scores": autofill_data["confidence_scores"]
+                },
+                batched=batched
+            )
 
-                if response.status_code == 200:
-                    result = response.json()
-                    logger.info("Auto-fill data sent successfully to calculator")
-                    return {
-                        "success": True,
-                        "calculator_response": result,
-                        "calculator_url": result.get("calculator_url"),
-                        "session_id": result.get("session_id")
-                    }
-                else:
-                    logger.error(f"Calculator API returned status {response.status_code}")
-                    return {
-                        "success": False,
-                        "error": f"Calculator API error: {response.status_code}",
-                        "details": response.text
-                    }
+            if status_code == 200:
+                logger.info("Auto-fill data sent successfully to calculator")
+                return {
+                    "success": True,
+                    "calculator_response": result,
+                    "calculator_url": result.get("calculator_url"),
+                    "session_id": result.get("session_id")
+                }
+            else:
+                logger.error(f"Calculator API returned status {status_code}")
+                return {
+                    "success": False,
+                    "error": f"Calculator API error: {status_code}",
+                    "details": result
+                }
 
+        except CircuitOpenError as e:
+            logger.error(f"Calculator service circuit open: {str(e)}")
+            return {
+                "success": False,
+                "error": "Calculator service temporarily unavailable"
+            }
         except httpx.TimeoutException:
             logger.error("Timeout sending data to calculator service")
             return {
@@ -554,14 +559,7 @@ class AutoFillService:
         try:
             logger.info(f"Consolidating data from {len(document_data_list)} documents")
 
-            consolidated = {
-                "autofill_data": {},
-                "source_documents": [],
-                "field_sources": {},
-                "confidence_scores": {},
-                "validation_notes": {},
-                "consolidation_summary": {}
-            }
+            consolidated = self.start_consolidation()
 
             # Group by form type and country
             document_groups = {}
@@ -575,44 +573,11 @@ class AutoFillService:
                 document_groups[key].append(doc_data)
 
             # Consolidate each group
-            for group_key, group_docs in document_groups.items():
+            for group_docs in document_groups.values():
                 for doc_data in group_docs:
-                    for field, value in doc_data["autofill_data"].items():
-                        if field not in consolidated["autofill_data"]:
-                            # First occurrence of this field
-                            consolidated["autofill_data"][field] = value
-                            consolidated["field_sources"][field] = group_key
-                            consolidated["confidence_scores"][field] = doc_data["confidence_scores"].get(field, 0.0)
-                        else:
-                            # Field already exists - keep higher confidence value
-                            existing_confidence = consolidated["confidence_scores"].get(field, 0.0)
-                            new_confidence = doc_data["confidence_scores"].get(field, 0.0)
-
-                            if new_confidence > existing_confidence:
-                                consolidated["autofill_data"][field] = value
-                                consolidated["field_sources"][field] = group_key
-                                consolidated["confidence_scores"][field] = new_confidence
-
-                    # Collect source document info
-                    consolidated["source_documents"].append({
-                        "form_type": doc_data["metadata"]["form_type"],
-                        "country": doc_data["metadata"]["country"],
-                        "extraction_date": doc_data["metadata"]["extraction_date"],
-                        "confidence": doc_data["metadata"]["overall_confidence"]
-                    })
-
-                    # Merge validation notes
-                    for field, notes in doc_data["validation_notes"].items():
-                        if field not in consolidated["validation_notes"]:
-                            consolidated["validation_notes"][field] = notes
-
-            # Generate consolidation summary
-            consolidated["consolidation_summary"] = {
-                "total_documents": len(document_data_list),
-                "document_types": len(document_groups),
-                "total_fields": len(consolidated["autofill_data"]),
-                "average_confidence": sum(consolidated["confidence_scores"].values()) / len(consolidated["confidence_scores"]) if consolidated["confidence_scores"] else 0.0
-            }
+                    self.merge_into_consolidation(consolidated, doc_data)
+
+            self.finalize_consolidation(consolidated)
 
             logger.info(
                 f"Document consolidation completed",
@@ -633,4 +598,80 @@ class AutoFillService:
                 "success": False,
                 "error": str(e),
                 "autofill_data": {}
-            }
\ No newline at end of file
+            }
+
+    def start_consolidation(self) -> Dict[str, Any]:
+        """Create an empty consolidation state for incremental merging"""
+        return {
+            "autofill_data": {},
+            "source_documents": [],
+            "field_sources": {},
+            "confidence_scores": {},
+            "validation_notes": {},
+            "consolidation_summary": {}
+        }
+
+    def merge_into_consolidation(
+        self,
+        consolidated: Dict[str, Any],
+        doc_data: Dict[str, Any]
+    ) -> Dict[str, Any]:
+        """
+        Merge one document's auto-fill data into a consolidation state
+
+        Fields already present are replaced only by a higher-confidence value,
+        so documents can be merged as they finish processing.
+
+        Args:
+            consolidated: State from start_consolidation (updated in place)
+            doc_data: Auto-fill data for a single document
+
+        Returns:
+            The updated consolidation state
+        """
+        group_key = f"{doc_data['metadata']['country']}_{doc_data['metadata']['form_type']}"
+
+        for field, value in doc_data["autofill_data"].items():
+            new_confidence = doc_data["confidence_scores"].get(field, 0.0)
+
+            if field not in consolidated["autofill_data"]:
+                # First occurrence of this field
+                consolidated["autofill_data"][field] = value
+                consolidated["field_sources"][field] = group_key
+                consolidated["confidence_scores"][field] = new_confidence
+            elif new_confidence > consolidated["confidence_scores"].get(field, 0.0):
+                # Field already exists - keep higher confidence value
+                consolidated["autofill_data"][field] = value
+                consolidated["field_sources"][field] = group_key
+                consolidated["confidence_scores"][field] = new_confidence
+
+        # Collect source document info
+        consolidated["source_documents"].append({
+            "form_type": doc_data["metadata"]["form_type"],
+            "country": doc_data["metadata"]["country"],
+            "extraction_date": doc_data["metadata"]["extraction_date"],
+            "confidence": doc_data["metadata"]["overall_confidence"]
+        })
+
+        # Merge validation notes
+        for field, notes in doc_data["validation_notes"].items():
+            if field not in consolidated["validation_notes"]:
+                consolidated["validation_notes"][field] = notes
+
+        return consolidated
+
+    def finalize_consolidation(self, consolidated: Dict[str, Any]) -> Dict[str, Any]:
+        """Refresh the consolidation summary; safe to call after every merge"""
+        document_types = {
+            f"{doc['country']}_{doc['form_type']}" for doc in consolidated["source_documents"]
+        }
+        confidences = consolidated["confidence_scores"]
+
+        consolidated["consolidation_summary"] = {
+            "total_documents": len(consolidated["source_documents"]),
+            "document_types": len(document_types),
+            "total_fields": len(consolidated["autofill_data"]),
+            "average_confidence": sum(confidences.values()) / len(confidences) if confidences else 0.0
+        }
+
+        return consolidated
@@ -0,0 +1,315 @@
+"""
+Pooled HTTP client for delivering auto-fill data to the tax calculator service
+"""
+import asyncio
+import random
+import time
+from typing import Dict, Any, List, Optional, Set, Tuple
+from urllib.parse import urlsplit
+import httpx
+
+from app.config import settings
+from app.utils.logging import get_logger
+
+logger = get_logger(__name__)
+
+
+class CircuitOpenError(Exception):
+    """Raised when a destination's circuit breaker is rejecting calls"""
+
+
+class CircuitBreaker:
+    """Consecutive-failure circuit breaker for a single destination"""
+
+    def __init__(self, failure_threshold: int, reset_timeout: float):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.failures = 0
+        self.opened_at: Optional[float] = None
+        self.trial_started_at: Optional[float] = None
+
+    @property
+    def state(self) -> str:
+        """closed, open or half_open"""
+        if self.opened_at is None:
+            return "closed"
+        if time.monotonic() - self.opened_at >= self.reset_timeout:
+            return "half_open"
+        return "open"
+
+    def allow_request(self) -> bool:
+        """
+        Closed circuits let every call through; half-open circuits admit a
+        single trial call until it reports back (or is presumed lost after
+        another reset_timeout)
+        """
+        state = self.state
+        if state == "closed":
+            return True
+        if state == "open":
+            return False
+
+        now = time.monotonic()
+        if self.trial_started_at is not None and now - self.trial_started_at < self.reset_timeout:
+            return False
+        self.trial_started_at = now
+        return True
+
+    def record_success(self):
+        self.failures = 0
+        self.opened_at = None
+        self.trial_started_at = None
+
+    def record_failure(self):
+        self.failures += 1
+        self.trial_started_at = None
+        # A failed half-open trial re-opens immediately
+        if self.failures >= self.failure_threshold or self.opened_at is not None:
+            self.opened_at = time.monotonic()
+
+
+class _AutofillBatcher:
+    """
+    Coalesces auto-fill payloads for one calculator type within a short window
+
+    Calculators that do not expose /autofill/{type}/batch (404/405) get the
+    items as individual /autofill/{type} posts over the pooled client, and
+    later batches for that type skip the batch endpoint.
+    """
+
+    def __init__(self, client: "CalculatorClient", calculator_type: str, window: float, max_size: int):
+        self.client = client
+        self.calculator_type = calculator_type
+        self.window = window
+        self.max_size = max_size
+        self._pending: List[Tuple[Dict[str, Any], asyncio.Future]] = []
+        self._timer: Optional[asyncio.TimerHandle] = None
+        # Sends in flight; the loop only keeps weak references to tasks
+        self._sends: Set[asyncio.Task] = set()
+        self.batch_endpoint_available = True
+
+    async def submit(self, payload: Dict[str, Any]) -> Tuple[int, Any]:
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        self._pending.append((payload, future))
+
+        if len(self._pending) >= self.max_size:
+            self._flush()
+        elif self._timer is None:
+            self._timer = loop.call_later(self.window, self._flush)
+
+        return await future
+
+    def _flush(self):
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+
+        items, self._pending = self._pending, []
+        if items:
+            task = asyncio.ensure_future(self._send(items))
+            self._sends.add(task)
+            task.add_done_callback(lambda task: self._send_done(task, items))
+
+    def _send_done(self, task: asyncio.Task, items: List[Tuple[Dict[str, Any], asyncio.Future]]):
+        """Release a finished send and make sure none of its callers is left waiting"""
+        self._sends.discard(task)
+        if task.cancelled():
+            for _, future in items:
+                future.cancel()
+            return
+
+        error = task.exception()
+        if error is not None:
+            logger.error(f"Batched auto-fill send for {self.calculator_type} failed: {str(error)}")
+            for _, future in items:
+                if not future.done():
+                    future.set_exception(error)
+
+    async def _send(self, items: List[Tuple[Dict[str, Any], asyncio.Future]]):
+        if not self.batch_endpoint_available:
+            await self._send_individually(items)
+            return
+
+        try:
+            status_code, body = await self.client.post_json(
+                f"/autofill/{self.calculator_type}/batch",
+                {"items": [payload for payload, _ in items]}
+            )
+        except Exception as e:
+            for _, future in items:
+                if not future.done():
+                    future.set_exception(e)
+            return
+
+        if status_code in (404, 405):
+            logger.info(f"Calculator has no batch auto-fill endpoint for {self.calculator_type}, posting items individually")
+            self.batch_endpoint_available = False
+            await self._send_individually(items)
+        elif status_code == 200 and isinstance(body, dict) and len(body.get("results", [])) == len(items):
+            # Results are returned in submission order
+            for (_, future), item_result in zip(items, body["results"]):
+                if not future.done():
+                    future.set_result((item_result.get("status_code", 200), item_result))
+        elif status_code == 200:
+            # Unusable batch answer; deliver each item on its own
+            await self._send_individually(items)
+        else:
+            for _, future in items:
+                if not future.done():
+                    future.set_result((status_code, body))
+
+    async def _send_individually(self, items: List[Tuple[Dict[str, Any], asyncio.Future]]):
+        results = await asyncio.gather(
+            *(self.client.post_json(f"/autofill/{self.calculator_type}", payload) for payload, _ in items),
+            return_exceptions=True
+        )
+        for (_, future), result in zip(items, results):
+            if future.done():
+                continue
+            if isinstance(result, BaseException):
+                future.set_exception(result)
+            else:
+                future.set_result(result)
+
+
+class CalculatorClient:
+    """
+    Shared, connection-pooled client for the tax calculator API
+
+    One keep-alive (HTTP/2 when available) connection pool is reused for every
+    document; calls are retried with exponential backoff and guarded by a
+    circuit breaker per destination host. Optionally, auto-fill payloads are
+    coalesced into batch requests.
+    """
+
+    def __init__(self, base_url: Optional[str] = None):
+        self.base_url = (base_url or settings.tax_calculator_api_url).rstrip("/")
+        self.max_retries = settings.calculator_max_retries
+        self.retry_backoff = settings.calculator_retry_backoff
+        self.batch_window = settings.calculator_batch_window_ms / 1000
+        self.batch_max_size = settings.calculator_batch_max_size
+        self._client: Optional[httpx.AsyncClient] = None
+        self._breakers: Dict[str, CircuitBreaker] = {}
+        self._batchers: Dict[str, _AutofillBatcher] = {}
+
+    @property
+    def client(self) -> httpx.AsyncClient:
+        """Lazily created pooled client"""
+        if self._client is None:
+            self._client = httpx.AsyncClient(
+                http2=settings.calculator_http2,
+                limits=httpx.Limits(
+                    max_connections=settings.calculator_max_connections,
+                    max_keepalive_connections=settings.calculator_max_keepalive,
+                    keepalive_expiry=30.0
+                ),
+                timeout=30.0,
+                headers={
+                    "Content-Type": "application/json",
+                    "User-Agent": "FileProcessingService/1.0"
+                }
+            )
+        return self._client
+
+    def _breaker_for(self, url: str) -> CircuitBreaker:
+        destination = urlsplit(url).netloc
+        if destination not in self._breakers:
+            self._breakers[destination] = CircuitBreaker(
+                failure_threshold=settings.circuit_breaker_failure_threshold,
+                reset_timeout=settings.circuit_breaker_reset_seconds
+            )
+        return self._breakers[destination]
+
+    async def post_json(self, path: str, payload: Dict[str, Any]) -> Tuple[int, Any]:
+        """
+        POST JSON with retries, backoff and circuit breaking
+
+        Args:
+            path: Path relative to the calculator API base URL
+            payload: JSON body
+
+        Returns:
+            (status code, decoded JSON body or raw text)
+
+        The breaker is consulted once per call and sees one outcome per
+        call, whatever the number of retries.
+        """
+        url = f"{self.base_url}{path}"
+        breaker = self._breaker_for(url)
+
+        if not breaker.allow_request():
+            raise CircuitOpenError(f"Circuit open for {urlsplit(url).netloc}")
+
+        for attempt in range(self.max_retries + 1):
+            try:
+                response = await self.client.post(url, json=payload)
+            except httpx.TransportError as e:
+                if attempt >= self.max_retries:
+                    breaker.record_failure()
+                    raise
+                logger.warning(f"Calculator request failed ({str(e)}), retrying")
+            else:
+                retryable = response.status_code == 429 or response.status_code >= 500
+                if not retryable:
+                    breaker.record_success()
+                    try:
+                        return response.status_code, response.json()
+                    except ValueError:
+                        return response.status_code, response.text
+
+                if attempt >= self.max_retries:
+                    breaker.record_failure()
+                    return response.status_code, response.text
+                logger.warning(f"Calculator returned {response.status_code}, retrying")
+
+            # Exponential backoff with jitter
+            await asyncio.sleep(self.retry_backoff * (2 ** attempt) * (1 + random.random()))
+
+    async def send_autofill(
+        self,
+        calculator_type: str,
+        payload: Dict[str, Any],
+        batched: bool = False
+    ) -> Tuple[int, Any]:
+        """
+        Deliver one auto-fill payload, optionally coalesced with concurrent ones
+
+        Batched payloads are posted to /autofill/{calculator_type}/batch as
+        {"items": [...]}, and the calculator is expected to answer with
+        {"results": [...]} in the same order. Calculators without that
+        endpoint receive the items as individual /autofill/{calculator_type}
+        posts.
+        """
+        if not batched:
+            return await self.post_json(f"/autofill/{calculator_type}", payload)
+
+        if calculator_type not in self._batchers:
+            self._batchers[calculator_type] = _AutofillBatcher(
+                self, calculator_type, self.batch_window, self.batch_max_size
+            )
+        return await self._batchers[calculator_type].submit(payload)
+
+    def get_status(self) -> Dict[str, Any]:
+        """Circuit breaker state per destination"""
+        return {
+            destination: {"state": breaker.state, "failures": breaker.failures}
+            for destination, breaker in self._breakers.items()
+        }
+
+    async def aclose(self):
+        """Close pooled connections"""
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+
+
+_calculator_client: Optional[CalculatorClient] = None
+
+
+def get_calculator_client() -> CalculatorClient:
+    """Get the process-wide calculator client"""
+    global _calculator_client
+    if _calculator_client is None:
+        _calculator_client = CalculatorClient()
+    return _calculator_client
@@ -16,6 +16,7 @@ from app.config import settings
 from app.models.database import FileUpload, ProcessingStatus, AuditLog
 from app.services.security_service import SecurityService
 from app.services.virus_scanner import VirusScannerService
+from app.services.retention_cleanup import ExpiredFileCleaner
 from app.utils.logging import get_logger
 
 logger = get_logger(__name__)
@@ -304,7 +305,7 @@ class FileService:
 
     async def cleanup_expired_files(self, db: Session) -> int:
         """
-        Clean up expired files
+        Clean up expired files in bounded, separately committed batches
 
         Args:
             db: Database session
@@ -313,25 +314,10 @@ class FileService:
             Number of files cleaned up
         """
         try:
-            expired_files = db.query(FileUpload).filter(
-                FileUpload.expires_at < datetime.utcnow(),
-                FileUpload.deleted_at.is_(None)
-            ).all()
-
-            cleanup_count = 0
-            for file_upload in expired_files:
-                # Delete physical files
-                await self._delete_physical_files(file_upload)
-
-                # Mark as deleted
-                file_upload.deleted_at = datetime.utcnow()
-                file_upload.status = ProcessingStatus.DELETED
-                cleanup_count += 1
-
-            db.commit()
+            summary = ExpiredFileCleaner().run(db)
 
-            logger.info(f"Cleaned up {cleanup_count} expired files")
-            return cleanup_count
+            logger.info(f"Cleaned up {summary['cleaned_up']} expired files")
+            return summary["cleaned_up"]
 
         except Exception as e:
             logger.error(f"Error cleaning up expired files: {str(e)}", exc_info=True)
@@ -30,6 +30,8 @@ class FormRecognitionService:
     def __init__(self):
         self.confidence_threshold = settings.form_confidence_threshold
         self.form_patterns = self._load_form_patterns()
+        self._compiled_patterns = self._compile_form_patterns(self.form_patterns)
+        self._word_regex = re.compile(r'\b\w+\b')
 
     def _load_form_patterns(self) -> List[FormPattern]:
         """Load form recognition patterns"""
@@ -197,6 +199,20 @@ class FormRecognitionService:
 
         return patterns
 
+    def _compile_form_patterns(
+        self,
+        form_patterns: List[FormPattern]
+    ) -> Dict[Tuple[str, str], Dict[str, Any]]:
+        """Precompile recognition and exclusion regexes once per service instance"""
+        compiled = {}
+        for pattern in form_patterns:
+            compiled[(pattern.country, pattern.form_type)] = {
+                "patterns": [re.compile(p, re.IGNORECASE) for p in pattern.patterns],
+                "exclusions": [re.compile(p, re.IGNORECASE) for p in pattern.exclusion_patterns],
+                "keywords": [set(keyword.lower().split()) for keyword in pattern.keywords]
+            }
+        return compiled
+
     async def identify_form_type(self, ocr_text: str, filename: Optional[str] = None) -> Dict[str, Any]:
         """
         Identify the type of tax form from OCR text
@@ -221,11 +237,14 @@ class FormRecognitionService:
 
             # Normalize text for processing
             normalized_text = self._normalize_text(ocr_text)
+            text_words = set(self._word_regex.findall(normalized_text))
 
             # Score each form pattern
             form_scores = []
             for pattern in self.form_patterns:
-                score = await self._calculate_form_score(pattern, normalized_text, filename)
+                score = await self._calculate_form_score(
+                    pattern, normalized_text, filename, text_words
+                )
                 if score > 0:
                     form_scores.append({
                         "form_type": pattern.form_type,
@@ -293,25 +312,46 @@ class FormRecognitionService:
                 "error": str(e)
             }
 
+    async def identify_form_types(
+        self,
+        documents: List[Tuple[str, Optional[str]]]
+    ) -> List[Dict[str, Any]]:
+        """
+        Identify form types for a set of documents
+
+        Args:
+            documents: (ocr_text, filename) pairs
+
+        Returns:
+            Identification results in the same order as the input
+        """
+        logger.info(f"Starting bulk form identification for {len(documents)} documents")
+        return [
+            await self.identify_form_type(ocr_text, filename)
+            for ocr_text, filename in documents
+        ]
+
     async def _calculate_form_score(
         self,
         pattern: FormPattern,
         text: str,
-        filename: Optional[str] = None
+        filename: Optional[str] = None,
+        text_words: Optional[set] = None
     ) -> float:
         """Calculate confidence score for a form pattern"""
         try:
             score = 0.0
+            compiled = self._compiled_patterns[(pattern.country, pattern.form_type)]
 
             # Check for exclusion patterns first
-            for exclusion in pattern.exclusion_patterns:
-                if re.search(exclusion, text, re.IGNORECASE):
+            for exclusion in compiled["exclusions"]:
+                if exclusion.search(text):
                     return 0.0  # Exclude this form type
 
             # Pattern matching
             pattern_matches = 0
-            for pattern_regex in pattern.patterns:
-                if re.search(pattern_regex, text, re.IGNORECASE):
+            for pattern_regex in compiled["patterns"]:
+                if pattern_regex.search(text):
                     pattern_matches += 1
 
             if pattern_matches > 0:
@@ -319,10 +359,10 @@ class FormRecognitionService:
 
             # Keyword matching
             keyword_matches = 0
-            text_words = set(re.findall(r'\b\w+\b', text.lower()))
+            if text_words is None:
+                text_words = set(self._word_regex.findall(text.lower()))
 
-            for keyword in pattern.keywords:
-                keyword_words = set(keyword.lower().split())
+            for keyword_words in compiled["keywords"]:
                 if keyword_words.issubset(text_words):
                     keyword_matches += 1
 
@@ -1,11 +1,13 @@
 """
 OCR processing service using Tesseract
 """
+import asyncio
 import cv2
 import numpy as np
 import pytesseract
 from pathlib import Path
-from typing import Dict, Any, List, Optional, Tuple
+from typing import Dict, Any, List, Optional, Tuple, AsyncIterator
+from concurrent.futures import Executor, ThreadPoolExecutor
 from PIL import Image, ImageEnhance, ImageFilter
 from pdf2image import convert_from_path
 import tempfile
@@ -57,44 +59,11 @@ class OCRService:
 
             # Process each page
             pages_data = []
-            all_text = []
-            total_confidence = 0
-
             for i, image in enumerate(images):
                 page_result = await self._process_image(image, page_number=i + 1)
                 pages_data.append(page_result)
-                all_text.append(page_result["text"])
-                total_confidence += page_result["confidence"]
-
-            # Calculate overall confidence
-            overall_confidence = total_confidence / len(images) if images else 0
 
-            # Combine all text
-            combined_text = "\n\n".join(all_text)
-
-            result = {
-                "success": True,
-                "pages": pages_data,
-                "page_count": len(images),
-                "raw_text": combined_text,
-                "confidence": overall_confidence,
-                "processing_info": {
-                    "tesseract_version": pytesseract.get_tesseract_version(),
-                    "languages": self.languages,
-                    "dpi": self.dpi
-                }
-            }
-
-            logger.info(
-                f"OCR processing completed successfully",
-                extra={
-                    "page_count": len(images),
-                    "confidence": overall_confidence,
-                    "text_length": len(combined_text)
-                }
-            )
-
-            return result
+            return self._build_document_result(pages_data)
 
         except Exception as e:
             logger.error(f"Error in OCR processing: {str(e)}", exc_info=True)
@@ -106,6 +75,102 @@ class OCRService:
                 "confidence": 0
             }
 
+    async def process_documents(
+        self,
+        file_paths: List[Path],
+        executor: Optional[Executor] = None
+    ) -> AsyncIterator[Tuple[Path, Dict[str, Any]]]:
+        """
+        OCR a set of documents with one page pool shared across the whole set
+
+        Pages from every document are queued on the same executor, so a large
+        PDF does not hold up the single-page images uploaded with it.
+
+        Args:
+            file_paths: Paths to the document files
+            executor: Optional executor to run pages on; a temporary pool is used otherwise
+
+        Yields:
+            (file_path, OCR result) tuples in completion order
+        """
+        loop = asyncio.get_running_loop()
+        pool = executor or ThreadPoolExecutor(max_workers=settings.ocr_batch_workers)
+
+        def run_blocking(coro_fn, *args):
+            # The image helpers are coroutines but do blocking CPU/subprocess work,
+            # so each one runs to completion on a pool thread
+            return loop.run_in_executor(pool, lambda: asyncio.run(coro_fn(*args)))
+
+        async def run_document(file_path: Path) -> Tuple[Path, Dict[str, Any]]:
+            try:
+                images = await run_blocking(self._convert_to_images, file_path)
+                if not images:
+                    return file_path, {
+                        "success": False,
+                        "error": "Could not convert file to images for OCR processing",
+                        "pages": [],
+                        "raw_text": "",
+                        "confidence": 0
+                    }
+
+                pages_data = await asyncio.gather(*[
+                    run_blocking(self._process_image, image, i + 1)
+                    for i, image in enumerate(images)
+                ])
+                return file_path, self._build_document_result(list(pages_data))
+
+            except Exception as e:
+                logger.error(f"Error in batch OCR for {file_path}: {str(e)}", exc_info=True)
+                return file_path, {
+                    "success": False,
+                    "error": str(e),
+                    "pages": [],
+                    "raw_text": "",
+                    "confidence": 0
+                }
+
+        try:
+            for next_done in asyncio.as_completed([run_document(path) for path in file_paths]):
+                yield await next_done
+        finally:
+            if executor is None:
+                pool.shutdown(wait=False)
+
+    def _build_document_result(self, pages_data: List[Dict[str, Any]]) -> Dict[str, Any]:
+        """Combine per-page OCR results into a document result"""
+        all_text = [page["text"] for page in pages_data]
+        total_confidence = sum(page["confidence"] for page in pages_data)
+
+        # Calculate overall confidence
+        overall_confidence = total_confidence / len(pages_data) if pages_data else 0
+
+        # Combine all text
+        combined_text = "\n\n".join(all_text)
+
+        result = {
+            "success": True,
+            "pages": pages_data,
+            "page_count": len(pages_data),
+            "raw_text": combined_text,
+            "confidence": overall_confidence,
+            "processing_info": {
+                "tesseract_version": pytesseract.get_tesseract_version(),
+                "languages": self.languages,
+                "dpi": self.dpi
+            }
+        }
+
+        logger.info(
+            f"OCR processing completed successfully",
+            extra={
+                "page_count": len(pages_data),
+                "confidence": overall_confidence,
+                "text_length": len(combined_text)
+            }
+        )
+
+        return result
+
     async def _convert_to_images(self, file_path: Path) -> List[Image.Image]:
         """Convert file to images for OCR processing"""
         try:
@@ -0,0 +1,227 @@
+"""
+Batched retention cleanup for expired files and aged records
+"""
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, Any, List, Optional, Callable, Tuple
+from sqlalchemy import tuple_
+from sqlalchemy.orm import Session
+
+from app.config import settings
+from app.models.database import FileUpload, ProcessingStatus, AuditLog
+from app.utils.logging import get_logger
+
+logger = get_logger(__name__)
+
+
+def unlink_upload_files(file_path: Optional[str], encrypted_path: Optional[str]) -> Tuple[bool, str]:
+    """Remove an upload's plain and encrypted files; missing files count as removed"""
+    try:
+        for path in (file_path, encrypted_path):
+            if path:
+                Path(path).unlink(missing_ok=True)
+        return True, "deleted"
+    except Exception as e:
+        return False, str(e)
+
+
+class ExpiredFileCleaner:
+    """
+    Keyset-paginated cleanup of expired file uploads
+
+    Expired rows are read in (expires_at, id) order in bounded batches of
+    lightweight column tuples. Each batch unlinks its files concurrently on a
+    thread pool, marks the successfully removed rows deleted with one bulk
+    UPDATE, records audit entries, and commits before the next batch, so locks
+    are held for one batch at a time. A pause between batches rate-limits the
+    I/O, and a run stops after max_batches, returning a cursor to resume from.
+    """
+
+    def __init__(
+        self,
+        delete_files: Callable[[Optional[str], Optional[str]], Tuple[bool, str]] = unlink_upload_files,
+        batch_size: Optional[int] = None,
+        io_workers: Optional[int] = None,
+        batch_pause_seconds: Optional[float] = None,
+        max_batches: Optional[int] = None,
+        audit_event_type: str = "expired_cleanup"
+    ):
+        self.delete_files = delete_files
+        self.batch_size = batch_size or settings.cleanup_batch_size
+        self.io_workers = io_workers or settings.cleanup_io_workers
+        self.batch_pause_seconds = (
+            settings.cleanup_batch_pause_seconds if batch_pause_seconds is None else batch_pause_seconds
+        )
+        self.max_batches = max_batches or settings.cleanup_max_batches_per_run
+        self.audit_event_type = audit_event_type
+
+    def run(
+        self,
+        db: Session,
+        now: Optional[datetime] = None,
+        resume_after: Optional[Tuple[str, str]] = None
+    ) -> Dict[str, Any]:
+        """
+        Clean expired files in batches
+
+        Args:
+            db: Database session
+            now: Expiry cut-off (defaults to the current time)
+            resume_after: (expires_at ISO string, id) cursor returned by a previous run
+
+        Returns:
+            Cleanup summary with a resume cursor when more rows remain
+        """
+        now = now or datetime.utcnow()
+        cursor = (
+            (datetime.fromisoformat(resume_after[0]), uuid.UUID(resume_after[1])) if resume_after else None
+        )
+
+        summary = {
+            "cleaned_up": 0,
+            "errors": 0,
+            "batches": 0,
+            "complete": False,
+            "resume_after": None,
+            "error_details": []
+        }
+
+        with ThreadPoolExecutor(max_workers=self.io_workers, thread_name_prefix="cleanup-io") as pool:
+            while summary["batches"] < self.max_batches:
+                batch = self._next_batch(db, now, cursor)
+                if not batch:
+                    summary["complete"] = True
+                    break
+
+                cleaned, errors = self._process_batch(db, pool, batch, now)
+                summary["cleaned_up"] += len(cleaned)
+                summary["errors"] += len(errors)
+                summary["error_details"].extend(errors)
+                summary["batches"] += 1
+
+                # Failed rows stay undeleted; the cursor moves past them so a run never spins on them
+                last = batch[-1]
+                cursor = (last.expires_at, last.id)
+
+                if len(batch) < self.batch_size:
+                    summary["complete"] = True
+                    break
+
+                if self.batch_pause_seconds:
+                    time.sleep(self.batch_pause_seconds)
+
+        if not summary["complete"] and cursor:
+            summary["resume_after"] = [cursor[0].isoformat(), str(cursor[1])]
+
+        logger.info(
+            f"Expired file cleanup pass finished",
+            extra={key: value for key, value in summary.items() if key != "error_details"}
+        )
+        return summary
+
+    def _next_batch(self, db: Session, now: datetime, cursor: Optional[Tuple[datetime, Any]]) -> List[Any]:
+        """Fetch the next page of expired rows after the cursor"""
+        query = db.query(
+            FileUpload.id,
+            FileUpload.user_id,
+            FileUpload.file_path,
+            FileUpload.encrypted_path,
+            FileUpload.expires_at
+        ).filter(
+            FileUpload.expires_at < now,
+            FileUpload.deleted_at.is_(None)
+        )
+
+        if cursor:
+            query = query.filter(tuple_(FileUpload.expires_at, FileUpload.id) > tuple_(*cursor))
+
+        return query.order_by(FileUpload.expires_at, FileUpload.id).limit(self.batch_size).all()
+
+    def _process_batch(
+        self,
+        db: Session,
+        pool: ThreadPoolExecutor,
+        batch: List[Any],
+        now: datetime
+    ) -> Tuple[List[Any], List[str]]:
+        """Unlink a batch concurrently, then bulk-mark and audit the removed rows"""
+        outcomes = list(pool.map(
+            lambda row: self.delete_files(row.file_path, row.encrypted_path),
+            batch
+        ))
+
+        cleaned = [row for row, (success, _) in zip(batch, outcomes) if success]
+        errors = [
+            f"Failed to delete expired file {row.id}: {message}"
+            for row, (success, message) in zip(batch, outcomes) if not success
+        ]
+
+        if cleaned:
+            db.query(FileUpload).filter(
+                FileUpload.id.in_([row.id for row in cleaned])
+            ).update(
+                {FileUpload.deleted_at: now, FileUpload.status: ProcessingStatus.DELETED},
+                synchronize_session=False
+            )
+
+            db.bulk_insert_mappings(AuditLog, [
+                {
+                    "file_upload_id": row.id,
+                    "user_id": row.user_id,
+                    "event_type": self.audit_event_type,
+                    "event_description": "Expired file removed by retention cleanup",
+                    "event_details": {"expired_at": row.expires_at.isoformat()},
+                    "gdpr_relevant": True
+                }
+                for row in cleaned
+            ])
+
+        db.commit()
+        return cleaned, errors
+
+
+def purge_in_batches(
+    db: Session,
+    model,
+    *criteria,
+    batch_size: Optional[int] = None,
+    batch_pause_seconds: Optional[float] = None,
+    max_batches: Optional[int] = None
+) -> Dict[str, Any]:
+    """
+    Delete rows matching criteria in bounded, separately committed batches
+
+    Args:
+        db: Database session
+        model: Mapped class with id and created_at columns
+        criteria: Filter expressions selecting rows to purge
+
+    Returns:
+        Number of rows deleted and whether the purge finished
+    """
+    batch_size = batch_size or settings.cleanup_batch_size
+    pause = settings.cleanup_batch_pause_seconds if batch_pause_seconds is None else batch_pause_seconds
+    max_batches = max_batches or settings.cleanup_max_batches_per_run
+
+    deleted = 0
+    for _ in range(max_batches):
+        ids = [
+            row.id for row in db.query(model.id).filter(*criteria)
+            .order_by(model.created_at, model.id).limit(batch_size)
+        ]
+        if not ids:
+            return {"deleted": deleted, "complete": True}
+
+        deleted += db.query(model).filter(model.id.in_(ids)).delete(synchronize_session=False)
+        db.commit()
+
+        if len(ids) < batch_size:
+            return {"deleted": deleted, "complete": True}
+
+        if pause:
+            time.sleep(pause)
+
+    return {"deleted": deleted, "complete": False}
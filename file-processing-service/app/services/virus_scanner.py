@@ -4,7 +4,7 @@ Virus scanning service using ClamAV
 import asyncio
 import socket
 from pathlib import Path
-from typing import Dict, Any, Optional
+from typing import Dict, Any, Optional, List
 from app.config import settings
 from app.utils.logging import get_logger
 
@@ -56,26 +56,7 @@ class VirusScannerService:
                 timeout=self.timeout
             )
 
-            # Send INSTREAM command
-            writer.write(b"zINSTREAM\0")
-            await writer.drain()
-
-            # Send file content in chunks
-            chunk_size = 4096
-            with open(file_path, "rb") as f:
-                while True:
-                    chunk = f.read(chunk_size)
-                    if not chunk:
-                        break
-
-                    # Send chunk size (4 bytes, network byte order)
-                    size = len(chunk).to_bytes(4, byteorder='big')
-                    writer.write(size + chunk)
-                    await writer.drain()
-
-            # Send zero-length chunk to indicate end
-            writer.write(b"\x00\x00\x00\x00")
-            await writer.drain()
+            await self._send_instream(writer, file_path)
 
             # Read response
             response = await asyncio.wait_for(
@@ -86,25 +67,7 @@ class VirusScannerService:
             writer.close()
             await writer.wait_closed()
 
-            # Parse response
-            response_str = response.decode('utf-8').strip()
-
-            if "OK" in response_str:
-                return {
-                    "status": "clean",
-                    "details": "File is clean"
-                }
-            elif "FOUND" in response_str:
-                virus_name = response_str.split(":")[1].strip() if ":" in response_str else "Unknown"
-                return {
-                    "status": "infected",
-                    "details": f"Virus found: {virus_name}"
-                }
-            else:
-                return {
-                    "status": "error",
-                    "details": f"Unexpected response: {response_str}"
-                }
+            return self._parse_scan_response(response)
 
         except asyncio.TimeoutError:
             return {
@@ -122,6 +85,120 @@ class VirusScannerService:
                 "details": f"Scan error: {str(e)}"
             }
 
+    async def scan_files(self, file_paths: List[Path]) -> Dict[Path, Dict[str, Any]]:
+        """
+        Scan several files over a single ClamAV connection (IDSESSION)
+
+        Args:
+            file_paths: Paths of the files to scan
+
+        Returns:
+            Dictionary mapping each path to its scan result
+        """
+        if not self.enabled:
+            return {
+                path: {"status": "skipped", "details": "Virus scanning is disabled"}
+                for path in file_paths
+            }
+
+        results: Dict[Path, Dict[str, Any]] = {}
+        writer = None
+
+        try:
+            reader, writer = await asyncio.wait_for(
+                asyncio.open_connection(self.host, self.port),
+                timeout=self.timeout
+            )
+
+            writer.write(b"zIDSESSION\0")
+            await writer.drain()
+
+            # Commands are sent one at a time so each reply maps to its file
+            for path in file_paths:
+                try:
+                    await self._send_instream(writer, path)
+                    reply = await asyncio.wait_for(
+                        reader.readuntil(b"\0"),
+                        timeout=self.timeout
+                    )
+                    # Session replies are prefixed with the command id: "<id>: stream: OK"
+                    results[path] = self._parse_scan_response(reply.split(b":", 1)[-1])
+                except (FileNotFoundError, PermissionError, IsADirectoryError) as e:
+                    # Raised by open() before INSTREAM is sent, so the session is still in step
+                    results[path] = {"status": "error", "details": f"Scan error: {str(e)}"}
+
+            writer.write(b"zEND\0")
+            await writer.drain()
+
+        except asyncio.TimeoutError:
+            logger.error("ClamAV session scan timed out")
+        except ConnectionRefusedError:
+            logger.error("Cannot connect to ClamAV daemon for session scan")
+        except Exception as e:
+            logger.error(f"Error in ClamAV session scan: {str(e)}", exc_info=True)
+        finally:
+            if writer is not None:
+                writer.close()
+                try:
+                    await writer.wait_closed()
+                except Exception:
+                    pass
+
+        # Anything not scanned before the session failed is reported as an error
+        for path in file_paths:
+            results.setdefault(path, {
+                "status": "error",
+                "details": "Scan session ended before file was scanned"
+            })
+
+        return results
+
+    async def _send_instream(self, writer: asyncio.StreamWriter, file_path: Path):
+        """Stream a file to ClamAV with the INSTREAM command"""
+        chunk_size = 4096
+        # Opened before the command: once INSTREAM is sent clamd reads chunks
+        # until the terminator, so an unreadable file must fail before that
+        with open(file_path, "rb") as f:
+            # Send INSTREAM command
+            writer.write(b"zINSTREAM\0")
+            await writer.drain()
+
+            # Send file content in chunks
+            while True:
+                chunk = f.read(chunk_size)
+                if not chunk:
+                    break
+
+                # Send chunk size (4 bytes, network byte order)
+                size = len(chunk).to_bytes(4, byteorder='big')
+                writer.write(size + chunk)
+                await writer.drain()
+
+        # Send zero-length chunk to indicate end
+        writer.write(b"\x00\x00\x00\x00")
+        await writer.drain()
+
+    def _parse_scan_response(self, response: bytes) -> Dict[str, Any]:
+        """Parse a ClamAV scan reply"""
+        response_str = response.decode('utf-8').strip().strip("\0")
+
+        if "OK" in response_str:
+            return {
+                "status": "clean",
+                "details": "File is clean"
+            }
+        elif "FOUND" in response_str:
+            virus_name = response_str.split(":")[1].strip() if ":" in response_str else "Unknown"
+            return {
+                "status": "infected",
+                "details": f"Virus found: {virus_name}"
+            }
+        else:
+            return {
+                "status": "error",
+                "details": f"Unexpected response: {response_str}"
+            }
+
     async def ping(self) -> bool:
         """Check if ClamAV daemon is responsive"""
         if not self.enabled:
@@ -17,8 +17,10 @@ celery_app.conf.update(
     # Task routing
     task_routes={
         'app.tasks.processing_tasks.process_document': {'queue': 'processing'},
+        'app.tasks.processing_tasks.process_document_batch': {'queue': 'processing'},
         'app.tasks.processing_tasks.cleanup_expired_files': {'queue': 'cleanup'},
         'app.tasks.processing_tasks.generate_statistics': {'queue': 'stats'},
+        'app.tasks.processing_tasks.rollup_audit_logs': {'queue': 'stats'},
     },
 
     # Worker configuration
@@ -57,7 +59,11 @@ celery_app.conf.update(
         },
         'generate-statistics': {
             'task': 'app.tasks.processing_tasks.generate_statistics',
-            'schedule': 21600.0,  # Run every 6 hours
+            'schedule': 3600.0,  # Run every hour (incremental rollup)
+        },
+        'rollup-audit-logs': {
+            'task': 'app.tasks.processing_tasks.rollup_audit_logs',
+            'schedule': 3600.0,  # Run every hour
         },
         'health-check': {
             'task': 'app.tasks.processing_tasks.health_check',
@@ -1,27 +1,36 @@
 """
 Celery tasks for document processing
 """
-import asyncio
 import traceback
-from datetime import datetime, timedelta
+from datetime import datetime, timedelta, timezone
 from pathlib import Path
-from typing import Dict, Any, Optional
+from typing import Dict, Any, List, Optional
 from celery import Task
+from sqlalchemy import distinct, func
 from sqlalchemy.orm import Session
 
+from app.config import settings
 from app.tasks.celery_app import celery_app
+from app.tasks.worker_context import WorkerServiceContainer, StageTimer, get_worker_container
 from app.database import SessionLocal
-from app.models.database import FileUpload, ProcessingJob, ProcessingStatistics, AuditLog
-from app.services.file_service import FileService
-from app.services.ocr_service import OCRService
-from app.services.form_recognition_service import FormRecognitionService
-from app.services.data_extraction_service import DataExtractionService
-from app.services.autofill_service import AutoFillService
-from app.services.virus_scanner import VirusScannerService
+from app.models.database import (
+    FileUpload, ProcessingJob, ProcessingStatistics, ProcessingStatus, AuditLog, ExtractedData
+)
+from app.services.retention_cleanup import ExpiredFileCleaner
+from app.security.audit import audit_logger
 from app.utils.logging import get_logger
 
 logger = get_logger(__name__)
 
+# Upload statuses counted as pending in processing statistics
+PENDING_STATUSES = [
+    ProcessingStatus.UPLOADED,
+    ProcessingStatus.SCANNING,
+    ProcessingStatus.PROCESSING,
+    ProcessingStatus.EXTRACTING,
+    ProcessingStatus.VALIDATING
+]
+
 
 class CallbackTask(Task):
     """Custom Celery task class with callback support"""
@@ -93,166 +102,27 @@ def process_document(self, file_id: int, user_id: Optional[str] = None) -> Dict[
     Returns:
         Processing results
     """
+    container = get_worker_container()
+
     try:
         logger.info(f"Starting document processing for file_id: {file_id}")
 
-        # Get database session
-        db = SessionLocal()
-
-        try:
-            # Get file record
-            file_record = db.query(FileUpload).filter(FileUpload.id == file_id).first()
-            if not file_record:
-                raise ValueError(f"File with ID {file_id} not found")
-
-            # Update job status
-            job = db.query(ProcessingJob).filter(
-                ProcessingJob.celery_task_id == self.request.id
-            ).first()
-
-            if job:
-                job.status = "processing"
-                job.started_at = datetime.utcnow()
-                db.commit()
-
-            # Initialize services
-            file_service = FileService()
-            virus_scanner = VirusScannerService()
-            ocr_service = OCRService()
-            form_recognition = FormRecognitionService()
-            data_extraction = DataExtractionService()
-            autofill_service = AutoFillService()
-
-            file_path = Path(file_record.file_path)
-            results = {
-                "file_id": file_id,
-                "filename": file_record.filename,
-                "processing_steps": {},
-                "final_result": {}
-            }
-
-            # Step 1: Virus scanning
-            logger.info("Starting virus scan")
-            scan_result = await virus_scanner.scan_file(file_path)
-            results["processing_steps"]["virus_scan"] = scan_result
-
-            if scan_result.get("status") == "infected":
-                # Mark file as infected and stop processing
-                file_record.processing_status = "failed"
-                file_record.error_message = "File infected with virus"
-                db.commit()
-                raise ValueError(f"File infected: {scan_result.get('details')}")
-
-            # Step 2: OCR Processing
-            logger.info("Starting OCR processing")
-            ocr_result = await ocr_service.process_document(file_path)
-            results["processing_steps"]["ocr"] = {
-                "success": ocr_result["success"],
-                "confidence": ocr_result.get("confidence", 0),
-                "page_count": ocr_result.get("page_count", 0),
-                "text_length": len(ocr_result.get("raw_text", ""))
-            }
-
-            if not ocr_result["success"]:
-                raise ValueError(f"OCR processing failed: {ocr_result.get('error')}")
-
-            raw_text = ocr_result["raw_text"]
-
-            # Step 3: Form Recognition
-            logger.info("Starting form recognition")
-            form_result = await form_recognition.identify_form_type(
-                raw_text,
-                file_record.filename
-            )
-            results["processing_steps"]["form_recognition"] = form_result
-
-            if form_result["form_type"] == "unknown":
-                logger.warning("Could not identify form type")
-                # Continue processing but with unknown form
-
-            # Step 4: Data Extraction
-            logger.info("Starting data extraction")
-            extraction_result = await data_extraction.extract_form_data(
-                raw_text,
-                form_result["form_type"],
-                form_result["country"]
-            )
-            results["processing_steps"]["data_extraction"] = {
-                "success": extraction_result["success"],
-                "fields_extracted": len(extraction_result.get("extracted_fields", {})),
-                "confidence": extraction_result.get("overall_confidence", 0)
-            }
-
-            if not extraction_result["success"]:
-                logger.warning(f"Data extraction issues: {extraction_result.get('error')}")
-                # Continue with partial data
-
-            # Step 5: Auto-fill Integration
-            logger.info("Starting auto-fill integration")
-            autofill_result = await autofill_service.prepare_autofill_data(
-                extraction_result.get("extracted_fields", {}),
-                form_result["form_type"],
-                form_result["country"]
+        with container.db_session() as db:
+            return container.run(
+                _run_document_pipeline(container, db, self.request.id, file_id, user_id)
             )
-            results["processing_steps"]["autofill"] = {
-                "success": autofill_result["success"],
-                "completeness": autofill_result.get("completeness", 0),
-                "mapped_fields": len(autofill_result.get("mapped_fields", {}))
-            }
-
-            # Prepare final result
-            results["final_result"] = {
-                "form_type": form_result["form_type"],
-                "country": form_result["country"],
-                "tax_year": form_result.get("tax_year"),
-                "confidence": form_result["confidence"],
-                "extracted_data": extraction_result.get("extracted_fields", {}),
-                "autofill_data": autofill_result.get("mapped_fields", {}),
-                "completeness": autofill_result.get("completeness", 0),
-                "recommendations": autofill_result.get("recommendations", [])
-            }
-
-            # Update file record
-            file_record.processing_status = "completed"
-            file_record.form_type = form_result["form_type"]
-            file_record.confidence_score = form_result["confidence"]
-            file_record.processed_at = datetime.utcnow()
-
-            # Create audit log entry
-            audit_log = AuditLog(
-                file_id=file_id,
-                action="document_processed",
-                user_id=user_id,
-                details={
-                    "form_type": form_result["form_type"],
-                    "confidence": form_result["confidence"],
-                    "processing_time": (datetime.utcnow() - job.created_at).total_seconds() if job else None
-                }
-            )
-            db.add(audit_log)
-
-            db.commit()
-            logger.info(f"Document processing completed for file_id: {file_id}")
-
-            return results
-
-        finally:
-            db.close()
 
     except Exception as e:
         logger.error(f"Error processing document {file_id}: {str(e)}", exc_info=True)
 
         # Update database on error
         try:
-            db = SessionLocal()
-            try:
+            with container.db_session() as db:
                 file_record = db.query(FileUpload).filter(FileUpload.id == file_id).first()
                 if file_record:
                     file_record.processing_status = "failed"
                     file_record.error_message = str(e)
                     db.commit()
-            finally:
-                db.close()
         except Exception as db_error:
             logger.error(f"Error updating database on processing failure: {str(db_error)}")
 
@@ -260,56 +130,410 @@ def process_document(self, file_id: int, user_id: Optional[str] = None) -> Dict[
         raise self.retry(exc=e, countdown=60)
 
 
+async def _run_document_pipeline(
+    container: WorkerServiceContainer,
+    db: Session,
+    task_id: str,
+    file_id: int,
+    user_id: Optional[str] = None
+) -> Dict[str, Any]:
+    """Run scan, OCR, recognition, extraction and auto-fill using the worker's warm services"""
+    timer = StageTimer()
+
+    # Get file record
+    file_record = db.query(FileUpload).filter(FileUpload.id == file_id).first()
+    if not file_record:
+        raise ValueError(f"File with ID {file_id} not found")
+
+    # Update job status
+    job = db.query(ProcessingJob).filter(
+        ProcessingJob.celery_task_id == task_id
+    ).first()
+
+    if job:
+        job.status = "processing"
+        job.started_at = datetime.utcnow()
+        db.commit()
+
+    file_path = Path(file_record.file_path)
+    results = {
+        "file_id": file_id,
+        "filename": file_record.filename,
+        "processing_steps": {},
+        "final_result": {}
+    }
+
+    # Step 1: Virus scanning
+    logger.info("Starting virus scan")
+    with timer.stage("virus_scan"):
+        scan_result = await container.virus_scanner.scan_file(file_path)
+    results["processing_steps"]["virus_scan"] = scan_result
+
+    if scan_result.get("status") == "infected":
+        # Mark file as infected and stop processing
+        file_record.processing_status = "failed"
+        file_record.error_message = "File infected with virus"
+        db.commit()
+        raise ValueError(f"File infected: {scan_result.get('details')}")
+
+    # Step 2: OCR Processing
+    logger.info("Starting OCR processing")
+    with timer.stage("ocr"):
+        ocr_result = await container.ocr_service.process_document(file_path)
+    results["processing_steps"]["ocr"] = {
+        "success": ocr_result["success"],
+        "confidence": ocr_result.get("confidence", 0),
+        "page_count": ocr_result.get("page_count", 0),
+        "text_length": len(ocr_result.get("raw_text", ""))
+    }
+
+    if not ocr_result["success"]:
+        raise ValueError(f"OCR processing failed: {ocr_result.get('error')}")
+
+    raw_text = ocr_result["raw_text"]
+
+    analysis = await _analyze_document_text(
+        container, timer, raw_text, file_record.filename, user_id
+    )
+    results["processing_steps"].update(analysis["processing_steps"])
+    results["final_result"] = analysis["final_result"]
+    form_result = analysis["form_result"]
+
+    # Update file record
+    file_record.processing_status = "completed"
+    file_record.form_type = form_result["form_type"]
+    file_record.confidence_score = form_result["confidence"]
+    file_record.processed_at = datetime.utcnow()
+
+    results["stage_timings_ms"] = timer.summary()
+
+    # Create audit log entry
+    audit_log = AuditLog(
+        file_id=file_id,
+        action="document_processed",
+        user_id=user_id,
+        details={
+            "form_type": form_result["form_type"],
+            "confidence": form_result["confidence"],
+            "processing_time": (datetime.utcnow() - job.created_at).total_seconds() if job else None,
+            "stage_timings_ms": results["stage_timings_ms"]
+        }
+    )
+    db.add(audit_log)
+
+    db.commit()
+    logger.info(
+        f"Document processing completed for file_id: {file_id}",
+        extra={"stage_timings_ms": results["stage_timings_ms"]}
+    )
+
+    return results
+
+
+async def _analyze_document_text(
+    container: WorkerServiceContainer,
+    timer: StageTimer,
+    raw_text: str,
+    filename: str,
+    user_id: Optional[str] = None
+) -> Dict[str, Any]:
+    """Run form recognition, data extraction and auto-fill on a document's OCR text"""
+    processing_steps = {}
+
+    # Step 3: Form Recognition
+    logger.info("Starting form recognition")
+    with timer.stage("form_recognition"):
+        form_result = await container.form_recognition.identify_form_type(
+            raw_text,
+            filename
+        )
+    processing_steps["form_recognition"] = form_result
+
+    if form_result["form_type"] == "unknown":
+        logger.warning("Could not identify form type")
+        # Continue processing but with unknown form
+
+    # Step 4: Data Extraction
+    logger.info("Starting data extraction")
+    with timer.stage("data_extraction"):
+        extraction_result = await container.data_extraction.extract_form_data(
+            form_type=form_result["form_type"],
+            country=form_result["country"],
+            ocr_text=raw_text
+        )
+    processing_steps["data_extraction"] = {
+        "success": extraction_result["success"],
+        "fields_extracted": len(extraction_result.get("extracted_fields", {})),
+        "confidence": extraction_result.get("overall_confidence", 0)
+    }
+
+    if not extraction_result["success"]:
+        logger.warning(f"Data extraction issues: {extraction_result.get('error')}")
+        # Continue with partial data
+
+    # Step 5: Auto-fill Integration
+    logger.info("Starting auto-fill integration")
+    with timer.stage("autofill"):
+        autofill_result = await container.autofill_service.prepare_autofill_data(
+            extracted_data=extraction_result,
+            form_type=form_result["form_type"],
+            country=form_result["country"],
+            user_id=user_id
+        )
+    processing_steps["autofill"] = {
+        "success": autofill_result["success"],
+        "completeness": autofill_result.get("completeness", 0),
+        "mapped_fields": len(autofill_result.get("autofill_data", {}))
+    }
+
+    # Prepare final result
+    final_result = {
+        "form_type": form_result["form_type"],
+        "country": form_result["country"],
+        "tax_year": form_result.get("tax_year"),
+        "confidence": form_result["confidence"],
+        "extracted_data": extraction_result.get("extracted_fields", {}),
+        "autofill_data": autofill_result.get("autofill_data", {}),
+        "completeness": autofill_result.get("completeness", 0),
+        "recommendations": autofill_result.get("recommendations", [])
+    }
+
+    return {
+        "processing_steps": processing_steps,
+        "final_result": final_result,
+        "form_result": form_result,
+        "autofill_result": autofill_result
+    }
+
+
 @celery_app.task(bind=True, max_retries=1)
-def cleanup_expired_files(self):
-    """Clean up expired files and associated data"""
+def process_document_batch(self, file_ids: List[int], user_id: Optional[str] = None) -> Dict[str, Any]:
+    """
+    Process a user's whole upload set as one pipelined job
+
+    All files are virus scanned in one ClamAV session and OCR'd on the worker's
+    shared page pool; each document is classified, extracted and merged into
+    the consolidated auto-fill data as soon as its OCR finishes, and partial
+    results are published as PROGRESS task state.
+
+    Args:
+        file_ids: IDs of the uploaded files
+        user_id: Optional user ID for tracking
+
+    Returns:
+        Per-document results and the consolidated auto-fill data
+    """
+    container = get_worker_container()
+
     try:
-        logger.info("Starting cleanup of expired files")
+        logger.info(f"Starting batch processing for {len(file_ids)} files")
 
-        db = SessionLocal()
-        try:
-            file_service = FileService()
+        with container.db_session() as db:
+            return container.run(
+                _run_batch_pipeline(container, db, self, file_ids, user_id)
+            )
 
-            # Get expired files
-            expired_files = db.query(FileUpload).filter(
-                FileUpload.expires_at < datetime.utcnow(),
-                FileUpload.deleted_at.is_(None)
-            ).all()
+    except Exception as e:
+        logger.error(f"Error in batch processing: {str(e)}", exc_info=True)
+        raise
 
-            cleanup_count = 0
-            error_count = 0
 
-            for file_record in expired_files:
-                try:
-                    # Delete file from storage
-                    file_path = Path(file_record.file_path)
-                    if file_path.exists():
-                        file_path.unlink()
+async def _run_batch_pipeline(
+    container: WorkerServiceContainer,
+    db: Session,
+    task: Task,
+    file_ids: List[int],
+    user_id: Optional[str] = None
+) -> Dict[str, Any]:
+    """Pipeline scan, OCR and analysis across a set of documents"""
+    timer = StageTimer()
+    autofill_service = container.autofill_service
+    consolidated = autofill_service.start_consolidation()
+    documents: Dict[str, Dict[str, Any]] = {}
+
+    file_records = {
+        record.id: record
+        for record in db.query(FileUpload).filter(FileUpload.id.in_(file_ids)).all()
+    }
+    jobs = {
+        job.file_upload_id: job
+        for job in db.query(ProcessingJob).filter(
+            ProcessingJob.job_id.like(f"{task.request.id}:%")
+        ).all()
+    }
+
+    def finish_document(file_id, status: str, result: Dict[str, Any]):
+        documents[str(file_id)] = {"status": status, **result}
+        job = jobs.get(file_id)
+        if job:
+            job.status = status
+            job.updated_at = datetime.utcnow()
+            if status == "completed":
+                job.completed_at = datetime.utcnow()
+                job.result = result
+            else:
+                job.error_message = result.get("error")
+        db.commit()
+
+        # Publish partial results so callers can render documents as they land
+        task.update_state(state="PROGRESS", meta=_batch_progress(file_ids, documents, consolidated))
+
+    for file_id in file_ids:
+        if file_id not in file_records:
+            finish_document(file_id, "failed", {"error": f"File with ID {file_id} not found"})
+
+    for job in jobs.values():
+        job.status = "processing"
+        job.started_at = datetime.utcnow()
+    db.commit()
+
+    # Step 1: Virus scan the whole set over one ClamAV session
+    paths = {Path(record.file_path): file_id for file_id, record in file_records.items()}
+    with timer.stage("virus_scan"):
+        scan_results = await container.virus_scanner.scan_files(list(paths))
+
+    clean_paths = []
+    for path, scan_result in scan_results.items():
+        file_id = paths[path]
+        if scan_result.get("status") == "infected":
+            file_records[file_id].status = "failed"
+            finish_document(file_id, "failed", {
+                "error": f"File infected: {scan_result.get('details')}",
+                "virus_scan": scan_result
+            })
+        else:
+            clean_paths.append(path)
+
+    # Steps 2-5: OCR on the shared pool, then analyse and consolidate each document as it completes
+    with timer.stage("ocr_and_analysis"):
+        async for path, ocr_result in container.ocr_service.process_documents(
+            clean_paths, executor=container.ocr_executor
+        ):
+            file_id = paths[path]
+            file_record = file_records[file_id]
 
-                    # Mark as deleted in database
-                    file_record.deleted_at = datetime.utcnow()
+            if not ocr_result["success"]:
+                file_record.status = "failed"
+                finish_document(file_id, "failed", {
+                    "error": f"OCR processing failed: {ocr_result.get('error')}"
+                })
+                continue
 
-                    # Create audit log
-                    audit_log = AuditLog(
-                        file_id=file_record.id,
-                        action="file_expired_cleanup",
-                        details={"reason": "automatic_cleanup", "expired_at": file_record.expires_at.isoformat()}
-                    )
-                    db.add(audit_log)
+            document_timer = StageTimer()
+            try:
+                analysis = await _analyze_document_text(
+                    container, document_timer, ocr_result["raw_text"], file_record.filename, user_id
+                )
+                form_result = analysis["form_result"]
+                autofill_result = analysis["autofill_result"]
+
+                if autofill_result["success"]:
+                    autofill_service.merge_into_consolidation(consolidated, autofill_result)
+                    autofill_service.finalize_consolidation(consolidated)
+            except Exception as e:
+                # One bad document fails on its own; the rest of the batch carries on
+                logger.error(f"Batch analysis failed for file_id {file_id}: {str(e)}", exc_info=True)
+                file_record.status = "failed"
+                finish_document(file_id, "failed", {"error": f"Document analysis failed: {str(e)}"})
+                continue
+
+            file_record.status = "completed"
+            file_record.processing_completed_at = datetime.utcnow()
+
+            db.add(AuditLog(
+                file_upload_id=file_id,
+                event_type="document_processed",
+                event_description=f"Document {file_record.filename} processed in batch",
+                user_id=user_id,
+                event_details={
+                    "form_type": form_result["form_type"],
+                    "confidence": form_result["confidence"],
+                    "batch_task_id": task.request.id,
+                    "stage_timings_ms": document_timer.summary()
+                }
+            ))
 
-                    cleanup_count += 1
+            finish_document(file_id, "completed", {
+                "file_id": file_id,
+                "filename": file_record.filename,
+                "processing_steps": {
+                    "virus_scan": scan_results[path],
+                    "ocr": {
+                        "success": True,
+                        "confidence": ocr_result.get("confidence", 0),
+                        "page_count": ocr_result.get("page_count", 0),
+                        "text_length": len(ocr_result.get("raw_text", ""))
+                    },
+                    **analysis["processing_steps"]
+                },
+                "final_result": analysis["final_result"],
+                "stage_timings_ms": document_timer.summary()
+            })
+
+    result = _batch_progress(file_ids, documents, consolidated)
+    result["user_id"] = user_id
+    result["stage_timings_ms"] = timer.summary()
+
+    logger.info(
+        "Batch processing completed",
+        extra={
+            "total_documents": len(file_ids),
+            "completed": result["completed"],
+            "failed": result["failed"],
+            "stage_timings_ms": result["stage_timings_ms"]
+        }
+    )
 
-                except Exception as e:
-                    logger.error(f"Error cleaning up file {file_record.id}: {str(e)}")
-                    error_count += 1
+    return result
 
-            db.commit()
 
-            result = {
-                "cleaned_up": cleanup_count,
-                "errors": error_count,
-                "total_expired": len(expired_files)
-            }
+def batch_job_id(task_id: str, file_id: Any) -> str:
+    """ProcessingJob.job_id of one file in a batch (job IDs are unique, the Celery task ID is shared)"""
+    return f"{task_id}:{file_id}"
+
+
+def _batch_progress(
+    file_ids: List[int],
+    documents: Dict[str, Dict[str, Any]],
+    consolidated: Dict[str, Any]
+) -> Dict[str, Any]:
+    """Build the partial/final result payload for a batch job"""
+    completed = sum(1 for doc in documents.values() if doc["status"] == "completed")
+    failed = sum(1 for doc in documents.values() if doc["status"] == "failed")
+
+    return {
+        "batch_size": len(file_ids),
+        "completed": completed,
+        "failed": failed,
+        "pending": len(file_ids) - completed - failed,
+        "documents": documents,
+        "consolidated": consolidated
+    }
+
+
+@celery_app.task(bind=True, max_retries=1)
+def cleanup_expired_files(self, resume_after: Optional[List[str]] = None):
+    """
+    Clean up expired files and associated data
+
+    Works through expired rows in bounded batches; when a run hits its batch
+    limit it re-queues itself with the keyset cursor so the backlog drains
+    without holding table locks for the whole pass.
+    """
+    try:
+        logger.info("Starting cleanup of expired files")
+
+        db = SessionLocal()
+        try:
+            result = ExpiredFileCleaner(audit_event_type="file_expired_cleanup").run(
+                db, resume_after=resume_after
+            )
+
+            if result["resume_after"]:
+                cleanup_expired_files.apply_async(
+                    kwargs={"resume_after": result["resume_after"]},
+                    countdown=settings.cleanup_batch_pause_seconds
+                )
 
             logger.info(f"Cleanup completed: {result}")
             return result
@@ -324,7 +548,7 @@ def cleanup_expired_files(self):
 
 @celery_app.task(bind=True, max_retries=1)
 def generate_statistics(self):
-    """Generate processing statistics"""
+    """Roll up hourly processing statistics and summarize the last 24 hours"""
     try:
         logger.info("Generating processing statistics")
 
@@ -332,67 +556,32 @@ def generate_statistics(self):
         try:
             now = datetime.utcnow()
 
-            # Calculate statistics for the last 24 hours
-            start_time = now - timedelta(hours=24)
-
-            # Get processing statistics
-            total_files = db.query(FileUpload).filter(
-                FileUpload.created_at >= start_time
-            ).count()
-
-            successful_files = db.query(FileUpload).filter(
-                FileUpload.created_at >= start_time,
-                FileUpload.processing_status == "completed"
-            ).count()
-
-            failed_files = db.query(FileUpload).filter(
-                FileUpload.created_at >= start_time,
-                FileUpload.processing_status == "failed"
-            ).count()
-
-            pending_files = db.query(FileUpload).filter(
-                FileUpload.created_at >= start_time,
-                FileUpload.processing_status.in_(["uploaded", "processing"])
-            ).count()
-
-            # Calculate average processing time
-            completed_jobs = db.query(ProcessingJob).filter(
-                ProcessingJob.created_at >= start_time,
-                ProcessingJob.status == "completed",
-                ProcessingJob.completed_at.isnot(None)
-            ).all()
-
-            avg_processing_time = 0
-            if completed_jobs:
-                total_time = sum([
-                    (job.completed_at - job.created_at).total_seconds()
-                    for job in completed_jobs
-                ])
-                avg_processing_time = total_time / len(completed_jobs)
-
-            # Form type distribution
-            form_types = db.execute("""
-                SELECT form_type, COUNT(*) as count
-                FROM file_uploads
-                WHERE created_at >= :start_time AND form_type IS NOT NULL
-                GROUP BY form_type
-            """, {"start_time": start_time}).fetchall()
-
-            form_distribution = {row[0]: row[1] for row in form_types}
-
-            # Create statistics record
-            stats = ProcessingStatistics(
-                period_start=start_time,
-                period_end=now,
-                total_files_processed=total_files,
-                successful_files=successful_files,
-                failed_files=failed_files,
-                average_processing_time=avg_processing_time,
-                form_type_distribution=form_distribution
-            )
-
-            db.add(stats)
-            db.commit()
+            # Calculate statistics for the last 24 hourly periods
+            start_time = now.replace(minute=0, second=0, microsecond=0) - timedelta(hours=23)
+
+            rolled_periods = _rollup_processing_statistics(db, now)
+
+            # Summary comes from the rollup rows only: O(periods), not O(rows)
+            totals = db.query(
+                func.coalesce(func.sum(ProcessingStatistics.total_files_uploaded), 0),
+                func.coalesce(func.sum(ProcessingStatistics.total_files_processed), 0),
+                func.coalesce(func.sum(ProcessingStatistics.total_files_failed), 0),
+                func.coalesce(func.sum(ProcessingStatistics.total_files_pending), 0),
+                func.coalesce(func.sum(ProcessingStatistics.total_processing_time), 0.0),
+                func.coalesce(func.sum(ProcessingStatistics.processing_time_samples), 0)
+            ).filter(
+                ProcessingStatistics.date >= start_time
+            ).one()
+
+            total_files, successful_files, failed_files, pending_files, total_time, samples = totals
+            avg_processing_time = total_time / samples if samples else 0
+
+            form_distribution = {}
+            for (form_type_counts,) in db.query(ProcessingStatistics.form_type_counts).filter(
+                ProcessingStatistics.date >= start_time
+            ):
+                for form_type, count in (form_type_counts or {}).items():
+                    form_distribution[form_type] = form_distribution.get(form_type, 0) + count
 
             result = {
                 "period": f"{start_time.isoformat()} to {now.isoformat()}",
@@ -402,7 +591,8 @@ def generate_statistics(self):
                 "pending": pending_files,
                 "success_rate": (successful_files / total_files * 100) if total_files > 0 else 0,
                 "average_processing_time": avg_processing_time,
-                "form_distribution": form_distribution
+                "form_distribution": form_distribution,
+                "rolled_up_periods": rolled_periods
             }
 
             logger.info(f"Statistics generated: {result}")
@@ -416,9 +606,133 @@ def generate_statistics(self):
         raise
 
 
+def _rollup_processing_statistics(db: Session, now: datetime) -> int:
+    """
+    Refresh hourly ProcessingStatistics rows from grouped SQL aggregates
+
+    Only recent hours are recomputed: those from the latest stored period on
+    (it may still have been open when last rolled up) plus a settle window
+    covering jobs that can still change status (timeout x attempts). Each run
+    therefore scans a few hours of rows rather than the whole history.
+
+    Returns:
+        Number of hourly periods written
+    """
+    current_hour = now.replace(minute=0, second=0, microsecond=0)
+    settle_window = timedelta(minutes=settings.job_timeout_minutes * (settings.retry_attempts + 1))
+    settled_before = (now - settle_window).replace(minute=0, second=0, microsecond=0)
+
+    last_period = db.query(func.max(ProcessingStatistics.date)).scalar()
+    if last_period is not None and last_period.tzinfo is not None:
+        last_period = last_period.astimezone(timezone.utc).replace(tzinfo=None)
+    since = min(last_period, settled_before) if last_period else current_hour - timedelta(hours=23)
+
+    periods: Dict[datetime, Dict[str, Any]] = {}
+
+    def period(bucket: datetime) -> Dict[str, Any]:
+        return periods.setdefault(bucket, {"form_type_counts": {}})
+
+    # File counts by status, one grouped scan
+    file_bucket = func.date_trunc('hour', FileUpload.created_at).label("bucket")
+    file_rows = db.query(
+        file_bucket,
+        func.count(FileUpload.id),
+        func.count(FileUpload.id).filter(FileUpload.status == ProcessingStatus.COMPLETED),
+        func.count(FileUpload.id).filter(FileUpload.status == ProcessingStatus.FAILED),
+        func.count(FileUpload.id).filter(FileUpload.status.in_(PENDING_STATUSES)),
+        func.coalesce(func.sum(FileUpload.file_size), 0)
+    ).filter(
+        FileUpload.created_at >= since
+    ).group_by(file_bucket).all()
+
+    for bucket, total, completed, failed, pending, total_size in file_rows:
+        period(bucket).update({
+            "total_files_uploaded": total,
+            "total_files_processed": completed,
+            "total_files_failed": failed,
+            "total_files_pending": pending,
+            "total_file_size": total_size
+        })
+
+    # Processing durations of completed jobs
+    job_bucket = func.date_trunc('hour', ProcessingJob.created_at).label("bucket")
+    duration = func.extract('epoch', ProcessingJob.completed_at - ProcessingJob.created_at)
+    job_rows = db.query(
+        job_bucket,
+        func.count(ProcessingJob.id),
+        func.sum(duration),
+        func.max(duration),
+        func.percentile_cont(0.5).within_group(duration)
+    ).filter(
+        ProcessingJob.status == "completed",
+        ProcessingJob.created_at >= since,
+        ProcessingJob.completed_at.isnot(None)
+    ).group_by(job_bucket).all()
+
+    for bucket, samples, total_time, max_time, median_time in job_rows:
+        period(bucket).update({
+            "processing_time_samples": samples,
+            "total_processing_time": float(total_time or 0),
+            "average_processing_time": float(total_time or 0) / samples if samples else None,
+            "max_processing_time": float(max_time) if max_time is not None else None,
+            "median_processing_time": float(median_time) if median_time is not None else None
+        })
+
+    # Form type distribution, from the form detected for each upload
+    form_rows = db.query(
+        file_bucket,
+        ExtractedData.detected_form_type,
+        func.count(distinct(FileUpload.id))
+    ).join(
+        ExtractedData, ExtractedData.file_upload_id == FileUpload.id
+    ).filter(
+        FileUpload.created_at >= since,
+        ExtractedData.detected_form_type.isnot(None)
+    ).group_by(file_bucket, ExtractedData.detected_form_type).all()
+
+    for bucket, form_type, count in form_rows:
+        period(bucket)["form_type_counts"][form_type] = count
+
+    # Upsert one row per hour
+    existing = {
+        stats.date: stats
+        for stats in db.query(ProcessingStatistics).filter(ProcessingStatistics.date >= since)
+    }
+    for bucket, values in periods.items():
+        stats = existing.get(bucket)
+        if stats is None:
+            stats = ProcessingStatistics(date=bucket, hour=bucket.hour)
+            db.add(stats)
+        for column, value in values.items():
+            setattr(stats, column, value)
+
+    db.commit()
+    return len(periods)
+
+
+@celery_app.task(bind=True, max_retries=1)
+def rollup_audit_logs(self):
+    """Append hourly audit log rollups for hours settled since the last run"""
+    return run_async(audit_logger.rollup_audit_logs())
+
+
 @celery_app.task(bind=True)
 def health_check(self):
     """Perform system health check"""
+    try:
+        return get_worker_container().run(_run_health_check())
+
+    except Exception as e:
+        logger.error(f"Error in health check: {str(e)}", exc_info=True)
+        return {
+            "timestamp": datetime.utcnow().isoformat(),
+            "overall_status": "unhealthy",
+            "error": str(e)
+        }
+
+
+async def _run_health_check() -> Dict[str, Any]:
+    """Check database, virus scanner and Tesseract availability"""
     try:
         health_status = {
             "timestamp": datetime.utcnow().isoformat(),
@@ -438,7 +752,7 @@ def health_check(self):
 
         # Check virus scanner
         try:
-            scanner = VirusScannerService()
+            scanner = get_worker_container().virus_scanner
             if await scanner.ping():
                 health_status["services"]["virus_scanner"] = "healthy"
             else:
@@ -447,12 +761,12 @@ def health_check(self):
                     health_status["overall_status"] = "degraded"
         except Exception as e:
             health_status["services"]["virus_scanner"] = f"unhealthy: {str(e)}"
-            if VirusScannerService().enabled:
+            if get_worker_container().virus_scanner.enabled:
                 health_status["overall_status"] = "degraded"
 
         # Check Tesseract OCR
         try:
-            ocr = OCRService()
+            ocr = get_worker_container().ocr_service
             ocr_info = ocr.get_tesseract_info()
             if "error" not in ocr_info:
                 health_status["services"]["tesseract"] = "healthy"
@@ -463,6 +777,9 @@ def health_check(self):
             health_status["services"]["tesseract"] = f"unhealthy: {str(e)}"
             health_status["overall_status"] = "unhealthy"
 
+        # Report one-off worker warm-up cost so it can be compared with per-task stage timings
+        health_status["worker_warmup_ms"] = get_worker_container().warmup_timings
+
         logger.info(f"Health check completed: {health_status['overall_status']}")
         return health_status
 
@@ -534,23 +851,5 @@ def retry_failed_jobs(self):
 
 # Helper function to run async functions in Celery tasks
 def run_async(coro):
-    """Run async function in sync context"""
-    try:
-        loop = asyncio.get_event_loop()
-    except RuntimeError:
-        loop = asyncio.new_event_loop()
-        asyncio.set_event_loop(loop)
-
-    return loop.run_until_complete(coro)
-
-
-# Patch async calls in tasks
-process_document = celery_app.task(bind=True, base=CallbackTask, max_retries=3)(
-    lambda self, file_id, user_id=None: run_async(
-        process_document.__wrapped__(self, file_id, user_id)
-    )
-)
-
-health_check = celery_app.task(bind=True)(
-    lambda self: run_async(health_check.__wrapped__(self))
-)
\ No newline at end of file
+    """Run async function in sync context on the worker's long-lived event loop"""
+    return get_worker_container().run(coro)
@@ -3,11 +3,13 @@ Task management utilities for Celery integration
 """
 from datetime import datetime, timedelta
 from typing import Dict, Any, List, Optional
+from sqlalchemy import or_
 from sqlalchemy.orm import Session
 from celery.result import AsyncResult
 
 from app.tasks.celery_app import celery_app
-from app.tasks.processing_tasks import process_document
+from app.tasks.processing_tasks import process_document, process_document_batch, batch_job_id
+from app.config import settings
 from app.database import SessionLocal
 from app.models.database import FileUpload, ProcessingJob
 from app.utils.logging import get_logger
@@ -89,6 +91,119 @@ class TaskManager:
             logger.error(f"Error submitting processing job for file {file_id}: {str(e)}")
             raise
 
+    async def submit_batch_processing_job(
+        self,
+        file_ids: List[int],
+        user_id: Optional[str] = None,
+        priority: int = 5
+    ) -> Dict[str, Any]:
+        """
+        Submit a user's upload set as a single pipelined batch job
+
+        Args:
+            file_ids: IDs of the uploaded files
+            user_id: Optional user ID for tracking
+            priority: Job priority (1-10, lower = higher priority)
+
+        Returns:
+            Batch job information; per-file job records share the batch task ID
+        """
+        try:
+            if not file_ids:
+                raise ValueError("No files provided for batch processing")
+
+            if len(file_ids) > settings.batch_max_documents:
+                raise ValueError(
+                    f"Batch exceeds maximum of {settings.batch_max_documents} documents"
+                )
+
+            db = SessionLocal()
+            try:
+                file_records = db.query(FileUpload).filter(FileUpload.id.in_(file_ids)).all()
+                found_ids = {record.id for record in file_records}
+                missing = [file_id for file_id in file_ids if file_id not in found_ids]
+                if missing:
+                    raise ValueError(f"Files not found: {missing}")
+
+                in_progress = [
+                    record.id for record in file_records
+                    if record.status not in ["uploaded", "failed"]
+                ]
+                if in_progress:
+                    raise ValueError(f"Files already processed or in progress: {in_progress}")
+
+                # Submit Celery task
+                task = process_document_batch.apply_async(
+                    args=[file_ids, user_id],
+                    priority=priority
+                )
+
+                # One job record per file so existing status lookups keep working
+                created_at = datetime.utcnow()
+                for record in file_records:
+                    db.add(ProcessingJob(
+                        file_upload_id=record.id,
+                        job_id=batch_job_id(task.id, record.id),
+                        job_type="batch",
+                        status="queued",
+                        total_steps=5,
+                        created_at=created_at
+                    ))
+                    record.status = "queued"
+                    record.job_id = task.id
+
+                db.commit()
+
+                logger.info(f"Submitted batch processing job for {len(file_ids)} files, task ID: {task.id}")
+
+                return {
+                    "task_id": task.id,
+                    "status": "queued",
+                    "file_ids": file_ids,
+                    "priority": priority,
+                    "created_at": created_at.isoformat()
+                }
+
+            finally:
+                db.close()
+
+        except Exception as e:
+            logger.error(f"Error submitting batch processing job: {str(e)}")
+            raise
+
+    async def get_batch_status(self, task_id: str) -> Dict[str, Any]:
+        """
+        Get progress of a batch job, including partial per-document results
+
+        Args:
+            task_id: Celery task ID of the batch
+
+        Returns:
+            Batch status information
+        """
+        try:
+            celery_result = AsyncResult(task_id, app=self.celery)
+            result = {
+                "task_id": task_id,
+                "status": celery_result.status.lower()
+            }
+
+            if celery_result.state == 'PROGRESS':
+                result["progress"] = celery_result.info
+            elif celery_result.successful():
+                result["result"] = celery_result.result
+            elif celery_result.failed():
+                result["error_message"] = str(celery_result.result)
+
+            return result
+
+        except Exception as e:
+            logger.error(f"Error getting batch status: {str(e)}")
+            return {
+                "status": "error",
+                "error": str(e)
+            }
+
     async def get_job_status(self, job_id: Optional[int] = None, task_id: Optional[str] = None) -> Dict[str, Any]:
         """
         Get status of a processing job
@@ -108,7 +223,11 @@ class TaskManager:
                 if job_id:
                     job = db.query(ProcessingJob).filter(ProcessingJob.id == job_id).first()
                 elif task_id:
-                    job = db.query(ProcessingJob).filter(ProcessingJob.celery_task_id == task_id).first()
+                    # Batch jobs carry the task ID followed by the file ID
+                    job = db.query(ProcessingJob).filter(or_(
+                        ProcessingJob.job_id == task_id,
+                        ProcessingJob.job_id.like(f"{task_id}:%")
+                    )).first()
 
                 if not job:
                     return {
@@ -117,7 +236,8 @@ class TaskManager:
                     }
 
                 # Get Celery task result
-                celery_result = AsyncResult(job.celery_task_id, app=self.celery)
+                celery_task_id = job.job_id.split(":", 1)[0]
+                celery_result = AsyncResult(celery_task_id, app=self.celery)
 
                 # Sync job status with Celery if needed
                 if job.status != celery_result.status.lower():
@@ -127,14 +247,13 @@ class TaskManager:
 
                 result = {
                     "job_id": job.id,
-                    "task_id": job.celery_task_id,
-                    "file_id": job.file_id,
+                    "task_id": celery_task_id,
+                    "file_id": job.file_upload_id,
                     "status": job.status,
                     "created_at": job.created_at.isoformat(),
                     "updated_at": job.updated_at.isoformat() if job.updated_at else None,
                     "started_at": job.started_at.isoformat() if job.started_at else None,
                     "completed_at": job.completed_at.isoformat() if job.completed_at else None,
-                    "priority": job.priority,
                     "retry_count": job.retry_count
                 }
 
@@ -0,0 +1,122 @@
+#!/usr/bin/env python3
+"""
+Benchmark auto-fill delivery against a local stub tax calculator
+
+Compares a new httpx client per payload (the previous behaviour) with the
+pooled CalculatorClient, unbatched and batched.
+
+    python benchmark_calculator_client.py --requests 500 --concurrency 50
+"""
+import argparse
+import asyncio
+import json
+import os
+import statistics
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+# The stub speaks HTTP/1.1 only; settings needed by app.config are filled with placeholders
+os.environ.setdefault("CALCULATOR_HTTP2", "false")
+for required in ("DATABASE_URL", "SECRET_KEY", "ENCRYPTION_KEY", "JWT_SECRET_KEY"):
+    os.environ.setdefault(required, "benchmark")
+
+import httpx
+
+from app.services.calculator_client import CalculatorClient
+
+
+class StubCalculatorHandler(BaseHTTPRequestHandler):
+    """Answers /autofill/{type} and /autofill/{type}/batch with a fixed latency"""
+
+    protocol_version = "HTTP/1.1"
+    latency = 0.005
+
+    def do_POST(self):
+        body = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+        time.sleep(self.latency)
+
+        if self.path.endswith("/batch"):
+            response = {"results": [
+                {"status_code": 200, "session_id": str(i), "calculator_url": "/calc"}
+                for i, _ in enumerate(body["items"])
+            ]}
+        else:
+            response = {"session_id": "1", "calculator_url": "/calc"}
+
+        payload = json.dumps(response).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def log_message(self, format, *args):
+        pass
+
+
+def start_stub_server() -> ThreadingHTTPServer:
+    server = ThreadingHTTPServer(("127.0.0.1", 0), StubCalculatorHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+async def run_mode(name: str, send, total: int, concurrency: int) -> dict:
+    semaphore = asyncio.Semaphore(concurrency)
+    latencies = []
+
+    async def one(i: int):
+        async with semaphore:
+            start = time.perf_counter()
+            await send({"user_id": f"user-{i}", "autofill_data": {"income.w2_wages": 50000.0}})
+            latencies.append((time.perf_counter() - start) * 1000)
+
+    started = time.perf_counter()
+    await asyncio.gather(*[one(i) for i in range(total)])
+    elapsed = time.perf_counter() - started
+
+    latencies.sort()
+    return {
+        "mode": name,
+        "requests_per_second": round(total / elapsed, 1),
+        "p50_ms": round(statistics.median(latencies), 2),
+        "p99_ms": round(latencies[int(len(latencies) * 0.99) - 1], 2)
+    }
+
+
+async def main(total: int, concurrency: int):
+    server = start_stub_server()
+    base_url = f"http://127.0.0.1:{server.server_address[1]}/api"
+
+    async def per_request_client(payload):
+        async with httpx.AsyncClient() as client:
+            await client.post(f"{base_url}/autofill/federal", json=payload, timeout=30.0)
+
+    client = CalculatorClient(base_url=base_url)
+
+    async def pooled(payload):
+        await client.send_autofill("federal", payload)
+
+    async def pooled_batched(payload):
+        await client.send_autofill("federal", payload, batched=True)
+
+    results = [
+        await run_mode("client_per_request", per_request_client, total, concurrency),
+        await run_mode("pooled", pooled, total, concurrency),
+        await run_mode("pooled_batched", pooled_batched, total, concurrency),
+    ]
+
+    await client.aclose()
+    server.shutdown()
+
+    for result in results:
+        print(json.dumps(result))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--requests", type=int, default=500)
+    parser.add_argument("--concurrency", type=int, default=50)
+    args = parser.parse_args()
+
+    asyncio.run(main(args.requests, args.concurrency))
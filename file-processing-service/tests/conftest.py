@@ -0,0 +1,35 @@
+"""
+Test configuration and fixtures
+"""
+import os
+
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from app.models.database import Base
+
+
+@pytest.fixture
+def db_session():
+    """
+    Session on a scratch PostgreSQL database with all models created
+
+    The rollups use PostgreSQL SQL (date_trunc, FILTER, percentile_cont), so
+    these tests need TEST_DATABASE_URL pointing at a disposable database.
+    """
+    database_url = os.getenv("TEST_DATABASE_URL")
+    if not database_url:
+        pytest.skip("TEST_DATABASE_URL is not set")
+
+    engine = create_engine(database_url, connect_args={"options": "-c timezone=utc"})
+    Base.metadata.drop_all(engine)
+    Base.metadata.create_all(engine)
+
+    session = sessionmaker(bind=engine)()
+    try:
+        yield session
+    finally:
+        session.close()
+        Base.metadata.drop_all(engine)
+        engine.dispose()
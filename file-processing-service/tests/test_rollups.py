@@ -0,0 +1,161 @@
+"""
+Test processing statistics and audit log rollups against the models
+"""
+import uuid
+from datetime import datetime, timedelta, timezone
+
+from app.models.database import (
+    AuditLog, AuditLogRollup, ExtractedData, FileUpload, ProcessingJob, ProcessingStatistics
+)
+from app.security.audit import _rollup_audit_logs, _summarize_audit_logs
+from app.tasks.processing_tasks import _rollup_processing_statistics
+
+
+NOW = datetime(2024, 3, 1, 12, 30)
+HOUR = datetime(2024, 3, 1, 11, 0)
+
+
+def make_upload(db, status: str, created_at: datetime, user_id=None) -> FileUpload:
+    upload = FileUpload(
+        user_id=user_id or uuid.uuid4(),
+        filename="w2.pdf",
+        original_filename="w2.pdf",
+        file_size=1000,
+        file_type="pdf",
+        mime_type="application/pdf",
+        file_path="/tmp/w2.pdf",
+        status=status,
+        created_at=created_at
+    )
+    db.add(upload)
+    db.flush()
+    return upload
+
+
+def make_audit_event(db, event_type: str, created_at: datetime, user_id, upload: FileUpload = None):
+    db.add(AuditLog(
+        event_type=event_type,
+        event_description=event_type.replace("_", " "),
+        user_id=user_id,
+        file_upload_id=upload.id if upload else None,
+        created_at=created_at
+    ))
+
+
+class TestProcessingStatisticsRollup:
+    """Test _rollup_processing_statistics"""
+
+    def test_rollup_counts_statuses_durations_and_form_types(self, db_session):
+        """Hourly row reflects upload statuses, job durations and detected forms"""
+        completed = make_upload(db_session, "completed", HOUR + timedelta(minutes=5))
+        make_upload(db_session, "failed", HOUR + timedelta(minutes=10))
+        make_upload(db_session, "scanning", HOUR + timedelta(minutes=15))
+
+        db_session.add(ExtractedData(file_upload_id=completed.id, detected_form_type="W-2"))
+        db_session.add(ProcessingJob(
+            file_upload_id=completed.id,
+            job_id="task-1",
+            job_type="ocr",
+            status="completed",
+            created_at=HOUR + timedelta(minutes=5),
+            completed_at=HOUR + timedelta(minutes=5, seconds=30)
+        ))
+        db_session.commit()
+
+        assert _rollup_processing_statistics(db_session, NOW) == 1
+
+        stats = db_session.query(ProcessingStatistics).one()
+        assert stats.date == HOUR.replace(tzinfo=timezone.utc)
+        assert stats.hour == 11
+        assert stats.total_files_uploaded == 3
+        assert stats.total_files_processed == 1
+        assert stats.total_files_failed == 1
+        assert stats.total_files_pending == 1
+        assert stats.total_file_size == 3000
+        assert stats.processing_time_samples == 1
+        assert stats.total_processing_time == 30.0
+        assert stats.median_processing_time == 30.0
+        assert stats.form_type_counts == {"W-2": 1}
+
+    def test_rerun_updates_existing_period(self, db_session):
+        """Re-rolling an open hour updates its row instead of adding another"""
+        make_upload(db_session, "completed", HOUR + timedelta(minutes=5))
+        db_session.commit()
+        _rollup_processing_statistics(db_session, NOW)
+
+        make_upload(db_session, "uploaded", HOUR + timedelta(minutes=20))
+        db_session.commit()
+        _rollup_processing_statistics(db_session, NOW)
+
+        stats = db_session.query(ProcessingStatistics).one()
+        assert stats.total_files_uploaded == 2
+        assert stats.total_files_pending == 1
+
+
+class TestAuditLogRollup:
+    """Test _rollup_audit_logs and _summarize_audit_logs"""
+
+    def test_rollup_and_summary_match_raw_events(self, db_session):
+        """Settled hours are rolled up once and the summary adds the raw tail"""
+        user_a, user_b = uuid.uuid4(), uuid.uuid4()
+        upload = make_upload(db_session, "completed", HOUR - timedelta(hours=1), user_id=user_a)
+
+        make_audit_event(db_session, "file_upload", HOUR - timedelta(minutes=50), user_a, upload)
+        make_audit_event(db_session, "file_access", HOUR - timedelta(minutes=40), user_a, upload)
+        make_audit_event(db_session, "file_upload", HOUR + timedelta(minutes=10), user_b)
+        # Current, still open hour
+        make_audit_event(db_session, "file_access", NOW - timedelta(minutes=5), user_b)
+        db_session.commit()
+
+        # HOUR closed only 30 minutes ago and is left to settle
+        result = _rollup_audit_logs(db_session, NOW)
+        assert result["periods_rolled_up"] == 1
+        assert result["rows_written"] == 2
+
+        rollups = {
+            (period.replace(tzinfo=None), action): count
+            for period, action, count in db_session.query(
+                AuditLogRollup.period_start, AuditLogRollup.action, AuditLogRollup.event_count
+            )
+        }
+        assert rollups == {
+            (HOUR - timedelta(hours=1), "file_upload"): 1,
+            (HOUR - timedelta(hours=1), "file_access"): 1
+        }
+
+        # Nothing new closed, nothing appended
+        assert _rollup_audit_logs(db_session, NOW)["rows_written"] == 0
+
+        summary = _summarize_audit_logs(db_session, HOUR - timedelta(minutes=45), NOW)
+        assert summary["action_counts"] == {"file_access": 2, "file_upload": 1}
+        assert summary["total_events"] == 3
+        assert summary["unique_users"] == 2
+        assert summary["unique_files"] == 1
+
+    def test_late_commit_in_settling_hour_is_counted(self, db_session):
+        """An event committed after a rollup run, dated in the hour just closed, still reaches the rollup"""
+        user = uuid.uuid4()
+        make_audit_event(db_session, "file_upload", HOUR - timedelta(minutes=30), user)
+        make_audit_event(db_session, "file_upload", HOUR + timedelta(minutes=5), user)
+        db_session.commit()
+        _rollup_audit_logs(db_session, NOW)
+
+        # Transaction started in HOUR but committed after the run above
+        make_audit_event(db_session, "file_access", HOUR + timedelta(minutes=55), user)
+        db_session.commit()
+
+        _rollup_audit_logs(db_session, NOW + timedelta(hours=1))
+        rollups = {
+            (period.replace(tzinfo=None), action): count
+            for period, action, count in db_session.query(
+                AuditLogRollup.period_start, AuditLogRollup.action, AuditLogRollup.event_count
+            )
+        }
+        assert rollups == {
+            (HOUR - timedelta(hours=1), "file_upload"): 1,
+            (HOUR, "file_upload"): 1,
+            (HOUR, "file_access"): 1
+        }
+
+        summary = _summarize_audit_logs(db_session, HOUR - timedelta(hours=1), NOW + timedelta(hours=1))
+        assert summary["action_counts"] == {"file_upload": 2, "file_access": 1}
@@ -0,0 +1,70 @@
+"""
+Test ClamAV session scanning against a stub clamd
+"""
+import asyncio
+
+import pytest
+import pytest_asyncio
+
+from app.services.virus_scanner import VirusScannerService
+
+
+EICAR_MARKER = b"EICAR-STANDARD-ANTIVIRUS-TEST-FILE"
+
+
+async def handle_clamd_session(reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+    """Minimal clamd: IDSESSION, then INSTREAM commands answered in order until END"""
+    command_id = 0
+    while True:
+        command = await reader.readuntil(b"\0")
+        if command == b"zIDSESSION\0":
+            continue
+        if command != b"zINSTREAM\0":
+            break
+
+        command_id += 1
+        data = b""
+        while True:
+            size = int.from_bytes(await reader.readexactly(4), byteorder="big")
+            if size == 0:
+                break
+            data += await reader.readexactly(size)
+
+        verdict = b"stream: Eicar-Signature FOUND" if EICAR_MARKER in data else b"stream: OK"
+        writer.write(str(command_id).encode() + b": " + verdict + b"\0")
+        await writer.drain()
+
+    writer.close()
+
+
+@pytest_asyncio.fixture
+async def scanner():
+    server = await asyncio.start_server(handle_clamd_session, "127.0.0.1", 0)
+    service = VirusScannerService()
+    service.enabled = True
+    service.host, service.port = server.sockets[0].getsockname()[:2]
+    service.timeout = 5
+    try:
+        yield service
+    finally:
+        server.close()
+        await server.wait_closed()
+
+
+@pytest.mark.asyncio
+async def test_missing_file_does_not_shift_session_verdicts(scanner, tmp_path):
+    clean = tmp_path / "clean.pdf"
+    clean.write_bytes(b"%PDF-1.4 clean document")
+    missing = tmp_path / "missing.pdf"
+    infected = tmp_path / "infected.pdf"
+    infected.write_bytes(b"X5O!P%@AP[4\\PZX54(P^)7CC)7}$" + EICAR_MARKER + b"!$H+H*")
+    second_clean = tmp_path / "clean2.pdf"
+    second_clean.write_bytes(b"%PDF-1.4 another clean document")
+
+    results = await scanner.scan_files([clean, missing, infected, second_clean])
+
+    assert results[clean]["status"] == "clean"
+    assert results[missing]["status"] == "error"
+    assert "No such file" in results[missing]["details"]
+    assert results[infected]["status"] == "infected"
+    assert results[second_clean]["status"] == "clean"
@@ -5,21 +5,38 @@ Fraud detection, unusual pattern identification, and tax law compliance monitori
 
 import pandas as pd
 import numpy as np
+from pandas.api.types import is_float_dtype, is_integer_dtype, is_numeric_dtype
 from sklearn.ensemble import IsolationForest
 from sklearn.preprocessing import StandardScaler, RobustScaler
 from sklearn.decomposition import PCA
 from sklearn.cluster import DBSCAN
 from sklearn.neighbors import LocalOutlierFactor
 import lightgbm as lgb
-from scipy import stats
 import logging
-from typing import Dict, List, Any, Tuple, Optional
+from collections import OrderedDict, deque
+from typing import Dict, List, Any, Tuple, Optional, Callable, Iterable, Iterator
 from datetime import datetime, timedelta
 import json
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# Rows in the rolling daily login window
+LOGIN_WINDOW_DAYS = 30
+
+# Columns behind frame-wide fraud feature statistics (quantiles, medians,
+# income bins, devices per user); the first chunked pass reads only these
+FRAUD_STATS_COLUMNS = [
+    'time_per_calculation', 'session_duration', 'gross_income',
+    'total_deductions', 'user_id', 'device_fingerprint'
+]
+
+INCOME_BRACKET_LABELS = ['low', 'med_low', 'med', 'med_high', 'high']
+
+# Expected effective tax rate by gross income band [bound, next bound)
+EXPECTED_TAX_BOUNDS = np.array([0, 10000, 40000, 85000, 163000, 207000, 518000, np.inf])
+EXPECTED_TAX_RATES = np.array([0.10, 0.12, 0.22, 0.24, 0.32, 0.35, 0.37])
+
 
 class FraudDetectionEngine:
     """Advanced fraud detection for tax calculations and user behavior"""
@@ -36,26 +53,37 @@ class FraudDetectionEngine:
         self.feature_importance = {}
         self.fraud_patterns = {}
 
-    def prepare_fraud_features(self, df: pd.DataFrame) -> pd.DataFrame:
-        """Prepare comprehensive features for fraud detection"""
+    def prepare_fraud_features(self, df: pd.DataFrame, feature_stats: Optional[Dict[str, Any]] = None,
+                               login_history: Optional[np.ndarray] = None) -> pd.DataFrame:
+        """Prepare comprehensive features for fraud detection
+
+        Every feature is computed column-wise over the whole frame. Features that
+        compare a row with the rest of the data read frame-wide statistics from
+        ``feature_stats`` (see ``compute_feature_stats``), which default to those of
+        ``df``; ``login_history`` holds the daily logins preceding ``df`` for the
+        rolling login window. See ``prepare_fraud_features_chunked``.
+        """
+        if feature_stats is None:
+            feature_stats = self.compute_feature_stats(df)
+
         features_df = df.copy()
 
         # User behavior anomalies
         features_df['login_frequency_anomaly'] = self._detect_frequency_anomaly(
-            df, 'daily_logins', window_days=30
+            df, 'daily_logins', window_days=LOGIN_WINDOW_DAYS, history=login_history
         )
 
         features_df['calculation_speed_anomaly'] = self._detect_speed_anomaly(
-            df, 'time_per_calculation'
+            df, 'time_per_calculation', feature_stats
         )
 
         features_df['session_duration_anomaly'] = self._detect_duration_anomaly(
-            df, 'session_duration'
+            df, 'session_duration', feature_stats
         )
 
         # Financial anomalies
         features_df['income_consistency_score'] = self._calculate_income_consistency(df)
-        features_df['deduction_ratio_anomaly'] = self._detect_deduction_anomalies(df)
+        features_df['deduction_ratio_anomaly'] = self._detect_deduction_anomalies(df, feature_stats)
         features_df['tax_liability_anomaly'] = self._detect_tax_liability_anomalies(df)
 
         # Pattern-based features
@@ -69,7 +97,7 @@ class FraudDetectionEngine:
 
         # Cross-reference anomalies
         features_df['ip_location_mismatch'] = self._detect_location_mismatches(df)
-        features_df['device_switching_frequency'] = self._analyze_device_patterns(df)
+        features_df['device_switching_frequency'] = self._analyze_device_patterns(df, feature_stats)
 
         # Advanced financial ratios
         features_df['expense_to_income_ratio'] = (
@@ -81,293 +109,288 @@ class FraudDetectionEngine:
 
         return features_df
 
-    def _detect_frequency_anomaly(self, df: pd.DataFrame, column: str, window_days: int) -> np.ndarray:
+    def prepare_fraud_features_chunked(
+        self, chunks: Callable[[], Iterable[pd.DataFrame]]
+    ) -> Iterator[pd.DataFrame]:
+        """Prepare features for data too large for memory, one chunk at a time
+
+        ``chunks`` is called twice and must yield the same chunks in the same
+        order each time, e.g. ``lambda: pd.read_csv(path, chunksize=500_000)``.
+        The first pass keeps only FRAUD_STATS_COLUMNS to compute the frame-wide
+        statistics; the second yields each chunk's features, equal to the rows
+        of ``prepare_fraud_features`` on the concatenated frame.
+        """
+        feature_stats = self.compute_feature_stats(pd.concat(
+            [chunk[chunk.columns.intersection(FRAUD_STATS_COLUMNS)] for chunk in chunks()],
+            ignore_index=True
+        ))
+
+        history = None
+        for chunk in chunks():
+            yield self.prepare_fraud_features(chunk, feature_stats=feature_stats, login_history=history)
+
+            logins = chunk['daily_logins'].to_numpy()
+            if history is not None:
+                logins = np.concatenate([history, logins])
+            history = logins[-(LOGIN_WINDOW_DAYS - 1):]
+
+    def compute_feature_stats(self, df: pd.DataFrame) -> Dict[str, Any]:
+        """Frame-wide statistics behind the speed, duration, deduction and device features"""
+        speeds = df['time_per_calculation'].fillna(df['time_per_calculation'].median())
+        q1, q3 = speeds.quantile([0.25, 0.75])
+
+        duration_median = df['session_duration'].median()
+        log_durations = np.log1p(df['session_duration'].fillna(duration_median).to_numpy(dtype=float))
+
+        deduction_ratios = df['total_deductions'] / np.maximum(df['gross_income'], 1)
+        income_brackets, income_bins = pd.cut(
+            df['gross_income'], bins=5, labels=INCOME_BRACKET_LABELS, retbins=True
+        )
+        bracket_ratios = deduction_ratios.groupby(income_brackets, observed=False).median()
+
+        feature_stats = {
+            'speed_median': df['time_per_calculation'].median(),
+            'speed_quartiles': (q1, q3),
+            'duration_median': duration_median,
+            'log_duration_mean': log_durations.mean(),
+            'log_duration_std': log_durations.std(),
+            'income_bins': income_bins,
+            'bracket_deduction_ratios': bracket_ratios.reindex(INCOME_BRACKET_LABELS).to_numpy(dtype=float),
+            'median_deduction_ratio': deduction_ratios.median(),
+            'device_switching_ratio': None
+        }
+
+        if 'device_fingerprint' in df.columns:
+            devices = df.groupby('user_id')['device_fingerprint']
+            feature_stats['device_switching_ratio'] = devices.nunique() / devices.size()
+
+        return feature_stats
+
+    @staticmethod
+    def _column(df: pd.DataFrame, column: str, default: Any = 0) -> pd.Series:
+        """A column, or the default for every row when the frame lacks it"""
+        if column in df.columns:
+            return df[column]
+        return pd.Series(default, index=df.index)
+
+    def _detect_frequency_anomaly(self, df: pd.DataFrame, column: str, window_days: int,
+                                  history: Optional[np.ndarray] = None) -> np.ndarray:
         """Detect unusual frequency patterns"""
-        rolling_mean = df[column].rolling(window=window_days, min_periods=1).mean()
-        rolling_std = df[column].rolling(window=window_days, min_periods=1).std()
+        values = df[column].reset_index(drop=True)
+        if history is not None and len(history):
+            values = pd.concat([pd.Series(history), values], ignore_index=True)
 
-        z_scores = np.abs((df[column] - rolling_mean) / np.maximum(rolling_std, 0.1))
-        return (z_scores > 3).astype(int)
+        rolling_mean = values.rolling(window=window_days, min_periods=1).mean()
+        rolling_std = values.rolling(window=window_days, min_periods=1).std()
 
-    def _detect_speed_anomaly(self, df: pd.DataFrame, column: str) -> np.ndarray:
+        z_scores = np.abs((values - rolling_mean) / np.maximum(rolling_std, 0.1))
+        return (z_scores > 3).astype(int).to_numpy()[len(values) - len(df):]
+
+    def _detect_speed_anomaly(self, df: pd.DataFrame, column: str, feature_stats: Dict[str, Any]) -> np.ndarray:
         """Detect unusually fast or slow calculation speeds"""
-        speeds = df[column].fillna(df[column].median())
-        q1, q3 = speeds.quantile([0.25, 0.75])
+        speeds = df[column].fillna(feature_stats['speed_median'])
+        q1, q3 = feature_stats['speed_quartiles']
         iqr = q3 - q1
 
         lower_bound = q1 - 3 * iqr
         upper_bound = q3 + 3 * iqr
 
-        return ((speeds < lower_bound) | (speeds > upper_bound)).astype(int)
+        return ((speeds < lower_bound) | (speeds > upper_bound)).astype(int).to_numpy()
 
-    def _detect_duration_anomaly(self, df: pd.DataFrame, column: str) -> np.ndarray:
+    def _detect_duration_anomaly(self, df: pd.DataFrame, column: str, feature_stats: Dict[str, Any]) -> np.ndarray:
         """Detect unusual session durations"""
-        durations = df[column].fillna(df[column].median())
+        durations = df[column].fillna(feature_stats['duration_median']).to_numpy(dtype=float)
 
         # Use log transformation for skewed duration data
         log_durations = np.log1p(durations)
-        z_scores = np.abs(stats.zscore(log_durations))
+        z_scores = np.abs((log_durations - feature_stats['log_duration_mean']) / feature_stats['log_duration_std'])
 
         return (z_scores > 3).astype(int)
 
     def _calculate_income_consistency(self, df: pd.DataFrame) -> np.ndarray:
         """Calculate income consistency score across multiple entries"""
-        consistency_scores = []
-
-        for idx, row in df.iterrows():
-            # Check consistency between different income sources
-            income_sources = [
-                row.get('salary_income', 0),
-                row.get('business_income', 0),
-                row.get('investment_income', 0),
-                row.get('other_income', 0)
-            ]
-
-            total_declared = sum(income_sources)
-            gross_income = row.get('gross_income', 0)
-
-            if gross_income > 0:
-                consistency = abs(total_declared - gross_income) / gross_income
-            else:
-                consistency = 0
+        # Check consistency between different income sources
+        total_declared = (
+            self._column(df, 'salary_income')
+            + self._column(df, 'business_income')
+            + self._column(df, 'investment_income')
+            + self._column(df, 'other_income')
+        )
+        gross_income = self._column(df, 'gross_income')
 
-            consistency_scores.append(min(consistency, 1.0))
+        positive = gross_income > 0
+        consistency = ((total_declared - gross_income).abs() / gross_income.where(positive)).where(positive, 0)
 
-        return np.array(consistency_scores)
+        return np.minimum(consistency.to_numpy(dtype=float), 1.0)
 
-    def _detect_deduction_anomalies(self, df: pd.DataFrame) -> np.ndarray:
+    def _detect_deduction_anomalies(self, df: pd.DataFrame, feature_stats: Dict[str, Any]) -> np.ndarray:
         """Detect unusual deduction patterns"""
-        deduction_ratios = df['total_deductions'] / np.maximum(df['gross_income'], 1)
+        deduction_ratios = (df['total_deductions'] / np.maximum(df['gross_income'], 1)).to_numpy(dtype=float)
 
-        # Calculate expected deduction ratio by income bracket
-        income_brackets = pd.cut(df['gross_income'], bins=5, labels=['low', 'med_low', 'med', 'med_high', 'high'])
-        expected_ratios = deduction_ratios.groupby(income_brackets).median()
+        # Expected deduction ratio is the median of the row's income bracket
+        brackets = pd.cut(df['gross_income'], bins=feature_stats['income_bins'], labels=False).to_numpy(dtype=float)
+        in_bracket = ~np.isnan(brackets)
 
-        anomaly_scores = []
-        for idx, row in df.iterrows():
-            bracket = income_brackets.iloc[idx]
-            actual_ratio = deduction_ratios.iloc[idx]
-            expected_ratio = expected_ratios[bracket] if pd.notna(bracket) else deduction_ratios.median()
+        expected_ratios = np.full(len(df), feature_stats['median_deduction_ratio'], dtype=float)
+        expected_ratios[in_bracket] = feature_stats['bracket_deduction_ratios'][brackets[in_bracket].astype(int)]
 
-            anomaly_score = abs(actual_ratio - expected_ratio) / max(expected_ratio, 0.01)
-            anomaly_scores.append(anomaly_score)
-
-        return (np.array(anomaly_scores) > 2).astype(int)
+        anomaly_scores = np.abs(deduction_ratios - expected_ratios) / np.maximum(expected_ratios, 0.01)
+        return (anomaly_scores > 2).astype(int)
 
     def _detect_tax_liability_anomalies(self, df: pd.DataFrame) -> np.ndarray:
         """Detect unusual tax liability calculations"""
-        # Calculate expected tax liability based on income and standard patterns
-        expected_tax_rates = {
-            (0, 10000): 0.10,
-            (10000, 40000): 0.12,
-            (40000, 85000): 0.22,
-            (85000, 163000): 0.24,
-            (163000, 207000): 0.32,
-            (207000, 518000): 0.35,
-            (518000, float('inf')): 0.37
-        }
+        income = self._column(df, 'gross_income').to_numpy(dtype=float)
+        actual_tax = self._column(df, 'tax_liability').to_numpy(dtype=float)
 
-        anomalies = []
-        for idx, row in df.iterrows():
-            income = row.get('gross_income', 0)
-            actual_tax = row.get('tax_liability', 0)
-
-            # Find expected tax rate
-            expected_rate = 0.22  # Default
-            for (min_inc, max_inc), rate in expected_tax_rates.items():
-                if min_inc <= income < max_inc:
-                    expected_rate = rate
-                    break
-
-            expected_tax = income * expected_rate
-            if expected_tax > 0:
-                deviation = abs(actual_tax - expected_tax) / expected_tax
-                anomalies.append(1 if deviation > 0.5 else 0)
-            else:
-                anomalies.append(0)
+        # Expected rate by income band; 0.22 for incomes outside every band (negative or missing)
+        band = np.searchsorted(EXPECTED_TAX_BOUNDS, income, side='right') - 1
+        in_band = (band >= 0) & (band < len(EXPECTED_TAX_RATES))
+        expected_rate = np.where(in_band, EXPECTED_TAX_RATES[np.clip(band, 0, len(EXPECTED_TAX_RATES) - 1)], 0.22)
+
+        expected_tax = income * expected_rate
+        with np.errstate(divide='ignore', invalid='ignore'):
+            deviation = np.abs(actual_tax - expected_tax) / expected_tax
 
-        return np.array(anomalies)
+        return ((expected_tax > 0) & (deviation > 0.5)).astype(int)
 
     def _detect_round_number_patterns(self, df: pd.DataFrame) -> np.ndarray:
         """Detect suspicious round number patterns"""
         numeric_columns = ['gross_income', 'total_deductions', 'charitable_donations', 'business_expenses']
-        round_scores = []
 
-        for idx, row in df.iterrows():
-            round_count = 0
-            total_numbers = 0
+        # Multiples of 100 count half only for integer-typed values. Row-wise
+        # scoring saw integers as floats when every column of the frame was
+        # numeric with at least one float column; keep that for parity.
+        integers_kept = not (
+            all(is_numeric_dtype(dtype) for dtype in df.dtypes)
+            and any(is_float_dtype(dtype) for dtype in df.dtypes)
+        )
 
-            for col in numeric_columns:
-                if col in row and pd.notna(row[col]) and row[col] > 0:
-                    value = row[col]
-                    total_numbers += 1
+        round_count = np.zeros(len(df))
+        total_numbers = np.zeros(len(df))
+
+        for col in numeric_columns:
+            if col not in df.columns:
+                continue
 
-                    # Check if number is suspiciously round
-                    if value % 1000 == 0 or value % 500 == 0:
-                        round_count += 1
-                    elif str(value).endswith('00') and value > 100:
-                        round_count += 0.5
+            values = df[col]
+            present = (values.notna() & (values > 0)).to_numpy()
+            total_numbers += present
 
-            round_ratio = round_count / max(total_numbers, 1)
-            round_scores.append(round_ratio)
+            # Check if number is suspiciously round
+            rounded = present & ((values % 1000 == 0) | (values % 500 == 0)).to_numpy()
+            round_count += rounded
 
-        return (np.array(round_scores) > 0.7).astype(int)
+            if integers_kept and is_integer_dtype(values.dtype):
+                round_count += 0.5 * (present & ~rounded & ((values % 100 == 0) & (values > 100)).to_numpy())
+
+        round_ratio = round_count / np.maximum(total_numbers, 1)
+        return (round_ratio > 0.7).astype(int)
 
     def _detect_sequential_patterns(self, df: pd.DataFrame) -> np.ndarray:
         """Detect sequential input patterns that may indicate automated entry"""
-        sequential_scores = []
-
-        for idx, row in df.iterrows():
-            # Check for sequential patterns in numerical inputs
-            numeric_values = [
-                row.get('gross_income', 0),
-                row.get('total_deductions', 0),
-                row.get('charitable_donations', 0),
-                row.get('medical_expenses', 0)
-            ]
-
-            # Remove zeros and sort
-            non_zero_values = sorted([v for v in numeric_values if v > 0])
-
-            if len(non_zero_values) >= 3:
-                # Check for arithmetic progression
-                differences = [non_zero_values[i+1] - non_zero_values[i]
-                             for i in range(len(non_zero_values)-1)]
-
-                # Check if differences are roughly equal (arithmetic sequence)
-                if len(set(differences)) <= 2 and max(differences) > 0:
-                    sequential_scores.append(1)
-                else:
-                    sequential_scores.append(0)
-            else:
-                sequential_scores.append(0)
+        numeric_values = np.column_stack([
+            self._column(df, column).to_numpy(dtype=float)
+            for column in ['gross_income', 'total_deductions', 'charitable_donations', 'medical_expenses']
+        ])
+
+        # Sort the positive values of each row; zeros and missing values go last as NaN
+        positive = numeric_values > 0
+        counts = positive.sum(axis=1)
+        values = np.sort(np.where(positive, numeric_values, np.nan), axis=1)
+
+        # Arithmetic progression: at most two distinct differences between neighbours
+        differences = np.sort(np.diff(values, axis=1), axis=1)
+        valid = np.arange(1, differences.shape[1]) < (counts - 1)[:, None]
+        distinct = 1 + ((np.diff(differences, axis=1) != 0) & valid).sum(axis=1)
+        largest = np.take_along_axis(differences, np.maximum(counts - 2, 0)[:, None], axis=1)[:, 0]
 
-        return np.array(sequential_scores)
+        return ((counts >= 3) & (distinct <= 2) & (largest > 0)).astype(int)
 
     def _detect_copy_paste_behavior(self, df: pd.DataFrame) -> np.ndarray:
         """Detect potential copy-paste behavior in form filling"""
-        copy_paste_indicators = []
-
-        for idx, row in df.iterrows():
-            # Look for exact duplicates in related fields
-            related_fields = [
-                ['business_income', 'business_expenses'],
-                ['investment_income', 'investment_expenses'],
-                ['rental_income', 'rental_expenses']
-            ]
-
-            exact_matches = 0
-            total_pairs = 0
-
-            for field_pair in related_fields:
-                if all(field in row for field in field_pair):
-                    val1, val2 = row[field_pair[0]], row[field_pair[1]]
-                    if pd.notna(val1) and pd.notna(val2) and val1 > 0 and val2 > 0:
-                        total_pairs += 1
-                        if val1 == val2:
-                            exact_matches += 1
-
-            if total_pairs > 0:
-                match_ratio = exact_matches / total_pairs
-                copy_paste_indicators.append(1 if match_ratio > 0.5 else 0)
-            else:
-                copy_paste_indicators.append(0)
+        # Look for exact duplicates in related fields
+        related_fields = [
+            ['business_income', 'business_expenses'],
+            ['investment_income', 'investment_expenses'],
+            ['rental_income', 'rental_expenses']
+        ]
+
+        exact_matches = np.zeros(len(df), dtype=int)
+        total_pairs = np.zeros(len(df), dtype=int)
+
+        for first, second in related_fields:
+            if first not in df.columns or second not in df.columns:
+                continue
+
+            val1, val2 = df[first], df[second]
+            compared = (val1.notna() & val2.notna() & (val1 > 0) & (val2 > 0)).to_numpy()
+            total_pairs += compared
+            exact_matches += compared & (val1 == val2).to_numpy()
 
-        return np.array(copy_paste_indicators)
+        # More than half of the compared pairs match
+        return ((total_pairs > 0) & (2 * exact_matches > total_pairs)).astype(int)
 
     def _detect_filing_time_anomalies(self, df: pd.DataFrame) -> np.ndarray:
         """Detect unusual filing time patterns"""
         if 'filing_timestamp' not in df.columns:
             return np.zeros(len(df))
 
-        filing_times = pd.to_datetime(df['filing_timestamp'])
-        anomalies = []
-
-        for timestamp in filing_times:
-            hour = timestamp.hour
-            day_of_week = timestamp.dayofweek
-            month = timestamp.month
-
-            anomaly_score = 0
-
-            # Unusual hours (3 AM - 6 AM)
-            if 3 <= hour <= 6:
-                anomaly_score += 0.5
+        filing_times = pd.to_datetime(df['filing_timestamp']).dt
 
-            # Weekend filing for simple returns
-            if day_of_week >= 5:  # Saturday or Sunday
-                anomaly_score += 0.3
+        # Unusual hours (3 AM - 6 AM)
+        anomaly_score = np.where(filing_times.hour.between(3, 6), 0.5, 0.0)
 
-            # Filing outside tax season without obvious reason
-            if month not in [1, 2, 3, 4, 10, 11, 12]:
-                anomaly_score += 0.2
+        # Weekend filing for simple returns
+        anomaly_score = anomaly_score + np.where(filing_times.dayofweek >= 5, 0.3, 0.0)
 
-            anomalies.append(1 if anomaly_score > 0.7 else 0)
+        # Filing outside tax season without obvious reason
+        anomaly_score = anomaly_score + np.where(~filing_times.month.isin([1, 2, 3, 4, 10, 11, 12]), 0.2, 0.0)
 
-        return np.array(anomalies)
+        return (anomaly_score > 0.7).astype(int)
 
     def _analyze_data_entry_rhythm(self, df: pd.DataFrame) -> np.ndarray:
         """Analyze data entry rhythm for human vs automated patterns"""
         if 'keystroke_timings' not in df.columns:
             return np.zeros(len(df))
 
-        rhythm_scores = []
+        timings = df['keystroke_timings'].reset_index(drop=True)
+        rhythm_scores = np.zeros(len(df), dtype=int)
 
-        for idx, row in df.iterrows():
-            timings = row.get('keystroke_timings', [])
-            if len(timings) < 10:
-                rhythm_scores.append(0)
-                continue
+        long_enough = timings.map(len) >= 10
+        if not long_enough.any():
+            return rhythm_scores
 
-            # Calculate coefficient of variation in keystroke intervals
-            intervals = np.diff(timings)
-            if len(intervals) > 0:
-                cv = np.std(intervals) / np.mean(intervals)
-                # Human typing has natural variation, automated has low variation
-                rhythm_scores.append(1 if cv < 0.1 else 0)
-            else:
-                rhythm_scores.append(0)
+        # One row per keystroke, indexed by the position of its entry
+        keystrokes = timings[long_enough].explode().astype(float)
+        intervals = keystrokes.groupby(level=0).diff().dropna()
+
+        # Coefficient of variation in keystroke intervals; human typing has
+        # natural variation, automated has low variation
+        by_entry = intervals.groupby(level=0)
+        cv = by_entry.std(ddof=0) / by_entry.mean()
+        rhythm_scores[cv.index.to_numpy()] = (cv < 0.1).astype(int)
 
-        return np.array(rhythm_scores)
+        return rhythm_scores
 
     def _detect_location_mismatches(self, df: pd.DataFrame) -> np.ndarray:
         """Detect mismatches between declared location and IP location"""
-        mismatches = []
+        declared_state = self._column(df, 'state', '').fillna('').str.upper()
+        ip_state = self._column(df, 'ip_location_state', '').fillna('').str.upper()
 
-        for idx, row in df.iterrows():
-            declared_state = row.get('state', '').upper()
-            ip_state = row.get('ip_location_state', '').upper()
-
-            if declared_state and ip_state:
-                # Simple mismatch detection
-                mismatch = 1 if declared_state != ip_state else 0
-                mismatches.append(mismatch)
-            else:
-                mismatches.append(0)
+        mismatches = (declared_state != '') & (ip_state != '') & (declared_state != ip_state)
+        return mismatches.astype(int).to_numpy()
 
-        return np.array(mismatches)
-
-    def _analyze_device_patterns(self, df: pd.DataFrame) -> np.ndarray:
+    def _analyze_device_patterns(self, df: pd.DataFrame, feature_stats: Dict[str, Any]) -> np.ndarray:
         """Analyze device switching patterns"""
         if 'device_fingerprint' not in df.columns:
             return np.zeros(len(df))
 
-        # Group by user and analyze device switching frequency
-        device_switching = []
-
-        for idx, row in df.iterrows():
-            user_id = row.get('user_id')
-            if user_id:
-                user_data = df[df['user_id'] == user_id]
-                unique_devices = user_data['device_fingerprint'].nunique()
-                total_sessions = len(user_data)
+        # Unique devices per session of each user, over the whole data
+        user_ids = df['user_id']
+        switching_ratio = user_ids.map(feature_stats['device_switching_ratio'])
 
-                switching_ratio = unique_devices / max(total_sessions, 1)
-                device_switching.append(1 if switching_ratio > 0.5 else 0)
-            else:
-                device_switching.append(0)
-
-        return np.array(device_switching)
+        known_user = user_ids.notna() & (user_ids != 0) & (user_ids != '')
+        return (known_user & (switching_ratio > 0.5)).astype(int).to_numpy()
 
     def _calculate_deduction_diversity(self, df: pd.DataFrame) -> np.ndarray:
         """Calculate diversity score for deduction types"""
@@ -376,34 +399,23 @@ class FraudDetectionEngine:
             'education_expenses', 'home_office_deduction'
         ]
 
-        diversity_scores = []
-
-        for idx, row in df.iterrows():
-            non_zero_deductions = sum(1 for col in deduction_columns
-                                    if col in row and row[col] > 0)
-            total_deductions = len(deduction_columns)
+        non_zero_deductions = np.zeros(len(df), dtype=int)
+        for col in deduction_columns:
+            if col in df.columns:
+                non_zero_deductions += (df[col] > 0).to_numpy()
 
-            diversity = non_zero_deductions / total_deductions
-            diversity_scores.append(diversity)
-
-        return np.array(diversity_scores)
+        return non_zero_deductions / len(deduction_columns)
 
     def _check_tax_bracket_consistency(self, df: pd.DataFrame) -> np.ndarray:
         """Check consistency between reported income and tax bracket behavior"""
-        consistency_scores = []
-
-        for idx, row in df.iterrows():
-            income = row.get('gross_income', 0)
-            deductions = row.get('total_deductions', 0)
+        income = self._column(df, 'gross_income').to_numpy(dtype=float)
+        deductions = self._column(df, 'total_deductions').to_numpy(dtype=float)
 
-            # Higher income taxpayers typically have more complex deductions
-            expected_complexity = min(income / 50000, 3)  # Scale 0-3
-            actual_complexity = min(deductions / 10000, 3)  # Scale 0-3
+        # Higher income taxpayers typically have more complex deductions
+        expected_complexity = np.minimum(income / 50000, 3)  # Scale 0-3
+        actual_complexity = np.minimum(deductions / 10000, 3)  # Scale 0-3
 
-            consistency = 1 - abs(expected_complexity - actual_complexity) / 3
-            consistency_scores.append(consistency)
-
-        return np.array(consistency_scores)
+        return 1 - np.abs(expected_complexity - actual_complexity) / 3
 
     def fit(self, df: pd.DataFrame, labels: np.ndarray = None):
         """Train fraud detection model"""
@@ -437,8 +449,12 @@ class FraudDetectionEngine:
         if not self.is_fitted:
             raise ValueError("Model must be fitted before prediction")
 
-        # Prepare features
-        feature_df = self.prepare_fraud_features(df)
+        return self.score_features(self.prepare_fraud_features(df))
+
+    def score_features(self, feature_df: pd.DataFrame) -> np.ndarray:
+        """Fraud probability for already prepared features"""
+        if not self.is_fitted:
+            raise ValueError("Model must be fitted before prediction")
 
         # Select numerical features
         numerical_features = feature_df.select_dtypes(include=[np.number]).columns
@@ -506,6 +522,130 @@ class FraudDetectionEngine:
         return explanation
 
 
+class UserFraudState:
+    """Per-user rolling state behind the online login frequency and device switching features"""
+
+    __slots__ = ('logins', 'login_count', 'login_mean', 'login_m2', 'devices', 'sessions')
+
+    def __init__(self, window: int = LOGIN_WINDOW_DAYS):
+        self.logins = deque(maxlen=window)
+        self.login_count = 0  # non-missing values in the window
+        self.login_mean = 0.0
+        self.login_m2 = 0.0
+        self.devices = set()
+        self.sessions = 0
+
+    def add_login(self, value: float) -> Tuple[float, float]:
+        """Slide the login window by one value; returns the window's mean and sample std
+
+        Welford's update with removal of the value leaving the window, so the
+        cost does not depend on the window length. Missing values occupy a
+        slot but are left out of the moments, as in pandas rolling windows.
+        """
+        if len(self.logins) == self.logins.maxlen:
+            oldest = self.logins[0]
+            if not np.isnan(oldest):
+                self.login_count -= 1
+                if self.login_count:
+                    delta = oldest - self.login_mean
+                    self.login_mean -= delta / self.login_count
+                    self.login_m2 -= delta * (oldest - self.login_mean)
+                else:
+                    self.login_mean, self.login_m2 = 0.0, 0.0
+
+        self.logins.append(value)
+        if not np.isnan(value):
+            self.login_count += 1
+            delta = value - self.login_mean
+            self.login_mean += delta / self.login_count
+            self.login_m2 += delta * (value - self.login_mean)
+
+        if self.login_count == 0:
+            return np.nan, np.nan
+        if self.login_count == 1:
+            return self.login_mean, np.nan
+        return self.login_mean, np.sqrt(max(self.login_m2, 0.0) / (self.login_count - 1))
+
+    def add_session(self, device: Any) -> float:
+        """Count a session on a device; returns unique devices per session"""
+        self.sessions += 1
+        if pd.notna(device):
+            self.devices.add(device)
+        return len(self.devices) / self.sessions
+
+
+class OnlineFraudScorer:
+    """
+    Event-at-a-time fraud scoring from compact per-user state.
+
+    Row-local features run through the batch helpers on the incoming events;
+    the login window and device switching come from each user's
+    UserFraudState, updated in O(1) per event, so no history is reloaded.
+    An event's features equal the last row of ``prepare_fraud_features``
+    over that user's events so far, given the same reference statistics
+    for speeds, durations and deduction ratios.
+    """
+
+    def __init__(self, engine: FraudDetectionEngine, reference_stats: Dict[str, Any], max_users: int = 100000):
+        self.engine = engine
+        self.reference_stats = reference_stats
+        self.max_users = max_users
+        self.states: "OrderedDict[Any, UserFraudState]" = OrderedDict()
+
+    @classmethod
+    def from_history(cls, engine: FraudDetectionEngine, history: pd.DataFrame, **kwargs) -> 'OnlineFraudScorer':
+        """Scorer with reference statistics from past events, e.g. the training frame"""
+        return cls(engine, engine.compute_feature_stats(history), **kwargs)
+
+    def user_state(self, user_id: Any) -> UserFraudState:
+        state = self.states.get(user_id)
+        if state is None:
+            state = self.states[user_id] = UserFraudState()
+            if len(self.states) > self.max_users:
+                self.states.popitem(last=False)  # least recently seen user
+        else:
+            self.states.move_to_end(user_id)
+        return state
+
+    def forget(self, user_id: Any):
+        self.states.pop(user_id, None)
+
+    def score_events(self, events: List[Dict[str, Any]]) -> pd.DataFrame:
+        """Features (and fraud probability once the engine is fitted) for events in arrival order"""
+        df = pd.DataFrame(events)
+        features_df = self.engine.prepare_fraud_features(df, feature_stats=self.reference_stats)
+
+        login_flags = np.zeros(len(df), dtype=int)
+        device_flags = np.zeros(len(df), dtype=int)
+        track_devices = 'device_fingerprint' in df.columns
+
+        for i, event in enumerate(events):
+            user_id = event.get('user_id')
+            known_user = bool(user_id) and pd.notna(user_id)
+            state = self.user_state(user_id) if known_user else UserFraudState()
+
+            logins = event['daily_logins']
+            logins = np.nan if logins is None else float(logins)
+            mean, std = state.add_login(logins)
+            z_score = abs((logins - mean) / np.maximum(std, 0.1))
+            login_flags[i] = int(z_score > 3)
+
+            if track_devices and known_user:
+                device_flags[i] = int(state.add_session(event.get('device_fingerprint')) > 0.5)
+
+        features_df['login_frequency_anomaly'] = login_flags
+        if track_devices:
+            features_df['device_switching_frequency'] = device_flags
+
+        if self.engine.is_fitted:
+            features_df['fraud_probability'] = self.engine.score_features(features_df)
+
+        return features_df
+
+    def score_event(self, event: Dict[str, Any]) -> Dict[str, Any]:
+        return self.score_events([event]).iloc[0].to_dict()
+
+
 class UnusualPatternDetector:
     """Detect unusual patterns in tax calculations and user behavior"""
 
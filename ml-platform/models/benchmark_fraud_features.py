@@ -0,0 +1,570 @@
+"""
+Fraud Feature Benchmark
+Row-wise vs vectorized vs online FraudDetectionEngine features: parity and throughput
+
+Builds a synthetic filings frame, scores a sample with the original
+row-by-row feature code (kept below as LegacyFraudFeatures) and with the
+vectorized pipeline, whole-frame and chunked, and checks every feature column
+is identical. Streams the sample through OnlineFraudScorer and checks each
+event against the batch features of its user's events so far. Then times
+the vectorized pipeline on the full frame. Prints JSON lines; exits with
+status 1 on any mismatch.
+
+    python models/benchmark_fraud_features.py --rows 1000000 --parity-rows 20000 --chunk-size 250000
+"""
+
+import argparse
+import json
+import os
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+from scipy import stats
+
+sys.path.append(os.path.dirname(__file__))
+
+from anomaly_detection import FraudDetectionEngine, OnlineFraudScorer, LOGIN_WINDOW_DAYS
+
+FEATURE_COLUMNS = [
+    'login_frequency_anomaly', 'calculation_speed_anomaly', 'session_duration_anomaly',
+    'income_consistency_score', 'deduction_ratio_anomaly', 'tax_liability_anomaly',
+    'round_number_frequency', 'sequential_input_pattern', 'copy_paste_indicators',
+    'filing_time_anomaly', 'data_entry_rhythm', 'ip_location_mismatch',
+    'device_switching_frequency', 'expense_to_income_ratio', 'deduction_diversity_score',
+    'tax_bracket_consistency'
+]
+
+
+class LegacyFraudFeatures(FraudDetectionEngine):
+    """The feature code as it was before vectorization, one row at a time"""
+
+    def prepare_fraud_features(self, df: pd.DataFrame) -> pd.DataFrame:
+        """Row-by-row reference implementation"""
+        features_df = df.copy()
+
+        # User behavior anomalies
+        features_df['login_frequency_anomaly'] = self._detect_frequency_anomaly(
+            df, 'daily_logins', window_days=30
+        )
+
+        features_df['calculation_speed_anomaly'] = self._detect_speed_anomaly(
+            df, 'time_per_calculation'
+        )
+
+        features_df['session_duration_anomaly'] = self._detect_duration_anomaly(
+            df, 'session_duration'
+        )
+
+        # Financial anomalies
+        features_df['income_consistency_score'] = self._calculate_income_consistency(df)
+        features_df['deduction_ratio_anomaly'] = self._detect_deduction_anomalies(df)
+        features_df['tax_liability_anomaly'] = self._detect_tax_liability_anomalies(df)
+
+        # Pattern-based features
+        features_df['round_number_frequency'] = self._detect_round_number_patterns(df)
+        features_df['sequential_input_pattern'] = self._detect_sequential_patterns(df)
+        features_df['copy_paste_indicators'] = self._detect_copy_paste_behavior(df)
+
+        # Temporal anomalies
+        features_df['filing_time_anomaly'] = self._detect_filing_time_anomalies(df)
+        features_df['data_entry_rhythm'] = self._analyze_data_entry_rhythm(df)
+
+        # Cross-reference anomalies
+        features_df['ip_location_mismatch'] = self._detect_location_mismatches(df)
+        features_df['device_switching_frequency'] = self._analyze_device_patterns(df)
+
+        # Advanced financial ratios
+        features_df['expense_to_income_ratio'] = (
+            df['total_expenses'] / np.maximum(df['gross_income'], 1)
+        )
+
+        features_df['deduction_diversity_score'] = self._calculate_deduction_diversity(df)
+        features_df['tax_bracket_consistency'] = self._check_tax_bracket_consistency(df)
+
+        return features_df
+
+    def _detect_frequency_anomaly(self, df: pd.DataFrame, column: str, window_days: int) -> np.ndarray:
+        """Detect unusual frequency patterns"""
+        rolling_mean = df[column].rolling(window=window_days, min_periods=1).mean()
+        rolling_std = df[column].rolling(window=window_days, min_periods=1).std()
+
+        z_scores = np.abs((df[column] - rolling_mean) / np.maximum(rolling_std, 0.1))
+        return (z_scores > 3).astype(int)
+
+    def _detect_speed_anomaly(self, df: pd.DataFrame, column: str) -> np.ndarray:
+        """Detect unusually fast or slow calculation speeds"""
+        speeds = df[column].fillna(df[column].median())
+        q1, q3 = speeds.quantile([0.25, 0.75])
+        iqr = q3 - q1
+
+        lower_bound = q1 - 3 * iqr
+        upper_bound = q3 + 3 * iqr
+
+        return ((speeds < lower_bound) | (speeds > upper_bound)).astype(int)
+
+    def _detect_duration_anomaly(self, df: pd.DataFrame, column: str) -> np.ndarray:
+        """Detect unusual session durations"""
+        durations = df[column].fillna(df[column].median())
+
+        # Use log transformation for skewed duration data
+        log_durations = np.log1p(durations)
+        z_scores = np.abs(stats.zscore(log_durations))
+
+        return (z_scores > 3).astype(int)
+
+    def _calculate_income_consistency(self, df: pd.DataFrame) -> np.ndarray:
+        """Calculate income consistency score across multiple entries"""
+        consistency_scores = []
+
+        for idx, row in df.iterrows():
+            # Check consistency between different income sources
+            income_sources = [
+                row.get('salary_income', 0),
+                row.get('business_income', 0),
+                row.get('investment_income', 0),
+                row.get('other_income', 0)
+            ]
+
+            total_declared = sum(income_sources)
+            gross_income = row.get('gross_income', 0)
+
+            if gross_income > 0:
+                consistency = abs(total_declared - gross_income) / gross_income
+            else:
+                consistency = 0
+
+            consistency_scores.append(min(consistency, 1.0))
+
+        return np.array(consistency_scores)
+
+    def _detect_deduction_anomalies(self, df: pd.DataFrame) -> np.ndarray:
+        """Detect unusual deduction patterns"""
+        deduction_ratios = df['total_deductions'] / np.maximum(df['gross_income'], 1)
+
+        # Calculate expected deduction ratio by income bracket
+        income_brackets = pd.cut(df['gross_income'], bins=5, labels=['low', 'med_low', 'med', 'med_high', 'high'])
+        expected_ratios = deduction_ratios.groupby(income_brackets).median()
+
+        anomaly_scores = []
+        for idx, row in df.iterrows():
+            bracket = income_brackets.iloc[idx]
+            actual_ratio = deduction_ratios.iloc[idx]
+            expected_ratio = expected_ratios[bracket] if pd.notna(bracket) else deduction_ratios.median()
+
+            anomaly_score = abs(actual_ratio - expected_ratio) / max(expected_ratio, 0.01)
+            anomaly_scores.append(anomaly_score)
+
+        return (np.array(anomaly_scores) > 2).astype(int)
+
+    def _detect_tax_liability_anomalies(self, df: pd.DataFrame) -> np.ndarray:
+        """Detect unusual tax liability calculations"""
+        # Calculate expected tax liability based on income and standard patterns
+        expected_tax_rates = {
+            (0, 10000): 0.10,
+            (10000, 40000): 0.12,
+            (40000, 85000): 0.22,
+            (85000, 163000): 0.24,
+            (163000, 207000): 0.32,
+            (207000, 518000): 0.35,
+            (518000, float('inf')): 0.37
+        }
+
+        anomalies = []
+        for idx, row in df.iterrows():
+            income = row.get('gross_income', 0)
+            actual_tax = row.get('tax_liability', 0)
+
+            # Find expected tax rate
+            expected_rate = 0.22  # Default
+            for (min_inc, max_inc), rate in expected_tax_rates.items():
+                if min_inc <= income < max_inc:
+                    expected_rate = rate
+                    break
+
+            expected_tax = income * expected_rate
+            if expected_tax > 0:
+                deviation = abs(actual_tax - expected_tax) / expected_tax
+                anomalies.append(1 if deviation > 0.5 else 0)
+            else:
+                anomalies.append(0)
+
+        return np.array(anomalies)
+
+    def _detect_round_number_patterns(self, df: pd.DataFrame) -> np.ndarray:
+        """Detect suspicious round number patterns"""
+        numeric_columns = ['gross_income', 'total_deductions', 'charitable_donations', 'business_expenses']
+        round_scores = []
+
+        for idx, row in df.iterrows():
+            round_count = 0
+            total_numbers = 0
+
+            for col in numeric_columns:
+                if col in row and pd.notna(row[col]) and row[col] > 0:
+                    value = row[col]
+                    total_numbers += 1
+
+                    # Check if number is suspiciously round
+                    if value % 1000 == 0 or value % 500 == 0:
+                        round_count += 1
+                    elif str(value).endswith('00') and value > 100:
+                        round_count += 0.5
+
+            round_ratio = round_count / max(total_numbers, 1)
+            round_scores.append(round_ratio)
+
+        return (np.array(round_scores) > 0.7).astype(int)
+
+    def _detect_sequential_patterns(self, df: pd.DataFrame) -> np.ndarray:
+        """Detect sequential input patterns that may indicate automated entry"""
+        sequential_scores = []
+
+        for idx, row in df.iterrows():
+            # Check for sequential patterns in numerical inputs
+            numeric_values = [
+                row.get('gross_income', 0),
+                row.get('total_deductions', 0),
+                row.get('charitable_donations', 0),
+                row.get('medical_expenses', 0)
+            ]
+
+            # Remove zeros and sort
+            non_zero_values = sorted([v for v in numeric_values if v > 0])
+
+            if len(non_zero_values) >= 3:
+                # Check for arithmetic progression
+                differences = [non_zero_values[i+1] - non_zero_values[i]
+                             for i in range(len(non_zero_values)-1)]
+
+                # Check if differences are roughly equal (arithmetic sequence)
+                if len(set(differences)) <= 2 and max(differences) > 0:
+                    sequential_scores.append(1)
+                else:
+                    sequential_scores.append(0)
+            else:
+                sequential_scores.append(0)
+
+        return np.array(sequential_scores)
+
+    def _detect_copy_paste_behavior(self, df: pd.DataFrame) -> np.ndarray:
+        """Detect potential copy-paste behavior in form filling"""
+        copy_paste_indicators = []
+
+        for idx, row in df.iterrows():
+            # Look for exact duplicates in related fields
+            related_fields = [
+                ['business_income', 'business_expenses'],
+                ['investment_income', 'investment_expenses'],
+                ['rental_income', 'rental_expenses']
+            ]
+
+            exact_matches = 0
+            total_pairs = 0
+
+            for field_pair in related_fields:
+                if all(field in row for field in field_pair):
+                    val1, val2 = row[field_pair[0]], row[field_pair[1]]
+                    if pd.notna(val1) and pd.notna(val2) and val1 > 0 and val2 > 0:
+                        total_pairs += 1
+                        if val1 == val2:
+                            exact_matches += 1
+
+            if total_pairs > 0:
+                match_ratio = exact_matches / total_pairs
+                copy_paste_indicators.append(1 if match_ratio > 0.5 else 0)
+            else:
+                copy_paste_indicators.append(0)
+
+        return np.array(copy_paste_indicators)
+
+    def _detect_filing_time_anomalies(self, df: pd.DataFrame) -> np.ndarray:
+        """Detect unusual filing time patterns"""
+        if 'filing_timestamp' not in df.columns:
+            return np.zeros(len(df))
+
+        filing_times = pd.to_datetime(df['filing_timestamp'])
+        anomalies = []
+
+        for timestamp in filing_times:
+            hour = timestamp.hour
+            day_of_week = timestamp.dayofweek
+            month = timestamp.month
+
+            anomaly_score = 0
+
+            # Unusual hours (3 AM - 6 AM)
+            if 3 <= hour <= 6:
+                anomaly_score += 0.5
+
+            # Weekend filing for simple returns
+            if day_of_week >= 5:  # Saturday or Sunday
+                anomaly_score += 0.3
+
+            # Filing outside tax season without obvious reason
+            if month not in [1, 2, 3, 4, 10, 11, 12]:
+                anomaly_score += 0.2
+
+            anomalies.append(1 if anomaly_score > 0.7 else 0)
+
+        return np.array(anomalies)
+
+    def _analyze_data_entry_rhythm(self, df: pd.DataFrame) -> np.ndarray:
+        """Analyze data entry rhythm for human vs automated patterns"""
+        if 'keystroke_timings' not in df.columns:
+            return np.zeros(len(df))
+
+        rhythm_scores = []
+
+        for idx, row in df.iterrows():
+            timings = row.get('keystroke_timings', [])
+            if len(timings) < 10:
+                rhythm_scores.append(0)
+                continue
+
+            # Calculate coefficient of variation in keystroke intervals
+            intervals = np.diff(timings)
+            if len(intervals) > 0:
+                cv = np.std(intervals) / np.mean(intervals)
+                # Human typing has natural variation, automated has low variation
+                rhythm_scores.append(1 if cv < 0.1 else 0)
+            else:
+                rhythm_scores.append(0)
+
+        return np.array(rhythm_scores)
+
+    def _detect_location_mismatches(self, df: pd.DataFrame) -> np.ndarray:
+        """Detect mismatches between declared location and IP location"""
+        mismatches = []
+
+        for idx, row in df.iterrows():
+            declared_state = row.get('state', '').upper()
+            ip_state = row.get('ip_location_state', '').upper()
+
+            if declared_state and ip_state:
+                # Simple mismatch detection
+                mismatch = 1 if declared_state != ip_state else 0
+                mismatches.append(mismatch)
+            else:
+                mismatches.append(0)
+
+        return np.array(mismatches)
+
+    def _analyze_device_patterns(self, df: pd.DataFrame) -> np.ndarray:
+        """Analyze device switching patterns"""
+        if 'device_fingerprint' not in df.columns:
+            return np.zeros(len(df))
+
+        # Group by user and analyze device switching frequency
+        device_switching = []
+
+        for idx, row in df.iterrows():
+            user_id = row.get('user_id')
+            if user_id:
+                user_data = df[df['user_id'] == user_id]
+                unique_devices = user_data['device_fingerprint'].nunique()
+                total_sessions = len(user_data)
+
+                switching_ratio = unique_devices / max(total_sessions, 1)
+                device_switching.append(1 if switching_ratio > 0.5 else 0)
+            else:
+                device_switching.append(0)
+
+        return np.array(device_switching)
+
+    def _calculate_deduction_diversity(self, df: pd.DataFrame) -> np.ndarray:
+        """Calculate diversity score for deduction types"""
+        deduction_columns = [
+            'charitable_donations', 'medical_expenses', 'business_expenses',
+            'education_expenses', 'home_office_deduction'
+        ]
+
+        diversity_scores = []
+
+        for idx, row in df.iterrows():
+            non_zero_deductions = sum(1 for col in deduction_columns
+                                    if col in row and row[col] > 0)
+            total_deductions = len(deduction_columns)
+
+            diversity = non_zero_deductions / total_deductions
+            diversity_scores.append(diversity)
+
+        return np.array(diversity_scores)
+
+    def _check_tax_bracket_consistency(self, df: pd.DataFrame) -> np.ndarray:
+        """Check consistency between reported income and tax bracket behavior"""
+        consistency_scores = []
+
+        for idx, row in df.iterrows():
+            income = row.get('gross_income', 0)
+            deductions = row.get('total_deductions', 0)
+
+            # Higher income taxpayers typically have more complex deductions
+            expected_complexity = min(income / 50000, 3)  # Scale 0-3
+            actual_complexity = min(deductions / 10000, 3)  # Scale 0-3
+
+            consistency = 1 - abs(expected_complexity - actual_complexity) / 3
+            consistency_scores.append(consistency)
+
+        return np.array(consistency_scores)
+
+
+def make_filings(rows: int, seed: int = 0) -> pd.DataFrame:
+    """Synthetic filings that exercise every feature, including the rare flags"""
+    rng = np.random.default_rng(seed)
+    states = np.array(['CA', 'NY', 'TX', 'WA', 'FL'])
+
+    gross_income = rng.lognormal(11, 0.8, rows).round(2)
+    # Some round and some integer-valued amounts
+    round_income = rng.random(rows) < 0.1
+    gross_income[round_income] = rng.integers(1, 200, round_income.sum()) * 500
+    total_deductions = (gross_income * rng.uniform(0, 0.4, rows)).round(0).astype(np.int64)
+
+    df = pd.DataFrame({
+        'user_id': rng.integers(0, max(rows // 4, 1), rows),
+        'device_fingerprint': rng.choice([f'device-{i}' for i in range(50)], rows),
+        'daily_logins': rng.poisson(2, rows),
+        'time_per_calculation': np.where(rng.random(rows) < 0.05, np.nan, rng.lognormal(3, 1, rows)),
+        'session_duration': np.where(rng.random(rows) < 0.05, np.nan, rng.lognormal(6, 1.2, rows)),
+        'gross_income': gross_income,
+        'salary_income': (gross_income * rng.uniform(0.5, 1.0, rows)).round(2),
+        'business_income': rng.choice([0.0, 5000.0, 12000.0], rows),
+        'business_expenses': rng.choice([0.0, 5000.0, 7300.0], rows),
+        'investment_income': rng.choice([0.0, 800.0, 2500.0], rows),
+        'investment_expenses': rng.choice([0.0, 800.0], rows),
+        'rental_income': rng.choice([0.0, 9600.0], rows),
+        'rental_expenses': rng.choice([0.0, 9600.0, 4100.0], rows),
+        'other_income': np.where(rng.random(rows) < 0.02, np.nan, 0.0),
+        'total_deductions': total_deductions,
+        'charitable_donations': rng.choice([0, 100, 1000, 1250, 2000], rows),
+        'medical_expenses': rng.choice([0.0, 1500.0, 3000.0, 4500.0], rows),
+        'education_expenses': rng.choice([0.0, 2500.0], rows),
+        'home_office_deduction': rng.choice([0.0, 1500.0], rows),
+        'tax_liability': (gross_income * rng.uniform(0.05, 0.4, rows)).round(2),
+        'total_expenses': (gross_income * rng.uniform(0, 0.6, rows)).round(2),
+        'filing_timestamp': pd.Timestamp('2024-01-01') + pd.to_timedelta(rng.integers(0, 366 * 24 * 3600, rows), unit='s'),
+        'state': rng.choice(states, rows),
+        'ip_location_state': np.where(rng.random(rows) < 0.1, rng.choice(states, rows), ''),
+    })
+
+    # Arithmetic progressions across income, deductions, donations and medical expenses
+    sequential = rng.random(rows) < 0.02
+    start, step = rng.integers(1, 50, rows) * 100, rng.integers(1, 20, rows) * 100
+    df.loc[sequential, 'charitable_donations'] = start[sequential]
+    df.loc[sequential, 'medical_expenses'] = (start + step)[sequential]
+    df.loc[sequential, 'total_deductions'] = (start + 2 * step)[sequential]
+    df.loc[sequential, 'gross_income'] = (start + 3 * step)[sequential]
+
+    # Keystroke timings; a few rows type at a machine-regular pace
+    regular = rng.random(rows) < 0.05
+    lengths = rng.integers(5, 30, rows)
+    df['keystroke_timings'] = [
+        list(np.cumsum(np.full(length, 0.12) if is_regular else rng.exponential(0.2, length)))
+        for length, is_regular in zip(lengths, regular)
+    ]
+
+    return df
+
+
+def compare(expected: pd.DataFrame, actual: pd.DataFrame) -> list:
+    """Feature columns whose values differ (NaN equal to NaN)"""
+    return [
+        column for column in FEATURE_COLUMNS
+        if not np.array_equal(expected[column].to_numpy(dtype=float),
+                              actual[column].to_numpy(dtype=float), equal_nan=True)
+    ]
+
+
+def stream_online(engine: FraudDetectionEngine, sample: pd.DataFrame, batch_size: int) -> pd.DataFrame:
+    """Online features for the sample's events in arrival order, in micro-batches"""
+    scorer = OnlineFraudScorer.from_history(engine, sample)
+    events = sample.to_dict('records')
+    return pd.concat(
+        [scorer.score_events(events[start:start + batch_size]) for start in range(0, len(events), batch_size)],
+        ignore_index=True
+    )
+
+
+def batch_prefix_features(engine: FraudDetectionEngine, sample: pd.DataFrame, users: int):
+    """Batch features of each event over its user's events so far, for the first users"""
+    reference = engine.compute_feature_stats(sample)
+    positions, expected = [], []
+
+    known_users = [user_id for user_id in sample['user_id'].unique() if user_id][:users]
+    for user_id in known_users:
+        rows = np.flatnonzero(sample['user_id'].to_numpy() == user_id)
+        for end in range(1, len(rows) + 1):
+            prefix = sample.iloc[rows[:end]].reset_index(drop=True)
+            # Device switching is per user: the user's own events, as online
+            feature_stats = {
+                **reference,
+                'device_switching_ratio': engine.compute_feature_stats(prefix)['device_switching_ratio']
+            }
+            expected.append(engine.prepare_fraud_features(prefix, feature_stats=feature_stats).iloc[[-1]])
+            positions.append(rows[end - 1])
+
+    return positions, pd.concat(expected, ignore_index=True)
+
+
+def timed(function, *args):
+    started = time.perf_counter()
+    result = function(*args)
+    return result, time.perf_counter() - started
+
+
+def throughput(mode: str, rows: int, seconds: float) -> dict:
+    return {"mode": mode, "rows": rows, "seconds": round(seconds, 3), "rows_per_second": round(rows / seconds, 1)}
+
+
+def main(args):
+    engine = FraudDetectionEngine()
+    df = make_filings(args.rows)
+    sample = df.iloc[:args.parity_rows].reset_index(drop=True)
+
+    legacy, legacy_seconds = timed(LegacyFraudFeatures().prepare_fraud_features, sample)
+    vectorized, vectorized_seconds = timed(engine.prepare_fraud_features, sample)
+    chunk_size = max(args.parity_rows // 4, LOGIN_WINDOW_DAYS // 2)
+    chunked = pd.concat(engine.prepare_fraud_features_chunked(
+        lambda: (sample.iloc[start:start + chunk_size] for start in range(0, len(sample), chunk_size))
+    ))
+
+    online, online_seconds = timed(stream_online, engine, sample, args.online_batch_size)
+    positions, prefix_expected = batch_prefix_features(engine, sample, args.online_users)
+
+    mismatches = {
+        "vectorized": compare(legacy, vectorized),
+        "chunked": compare(legacy, chunked),
+        "online": compare(prefix_expected, online.iloc[positions])
+    }
+    print(json.dumps({"check": "parity", "rows": len(sample), "online_events_checked": len(positions),
+                      "mismatched_columns": mismatches}))
+    print(json.dumps(throughput("row_loop", len(sample), legacy_seconds)))
+    print(json.dumps(throughput("vectorized", len(sample), vectorized_seconds)))
+    print(json.dumps(throughput(f"online_batch_{args.online_batch_size}", len(sample), online_seconds)))
+
+    _, seconds = timed(engine.prepare_fraud_features, df)
+    print(json.dumps(throughput("vectorized", len(df), seconds)))
+
+    def score_chunks():
+        for features in engine.prepare_fraud_features_chunked(
+            lambda: (df.iloc[start:start + args.chunk_size] for start in range(0, len(df), args.chunk_size))
+        ):
+            del features
+
+    _, seconds = timed(score_chunks)
+    print(json.dumps(throughput(f"chunked_{args.chunk_size}", len(df), seconds)))
+
+    if any(mismatches.values()):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[1])
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--parity-rows", type=int, default=20_000)
+    parser.add_argument("--chunk-size", type=int, default=250_000)
+    parser.add_argument("--online-batch-size", type=int, default=500)
+    parser.add_argument("--online-users", type=int, default=200)
+
+    main(parser.parse_args())
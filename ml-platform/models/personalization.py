@@ -6,35 +6,144 @@ Advanced recommendation and personalization models
 import pandas as pd
 import numpy as np
 from sklearn.feature_extraction.text import TfidfVectorizer
-from sklearn.metrics.pairwise import cosine_similarity
 from sklearn.decomposition import TruncatedSVD
 from sklearn.ensemble import RandomForestRegressor
 from sklearn.preprocessing import StandardScaler
+from sklearn.cluster import MiniBatchKMeans
 import lightgbm as lgb
 import pickle
 import logging
-from typing import Dict, List, Any, Tuple, Optional
+from typing import Dict, List, Any, Tuple, Optional, Iterable, Iterator
 from datetime import datetime, timedelta
 import json
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+COMPLEXITY_LEVELS = {'beginner': 1, 'intermediate': 2, 'advanced': 3}
+
+# Inputs of the tip scoring model, in training order
+TIP_MODEL_FEATURES = [
+    'user_income', 'user_age', 'user_has_dependents', 'user_is_business_owner',
+    'tip_savings_potential', 'tip_applicability_score',
+    'income_tip_match', 'filing_status_match', 'complexity_match',
+    'savings_to_income_ratio'
+]
+
+# User × item (tip or content) pairs scored per block of users
+SCORE_BLOCK_PAIRS = 1_000_000
+
+# Catalog size from which collaborative recommendations search an IVF index
+ANN_MIN_ITEMS = 50_000
+
+
+def _column(df: pd.DataFrame, column: str, default: Any) -> pd.Series:
+    """A column, or the default for every row when the frame lacks it"""
+    if column in df.columns:
+        return df[column]
+    return pd.Series(default, index=df.index)
+
+
+def top_k_columns(scores: np.ndarray, k: int) -> np.ndarray:
+    """Column indices of the k highest scores in each row, best first
+
+    argpartition finds each row's k-th highest score in linear time; ties are
+    kept in column order, as a stable descending sort would.
+    """
+    n_rows, n_columns = scores.shape
+    k = min(k, n_columns)
+    if k <= 0:
+        return np.zeros((n_rows, 0), dtype=np.intp)
+
+    kth_columns = np.argpartition(-scores, k - 1, axis=1)[:, k - 1:k]
+    kth = np.take_along_axis(scores, kth_columns, axis=1)
+
+    above = scores > kth
+    tied = scores == kth
+    needed = (k - above.sum(axis=1))[:, None]
+    chosen = above | (tied & (np.cumsum(tied, axis=1) <= needed))
+
+    columns = np.nonzero(chosen)[1].reshape(n_rows, k)
+    order = np.lexsort((columns, -np.take_along_axis(scores, columns, axis=1)), axis=1)
+    return np.take_along_axis(columns, order, axis=1)
+
+
+class IVFIndex:
+    """
+    Inverted-file index for approximate maximum inner product search.
+
+    Item vectors are clustered with k-means; a query scores only the items
+    in the n_probe lists whose centroids have the highest inner product
+    with it, instead of the whole catalog.
+    """
+
+    def __init__(self, n_lists: Optional[int] = None, n_probe: int = 8, random_state: int = 42):
+        self.n_lists = n_lists
+        self.n_probe = n_probe
+        self.random_state = random_state
+        self.vectors = None
+        self.centroids = None
+        self.list_items = None
+        self.list_offsets = None
+
+    def build(self, vectors: np.ndarray) -> 'IVFIndex':
+        n_lists = self.n_lists or max(1, int(np.sqrt(len(vectors))))
+        kmeans = MiniBatchKMeans(n_clusters=n_lists, random_state=self.random_state, n_init=3).fit(vectors)
+
+        # Items of list l are list_items[list_offsets[l]:list_offsets[l + 1]]
+        self.vectors = vectors
+        self.centroids = kmeans.cluster_centers_
+        self.list_items = np.argsort(kmeans.labels_, kind='stable')
+        self.list_offsets = np.searchsorted(kmeans.labels_[self.list_items], np.arange(n_lists + 1))
+        return self
+
+    def search(self, queries: np.ndarray, k: int,
+               exclude: Optional[np.ndarray] = None) -> Tuple[np.ndarray, np.ndarray]:
+        """Approximate top k items per query as (items, scores), padded with -1 and -inf
+
+        exclude is an optional (queries, items) mask of items never returned.
+        """
+        probes = top_k_columns(queries @ self.centroids.T, self.n_probe)
+        items = np.full((len(queries), k), -1, dtype=np.intp)
+        scores = np.full((len(queries), k), -np.inf)
+
+        for i, (query, lists) in enumerate(zip(queries, probes)):
+            candidates = np.concatenate([
+                self.list_items[self.list_offsets[l]:self.list_offsets[l + 1]] for l in lists
+            ])
+            if exclude is not None:
+                candidates = candidates[~exclude[i, candidates]]
+
+            candidate_scores = self.vectors[candidates] @ query
+            top = top_k_columns(candidate_scores[None, :], k)[0]
+            items[i, :len(top)] = candidates[top]
+            scores[i, :len(top)] = candidate_scores[top]
+
+        return items, scores
+
 
 class ContentRecommendationEngine:
     """Content-based and collaborative filtering recommendation system"""
 
-    def __init__(self):
+    def __init__(self, ann_min_items: Optional[int] = ANN_MIN_ITEMS):
         self.content_vectorizer = TfidfVectorizer(
             max_features=10000,
             stop_words='english',
             ngram_range=(1, 2)
         )
         self.svd_model = TruncatedSVD(n_components=100)
-        self.content_similarity = None
+        self.ann_min_items = ann_min_items
         self.user_item_matrix = None
         self.content_features = None
 
+        # Row lookups and precomputed matrices, set by fit_content_model
+        self.content_rows: Dict[Any, int] = {}  # content_id -> content_features row
+        self.content_vectors = None  # unit-norm TF-IDF rows, one per content row
+        self.ratings = None  # user_item_matrix values
+        self.item_content_rows = None  # content row of each user_item_matrix column, -1 if none
+        self.item_embeddings = None  # SVD item factors, one row per user_item_matrix column
+        self.item_index: Optional[IVFIndex] = None
+
     def prepare_content_data(self, content_df: pd.DataFrame) -> pd.DataFrame:
         """Prepare content data with features"""
         features_df = content_df.copy()
@@ -97,11 +206,12 @@ class ContentRecommendationEngine:
         logger.info("Training content recommendation model")
 
         # Prepare content features
-        content_features = self.prepare_content_data(content_df)
+        content_features = self.prepare_content_data(content_df).reset_index(drop=True)
+        self.content_rows = {content_id: row for row, content_id in enumerate(content_features['content_id'])}
 
-        # Create content similarity matrix
-        text_features = self.content_vectorizer.fit_transform(content_features['combined_text'])
-        self.content_similarity = cosine_similarity(text_features)
+        # TF-IDF rows are unit-norm, so content similarity is a sparse dot
+        # product computed per query instead of a dense items × items matrix
+        self.content_vectors = self.content_vectorizer.fit_transform(content_features['combined_text'])
 
         # Prepare user-item matrix for collaborative filtering
         self.user_item_matrix = interaction_df.pivot_table(
@@ -110,10 +220,21 @@ class ContentRecommendationEngine:
             values='rating',
             fill_value=0
         )
+        self.ratings = self.user_item_matrix.to_numpy(dtype=float)
+        self.item_content_rows = np.array(
+            [self.content_rows.get(content_id, -1) for content_id in self.user_item_matrix.columns],
+            dtype=np.intp
+        )
 
         # Fit SVD for collaborative filtering
+        self.item_embeddings = None
+        self.item_index = None
         if self.user_item_matrix.shape[1] > 100:
-            self.svd_model.fit(self.user_item_matrix.values)
+            self.svd_model.fit(self.ratings)
+            self.item_embeddings = np.ascontiguousarray(self.svd_model.components_.T)
+
+            if self.ann_min_items is not None and len(self.item_embeddings) >= self.ann_min_items:
+                self.item_index = IVFIndex().build(self.item_embeddings)
 
         self.content_features = content_features
         logger.info("Content recommendation model trained successfully")
@@ -137,23 +258,82 @@ class ContentRecommendationEngine:
 
         return recommendations[:top_k]
 
+    def get_collaborative_recommendations_batch(self, user_ids: Iterable, top_k: int = 10) -> pd.DataFrame:
+        """Collaborative recommendations for many users
+
+        Returns user_id, content_id, title, rank (1 is best) and score rows;
+        users without ratings are skipped. Each block of users is scored
+        with one matrix multiply (or one index search).
+        """
+        columns = ['user_id', 'content_id', 'title', 'rank', 'score']
+        if self.item_embeddings is None:
+            return pd.DataFrame(columns=columns)
+
+        user_index = self.user_item_matrix.index
+        known = [user_id for user_id in user_ids if user_id in user_index]
+        rows = user_index.get_indexer(known)
+        block_size = max(1, SCORE_BLOCK_PAIRS // len(self.item_embeddings))
+
+        content_ids = self.content_features['content_id'].to_numpy()
+        titles = self.content_features['title'].to_numpy()
+
+        blocks = []
+        for start in range(0, len(rows), block_size):
+            block_rows = rows[start:start + block_size]
+            items, scores = self._collaborative_top_k(block_rows, top_k)
+            user_rows, ranks = np.nonzero(items >= 0)
+            content_rows = self.item_content_rows[items[user_rows, ranks]]
+
+            blocks.append(pd.DataFrame({
+                'user_id': user_index[block_rows][user_rows],
+                'content_id': content_ids[content_rows],
+                'title': titles[content_rows],
+                'rank': ranks + 1,
+                'score': scores[user_rows, ranks]
+            }))
+
+        return pd.concat(blocks, ignore_index=True) if blocks else pd.DataFrame(columns=columns)
+
+    def _collaborative_top_k(self, rows: np.ndarray, top_k: int) -> Tuple[np.ndarray, np.ndarray]:
+        """Top unrated items for users at the given user_item_matrix rows
+
+        Returns (users, top_k) user_item_matrix columns and scores, padded
+        with -1 and -inf when a user has fewer candidate items.
+        """
+        ratings = self.ratings[rows]
+        user_embeddings = ratings @ self.item_embeddings  # svd_model.transform
+
+        # Rated items and items missing from the content catalog are never recommended
+        excluded = (ratings != 0) | (self.item_content_rows < 0)
+
+        if self.item_index is not None:
+            return self.item_index.search(user_embeddings, top_k, exclude=excluded)
+
+        item_scores = user_embeddings @ self.item_embeddings.T
+        item_scores[excluded] = -np.inf
+
+        top = top_k_columns(item_scores, top_k)
+        top_scores = np.take_along_axis(item_scores, top, axis=1)
+        return np.where(np.isfinite(top_scores), top, -1), top_scores
+
     def _get_content_based_recommendations(self, content_id: int, top_k: int) -> List[Dict]:
         """Get content-based recommendations"""
-        if self.content_similarity is None:
+        if self.content_vectors is None or content_id not in self.content_rows:
             return []
 
-        content_idx = self.content_features[self.content_features['content_id'] == content_id].index[0]
-        similarity_scores = self.content_similarity[content_idx]
+        content_idx = self.content_rows[content_id]
+        similarity_scores = (self.content_vectors @ self.content_vectors[content_idx].T).toarray().ravel()
+        similarity_scores[content_idx] = -np.inf  # never the content itself
 
         # Get top similar content
-        similar_indices = np.argsort(similarity_scores)[::-1][1:top_k+1]
+        similar_indices = top_k_columns(similarity_scores[None, :], top_k)[0]
+        similar_indices = similar_indices[np.isfinite(similarity_scores[similar_indices])]
 
         recommendations = []
         for idx in similar_indices:
-            content_row = self.content_features.iloc[idx]
             recommendations.append({
-                'content_id': content_row['content_id'],
-                'title': content_row['title'],
+                'content_id': self.content_features.at[idx, 'content_id'],
+                'title': self.content_features.at[idx, 'title'],
                 'score': float(similarity_scores[idx]),
                 'reason': 'content_similarity'
             })
@@ -162,109 +342,89 @@ class ContentRecommendationEngine:
 
     def _get_collaborative_recommendations(self, user_id: int, top_k: int) -> List[Dict]:
         """Get collaborative filtering recommendations"""
-        if user_id not in self.user_item_matrix.index:
+        if self.item_embeddings is None or user_id not in self.user_item_matrix.index:
             return []
 
         user_idx = self.user_item_matrix.index.get_loc(user_id)
-        user_vector = self.user_item_matrix.values[user_idx:user_idx+1]
-
-        if hasattr(self.svd_model, 'components_'):
-            # Transform user vector
-            user_reduced = self.svd_model.transform(user_vector)
-
-            # Calculate scores for all items
-            item_scores = user_reduced.dot(self.svd_model.components_)
+        items, scores = self._collaborative_top_k(np.array([user_idx]), top_k)
 
-            # Get unrated items
-            unrated_items = np.where(user_vector[0] == 0)[0]
-            item_scores_filtered = [(idx, item_scores[0][idx]) for idx in unrated_items]
-            item_scores_filtered.sort(key=lambda x: x[1], reverse=True)
-
-            recommendations = []
-            for item_idx, score in item_scores_filtered[:top_k]:
-                content_id = self.user_item_matrix.columns[item_idx]
-                content_row = self.content_features[self.content_features['content_id'] == content_id]
-
-                if not content_row.empty:
-                    recommendations.append({
-                        'content_id': content_id,
-                        'title': content_row.iloc[0]['title'],
-                        'score': float(score),
-                        'reason': 'collaborative_filtering'
-                    })
+        recommendations = []
+        for item_idx, score in zip(items[0], scores[0]):
+            if item_idx < 0:
+                break
 
-            return recommendations
+            content_idx = self.item_content_rows[item_idx]
+            recommendations.append({
+                'content_id': self.content_features.at[content_idx, 'content_id'],
+                'title': self.content_features.at[content_idx, 'title'],
+                'score': float(score),
+                'reason': 'collaborative_filtering'
+            })
 
-        return []
+        return recommendations
 
     def _get_profile_based_recommendations(self, user_profile: Dict, top_k: int) -> List[Dict]:
         """Get recommendations based on user profile"""
         if not user_profile or self.content_features is None:
             return []
 
-        # Calculate profile-content match scores
-        content_scores = []
-
-        for _, content in self.content_features.iterrows():
-            score = self._calculate_profile_match_score(user_profile, content)
-            content_scores.append((content['content_id'], score, content['title']))
-
-        # Sort by score
-        content_scores.sort(key=lambda x: x[1], reverse=True)
+        content_scores = self._profile_match_scores(user_profile)
+        top = top_k_columns(content_scores[None, :], top_k)[0]
 
         recommendations = []
-        for content_id, score, title in content_scores[:top_k]:
+        for idx in top:
             recommendations.append({
-                'content_id': content_id,
-                'title': title,
-                'score': score,
+                'content_id': self.content_features.at[idx, 'content_id'],
+                'title': self.content_features.at[idx, 'title'],
+                'score': float(content_scores[idx]),
                 'reason': 'profile_match'
             })
 
         return recommendations
 
-    def _calculate_profile_match_score(self, user_profile: Dict, content: pd.Series) -> float:
-        """Calculate how well content matches user profile"""
-        score = 0.0
+    def _profile_match_scores(self, user_profile: Dict) -> np.ndarray:
+        """How well each content row matches the user profile"""
+        content = self.content_features
+        score = np.zeros(len(content))
 
-        # Income bracket matching
-        if user_profile.get('income_bracket') == content.get('target_income_bracket'):
-            score += 0.3
+        # Income bracket matching (a profile without a bracket matches a catalog without one)
+        if 'target_income_bracket' in content.columns:
+            income_match = content['target_income_bracket'] == user_profile.get('income_bracket')
+        else:
+            income_match = user_profile.get('income_bracket') is None
+        score += np.where(income_match, 0.3, 0.0)
 
         # Filing status matching
-        if user_profile.get('filing_status') in str(content.get('applicable_filing_status', '')):
-            score += 0.2
+        filing_status = user_profile.get('filing_status')
+        if filing_status is not None:
+            applicable = _column(content, 'applicable_filing_status', '').astype(str)
+            score += np.where(applicable.str.contains(str(filing_status), regex=False), 0.2, 0.0)
 
         # Complexity matching
         user_experience = user_profile.get('tax_experience_level', 'beginner')
-        if user_experience == content.get('difficulty'):
-            score += 0.2
+        score += np.where(_column(content, 'difficulty', None) == user_experience, 0.2, 0.0)
 
         # Seasonal relevance
-        score += content.get('seasonal_relevance', 0.5) * 0.1
+        score += _column(content, 'seasonal_relevance', 0.5).to_numpy(dtype=float) * 0.1
 
         # Popularity boost
-        score += content.get('popularity_score', 0.5) * 0.2
+        score += _column(content, 'popularity_score', 0.5).to_numpy(dtype=float) * 0.2
 
         return score
 
     def _apply_personalization_filters(self, recommendations: List[Dict],
                                      user_profile: Dict) -> List[Dict]:
         """Apply personalization filters to recommendations"""
+        user_level = user_profile.get('tax_experience_level', 'beginner')
 
         # Filter by user preferences
         filtered_recs = []
         for rec in recommendations:
-            content = self.content_features[
-                self.content_features['content_id'] == rec['content_id']
-            ]
-
-            if not content.empty:
-                content_row = content.iloc[0]
+            content_idx = self.content_rows.get(rec['content_id'])
 
+            if content_idx is not None:
                 # Skip if content doesn't match user's complexity preference
-                user_level = user_profile.get('tax_experience_level', 'beginner')
-                content_level = content_row.get('difficulty', 'beginner')
+                content_level = self.content_features.at[content_idx, 'difficulty']
 
                 if self._is_appropriate_difficulty(user_level, content_level):
                     filtered_recs.append(rec)
@@ -283,64 +443,185 @@ class ContentRecommendationEngine:
 
 
 class PersonalizedTipsEngine:
-    """Generate personalized tax tips and advice"""
+    """
+    Generate personalized tax tips and advice.
+
+    User × tip interaction features are computed as NumPy outer operations
+    between user columns and tip columns, one block of users at a time, so
+    the cross product is never held in full and no per-pair Python runs.
+    """
 
     def __init__(self):
         self.tip_scorer = RandomForestRegressor(n_estimators=100, random_state=42)
         self.scaler = StandardScaler()
         self.is_fitted = False
 
-    def prepare_tip_features(self, user_data: pd.DataFrame, tips_data: pd.DataFrame) -> pd.DataFrame:
-        """Prepare features for tip personalization"""
-
-        # Create user-tip interaction features
-        features_list = []
-
-        for _, user in user_data.iterrows():
-            for _, tip in tips_data.iterrows():
-                feature_row = {
-                    'user_id': user['user_id'],
-                    'tip_id': tip['tip_id'],
+    def prepare_tip_features(self, user_data: pd.DataFrame, tips_data: pd.DataFrame,
+                             block_size: Optional[int] = None) -> pd.DataFrame:
+        """Prepare features for tip personalization (one row per user × tip pair)"""
+        blocks = list(self.iter_tip_features(user_data, tips_data, block_size))
+        return pd.concat(blocks, ignore_index=True) if blocks else pd.DataFrame()
+
+    def iter_tip_features(self, user_data: pd.DataFrame, tips_data: pd.DataFrame,
+                          block_size: Optional[int] = None) -> Iterator[pd.DataFrame]:
+        """User-tip interaction features for one block of users at a time, users major"""
+        tips = self._tip_arrays(tips_data)
+        n_tips = len(tips_data)
+
+        for users in self._user_blocks(user_data, n_tips, block_size):
+            matches = self._pair_matches(users, tips)
+            n_users = len(users)
+
+            def per_user(column: str, default: Any) -> np.ndarray:
+                return np.repeat(_column(users, column, default).to_numpy(), n_tips)
+
+            def per_tip(values: np.ndarray) -> np.ndarray:
+                return np.tile(values, n_users)
+
+            yield pd.DataFrame({
+                'user_id': per_user('user_id', None),
+                'tip_id': per_tip(tips['tip_id']),
+
+                # User features
+                'user_income': per_user('income', 0),
+                'user_age': per_user('age', 0),
+                'user_filing_status': per_user('filing_status', ''),
+                'user_state': per_user('state', ''),
+                'user_has_dependents': per_user('has_dependents', 0),
+                'user_is_business_owner': per_user('is_business_owner', 0),
+                'user_tax_experience': per_user('tax_experience_level', 'beginner'),
+
+                # Tip features
+                'tip_category': per_tip(tips['category']),
+                'tip_complexity': per_tip(tips['complexity']),
+                'tip_savings_potential': per_tip(tips['savings']),
+                'tip_applicability_score': per_tip(tips['applicability']),
+
+                # Interaction features
+                **{name: values.ravel() for name, values in matches.items()}
+            })
 
-                    # User features
-                    'user_income': user.get('income', 0),
-                    'user_age': user.get('age', 0),
-                    'user_filing_status': user.get('filing_status', ''),
-                    'user_state': user.get('state', ''),
-                    'user_has_dependents': user.get('has_dependents', 0),
-                    'user_is_business_owner': user.get('is_business_owner', 0),
-                    'user_tax_experience': user.get('tax_experience_level', 'beginner'),
+    def _user_blocks(self, user_data: pd.DataFrame, n_tips: int,
+                     block_size: Optional[int]) -> Iterator[pd.DataFrame]:
+        """Blocks of users sized so a block's cross product stays near SCORE_BLOCK_PAIRS pairs"""
+        block_size = block_size or max(1, SCORE_BLOCK_PAIRS // max(n_tips, 1))
+        for start in range(0, len(user_data), block_size):
+            yield user_data.iloc[start:start + block_size]
+
+    def _tip_arrays(self, tips_data: pd.DataFrame) -> Dict[str, Any]:
+        """Tip columns and parsed match criteria, computed once per tips frame"""
+        income_ranges = [
+            self._parse_income_ranges(value)
+            for value in _column(tips_data, 'applicable_income_ranges', '').fillna('')
+        ]
 
-                    # Tip features
-                    'tip_category': tip.get('category', ''),
-                    'tip_complexity': tip.get('complexity_level', 'beginner'),
-                    'tip_savings_potential': tip.get('avg_savings_amount', 0),
-                    'tip_applicability_score': tip.get('general_applicability', 0.5),
+        # Ranges padded to a common width; padding never matches
+        width = max([len(ranges) for ranges in income_ranges] + [1])
+        income_low = np.full((len(tips_data), width), np.inf)
+        income_high = np.full((len(tips_data), width), -np.inf)
+        for i, ranges in enumerate(income_ranges):
+            for j, (min_income, max_income) in enumerate(ranges):
+                income_low[i, j], income_high[i, j] = min_income, max_income
+
+        filing_statuses = _column(tips_data, 'applicable_filing_statuses', '').fillna('').astype(str).str.lower()
+        complexity = _column(tips_data, 'complexity_level', 'beginner')
+
+        return {
+            'tip_id': tips_data['tip_id'].to_numpy(),
+            'category': _column(tips_data, 'category', '').to_numpy(),
+            'complexity': complexity.to_numpy(),
+            'complexity_level': complexity.map(COMPLEXITY_LEVELS).fillna(1).to_numpy(dtype=float),
+            'savings': _column(tips_data, 'avg_savings_amount', 0).to_numpy(dtype=float),
+            'applicability': _column(tips_data, 'general_applicability', 0.5).to_numpy(dtype=float),
+            'income_low': income_low,
+            'income_high': income_high,
+            'filing_statuses': filing_statuses.tolist(),
+            'all_filing_statuses': filing_statuses.str.contains('all', regex=False).to_numpy()
+        }
 
-                    # Interaction features
-                    'income_tip_match': self._calculate_income_tip_match(user, tip),
-                    'filing_status_match': self._calculate_filing_status_match(user, tip),
-                    'complexity_match': self._calculate_complexity_match(user, tip),
-                    'savings_to_income_ratio': tip.get('avg_savings_amount', 0) / max(user.get('income', 1), 1),
-                }
+    def _pair_matches(self, users: pd.DataFrame, tips: Dict[str, Any]) -> Dict[str, np.ndarray]:
+        """Interaction features as (users, tips) arrays"""
+        # Income inside any of the tip's ranges
+        income = _column(users, 'income', 0).to_numpy(dtype=float)[:, None, None]
+        income_tip_match = (
+            (tips['income_low'] <= income) & (income <= tips['income_high'])
+        ).any(axis=2).astype(float)
+
+        # Filing status is a substring test, so evaluate it once per distinct user status
+        user_statuses = _column(users, 'filing_status', '').fillna('').astype(str).str.lower().to_numpy()
+        statuses, status_rows = np.unique(user_statuses, return_inverse=True)
+        status_matches = np.array(
+            [[status in applicable for applicable in tips['filing_statuses']] for status in statuses],
+            dtype=bool
+        ).reshape(len(statuses), len(tips['filing_statuses']))
+        filing_status_match = (status_matches[status_rows] | tips['all_filing_statuses']).astype(float)
 
-                features_list.append(feature_row)
+        # Prefer tips at or slightly above user level
+        user_level = _column(users, 'tax_experience_level', 'beginner').map(COMPLEXITY_LEVELS).fillna(1)
+        user_level = user_level.to_numpy(dtype=float)[:, None]
+        tip_level = tips['complexity_level'][None, :]
+        complexity_match = np.where(tip_level <= user_level + 1, 1.0 - np.abs(tip_level - user_level) / 3.0, 0.0)
+
+        ratio_income = np.maximum(_column(users, 'income', 1).to_numpy(dtype=float), 1)
+        savings_to_income_ratio = tips['savings'][None, :] / ratio_income[:, None]
+
+        return {
+            'income_tip_match': income_tip_match,
+            'filing_status_match': filing_status_match,
+            'complexity_match': complexity_match,
+            'savings_to_income_ratio': savings_to_income_ratio
+        }
 
-        return pd.DataFrame(features_list)
+    def _score_pairs(self, users: pd.DataFrame, tips: Dict[str, Any]) -> np.ndarray:
+        """Personalization scores as a (users, tips) array"""
+        matches = self._pair_matches(users, tips)
+        n_users, n_tips = matches['income_tip_match'].shape
 
-    def _calculate_income_tip_match(self, user: pd.Series, tip: pd.Series) -> float:
-        """Calculate how well tip matches user's income level"""
-        user_income = user.get('income', 0)
-        tip_income_ranges = tip.get('applicable_income_ranges', '').split(',')
+        if not self.is_fitted:
+            # Simple rule-based personalization
+            return (
+                0.5
+                + np.where(matches['income_tip_match'] > 0, 0.3, 0.0)
+                + np.where(matches['filing_status_match'] > 0, 0.2, 0.0)
+                + matches['complexity_match'] * 0.3
+            )
 
-        for income_range in tip_income_ranges:
+        def per_user(column: str) -> np.ndarray:
+            return np.repeat(_column(users, column, 0).to_numpy(dtype=float), n_tips)
+
+        X = pd.DataFrame({
+            'user_income': per_user('income'),
+            'user_age': per_user('age'),
+            'user_has_dependents': per_user('has_dependents'),
+            'user_is_business_owner': per_user('is_business_owner'),
+            'tip_savings_potential': np.tile(tips['savings'], n_users),
+            'tip_applicability_score': np.tile(tips['applicability'], n_users),
+            **{name: values.ravel() for name, values in matches.items()}
+        })[TIP_MODEL_FEATURES].fillna(0)
+
+        scores = self.tip_scorer.predict(self.scaler.transform(X))
+        return scores.reshape(n_users, n_tips)
+
+    @staticmethod
+    def _parse_income_ranges(income_ranges: str) -> List[Tuple[int, int]]:
+        """'min-max' ranges from a comma-separated list; malformed entries are skipped"""
+        parsed = []
+        for income_range in income_ranges.split(','):
             if '-' in income_range:
                 try:
                     min_income, max_income = map(int, income_range.strip().split('-'))
-                    if min_income <= user_income <= max_income:
-                        return 1.0
+                    parsed.append((min_income, max_income))
                 except:
                     continue
+        return parsed
+
+    def _calculate_income_tip_match(self, user: pd.Series, tip: pd.Series) -> float:
+        """Calculate how well tip matches user's income level"""
+        user_income = user.get('income', 0)
+
+        for min_income, max_income in self._parse_income_ranges(tip.get('applicable_income_ranges', '')):
+            if min_income <= user_income <= max_income:
+                return 1.0
 
         return 0.0
 
@@ -354,19 +635,6 @@ class PersonalizedTipsEngine:
 
         return 0.0
 
-    def _calculate_complexity_match(self, user: pd.Series, tip: pd.Series) -> float:
-        """Calculate complexity level match"""
-        complexity_mapping = {'beginner': 1, 'intermediate': 2, 'advanced': 3}
-
-        user_level = complexity_mapping.get(user.get('tax_experience_level', 'beginner'), 1)
-        tip_level = complexity_mapping.get(tip.get('complexity_level', 'beginner'), 1)
-
-        # Prefer tips at or slightly above user level
-        if tip_level <= user_level + 1:
-            return 1.0 - abs(tip_level - user_level) / 3.0
-
-        return 0.0
-
     def fit(self, user_data: pd.DataFrame, tips_data: pd.DataFrame,
             interaction_data: pd.DataFrame):
         """Train tip personalization model"""
@@ -388,15 +656,7 @@ class PersonalizedTipsEngine:
             merged_df['engagement_score'].fillna(0.5) * 4.0 * 0.4
         )
 
-        # Prepare features for model
-        feature_columns = [
-            'user_income', 'user_age', 'user_has_dependents', 'user_is_business_owner',
-            'tip_savings_potential', 'tip_applicability_score',
-            'income_tip_match', 'filing_status_match', 'complexity_match',
-            'savings_to_income_ratio'
-        ]
-
-        X = merged_df[feature_columns].fillna(0)
+        X = merged_df[TIP_MODEL_FEATURES].fillna(0)
         y = merged_df['target']
 
         # Scale features
@@ -415,83 +675,66 @@ class PersonalizedTipsEngine:
             logger.warning("Model not fitted. Using fallback method.")
             return self._get_fallback_tips(user_profile, tips_data, top_k)
 
-        # Prepare features for all tips
-        tip_scores = []
-
-        for _, tip in tips_data.iterrows():
-            # Create feature vector
-            features = [
-                user_profile.get('income', 0),
-                user_profile.get('age', 0),
-                user_profile.get('has_dependents', 0),
-                user_profile.get('is_business_owner', 0),
-                tip.get('avg_savings_amount', 0),
-                tip.get('general_applicability', 0.5),
-                self._calculate_income_tip_match(pd.Series(user_profile), tip),
-                self._calculate_filing_status_match(pd.Series(user_profile), tip),
-                self._calculate_complexity_match(pd.Series(user_profile), tip),
-                tip.get('avg_savings_amount', 0) / max(user_profile.get('income', 1), 1)
-            ]
-
-            # Get prediction
-            features_scaled = self.scaler.transform([features])
-            score = self.tip_scorer.predict(features_scaled)[0]
-
-            tip_scores.append((tip['tip_id'], score, tip))
-
-        # Sort by score and return top tips
-        tip_scores.sort(key=lambda x: x[1], reverse=True)
+        scores = self._score_pairs(pd.DataFrame([user_profile]), self._tip_arrays(tips_data))
+        top = top_k_columns(scores, top_k)[0]
 
         personalized_tips = []
-        for tip_id, score, tip_data in tip_scores[:top_k]:
+        # to_dict gives native Python values; numpy scalars do not serialize in API responses
+        records = tips_data.iloc[top].to_dict('records')
+        for position, tip, score in zip(top, records, scores[0, top]):
             personalized_tips.append({
-                'tip_id': tip_id,
-                'title': tip_data['title'],
-                'content': tip_data['content'],
-                'category': tip_data['category'],
-                'potential_savings': tip_data.get('avg_savings_amount', 0),
+                'tip_id': tip['tip_id'],
+                'title': tip['title'],
+                'content': tip['content'],
+                'category': tip['category'],
+                'potential_savings': tip.get('avg_savings_amount', 0),
                 'personalization_score': float(score),
-                'reason': self._generate_personalization_reason(user_profile, tip_data)
+                'reason': self._generate_personalization_reason(user_profile, tips_data.iloc[position])
             })
 
         return personalized_tips
 
+    def iter_personalized_tips(self, user_data: pd.DataFrame, tips_data: pd.DataFrame,
+                               top_k: int = 5, block_size: Optional[int] = None) -> Iterator[pd.DataFrame]:
+        """Top tips for many users, one block of users at a time
+
+        Yields frames of user_id, tip_id, rank (1 is best) and
+        personalization_score with top_k rows per user.
+        """
+        tips = self._tip_arrays(tips_data)
+
+        for users in self._user_blocks(user_data, len(tips_data), block_size):
+            scores = self._score_pairs(users, tips)
+            top = top_k_columns(scores, top_k)
+            k = top.shape[1]
+
+            yield pd.DataFrame({
+                'user_id': np.repeat(users['user_id'].to_numpy(), k),
+                'tip_id': tips['tip_id'][top].ravel(),
+                'rank': np.tile(np.arange(1, k + 1), len(users)),
+                'personalization_score': np.take_along_axis(scores, top, axis=1).ravel()
+            })
+
     def _get_fallback_tips(self, user_profile: Dict, tips_data: pd.DataFrame,
                           top_k: int) -> List[Dict]:
         """Fallback method when model is not fitted"""
-        # Simple rule-based personalization
-        scored_tips = []
-
-        for _, tip in tips_data.iterrows():
-            score = 0.5  # Base score
-
-            # Income-based scoring
-            if self._calculate_income_tip_match(pd.Series(user_profile), tip) > 0:
-                score += 0.3
-
-            # Filing status match
-            if self._calculate_filing_status_match(pd.Series(user_profile), tip) > 0:
-                score += 0.2
-
-            # Complexity match
-            score += self._calculate_complexity_match(pd.Series(user_profile), tip) * 0.3
-
-            scored_tips.append((tip['tip_id'], score, tip))
-
-        scored_tips.sort(key=lambda x: x[1], reverse=True)
-
-        return [
-            {
-                'tip_id': tip_id,
-                'title': tip_data['title'],
-                'content': tip_data['content'],
-                'category': tip_data['category'],
-                'potential_savings': tip_data.get('avg_savings_amount', 0),
+        # Simple rule-based personalization (see _score_pairs)
+        scores = self._score_pairs(pd.DataFrame([user_profile]), self._tip_arrays(tips_data))
+        top = top_k_columns(scores, top_k)[0]
+
+        fallback_tips = []
+        for tip, score in zip(tips_data.iloc[top].to_dict('records'), scores[0, top]):
+            fallback_tips.append({
+                'tip_id': tip['tip_id'],
+                'title': tip['title'],
+                'content': tip['content'],
+                'category': tip['category'],
+                'potential_savings': tip.get('avg_savings_amount', 0),
                 'personalization_score': float(score),
                 'reason': 'Basic profile matching'
-            }
-            for tip_id, score, tip_data in scored_tips[:top_k]
-        ]
+            })
+
+        return fallback_tips
 
     def _generate_personalization_reason(self, user_profile: Dict, tip_data: pd.Series) -> str:
         """Generate explanation for why tip was recommended"""
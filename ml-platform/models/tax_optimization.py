@@ -19,7 +19,10 @@ import mlflow.sklearn
 import mlflow.xgboost
 import pickle
 import joblib
+import json
+from concurrent.futures import ProcessPoolExecutor
 from datetime import datetime
+from functools import lru_cache
 import warnings
 warnings.filterwarnings('ignore')
 
@@ -34,6 +37,18 @@ from infrastructure.feature_store import GlobalTaxCalcFeatureStore
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# Year-versioned rules, laid out as <dir>/<year>/usa.json like tax-engine/app/data/tax_rules
+TAX_RULES_DIR = os.getenv('TAX_RULES_DIR', os.path.join(os.path.dirname(__file__), 'data', 'tax_rules'))
+
+# Below this many users recommend_deductions_batch predicts in-process; the pool only pays off on large batches
+DEDUCTION_POOL_MIN_USERS = int(os.getenv('DEDUCTION_POOL_MIN_USERS', '5000'))
+
+# Optimizer filing statuses and their keys in the rules files
+FILING_STATUS_KEYS = {
+    'married_jointly': 'married_filing_jointly',
+    'married_separately': 'married_filing_separately'
+}
+
 
 class TaxSavingsPredictor:
     """Predicts potential tax savings based on user profile and financial data"""
@@ -251,8 +266,13 @@ class TaxSavingsPredictor:
 class DeductionRecommendationEngine:
     """Recommends optimal deductions based on user profile"""
 
+    # Worker pool for large batches; not pickled with the engine
+    _pool: Optional[ProcessPoolExecutor] = None
+    _pool_workers = 0
+
     def __init__(self):
         self.deduction_models = {}
+        self.label_encoders: Dict[str, LabelEncoder] = {}
         self.deduction_categories = [
             'retirement_401k',
             'retirement_ira',
@@ -269,6 +289,11 @@ class DeductionRecommendationEngine:
 
         results = {}
 
+        # Workers hold the previous models; encoders are refit on this training set
+        self.close()
+        self.label_encoders = {}
+        base_features = self._create_base_features(df, fit=True)
+
         for category in self.deduction_categories:
             logger.info(f"Training model for {category}")
 
@@ -280,7 +305,7 @@ class DeductionRecommendationEngine:
                 target = self._generate_synthetic_deduction_target(df, category)
 
             # Create features
-            features = self._create_deduction_features(df, category)
+            features = self._add_category_features(base_features, df, category, fit=True)
 
             # Train model
             model = RandomForestRegressor(n_estimators=50, random_state=42)
@@ -327,10 +352,10 @@ class DeductionRecommendationEngine:
 
         return pd.Series(target)
 
-    def _create_deduction_features(self, df: pd.DataFrame, category: str) -> pd.DataFrame:
-        """Create features specific to deduction category"""
+    def _create_base_features(self, df: pd.DataFrame, fit: bool = False) -> pd.DataFrame:
+        """Features shared by every deduction category"""
 
-        features = pd.DataFrame()
+        features = pd.DataFrame(index=df.index)
 
         # Basic demographic features
         basic_features = ['age', 'gross_income', 'dependents', 'filing_status']
@@ -338,62 +363,147 @@ class DeductionRecommendationEngine:
             if feature in df.columns:
                 features[feature] = df[feature]
 
+        return self._encode_features(features, fit)
+
+    def _add_category_features(self, base_features: pd.DataFrame, df: pd.DataFrame,
+                               category: str, fit: bool = False) -> pd.DataFrame:
+        """Base features plus the columns specific to a deduction category"""
+
+        extra = pd.DataFrame(index=df.index)
+
         # Category-specific features
         if 'retirement' in category:
-            features['age_factor'] = np.maximum(0, df.get('age', 30) - 25) / 40
-            features['high_income'] = (df.get('gross_income', 50000) > 100000).astype(int)
+            extra['age_factor'] = np.maximum(0, df.get('age', 30) - 25) / 40
+            extra['high_income'] = (df.get('gross_income', 50000) > 100000).astype(int)
 
         elif category == 'charitable_donations':
-            features['high_income'] = (df.get('gross_income', 50000) > 75000).astype(int)
-            features['education_level'] = df.get('education_level', 'bachelor')
+            extra['high_income'] = (df.get('gross_income', 50000) > 75000).astype(int)
+            extra['education_level'] = df.get('education_level', 'bachelor')
 
         elif category == 'mortgage_interest':
-            features['homeowner'] = df.get('homeowner', 0)
-            features['age_factor'] = ((df.get('age', 30) >= 25) & (df.get('age', 30) <= 45)).astype(int)
+            extra['homeowner'] = df.get('homeowner', 0)
+            extra['age_factor'] = ((df.get('age', 30) >= 25) & (df.get('age', 30) <= 45)).astype(int)
+
+        if extra.columns.empty:
+            return base_features
+        return pd.concat([base_features, self._encode_features(extra, fit)], axis=1)
 
+    def _encode_features(self, features: pd.DataFrame, fit: bool = False) -> pd.DataFrame:
+        """Fill missing values and label-encode categorical columns
+
+        Encoders are fit on the training data and reused for predictions, so
+        a category keeps its code whatever else is in the batch. Categories
+        unseen in training are encoded as -1.
+        """
         # Fill missing values
         features = features.fillna(0)
 
         # Encode categorical variables
         for col in features.select_dtypes(include=['object']).columns:
-            le = LabelEncoder()
-            features[col] = le.fit_transform(features[col].astype(str))
+            values = features[col].astype(str)
+            if fit:
+                self.label_encoders[col] = LabelEncoder().fit(values)
+            le = self.label_encoders.get(col)
+            if le is None:
+                raise ValueError(f"No label encoder fitted for column {col}")
+            codes = pd.Series(np.arange(len(le.classes_)), index=le.classes_)
+            features[col] = values.map(codes).fillna(-1).astype(int)
 
         return features
 
     def recommend_deductions(self, user_profile: Dict[str, Any]) -> List[Dict[str, Any]]:
         """Recommend optimal deductions for a user"""
 
-        recommendations = []
-        user_df = pd.DataFrame([user_profile])
-
-        for category, model in self.deduction_models.items():
-            # Create features for this category
-            features = self._create_deduction_features(user_df, category)
-
-            # Predict optimal deduction amount
-            predicted_amount = model.predict(features)[0]
-
-            # Calculate potential tax savings (assuming 22% tax bracket)
-            tax_savings = predicted_amount * 0.22
-
-            # Create recommendation
-            recommendation = {
-                'category': category,
-                'recommended_amount': max(0, predicted_amount),
-                'estimated_tax_savings': max(0, tax_savings),
-                'confidence': 0.75,  # This would be calculated based on model uncertainty
-                'description': self._get_deduction_description(category),
-                'complexity': self._get_deduction_complexity(category),
-                'priority': 'high' if tax_savings > 1000 else 'medium' if tax_savings > 500 else 'low'
-            }
-
-            recommendations.append(recommendation)
+        recommendations = self.recommend_deductions_batch(pd.DataFrame([user_profile]), n_jobs=1)
+
+        # Sorted by estimated tax savings
+        return recommendations.drop(columns=['user_id', 'rank']).astype({
+            'category': str, 'description': str, 'complexity': str, 'priority': str
+        }).to_dict('records')
+
+    def recommend_deductions_batch(self, users_df: pd.DataFrame, n_jobs: Optional[int] = None) -> pd.DataFrame:
+        """Ranked deduction recommendations for many users
+
+        Builds the shared features once, predicts each category over all
+        users (categories spread over the engine's process pool for batches
+        of at least DEDUCTION_POOL_MIN_USERS users, unless n_jobs is 1) and
+        returns a long frame with one row per user and category, ordered by
+        user and then rank (1 = highest estimated tax savings). Category,
+        description, complexity and priority are categoricals.
+        """
+        categories = list(self.deduction_models)
+        base_features = self._create_base_features(users_df)
+        feature_frames = {
+            category: self._add_category_features(base_features, users_df, category)
+            for category in categories
+        }
 
-        # Sort by estimated tax savings
-        recommendations.sort(key=lambda x: x['estimated_tax_savings'], reverse=True)
+        n_jobs = min(n_jobs or os.cpu_count() or 1, len(categories))
+        if n_jobs > 1 and len(users_df) >= DEDUCTION_POOL_MIN_USERS:
+            pool = self._get_pool(n_jobs)
+            futures = [
+                pool.submit(_predict_deduction_category, category, feature_frames[category])
+                for category in categories
+            ]
+            predictions = [future.result() for future in futures]
+        else:
+            predictions = [self.deduction_models[category].predict(feature_frames[category]) for category in categories]
+
+        # (users, categories) predicted amounts
+        predicted_amount = np.column_stack(predictions) if predictions else np.zeros((len(users_df), 0))
+
+        # Calculate potential tax savings (assuming 22% tax bracket)
+        tax_savings = predicted_amount * 0.22
+        estimated_tax_savings = np.maximum(0, tax_savings)
+
+        # Rank categories by estimated tax savings; ties keep category order
+        order = np.argsort(-estimated_tax_savings, axis=1, kind='stable')
+        rows = np.repeat(np.arange(len(users_df)), len(categories))
+        codes = order.ravel()
+        ranked_savings = tax_savings[rows, codes]
+
+        user_ids = users_df['user_id'].to_numpy() if 'user_id' in users_df.columns else np.arange(len(users_df))
+
+        return pd.DataFrame({
+            'user_id': user_ids[rows],
+            'rank': np.tile(np.arange(1, len(categories) + 1), len(users_df)),
+            'category': pd.Categorical.from_codes(codes, categories),
+            'recommended_amount': np.maximum(0, predicted_amount[rows, codes]),
+            'estimated_tax_savings': estimated_tax_savings[rows, codes],
+            'confidence': 0.75,  # This would be calculated based on model uncertainty
+            'description': pd.Categorical(
+                [self._get_deduction_description(category) for category in categories]
+            )[codes],
+            'complexity': pd.Categorical(
+                [self._get_deduction_complexity(category) for category in categories]
+            )[codes],
+            'priority': pd.Categorical(
+                np.select([ranked_savings > 1000, ranked_savings > 500], ['high', 'medium'], 'low'),
+                categories=['high', 'medium', 'low']
+            )
+        })
 
-        return recommendations
+    def _get_pool(self, n_jobs: int) -> ProcessPoolExecutor:
+        """Worker pool holding the category models, started once and reused across batches"""
+        if self._pool is None or self._pool_workers != n_jobs:
+            self.close()
+            self._pool = ProcessPoolExecutor(max_workers=n_jobs, initializer=_init_deduction_worker,
+                                             initargs=(self.deduction_models,))
+            self._pool_workers = n_jobs
+        return self._pool
+
+    def close(self):
+        """Shut down the worker pool, if one was started"""
+        if self._pool is not None:
+            self._pool.shutdown()
+            self._pool = None
+            self._pool_workers = 0
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        state.pop('_pool', None)
+        state.pop('_pool_workers', None)
+        return state
 
     def _get_deduction_description(self, category: str) -> str:
         """Get human-readable description for deduction category"""
@@ -428,80 +538,131 @@ class DeductionRecommendationEngine:
         return complexity_map.get(category, 'medium')
 
 
+# Category models of a recommend_deductions_batch worker process
+_WORKER_DEDUCTION_MODELS: Dict[str, Any] = {}
+
+
+def _init_deduction_worker(models: Dict[str, Any]):
+    global _WORKER_DEDUCTION_MODELS
+    _WORKER_DEDUCTION_MODELS = models
+
+
+def _predict_deduction_category(category: str, features: pd.DataFrame) -> np.ndarray:
+    return _WORKER_DEDUCTION_MODELS[category].predict(features)
+
+
+class BracketTable:
+    """One filing status's brackets as cumulative arrays, so tax is a searchsorted lookup"""
+
+    def __init__(self, brackets: List[Tuple[float, float]]):
+        # brackets are (upper limit, rate) pairs; the top limit is inf
+        self.upper = np.array([limit for limit, _ in brackets[:-1]], dtype=float)
+        self.rates = np.array([rate for _, rate in brackets], dtype=float)
+        self.lower = np.concatenate([[0.0], self.upper])
+
+        # Tax owed on income up to the lower limit of each bracket
+        self.base_tax = np.concatenate([[0.0], np.cumsum(np.diff(self.lower) * self.rates[:-1])])
+
+    def tax(self, income) -> np.ndarray:
+        income = np.maximum(np.asarray(income, dtype=float), 0.0)
+        bracket = np.searchsorted(self.upper, income, side='left')
+        return self.base_tax[bracket] + (income - self.lower[bracket]) * self.rates[bracket]
+
+
+def available_tax_years() -> List[int]:
+    """Years with a usa.json under TAX_RULES_DIR"""
+    if not os.path.isdir(TAX_RULES_DIR):
+        return []
+    return sorted(
+        int(entry) for entry in os.listdir(TAX_RULES_DIR)
+        if entry.isdigit() and os.path.isfile(os.path.join(TAX_RULES_DIR, entry, 'usa.json'))
+    )
+
+
+@lru_cache(maxsize=None)
+def load_federal_brackets(tax_year: int) -> Dict[str, List[Tuple[float, float]]]:
+    """Federal brackets by filing status as (upper limit, rate), from <TAX_RULES_DIR>/<year>/usa.json"""
+    path = os.path.join(TAX_RULES_DIR, str(tax_year), 'usa.json')
+    if not os.path.isfile(path):
+        raise ValueError(f"No tax rules for {tax_year} in {TAX_RULES_DIR}; available years: {available_tax_years()}")
+
+    with open(path) as f:
+        rules = json.load(f)
+
+    return {
+        status: [
+            (float('inf') if bracket['max'] is None else float(bracket['max']), float(bracket['rate']))
+            for bracket in brackets
+        ]
+        for status, brackets in rules['federal']['tax_brackets'].items()
+    }
+
+
 class FilingStatusOptimizer:
     """Optimizes filing status for married couples"""
 
-    def __init__(self):
+    def __init__(self, tax_year: Optional[int] = None):
+        years = available_tax_years()
+        self.tax_year = tax_year or (years[-1] if years else None)
         self.tax_brackets = self._load_tax_brackets()
+        self.bracket_tables = {
+            status: BracketTable(brackets) for status, brackets in self.tax_brackets.items()
+        }
 
     def _load_tax_brackets(self) -> Dict[str, List[Tuple[float, float]]]:
         """Load tax brackets for different filing statuses"""
-
-        # 2023 tax brackets (simplified)
-        return {
-            'married_jointly': [
-                (22275, 0.10),
-                (89450, 0.12),
-                (190750, 0.22),
-                (364200, 0.24),
-                (462500, 0.32),
-                (693750, 0.35),
-                (float('inf'), 0.37)
-            ],
-            'married_separately': [
-                (11137.5, 0.10),
-                (44725, 0.12),
-                (95375, 0.22),
-                (182050, 0.24),
-                (231250, 0.32),
-                (346875, 0.35),
-                (float('inf'), 0.37)
-            ]
-        }
+        brackets = load_federal_brackets(self.tax_year)
+        return {status: brackets[key] for status, key in FILING_STATUS_KEYS.items()}
 
     def calculate_tax(self, income: float, filing_status: str) -> float:
         """Calculate federal tax for given income and filing status"""
-
-        brackets = self.tax_brackets.get(filing_status, self.tax_brackets['married_jointly'])
-        total_tax = 0
-        previous_bracket = 0
-
-        for bracket_limit, rate in brackets:
-            taxable_in_bracket = min(income, bracket_limit) - previous_bracket
-            if taxable_in_bracket > 0:
-                total_tax += taxable_in_bracket * rate
-                previous_bracket = bracket_limit
-            else:
-                break
-
-        return total_tax
+        table = self.bracket_tables.get(filing_status, self.bracket_tables['married_jointly'])
+        return float(table.tax(income))
 
     def optimize_filing_status(self, spouse1_income: float, spouse2_income: float) -> Dict[str, Any]:
         """Determine optimal filing status for married couple"""
+        result = self.optimize_filing_status_batch([spouse1_income], [spouse2_income]).iloc[0]
+
+        optimal_status = result['optimal_filing_status']
+        tax_savings = float(result['tax_savings'])
+
+        return {
+            'optimal_filing_status': optimal_status,
+            'joint_filing_tax': float(result['joint_filing_tax']),
+            'separate_filing_tax': float(result['separate_filing_tax']),
+            'tax_savings': tax_savings,
+            'savings_percentage': float(result['savings_percentage']),
+            'recommendation': f"File {optimal_status.replace('_', ' ')} to save ${tax_savings:,.0f}"
+        }
 
-        total_income = spouse1_income + spouse2_income
+    def optimize_filing_status_batch(self, spouse1_income, spouse2_income) -> pd.DataFrame:
+        """Optimal filing status for a population of couples
 
-        # Calculate tax for joint filing
-        joint_tax = self.calculate_tax(total_income, 'married_jointly')
+        Takes equal-length arrays of spouse incomes and returns one row per
+        couple with the optimal status, both taxes, savings and savings as a
+        percentage of the lower tax.
+        """
+        spouse1_income = np.asarray(spouse1_income, dtype=float)
+        spouse2_income = np.asarray(spouse2_income, dtype=float)
 
-        # Calculate tax for separate filing
-        separate_tax = (
-            self.calculate_tax(spouse1_income, 'married_separately') +
-            self.calculate_tax(spouse2_income, 'married_separately')
-        )
+        # Calculate tax for joint and separate filing
+        joint_tax = self.bracket_tables['married_jointly'].tax(spouse1_income + spouse2_income)
+        separate = self.bracket_tables['married_separately']
+        separate_tax = separate.tax(spouse1_income) + separate.tax(spouse2_income)
 
         # Determine optimal choice
-        optimal_status = 'married_jointly' if joint_tax < separate_tax else 'married_separately'
-        tax_savings = abs(joint_tax - separate_tax)
+        tax_savings = np.abs(joint_tax - separate_tax)
+        lower_tax = np.minimum(joint_tax, separate_tax)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            savings_percentage = np.where(lower_tax > 0, tax_savings / lower_tax * 100, 0.0)
 
-        return {
-            'optimal_filing_status': optimal_status,
+        return pd.DataFrame({
+            'optimal_filing_status': np.where(joint_tax < separate_tax, 'married_jointly', 'married_separately'),
             'joint_filing_tax': joint_tax,
             'separate_filing_tax': separate_tax,
             'tax_savings': tax_savings,
-            'savings_percentage': (tax_savings / min(joint_tax, separate_tax)) * 100,
-            'recommendation': f"File {optimal_status.replace('_', ' ')} to save ${tax_savings:,.0f}"
-        }
+            'savings_percentage': savings_percentage
+        })
 
 
 def train_tax_optimization_models():
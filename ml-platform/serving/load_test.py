@@ -0,0 +1,128 @@
+"""
+Prediction Load Test
+Local load generator for /predict micro-batching and /predict/batch
+
+Registers a small scikit-learn classifier in the in-process model registry
+(no MLflow needed), then drives the FastAPI app over ASGI with concurrent
+single-row /predict requests for each batch size, plus /predict/batch with
+pre-built chunks, and prints p50/p99 latency and throughput as JSON lines.
+
+    python serving/load_test.py --requests 5000 --concurrency 64 --batch-sizes 1 16 64
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import sys
+import time
+from datetime import datetime
+
+import httpx
+import numpy as np
+import pandas as pd
+from sklearn.ensemble import RandomForestClassifier
+
+sys.path.append(os.path.dirname(__file__))
+
+from model_server import app, model_registry, ModelSlot, PredictionBatcher
+
+MODEL_NAME = "load_test_model"
+FEATURES = [f"feature_{i}" for i in range(20)]
+
+
+def register_model(seed: int = 0):
+    """Train a toy classifier on synthetic rows and register it as a loaded model"""
+    rng = np.random.default_rng(seed)
+    X = rng.normal(size=(5000, len(FEATURES)))
+    y = (X[:, 0] + X[:, 1] > 0).astype(int)
+
+    model = RandomForestClassifier(n_estimators=50, max_depth=8, random_state=seed)
+    model.fit(pd.DataFrame(X, columns=FEATURES), y)
+
+    model_registry._publish(MODEL_NAME, ModelSlot(
+        model=model, version="load-test", stage="None", run_id=None,
+        model_uri="in-process", loaded_at=datetime.now().isoformat()
+    ))
+
+
+def make_rows(count: int, seed: int = 1):
+    rng = np.random.default_rng(seed)
+    return [dict(zip(FEATURES, row)) for row in rng.normal(size=(count, len(FEATURES))).tolist()]
+
+
+def summarize(mode: str, latencies: list, elapsed: float, rows: int) -> dict:
+    latencies_ms = np.array(latencies) * 1000
+    return {
+        "mode": mode,
+        "requests": len(latencies),
+        "p50_ms": round(float(np.percentile(latencies_ms, 50)), 2),
+        "p99_ms": round(float(np.percentile(latencies_ms, 99)), 2),
+        "requests_per_second": round(len(latencies) / elapsed, 1),
+        "rows_per_second": round(rows / elapsed, 1)
+    }
+
+
+async def run_single(client: httpx.AsyncClient, rows: list, concurrency: int, batch_size: int) -> dict:
+    """Concurrent single-row /predict requests with the batcher capped at batch_size"""
+    if MODEL_NAME in model_registry.batchers:
+        model_registry.batchers.pop(MODEL_NAME).stop()
+    model_registry.batchers[MODEL_NAME] = PredictionBatcher(model_registry, MODEL_NAME, max_batch_size=batch_size)
+
+    queue = asyncio.Queue()
+    for row in rows:
+        queue.put_nowait(row)
+    latencies = []
+
+    async def worker():
+        while not queue.empty():
+            row = queue.get_nowait()
+            started = time.perf_counter()
+            response = await client.post("/predict", json={
+                "features": row, "model_name": MODEL_NAME, "use_cache": False
+            })
+            response.raise_for_status()
+            latencies.append(time.perf_counter() - started)
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    return summarize(f"predict_max_batch_{batch_size}", latencies, time.perf_counter() - started, len(rows))
+
+
+async def run_batch_endpoint(client: httpx.AsyncClient, rows: list, chunk_size: int) -> dict:
+    """Sequential /predict/batch calls with chunk_size rows each"""
+    latencies = []
+    started = time.perf_counter()
+    for start in range(0, len(rows), chunk_size):
+        request_started = time.perf_counter()
+        response = await client.post("/predict/batch", json={
+            "model_name": MODEL_NAME, "instances": rows[start:start + chunk_size]
+        })
+        response.raise_for_status()
+        latencies.append(time.perf_counter() - request_started)
+    return summarize(f"predict_batch_chunk_{chunk_size}", latencies, time.perf_counter() - started, len(rows))
+
+
+async def main(args):
+    register_model()
+    rows = make_rows(args.requests)
+
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://load-test") as client:
+        # Warm up the model and the HTTP stack before timing
+        await run_single(client, rows[:200], args.concurrency, max(args.batch_sizes))
+
+        for batch_size in args.batch_sizes:
+            print(json.dumps(await run_single(client, rows, args.concurrency, batch_size)))
+
+        print(json.dumps(await run_batch_endpoint(client, rows, args.chunk_size)))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[1])
+    parser.add_argument("--requests", type=int, default=5000)
+    parser.add_argument("--concurrency", type=int, default=64)
+    parser.add_argument("--batch-sizes", type=int, nargs="+", default=[1, 16, 64])
+    parser.add_argument("--chunk-size", type=int, default=256)
+
+    asyncio.run(main(parser.parse_args()))
@@ -6,7 +6,7 @@ FastAPI-based model serving with monitoring and A/B testing
 from fastapi import FastAPI, HTTPException, BackgroundTasks, Depends
 from fastapi.middleware.cors import CORSMiddleware
 from pydantic import BaseModel, Field
-from typing import Dict, List, Any, Optional, Union
+from typing import Dict, List, Any, Optional, Union, Tuple
 import mlflow
 import mlflow.pyfunc
 import numpy as np
@@ -16,8 +16,14 @@ import time
 import uuid
 from datetime import datetime
 import redis
+import redis.asyncio as redis_asyncio
 import json
+import hashlib
+import math
+import random
 import asyncio
+from collections import OrderedDict, deque
+from dataclasses import dataclass
 from prometheus_client import Counter, Histogram, Gauge, generate_latest
 import uvicorn
 from contextlib import asynccontextmanager
@@ -40,16 +46,375 @@ PREDICTION_LATENCY = Histogram('ml_prediction_duration_seconds', 'Prediction lat
 MODEL_LOAD_TIME = Histogram('ml_model_load_duration_seconds', 'Model loading time', ['model_name'])
 ACTIVE_MODELS = Gauge('ml_active_models', 'Number of active models')
 ERROR_COUNTER = Counter('ml_prediction_errors_total', 'Total prediction errors', ['model_name', 'error_type'])
+BATCH_SIZE = Histogram('ml_prediction_batch_size', 'Rows per model call', ['model_name'],
+                       buckets=(1, 2, 4, 8, 16, 32, 64, 128, 256, 512, 1024))
+
+PREDICTION_CACHE_LOOKUPS = Counter('ml_prediction_cache_lookups_total', 'Prediction cache lookups', ['result'])
+
+# In-process tier of the prediction cache; Redis is shared between workers
+PREDICTION_CACHE_MAX_ENTRIES = int(os.getenv("PREDICTION_CACHE_MAX_ENTRIES", "10000"))
+PREDICTION_CACHE_TTL = int(os.getenv("PREDICTION_CACHE_TTL", "3600"))
+
+SHADOW_LATENCY = Histogram('ml_shadow_latency_seconds', 'Latency of primary and shadow scoring', ['model_name', 'role'])
+SHADOW_DELTA = Histogram('ml_shadow_prediction_delta', 'Absolute difference between shadow and primary predictions',
+                         ['model_name'], buckets=(0, 0.001, 0.01, 0.05, 0.1, 0.25, 0.5, 1, 5, 10, 100, 1000))
+SHADOW_DISAGREEMENTS = Counter('ml_shadow_disagreements_total', 'Shadow predictions that differ from primary', ['model_name'])
+
+# Recent /predict rows kept per model to warm up a new version before it is swapped in
+WARMUP_SAMPLE_SIZE = int(os.getenv("MODEL_WARMUP_SAMPLE_SIZE", "32"))
+
+# Micro-batching of concurrent /predict requests
+BATCH_MAX_SIZE = int(os.getenv("PREDICT_BATCH_MAX_SIZE", "64"))
+BATCH_MAX_WAIT_MS = float(os.getenv("PREDICT_BATCH_MAX_WAIT_MS", "5"))
+
+
+def split_predictions(prediction: Any) -> List[Any]:
+    """Split a batch prediction into one JSON-serializable value per row"""
+    if isinstance(prediction, (pd.DataFrame, pd.Series)):
+        prediction = prediction.to_numpy()
+    return np.asarray(prediction).tolist()
+
+
+def predict_rows(model, rows: List[Dict[str, Any]]) -> Tuple[List[Any], List[Optional[float]]]:
+    """Run predict (and predict_proba when available) once per group of rows sharing a feature layout"""
+    groups: Dict[Tuple[str, ...], List[int]] = {}
+    for index, row in enumerate(rows):
+        groups.setdefault(tuple(row), []).append(index)
+
+    predictions: List[Any] = [None] * len(rows)
+    confidences: List[Optional[float]] = [None] * len(rows)
+
+    for columns, indices in groups.items():
+        frame = pd.DataFrame.from_records([rows[i] for i in indices], columns=list(columns))
+
+        for index, value in zip(indices, split_predictions(model.predict(frame))):
+            predictions[index] = value
+
+        if hasattr(model, 'predict_proba'):
+            try:
+                proba = np.asarray(model.predict_proba(frame))
+                for index, value in zip(indices, proba.max(axis=1).tolist()):
+                    confidences[index] = float(value)
+            except Exception:
+                pass
+
+    return predictions, confidences
+
+
+def _canonical(value: Any) -> Any:
+    """Type-normalized form of a feature value for fingerprinting"""
+    if isinstance(value, dict):
+        return {str(key): _canonical(item) for key, item in value.items()}
+    if isinstance(value, (list, tuple, np.ndarray)):
+        return [_canonical(item) for item in value]
+    if isinstance(value, (bool, np.bool_)):
+        return bool(value)
+    if isinstance(value, (int, float, np.integer, np.floating)):
+        # 3, 3.0 and np.int64(3) reach the model as the same number
+        value = float(value)
+        return repr(value) if math.isnan(value) or math.isinf(value) else value
+    if value is None or isinstance(value, str):
+        return value
+    return str(value)
+
+
+def feature_fingerprint(features: Dict[str, Any]) -> str:
+    """Stable hash of a feature dict: independent of key order, numeric types and the process"""
+    canonical = json.dumps(_canonical(features), sort_keys=True, separators=(",", ":"))
+    return hashlib.sha256(canonical.encode("utf-8")).hexdigest()[:32]
+
+
+class PredictionCache:
+    """Prediction cache with an in-process LRU/TTL tier in front of async Redis
+
+    Keys carry the model name and version, so a version swap never serves
+    stale predictions; invalidate_model also drops the old entries.
+    """
+
+    KEY_PREFIX = "prediction:"
+
+    def __init__(self, redis_client: Optional[redis_asyncio.Redis] = None,
+                 max_entries: int = PREDICTION_CACHE_MAX_ENTRIES, ttl: int = PREDICTION_CACHE_TTL):
+        self.redis_client = redis_client
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.local: "OrderedDict[str, Tuple[float, Dict[str, Any]]]" = OrderedDict()
+
+    def key(self, model_name: str, version: str, features: Dict[str, Any]) -> str:
+        return f"{self.KEY_PREFIX}{model_name}:{version}:{feature_fingerprint(features)}"
+
+    async def get(self, key: str) -> Optional[Dict[str, Any]]:
+        entry = self.local.get(key)
+        if entry is not None:
+            expires_at, value = entry
+            if time.time() < expires_at:
+                self.local.move_to_end(key)
+                PREDICTION_CACHE_LOOKUPS.labels(result="local_hit").inc()
+                return value
+            del self.local[key]
+
+        if self.redis_client is not None:
+            try:
+                cached = await self.redis_client.get(key)
+            except Exception as e:
+                logger.error(f"Failed to get cached prediction: {e}")
+                cached = None
+
+            if cached:
+                value = json.loads(cached)
+                self.put_local(key, value)
+                PREDICTION_CACHE_LOOKUPS.labels(result="redis_hit").inc()
+                return value
+
+        PREDICTION_CACHE_LOOKUPS.labels(result="miss").inc()
+        return None
+
+    def put_local(self, key: str, value: Dict[str, Any]):
+        self.local[key] = (time.time() + self.ttl, value)
+        self.local.move_to_end(key)
+        while len(self.local) > self.max_entries:
+            self.local.popitem(last=False)
+
+    async def set_shared(self, key: str, value: Dict[str, Any]):
+        """Write a prediction to Redis so other workers can serve it"""
+        if self.redis_client is None:
+            return
+        try:
+            await self.redis_client.setex(key, self.ttl, json.dumps(value, default=str))
+        except Exception as e:
+            logger.error(f"Failed to cache prediction: {e}")
+
+    def invalidate_model(self, model_name: str):
+        """Drop a model's cached predictions locally now and in Redis in the background"""
+        prefix = f"{self.KEY_PREFIX}{model_name}:"
+        for key in [key for key in self.local if key.startswith(prefix)]:
+            del self.local[key]
+
+        if self.redis_client is not None:
+            try:
+                asyncio.get_running_loop().create_task(self._purge_shared(prefix))
+            except RuntimeError:
+                # No running loop (startup): stale Redis entries are keyed by the old version and expire by TTL
+                pass
+
+    async def _purge_shared(self, prefix: str):
+        try:
+            keys = [key async for key in self.redis_client.scan_iter(match=f"{prefix}*", count=1000)]
+            if keys:
+                await self.redis_client.delete(*keys)
+        except Exception as e:
+            logger.error(f"Failed to purge cached predictions for {prefix}: {e}")
+
+
+class PredictionBatcher:
+    """Gathers concurrent single-row predictions for one model into batched model calls"""
+
+    def __init__(self, registry: "ModelRegistry", model_name: str,
+                 max_batch_size: int = BATCH_MAX_SIZE, max_wait_ms: float = BATCH_MAX_WAIT_MS, shadow: bool = False):
+        self.registry = registry
+        self.model_name = model_name
+        self.shadow = shadow
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait_ms / 1000
+        self.queue: asyncio.Queue = asyncio.Queue()
+        self.worker: Optional[asyncio.Task] = None
+
+    async def submit(self, features: Dict[str, Any]) -> Tuple[Any, Optional[float], str]:
+        """Queue one row and wait for its (prediction, confidence, version that scored it)"""
+        if self.worker is None or self.worker.done():
+            self.worker = asyncio.create_task(self._run())
+
+        future = asyncio.get_running_loop().create_future()
+        await self.queue.put((features, future))
+        return await future
+
+    async def predict_many(self, rows: List[Dict[str, Any]]) -> Tuple[List[Any], List[Optional[float]], str]:
+        """Score rows the caller already holds as a batch, off the event loop.
+
+        The slot is read once, so the returned version is the one whose model
+        scored the rows even if a hot-swap publishes a new slot meanwhile.
+        """
+        slot = self.registry.get_slot(self.model_name, shadow=self.shadow)
+        if slot is None:
+            raise KeyError(f"Model {self.model_name} not found")
+
+        BATCH_SIZE.labels(model_name=self.model_name).observe(len(rows))
+        predictions, confidences = await asyncio.get_running_loop().run_in_executor(None, predict_rows, slot.model, rows)
+        return predictions, confidences, slot.version
+
+    async def _collect(self) -> List[Tuple[Dict[str, Any], asyncio.Future]]:
+        """Wait for one request, then take more until the batch is full or the wait expires"""
+        loop = asyncio.get_running_loop()
+        batch = [await self.queue.get()]
+        deadline = loop.time() + self.max_wait
+
+        while len(batch) < self.max_batch_size:
+            if not self.queue.empty():
+                batch.append(self.queue.get_nowait())
+                continue
+
+            timeout = deadline - loop.time()
+            if timeout <= 0:
+                break
+            try:
+                batch.append(await asyncio.wait_for(self.queue.get(), timeout))
+            except asyncio.TimeoutError:
+                break
+
+        return batch
+
+    async def _run(self):
+        while True:
+            batch = await self._collect()
+            # Callers that gave up (client disconnects) are not scored
+            batch = [(features, future) for features, future in batch if not future.done()]
+            if not batch:
+                continue
+
+            try:
+                predictions, confidences, version = await self.predict_many([features for features, _ in batch])
+            except Exception as e:
+                if len(batch) == 1:
+                    self._fail(batch[0][1], e)
+                    continue
+                # One malformed row must not fail its neighbours: rescore each row on its own
+                logger.warning(f"Batched prediction failed for {self.model_name}, retrying {len(batch)} rows singly: {e}")
+                await asyncio.gather(*(self._predict_one(features, future) for features, future in batch))
+                continue
+
+            for (_, future), prediction, confidence in zip(batch, predictions, confidences):
+                if not future.done():
+                    future.set_result((prediction, confidence, version))
+
+    async def _predict_one(self, features: Dict[str, Any], future: asyncio.Future):
+        try:
+            predictions, confidences, version = await self.predict_many([features])
+        except Exception as e:
+            self._fail(future, e)
+            return
+        if not future.done():
+            future.set_result((predictions[0], confidences[0], version))
+
+    @staticmethod
+    def _fail(future: asyncio.Future, error: Exception):
+        if not future.done():
+            future.set_exception(error)
+
+    def stop(self):
+        if self.worker is not None:
+            self.worker.cancel()
+            self.worker = None
+
+
+def _prediction_delta(primary: Any, shadow: Any) -> Optional[float]:
+    """Largest absolute difference between two predictions, or None when they are not numeric"""
+    try:
+        primary, shadow = np.asarray(primary, dtype=float), np.asarray(shadow, dtype=float)
+        return float(np.max(np.abs(primary - shadow))) if primary.shape == shadow.shape else None
+    except (TypeError, ValueError):
+        return None
+
+
+@dataclass
+class ModelSlot:
+    """One loaded model version, published to the registry in a single assignment"""
+    model: Any
+    version: str
+    stage: str
+    run_id: Optional[str]
+    model_uri: str
+    loaded_at: str
+    load_seconds: float = 0.0
+    warmup_ms: Optional[float] = None
+
+    @property
+    def metadata(self) -> Dict[str, Any]:
+        return {
+            'version': self.version,
+            'stage': self.stage,
+            'run_id': self.run_id,
+            'loaded_at': self.loaded_at,
+            'model_uri': self.model_uri,
+            'load_seconds': self.load_seconds,
+            'warmup_ms': self.warmup_ms
+        }
+
+
+class ShadowDeployment:
+    """A candidate version scored on a fraction of live traffic; its predictions are never returned"""
+
+    def __init__(self, slot: ModelSlot, fraction: float, window: int = 10000):
+        self.slot = slot
+        self.fraction = fraction
+        self.started_at = datetime.now().isoformat()
+        self.scored = 0
+        self.errors = 0
+        self.disagreements = 0
+        self.primary_latency_ms = deque(maxlen=window)
+        self.shadow_latency_ms = deque(maxlen=window)
+        self.deltas = deque(maxlen=window)
+
+    def should_sample(self) -> bool:
+        return random.random() < self.fraction
+
+    def record(self, model_name: str, primary: Any, shadow: Any, primary_ms: float, shadow_ms: float):
+        self.scored += 1
+        self.primary_latency_ms.append(primary_ms)
+        self.shadow_latency_ms.append(shadow_ms)
+        SHADOW_LATENCY.labels(model_name=model_name, role="primary").observe(primary_ms / 1000)
+        SHADOW_LATENCY.labels(model_name=model_name, role="shadow").observe(shadow_ms / 1000)
+
+        if shadow != primary:
+            self.disagreements += 1
+            SHADOW_DISAGREEMENTS.labels(model_name=model_name).inc()
+
+        delta = _prediction_delta(primary, shadow)
+        if delta is not None:
+            self.deltas.append(delta)
+            SHADOW_DELTA.labels(model_name=model_name).observe(delta)
+
+    def stats(self) -> Dict[str, Any]:
+        def percentiles(values):
+            if not values:
+                return None
+            p50, p99 = np.percentile(np.fromiter(values, dtype=float), [50, 99])
+            return {"p50": round(float(p50), 3), "p99": round(float(p99), 3)}
+
+        return {
+            "candidate": self.slot.metadata,
+            "fraction": self.fraction,
+            "started_at": self.started_at,
+            "scored": self.scored,
+            "errors": self.errors,
+            "disagreement_rate": self.disagreements / self.scored if self.scored else None,
+            "mean_abs_delta": float(np.mean(self.deltas)) if self.deltas else None,
+            "max_abs_delta": float(np.max(self.deltas)) if self.deltas else None,
+            "primary_latency_ms": percentiles(self.primary_latency_ms),
+            "shadow_latency_ms": percentiles(self.shadow_latency_ms)
+        }
 
 
 class ModelRegistry:
-    """Registry for managing loaded models"""
+    """Registry for managing loaded models
+
+    Each model name points at an immutable ModelSlot. A new version is loaded
+    and warmed up in a worker thread while the current one keeps serving, then
+    swapped in with one assignment, so requests see either the old or the new
+    version in full. A candidate can instead be attached as a shadow.
+    """
 
     def __init__(self):
-        self.models = {}
-        self.model_metadata = {}
+        self.slots: Dict[str, ModelSlot] = {}
+        self.shadows: Dict[str, ShadowDeployment] = {}
+        self.load_status: Dict[str, Dict[str, Any]] = {}
+        self.loading: Dict[Tuple[str, bool], asyncio.Task] = {}
+        self.warmup_rows: Dict[str, deque] = {}
+        self.batchers: Dict[str, PredictionBatcher] = {}
+        self.shadow_batchers: Dict[str, PredictionBatcher] = {}
+        self.shadow_tasks = set()
         self.feature_store = GlobalTaxCalcFeatureStore()
         self.redis_client = None
+        self.prediction_cache = PredictionCache()
         self._setup_redis()
 
     def _setup_redis(self):
@@ -57,63 +422,197 @@ class ModelRegistry:
         try:
             self.redis_client = redis.Redis(host='localhost', port=6379, decode_responses=True)
             self.redis_client.ping()
+            self.prediction_cache.redis_client = redis_asyncio.Redis(host='localhost', port=6379, decode_responses=True)
             logger.info("Connected to Redis for model caching")
         except Exception as e:
             logger.warning(f"Redis connection failed: {e}")
 
+    def _build_slot(self, model_name: str, stage: str, warmup_rows: List[Dict[str, Any]]) -> ModelSlot:
+        """Resolve, load and warm up one version; runs off the event loop"""
+        start_time = time.time()
+
+        # Resolve only the requested stage (or an explicit version number) instead of searching every version
+        mlflow_client = mlflow.MlflowClient()
+        if stage.isdigit():
+            model_version = mlflow_client.get_model_version(model_name, stage)
+        else:
+            versions = mlflow_client.get_latest_versions(model_name, stages=[stage])
+            if not versions:
+                raise ValueError(f"No {stage} version of {model_name}")
+            model_version = versions[0]
+
+        # Pin the version so a concurrent stage transition cannot change what is loaded
+        model_uri = f"models:/{model_name}/{model_version.version}"
+        model = mlflow.pyfunc.load_model(model_uri)
+
+        # Warm-up on recent traffic fails the load before the version can serve
+        warmup_ms = None
+        if warmup_rows:
+            warmup_start = time.time()
+            predict_rows(model, warmup_rows)
+            warmup_ms = (time.time() - warmup_start) * 1000
+
+        return ModelSlot(
+            model=model,
+            version=str(model_version.version),
+            stage=model_version.current_stage,
+            run_id=model_version.run_id,
+            model_uri=model_uri,
+            loaded_at=datetime.now().isoformat(),
+            load_seconds=time.time() - start_time,
+            warmup_ms=warmup_ms
+        )
+
+    def _publish(self, model_name: str, slot: ModelSlot):
+        """Atomically point model_name at a new slot"""
+        previous = self.slots.get(model_name)
+        self.slots[model_name] = slot
+
+        # Predictions cached for another version of this model are no longer valid
+        if previous is not None and previous.version != slot.version:
+            self.prediction_cache.invalidate_model(model_name)
+
+        MODEL_LOAD_TIME.labels(model_name=model_name).observe(slot.load_seconds)
+        ACTIVE_MODELS.set(len(self.slots))
+        logger.info(f"Serving model {model_name} v{slot.version} (loaded in {slot.load_seconds:.2f}s)")
+
     def load_model(self, model_name: str, stage: str = "Production") -> bool:
-        """Load model from MLflow registry"""
+        """Load model from MLflow registry, blocking until it serves"""
         try:
-            start_time = time.time()
-
-            # Load model
-            model_uri = f"models:/{model_name}/{stage}"
-            model = mlflow.pyfunc.load_model(model_uri)
-
-            # Get model metadata
-            mlflow_client = mlflow.MlflowClient()
-            model_versions = mlflow_client.search_model_versions(f"name='{model_name}'")
-            latest_version = max(model_versions, key=lambda x: int(x.version))
-
-            # Store model and metadata
-            self.models[model_name] = model
-            self.model_metadata[model_name] = {
-                'version': latest_version.version,
-                'stage': latest_version.current_stage,
-                'run_id': latest_version.run_id,
-                'loaded_at': datetime.now().isoformat(),
-                'model_uri': model_uri
-            }
+            slot = self._build_slot(model_name, stage, list(self.warmup_rows.get(model_name, ())))
+        except Exception as e:
+            logger.error(f"Failed to load model {model_name}: {e}")
+            return False
 
-            load_time = time.time() - start_time
-            MODEL_LOAD_TIME.labels(model_name=model_name).observe(load_time)
-            ACTIVE_MODELS.set(len(self.models))
+        self._publish(model_name, slot)
+        return True
 
-            logger.info(f"Loaded model {model_name} v{latest_version.version} in {load_time:.2f}s")
-            return True
+    def start_load(self, model_name: str, stage: str = "Production",
+                   shadow_fraction: Optional[float] = None) -> asyncio.Task:
+        """Load a version in the background; the current version keeps serving until the swap"""
+        key = (model_name, shadow_fraction is not None)
+        if key in self.loading:
+            return self.loading[key]
+
+        task = asyncio.create_task(self._load(model_name, stage, shadow_fraction))
+        self.loading[key] = task
+        task.add_done_callback(lambda _: self.loading.pop(key, None))
+        return task
+
+    async def load_model_async(self, model_name: str, stage: str = "Production",
+                               shadow_fraction: Optional[float] = None) -> bool:
+        """Load a version in the background and wait for it to be published"""
+        return await asyncio.shield(self.start_load(model_name, stage, shadow_fraction))
+
+    async def _load(self, model_name: str, stage: str, shadow_fraction: Optional[float]) -> bool:
+        role = "shadow" if shadow_fraction is not None else "primary"
+        self.load_status[model_name] = {'state': 'loading', 'stage': stage, 'role': role,
+                                        'started_at': datetime.now().isoformat()}
+        warmup_rows = list(self.warmup_rows.get(model_name, ()))
 
+        try:
+            slot = await asyncio.get_running_loop().run_in_executor(
+                None, self._build_slot, model_name, stage, warmup_rows
+            )
         except Exception as e:
-            logger.error(f"Failed to load model {model_name}: {e}")
+            logger.error(f"Failed to load model {model_name} ({stage}): {e}")
+            self.load_status[model_name].update(state='failed', error=str(e))
             return False
 
+        if shadow_fraction is None:
+            self._publish(model_name, slot)
+        else:
+            self.shadows[model_name] = ShadowDeployment(slot, shadow_fraction)
+            logger.info(f"Shadowing model {model_name} v{slot.version} on {shadow_fraction:.0%} of traffic")
+
+        self.load_status[model_name].update(state='ready', version=slot.version, warmup_ms=slot.warmup_ms)
+        return True
+
     def get_model(self, model_name: str):
         """Get loaded model"""
-        return self.models.get(model_name)
+        slot = self.slots.get(model_name)
+        return slot.model if slot else None
+
+    def get_slot(self, model_name: str, shadow: bool = False) -> Optional[ModelSlot]:
+        """Get the published slot (or the shadow candidate's slot) for a model"""
+        if shadow:
+            deployment = self.shadows.get(model_name)
+            return deployment.slot if deployment else None
+        return self.slots.get(model_name)
+
+    def get_shadow_model(self, model_name: str):
+        """Get the candidate model being shadowed"""
+        shadow = self.shadows.get(model_name)
+        return shadow.slot.model if shadow else None
+
+    def get_batcher(self, model_name: str, shadow: bool = False) -> PredictionBatcher:
+        """Get the prediction batcher for a model; it always scores with the currently published version"""
+        batchers = self.shadow_batchers if shadow else self.batchers
+        if model_name not in batchers:
+            batchers[model_name] = PredictionBatcher(self, model_name, shadow=shadow)
+        return batchers[model_name]
 
     def get_model_metadata(self, model_name: str) -> Dict[str, Any]:
         """Get model metadata"""
-        return self.model_metadata.get(model_name, {})
+        slot = self.slots.get(model_name)
+        return slot.metadata if slot else {}
 
     def list_models(self) -> List[str]:
         """List all loaded models"""
-        return list(self.models.keys())
+        return list(self.slots.keys())
+
+    def record_sample(self, model_name: str, features: Dict[str, Any]):
+        """Keep recent rows as the warm-up batch for the next version"""
+        if model_name not in self.warmup_rows:
+            self.warmup_rows[model_name] = deque(maxlen=WARMUP_SAMPLE_SIZE)
+        self.warmup_rows[model_name].append(features)
+
+    def maybe_shadow(self, model_name: str, features: Dict[str, Any], prediction: Any, primary_ms: float):
+        """Score a sampled request with the shadow candidate without delaying the response"""
+        shadow = self.shadows.get(model_name)
+        if shadow is None or not shadow.should_sample():
+            return
+
+        task = asyncio.create_task(self._score_shadow(model_name, shadow, features, prediction, primary_ms))
+        self.shadow_tasks.add(task)
+        task.add_done_callback(self.shadow_tasks.discard)
+
+    async def _score_shadow(self, model_name: str, shadow: ShadowDeployment, features: Dict[str, Any],
+                            primary_prediction: Any, primary_ms: float):
+        start_time = time.time()
+        try:
+            prediction, _, _ = await self.get_batcher(model_name, shadow=True).submit(features)
+        except Exception as e:
+            shadow.errors += 1
+            ERROR_COUNTER.labels(model_name=model_name, error_type="shadow_error").inc()
+            logger.warning(f"Shadow scoring failed for {model_name}: {e}")
+            return
+
+        shadow.record(model_name, primary_prediction, prediction, primary_ms, (time.time() - start_time) * 1000)
+
+    def promote_shadow(self, model_name: str) -> Optional[ModelSlot]:
+        """Swap the warmed-up shadow candidate in as the serving version"""
+        shadow = self.stop_shadow(model_name)
+        if shadow is None:
+            return None
+        self._publish(model_name, shadow.slot)
+        return shadow.slot
+
+    def stop_shadow(self, model_name: str) -> Optional[ShadowDeployment]:
+        shadow = self.shadows.pop(model_name, None)
+        if model_name in self.shadow_batchers:
+            self.shadow_batchers.pop(model_name).stop()
+        return shadow
 
     def unload_model(self, model_name: str) -> bool:
         """Unload model from memory"""
-        if model_name in self.models:
-            del self.models[model_name]
-            del self.model_metadata[model_name]
-            ACTIVE_MODELS.set(len(self.models))
+        if model_name in self.slots:
+            del self.slots[model_name]
+            self.stop_shadow(model_name)
+            self.prediction_cache.invalidate_model(model_name)
+            if model_name in self.batchers:
+                self.batchers.pop(model_name).stop()
+            ACTIVE_MODELS.set(len(self.slots))
             logger.info(f"Unloaded model: {model_name}")
             return True
         return False
@@ -128,6 +627,11 @@ class PredictionRequest(BaseModel):
     experiment_id: Optional[str] = None
 
 
+class BatchPredictionRequest(BaseModel):
+    model_name: str
+    instances: List[Dict[str, Any]] = Field(..., min_length=1, max_length=10000)
+
+
 class TaxOptimizationRequest(BaseModel):
     user_id: int
     income: float
@@ -159,6 +663,16 @@ class PredictionResponse(BaseModel):
     experiment_id: Optional[str] = None
 
 
+class BatchPredictionResponse(BaseModel):
+    predictions: List[Any]
+    confidences: List[Optional[float]]
+    model_name: str
+    model_version: str
+    prediction_id: str
+    timestamp: str
+    latency_ms: float
+
+
 class HealthResponse(BaseModel):
     status: str
     models_loaded: int
@@ -185,8 +699,8 @@ async def lifespan(app: FastAPI):
         "recommendation_model"
     ]
 
-    for model_name in default_models:
-        success = model_registry.load_model(model_name)
+    results = await asyncio.gather(*(model_registry.load_model_async(name) for name in default_models))
+    for model_name, success in zip(default_models, results):
         if success:
             logger.info(f"Loaded default model: {model_name}")
 
@@ -295,31 +809,6 @@ async def get_features_for_user(user_id: int, feature_names: List[str]) -> Dict[
         return {}
 
 
-def cache_prediction(prediction_id: str, response: Dict[str, Any], ttl: int = 3600):
-    """Cache prediction result"""
-    if model_registry.redis_client:
-        try:
-            model_registry.redis_client.setex(
-                f"prediction:{prediction_id}",
-                ttl,
-                json.dumps(response, default=str)
-            )
-        except Exception as e:
-            logger.error(f"Failed to cache prediction: {e}")
-
-
-def get_cached_prediction(prediction_id: str) -> Optional[Dict[str, Any]]:
-    """Get cached prediction"""
-    if model_registry.redis_client:
-        try:
-            cached = model_registry.redis_client.get(f"prediction:{prediction_id}")
-            if cached:
-                return json.loads(cached)
-        except Exception as e:
-            logger.error(f"Failed to get cached prediction: {e}")
-    return None
-
-
 @app.get("/health", response_model=HealthResponse)
 async def health_check():
     """Health check endpoint"""
@@ -340,23 +829,85 @@ async def list_models():
     models = []
     for model_name in model_registry.list_models():
         metadata = model_registry.get_model_metadata(model_name)
+        shadow = model_registry.shadows.get(model_name)
         models.append({
             "name": model_name,
             "version": metadata.get("version"),
             "stage": metadata.get("stage"),
-            "loaded_at": metadata.get("loaded_at")
+            "loaded_at": metadata.get("loaded_at"),
+            "shadow_version": shadow.slot.version if shadow else None
         })
     return {"models": models}
 
 
 @app.post("/models/{model_name}/load")
-async def load_model(model_name: str, stage: str = "Production"):
-    """Load a model from MLflow registry"""
-    success = model_registry.load_model(model_name, stage)
-    if success:
-        return {"message": f"Model {model_name} loaded successfully"}
-    else:
-        raise HTTPException(status_code=500, detail=f"Failed to load model {model_name}")
+async def load_model(model_name: str, stage: str = "Production", wait: bool = False):
+    """Load a model from MLflow registry; the current version keeps serving until the new one is warmed up"""
+    task = model_registry.start_load(model_name, stage)
+    if not wait:
+        return {"message": f"Loading model {model_name} ({stage}) in the background", "status": "loading"}
+
+    if await asyncio.shield(task):
+        return {"message": f"Model {model_name} loaded successfully",
+                "version": model_registry.get_model_metadata(model_name).get("version")}
+    raise HTTPException(status_code=500, detail=f"Failed to load model {model_name}")
+
+
+@app.get("/models/{model_name}/status")
+async def model_status(model_name: str):
+    """Serving version and the state of the latest load"""
+    if model_name not in model_registry.load_status and not model_registry.get_model(model_name):
+        raise HTTPException(status_code=404, detail=f"Model {model_name} not found")
+
+    return {
+        "serving": model_registry.get_model_metadata(model_name) or None,
+        "last_load": model_registry.load_status.get(model_name),
+        "shadow": model_registry.shadows[model_name].stats() if model_name in model_registry.shadows else None
+    }
+
+
+@app.post("/models/{model_name}/shadow")
+async def start_shadow(model_name: str, stage: str = "Staging", fraction: float = 0.1, wait: bool = False):
+    """Load a candidate version and score a fraction of live traffic with it"""
+    if not model_registry.get_model(model_name):
+        raise HTTPException(status_code=404, detail=f"Model {model_name} not found")
+    if not 0 < fraction <= 1:
+        raise HTTPException(status_code=400, detail="Shadow fraction must be in (0, 1]")
+
+    task = model_registry.start_load(model_name, stage, shadow_fraction=fraction)
+    if not wait:
+        return {"message": f"Loading shadow candidate for {model_name} ({stage})", "status": "loading"}
+
+    if await asyncio.shield(task):
+        return {"message": f"Shadowing {model_name} on {fraction:.0%} of traffic",
+                "version": model_registry.shadows[model_name].slot.version}
+    raise HTTPException(status_code=500, detail=f"Failed to load shadow candidate for {model_name}")
+
+
+@app.get("/models/{model_name}/shadow")
+async def get_shadow_stats(model_name: str):
+    """Latency and prediction deltas of the shadow candidate against the serving version"""
+    if model_name not in model_registry.shadows:
+        raise HTTPException(status_code=404, detail=f"No shadow deployment for {model_name}")
+    return model_registry.shadows[model_name].stats()
+
+
+@app.post("/models/{model_name}/shadow/promote")
+async def promote_shadow(model_name: str):
+    """Swap the shadow candidate in as the serving version"""
+    slot = model_registry.promote_shadow(model_name)
+    if slot is None:
+        raise HTTPException(status_code=404, detail=f"No shadow deployment for {model_name}")
+    return {"message": f"Model {model_name} v{slot.version} promoted", "version": slot.version}
+
+
+@app.delete("/models/{model_name}/shadow")
+async def stop_shadow(model_name: str):
+    """Stop shadow scoring and drop the candidate"""
+    shadow = model_registry.stop_shadow(model_name)
+    if shadow is None:
+        raise HTTPException(status_code=404, detail=f"No shadow deployment for {model_name}")
+    return {"message": f"Stopped shadowing {model_name}", "stats": shadow.stats()}
 
 
 @app.delete("/models/{model_name}")
@@ -386,50 +937,34 @@ async def predict(request: PredictionRequest, background_tasks: BackgroundTasks)
             if ab_model:
                 model_name = ab_model
 
-        # Check cache if enabled
-        cache_key = f"{model_name}:{hash(str(request.features))}"
+        # Check cache if enabled; keys are stable across workers and tied to the loaded version
+        metadata = model_registry.get_model_metadata(model_name)
+        cache_key = model_registry.prediction_cache.key(model_name, metadata.get("version", "unknown"), request.features)
         if request.use_cache:
-            cached_result = get_cached_prediction(cache_key)
+            cached_result = await model_registry.prediction_cache.get(cache_key)
             if cached_result:
                 return PredictionResponse(**cached_result)
 
-        # Get model
-        model = model_registry.get_model(model_name)
-        if not model:
+        # Check model
+        if not model_registry.get_model(model_name):
             ERROR_COUNTER.labels(model_name=model_name, error_type="model_not_found").inc()
             raise HTTPException(status_code=404, detail=f"Model {model_name} not found")
 
-        # Prepare features
-        features_df = pd.DataFrame([request.features])
+        # Make prediction; concurrent requests for the same model share one predict/predict_proba call
+        predict_start = time.time()
+        prediction, confidence, version = await model_registry.get_batcher(model_name).submit(request.features)
 
-        # Make prediction
-        prediction = model.predict(features_df)
-
-        # Handle different prediction types
-        if isinstance(prediction, np.ndarray):
-            if prediction.ndim > 1:
-                prediction = prediction.tolist()
-            else:
-                prediction = prediction.item() if prediction.size == 1 else prediction.tolist()
-
-        # Calculate confidence if available
-        confidence = None
-        if hasattr(model, 'predict_proba'):
-            try:
-                proba = model.predict_proba(features_df)
-                confidence = float(np.max(proba))
-            except:
-                pass
+        model_registry.record_sample(model_name, request.features)
+        model_registry.maybe_shadow(model_name, request.features, prediction, (time.time() - predict_start) * 1000)
 
         # Create response
         latency = (time.time() - start_time) * 1000
-        metadata = model_registry.get_model_metadata(model_name)
 
         response = PredictionResponse(
             prediction=prediction,
             confidence=confidence,
             model_name=model_name,
-            model_version=metadata.get("version", "unknown"),
+            model_version=version,
             prediction_id=prediction_id,
             timestamp=datetime.now().isoformat(),
             latency_ms=latency,
@@ -437,25 +972,60 @@ async def predict(request: PredictionRequest, background_tasks: BackgroundTasks)
         )
 
         # Update metrics
-        PREDICTION_COUNTER.labels(model_name=model_name, version=metadata.get("version", "unknown")).inc()
+        PREDICTION_COUNTER.labels(model_name=model_name, version=version).inc()
         PREDICTION_LATENCY.labels(model_name=model_name).observe(latency / 1000)
 
-        # Cache result
+        # Cache result locally now and in Redis after the response is sent, keyed by the version
+        # that scored it: a hot-swap while the request was queued must not file it under the old one
         if request.use_cache:
-            background_tasks.add_task(
-                cache_prediction,
-                cache_key,
-                response.model_dump()
-            )
+            cache_key = model_registry.prediction_cache.key(model_name, version, request.features)
+            cached = response.model_dump()
+            model_registry.prediction_cache.put_local(cache_key, cached)
+            background_tasks.add_task(model_registry.prediction_cache.set_shared, cache_key, cached)
 
         return response
 
+    except HTTPException:
+        raise
     except Exception as e:
         ERROR_COUNTER.labels(model_name=model_name, error_type="prediction_error").inc()
         logger.error(f"Prediction error: {e}")
         raise HTTPException(status_code=500, detail=str(e))
 
 
+@app.post("/predict/batch", response_model=BatchPredictionResponse)
+async def predict_batch(request: BatchPredictionRequest):
+    """Score many rows with one model call"""
+    start_time = time.time()
+    model_name = request.model_name
+
+    if not model_registry.get_model(model_name):
+        ERROR_COUNTER.labels(model_name=model_name, error_type="model_not_found").inc()
+        raise HTTPException(status_code=404, detail=f"Model {model_name} not found")
+
+    try:
+        predictions, confidences, version = await model_registry.get_batcher(model_name).predict_many(request.instances)
+    except Exception as e:
+        ERROR_COUNTER.labels(model_name=model_name, error_type="prediction_error").inc()
+        logger.error(f"Batch prediction error: {e}")
+        raise HTTPException(status_code=500, detail=str(e))
+
+    latency = (time.time() - start_time) * 1000
+
+    PREDICTION_COUNTER.labels(model_name=model_name, version=version).inc(len(predictions))
+    PREDICTION_LATENCY.labels(model_name=model_name).observe(latency / 1000)
+
+    return BatchPredictionResponse(
+        predictions=predictions,
+        confidences=confidences,
+        model_name=model_name,
+        model_version=version,
+        prediction_id=str(uuid.uuid4()),
+        timestamp=datetime.now().isoformat(),
+        latency_ms=latency
+    )
+
+
 @app.post("/predict/tax-optimization")
 async def predict_tax_optimization(request: TaxOptimizationRequest):
     """Predict tax optimization opportunities"""
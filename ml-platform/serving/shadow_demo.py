@@ -0,0 +1,114 @@
+"""
+Shadow Scoring Demo
+Hot-swap and shadow scoring against a local file-based MLflow store
+
+Registers two versions of a toy classifier in a throwaway file store
+(version 1 in Production, version 2 in Staging), serves version 1, then
+under continuous /predict traffic shadows version 2 on a fraction of
+requests and promotes it. Prints shadow statistics, the versions that
+served each request and the number of failed requests (expected: 0).
+
+    python serving/shadow_demo.py --requests 2000 --fraction 0.5
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import sys
+import tempfile
+from collections import Counter
+
+import httpx
+import mlflow
+import mlflow.sklearn
+import numpy as np
+import pandas as pd
+from sklearn.ensemble import RandomForestClassifier
+from sklearn.linear_model import LogisticRegression
+
+sys.path.append(os.path.dirname(__file__))
+
+MODEL_NAME = "shadow_demo_model"
+FEATURES = [f"feature_{i}" for i in range(8)]
+
+
+def register_versions(tracking_dir: str):
+    """Register a Production and a Staging version in a local file store"""
+    mlflow.set_tracking_uri(f"file://{tracking_dir}")
+    client = mlflow.MlflowClient()
+
+    rng = np.random.default_rng(0)
+    X = pd.DataFrame(rng.normal(size=(2000, len(FEATURES))), columns=FEATURES)
+    y = (X["feature_0"] + 0.5 * X["feature_1"] > 0).astype(int)
+
+    for model, stage in ((LogisticRegression(), "Production"), (RandomForestClassifier(n_estimators=30), "Staging")):
+        with mlflow.start_run():
+            mlflow.sklearn.log_model(model.fit(X, y), "model", registered_model_name=MODEL_NAME)
+        version = max(int(v.version) for v in client.search_model_versions(f"name='{MODEL_NAME}'"))
+        client.transition_model_version_stage(MODEL_NAME, str(version), stage)
+
+
+async def traffic(client: httpx.AsyncClient, rows: list, concurrency: int, versions: Counter, failures: list):
+    queue = asyncio.Queue()
+    for row in rows:
+        queue.put_nowait(row)
+
+    async def worker():
+        while not queue.empty():
+            row = queue.get_nowait()
+            response = await client.post("/predict", json={
+                "features": row, "model_name": MODEL_NAME, "use_cache": False
+            })
+            if response.status_code == 200:
+                versions[response.json()["model_version"]] += 1
+            else:
+                failures.append(response.status_code)
+            # Spread traffic over the load, shadow and promotion steps
+            await asyncio.sleep(0.005)
+
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+
+
+async def main(args):
+    tracking_dir = tempfile.mkdtemp(prefix="mlruns-")
+    register_versions(tracking_dir)
+
+    # Imported after the tracking URI is set so the registry resolves versions from the file store
+    from model_server import app, model_registry
+
+    if not await model_registry.load_model_async(MODEL_NAME):
+        raise SystemExit("Failed to load the Production version")
+
+    rng = np.random.default_rng(1)
+    rows = [dict(zip(FEATURES, row)) for row in rng.normal(size=(args.requests, len(FEATURES))).tolist()]
+    versions, failures = Counter(), []
+
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://shadow-demo") as client:
+        load = asyncio.create_task(traffic(client, rows, args.concurrency, versions, failures))
+
+        await asyncio.sleep(1)
+        shadow = await client.post(f"/models/{MODEL_NAME}/shadow",
+                                   params={"stage": "Staging", "fraction": args.fraction, "wait": True})
+        print(json.dumps({"step": "shadow", **shadow.json()}))
+
+        await asyncio.sleep(2)
+        stats = await client.get(f"/models/{MODEL_NAME}/shadow")
+        print(json.dumps({"step": "shadow_stats", **stats.json()}, default=str))
+
+        promoted = await client.post(f"/models/{MODEL_NAME}/shadow/promote")
+        print(json.dumps({"step": "promote", **promoted.json()}))
+
+        await load
+
+    print(json.dumps({"step": "done", "served_by_version": dict(versions), "failed_requests": len(failures)}))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[1])
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--fraction", type=float, default=0.5)
+
+    asyncio.run(main(parser.parse_args()))
@@ -0,0 +1,90 @@
+"""
+Test drift sketch persistence
+"""
+
+from datetime import datetime, timedelta, timezone
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from monitoring.model_monitor import DataDriftDetector
+
+
+class TestDriftSketchPersistence:
+    """Test that persisted sketches merge back into the in-memory result"""
+
+    @pytest.fixture
+    def detector(self, tmp_path):
+        """Detector writing sketches to a scratch sqlite file"""
+        detector = DataDriftDetector(f"sqlite:///{tmp_path / 'monitoring.db'}")
+        rng = np.random.default_rng(0)
+        detector.set_reference_data('tax_model', pd.DataFrame({'income': rng.normal(60000, 15000, 5000)}),
+                                    keep_data=False)
+        return detector
+
+    def test_persist_merge_read_round_trip(self, detector):
+        """Test that windows read back from the database equal the merged in-memory sketches"""
+        rng = np.random.default_rng(1)
+        start = datetime(2024, 3, 1)
+        batches = [
+            (start + timedelta(minutes=10), rng.normal(60000, 15000, 400)),
+            (start + timedelta(minutes=50), rng.normal(60000, 15000, 600)),
+            (start + timedelta(hours=1, minutes=5), rng.normal(65000, 15000, 500)),
+            (start + timedelta(hours=2, minutes=30), rng.normal(70000, 15000, 300)),
+        ]
+        for timestamp, values in batches:
+            detector.update_sketches('tax_model', pd.DataFrame({'income': values}), timestamp)
+
+        in_memory = detector.window_sketches('tax_model', start, start + timedelta(hours=3))['income']
+        detector.flush_sketches()
+        assert detector.open_windows == {}
+
+        persisted = detector.window_sketches('tax_model', start, start + timedelta(hours=3))['income']
+        assert persisted.total == in_memory.total == 1800
+        np.testing.assert_allclose(persisted.counts, in_memory.counts)
+        assert persisted.mean == pytest.approx(in_memory.mean)
+
+        # Windows are selected by their start: [start, start + 2h) skips the third window
+        first_two = detector.window_sketches('tax_model', start, start + timedelta(hours=2))['income']
+        assert first_two.total == 1500
+
+    def test_same_window_rows_are_merged(self, detector):
+        """Test that a window persisted twice is read back as one sketch"""
+        rng = np.random.default_rng(2)
+        timestamp = datetime(2024, 3, 1, 9, 15)
+        for _ in range(2):
+            detector.update_sketches('tax_model', pd.DataFrame({'income': rng.normal(60000, 15000, 250)}), timestamp)
+            detector.flush_sketches('tax_model')
+
+        window = detector.window_sketches('tax_model', datetime(2024, 3, 1, 9), datetime(2024, 3, 1, 10))
+        assert window['income'].total == 500
+
+    def test_drift_between_persisted_windows(self, detector):
+        """Test drift detection on windows that only exist in the database"""
+        rng = np.random.default_rng(3)
+        start = datetime(2024, 3, 1)
+        detector.update_sketches('tax_model', pd.DataFrame({'income': rng.normal(60000, 15000, 2000)}), start)
+        detector.update_sketches('tax_model', pd.DataFrame({'income': rng.normal(90000, 15000, 2000)}),
+                                 start + timedelta(hours=1))
+        detector.flush_sketches()
+
+        metrics = detector.detect_drift_between('tax_model', start + timedelta(hours=1), start + timedelta(hours=2),
+                                                reference_start=start)
+        assert len(metrics) == 1
+        assert metrics[0].drift_detected
+
+    def test_aware_timestamps_share_utc_windows(self, detector):
+        """Test that aware and naive UTC timestamps land in, and select, the same windows"""
+        rng = np.random.default_rng(4)
+        eastern = timezone(timedelta(hours=-5))
+        detector.update_sketches('tax_model', pd.DataFrame({'income': rng.normal(60000, 15000, 200)}),
+                                 datetime(2024, 3, 1, 4, 30, tzinfo=eastern))
+        detector.update_sketches('tax_model', pd.DataFrame({'income': rng.normal(60000, 15000, 300)}),
+                                 datetime(2024, 3, 1, 9, 45))
+        assert list(detector.open_windows['tax_model']) == [datetime(2024, 3, 1, 9)]
+
+        detector.flush_sketches()
+        window = detector.window_sketches('tax_model', datetime(2024, 3, 1, 9, tzinfo=timezone.utc),
+                                          datetime(2024, 3, 1, 10, tzinfo=timezone.utc))
+        assert window['income'].total == 500
@@ -0,0 +1,105 @@
+"""
+Test deduction recommendation encoding and worker pool reuse
+"""
+
+import pickle
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from models import tax_optimization
+from models.tax_optimization import DeductionRecommendationEngine
+
+
+@pytest.fixture(scope="module")
+def engine():
+    """Engine trained on a small synthetic population"""
+    rng = np.random.default_rng(0)
+    n = 400
+    df = pd.DataFrame({
+        'age': rng.integers(22, 70, n),
+        'gross_income': rng.uniform(20000, 250000, n),
+        'dependents': rng.integers(0, 4, n),
+        'filing_status': rng.choice(['single', 'married_jointly', 'head_of_household'], n),
+        'education_level': rng.choice(['high_school', 'bachelor', 'master'], n),
+        'homeowner': rng.integers(0, 2, n),
+    })
+    np.random.seed(0)
+    engine = DeductionRecommendationEngine()
+    engine.train_deduction_models(df)
+    yield engine
+    engine.close()
+
+
+@pytest.fixture
+def users():
+    return pd.DataFrame({
+        'user_id': ['a', 'b', 'c'],
+        'age': [30, 45, 60],
+        'gross_income': [60000.0, 120000.0, 90000.0],
+        'dependents': [0, 2, 1],
+        'filing_status': ['single', 'married_jointly', 'head_of_household'],
+        'education_level': ['master', 'bachelor', 'high_school'],
+        'homeowner': [0, 1, 1],
+    })
+
+
+class TestDeductionEncoding:
+    """Test that categorical codes come from the encoders fit in training"""
+
+    def test_codes_match_training(self, engine, users):
+        """Test that a category keeps its training code whatever else is in the batch"""
+        encoder = engine.label_encoders['filing_status']
+        for _, row in users.iterrows():
+            features = engine._create_base_features(pd.DataFrame([row]))
+            assert features['filing_status'].iloc[0] == encoder.transform([row['filing_status']])[0]
+
+    def test_unseen_category(self, engine, users):
+        """Test that a category missing from the training data is encoded as -1"""
+        users = users.assign(filing_status=['married_separately', 'single', 'single'])
+        features = engine._create_base_features(users)
+        assert features['filing_status'].iloc[0] == -1
+
+    def test_single_user_matches_batch(self, engine, users):
+        """Test that recommending for one user matches that user's rows of a batch"""
+        batch = engine.recommend_deductions_batch(users, n_jobs=1)
+        for _, row in users.iterrows():
+            single = pd.DataFrame(engine.recommend_deductions(row.to_dict()))
+            expected = batch[batch['user_id'] == row['user_id']]
+            np.testing.assert_allclose(single['recommended_amount'].to_numpy(),
+                                       expected['recommended_amount'].to_numpy())
+
+
+class TestDeductionPool:
+    """Test that large batches reuse one worker pool"""
+
+    def test_pool_reused_and_matches_in_process(self, engine, users, monkeypatch):
+        """Test that pooled predictions equal in-process ones and the pool outlives the call"""
+        monkeypatch.setattr(tax_optimization, 'DEDUCTION_POOL_MIN_USERS', 0)
+        expected = engine.recommend_deductions_batch(users, n_jobs=1)
+
+        first = engine.recommend_deductions_batch(users, n_jobs=2)
+        pool = engine._pool
+        second = engine.recommend_deductions_batch(users, n_jobs=2)
+
+        assert pool is not None and engine._pool is pool
+        pd.testing.assert_frame_equal(first, expected)
+        pd.testing.assert_frame_equal(second, expected)
+
+    def test_small_batch_skips_pool(self, engine, users):
+        """Test that batches below the threshold never start a pool"""
+        engine.close()
+        engine.recommend_deductions_batch(users, n_jobs=2)
+        assert engine._pool is None
+
+    def test_pickle_drops_pool(self, engine, users, monkeypatch):
+        """Test that a pickled engine carries its encoders but not the pool"""
+        monkeypatch.setattr(tax_optimization, 'DEDUCTION_POOL_MIN_USERS', 0)
+        engine.recommend_deductions_batch(users, n_jobs=2)
+
+        restored = pickle.loads(pickle.dumps(engine))
+        assert restored._pool is None
+        assert set(restored.label_encoders) == {'filing_status', 'education_level'}
+        pd.testing.assert_frame_equal(restored.recommend_deductions_batch(users, n_jobs=1),
+                                      engine.recommend_deductions_batch(users, n_jobs=1))